@@ -69,6 +69,8 @@ examples:
       text: az prototype design --context "Add Redis caching layer"
     - name: Reset and start design fresh
       text: az prototype design --reset
+    - name: Generate architecture sections in parallel
+      text: az prototype design --skip-discovery --parallel-sections
 """
 
 helps["prototype build"] = """
@@ -91,6 +91,13 @@ def load_arguments(self, _):
             action="store_true",
             default=False,
         )
+        c.argument(
+            "parallel_sections",
+            options_list=["--parallel-sections"],
+            help="Generate all architecture sections concurrently, then reconcile them in one consistency pass.",
+            action="store_true",
+            default=False,
+        )
 
     # --- az prototype build ---
     with self.argument_context("prototype build") as c:
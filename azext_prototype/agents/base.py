@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
@@ -12,6 +13,9 @@ from azext_prototype.ai.provider import AIMessage, AIProvider, AIResponse
 
 logger = logging.getLogger(__name__)
 
+# Guards lazy creation of AgentContext.search_cache across worker threads.
+_search_cache_lock = threading.Lock()
+
 
 class AgentCapability(str, Enum):
     """Capabilities an agent can declare."""
@@ -67,6 +71,19 @@ class AgentContext:
     artifacts: dict[str, Any] = field(default_factory=dict)
     shared_state: dict[str, Any] = field(default_factory=dict)
     mcp_manager: Any = None  # MCPManager | None — typed as Any to avoid circular import
+    # SearchCache shared by every agent in the session; pass it to child
+    # contexts so delegated agents reuse the parent's search results.
+    search_cache: Any = None
+
+    def get_search_cache(self) -> Any:
+        """Return the session's search cache, creating it on first use."""
+        if self.search_cache is None:
+            from azext_prototype.knowledge.search_cache import SearchCache
+
+            with _search_cache_lock:
+                if self.search_cache is None:
+                    self.search_cache = SearchCache()
+        return self.search_cache
 
     def add_artifact(self, key: str, value: Any):
         """Store an artifact for other agents to reference."""
@@ -370,15 +387,18 @@ class BaseAgent:
                 )
             )
 
-            # Invoke each tool and append results
+            # Invoke the tools concurrently; results come back in call order
+            calls: list[tuple[str, dict]] = []
             for tc in response.tool_calls:
                 try:
                     args = _json.loads(tc.arguments) if isinstance(tc.arguments, str) else tc.arguments
                 except (_json.JSONDecodeError, TypeError):
                     args = {}
+                calls.append((tc.name, args))
 
-                result = context.mcp_manager.call_tool(tc.name, args)
+            results = context.mcp_manager.call_tools(calls)
 
+            for tc, result in zip(response.tool_calls, results):
                 tool_content = result.content
                 if result.is_error:
                     tool_content = f"Error: {result.error_message}"
@@ -421,29 +441,39 @@ class BaseAgent:
     ) -> AIResponse:
         """Detect ``[SEARCH: query]`` markers, fetch docs, and re-call the AI.
 
-        Attaches a :class:`~azext_prototype.knowledge.search_cache.SearchCache`
-        to *context* on first use so it is shared across agents in the same
-        session.
+        Results are cached in the context's shared
+        :class:`~azext_prototype.knowledge.search_cache.SearchCache`
+        (see :meth:`AgentContext.get_search_cache`).
         """
-        from azext_prototype.knowledge.search_cache import SearchCache
-        from azext_prototype.knowledge.web_search import search_and_fetch
+        from azext_prototype.knowledge.local_index import search_local
+        from azext_prototype.knowledge.web_search import search_and_fetch_many
 
-        cache = getattr(context, "_search_cache", None)
-        if cache is None:
-            cache = SearchCache()
-            context._search_cache = cache  # type: ignore[attr-defined]
+        cache = context.get_search_cache()
 
         markers = self._SEARCH_PATTERN.findall(response.content)[:3]
-        results: list[str] = []
+        resolved: dict[str, str] = {}
         for query in markers:
             cached = cache.get(query)
             if cached:
-                results.append(cached)
-            else:
-                fetched = search_and_fetch(query, max_results=2, max_chars_per_result=2000)
-                if fetched:
-                    cache.put(query, fetched)
-                    results.append(fetched)
+                resolved[query] = cached
+
+        # Try the offline knowledge index next; whatever it cannot answer
+        # is fetched from Learn concurrently (and from the persistent
+        # document cache when possible).
+        for query in dict.fromkeys(markers):
+            if query not in resolved:
+                local = search_local(query, max_results=2, max_chars_per_result=2000)
+                if local:
+                    cache.put(query, local)
+                    resolved[query] = local
+
+        misses = [q for q in dict.fromkeys(markers) if q not in resolved]
+        for query, fetched in zip(misses, search_and_fetch_many(misses, max_results=2, max_chars_per_result=2000)):
+            if fetched:
+                cache.put(query, fetched)
+                resolved[query] = fetched
+
+        results = [resolved[q] for q in markers if q in resolved]
 
         if not results:
             return response  # No results found, return original
@@ -298,6 +298,7 @@ class AgentOrchestrator:
             conversation_history=list(self.context.conversation_history),
             artifacts=dict(self.context.artifacts),
             shared_state=dict(self.context.shared_state),
+            search_cache=self.context.get_search_cache(),
         )
 
         return agent.execute(sub_context, sub_task)
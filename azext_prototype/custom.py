@@ -170,6 +170,7 @@ def _build_mcp_manager(config, project_dir: str):
             agents=srv.get("agents"),
             enabled=srv.get("enabled", True),
             timeout=srv.get("timeout", 30),
+            max_concurrency=srv.get("max_concurrency", 4),
             max_retries=srv.get("max_retries", 2),
             max_result_bytes=srv.get("max_result_bytes", 8192),
             settings=srv.get("settings", {}),
@@ -438,6 +439,7 @@ def prototype_design(
     interactive=False,
     status=False,
     skip_discovery=False,
+    parallel_sections=False,
     json_output=False,
 ):
     """Run the design stage.
@@ -512,6 +514,8 @@ def prototype_design(
         stage_kwargs["interactive"] = True
     if skip_discovery:
         stage_kwargs["skip_discovery"] = True
+    if parallel_sections:
+        stage_kwargs["parallel_sections"] = True
 
     from azext_prototype.ui.app import PrototypeApp
 
@@ -725,13 +729,13 @@ def _deploy_outputs(cmd):
         console.print_dim("Run 'az prototype deploy' first.")
         return {"status": "empty", "message": "No deployment outputs captured yet. Run 'az prototype deploy' first."}
 
-    for stage_name, stage_outputs in outputs.items():
-        console.print(f"  [accent]{stage_name}[/accent]")
-        if isinstance(stage_outputs, dict):
-            for key, val in stage_outputs.items():
-                console.print(f"    {key}: {val}")
-        else:
-            console.print(f"    {stage_outputs}")
+    stages = outputs.get("stages") or {}
+    for stage_name, entry in stages.items():
+        provider, source = entry.get("provider", "?"), entry.get("source", "?")
+        console.print(f"  [accent]{stage_name}[/accent] ({provider}, from {source})")
+        sensitive = set(entry.get("sensitive", []))
+        for key, val in entry.get("outputs", {}).items():
+            console.print(f"    {key}: {'(sensitive)' if key in sensitive else val}")
         console.print()
 
     return outputs
@@ -924,6 +928,16 @@ def prototype_status(cmd, detailed=False, json_output=False):
     # Deployment history
     status["deployment_history"] = tracker.get_deployment_history()
 
+    # Persistent cache footprint (in-process caches start empty every command)
+    from azext_prototype.knowledge.doc_cache import get_document_cache
+    from azext_prototype.stages.intent import get_classification_cache
+
+    learn = get_document_cache().stats()
+    status["caches"] = {
+        "learn-docs": {"entries": learn["entries"], "bytes": learn["bytes"]},
+        "intent": get_classification_cache().stats(),
+    }
+
     # -- JSON mode: return enriched dict --
     if json_output:
         return status
@@ -1037,6 +1051,14 @@ def prototype_status(cmd, detailed=False, json_output=False):
                 console.print(f"  {ts}  scope={scope}  files={files}")
             console.print()
 
+        if status["caches"]:
+            from azext_prototype.knowledge.search_cache import format_cache_stats
+
+            console.print_header("Caches")
+            for line in format_cache_stats(status["caches"]):
+                console.print(line)
+            console.print()
+
     return {"status": "displayed"}
 
 
@@ -220,6 +220,33 @@ class KnowledgeLoader:
         """Rough token count (~4 characters per token)."""
         return len(text) // _CHARS_PER_TOKEN
 
+    # ------------------------------------------------------------------
+    # Full-text search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 3,
+        min_coverage: float = 0.0,
+        service: str | None = None,
+    ) -> list:
+        """Search the knowledge tree with the offline BM25 index.
+
+        Returns a list of :class:`~azext_prototype.knowledge.local_index.IndexHit`.
+        When *service* is given, only sections of that service's
+        knowledge file are considered.
+        """
+        from azext_prototype.knowledge.local_index import get_local_index
+
+        source_filter = f"services/{service}.md" if service else None
+        return get_local_index(self._dir).search(
+            query,
+            max_results=max_results,
+            min_coverage=min_coverage,
+            source_filter=source_filter,
+        )
+
     # ------------------------------------------------------------------
     # Available files (for introspection / testing)
     # ------------------------------------------------------------------
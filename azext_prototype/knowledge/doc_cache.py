@@ -0,0 +1,288 @@
+"""Persistent, size-bounded cache for Microsoft Learn documents.
+
+Complements the session-scoped :class:`~azext_prototype.knowledge.search_cache.SearchCache`
+with a cross-session store under the user's Azure config directory
+(``$AZURE_CONFIG_DIR`` or ``~/.azure``), so repeated builds resolve
+``[SEARCH:]`` markers without touching the network.
+
+Two kinds of entries are stored, one JSON file each:
+
+* **Pages** — the *extracted plain text* of a fetched page (so the
+  HTML-to-text pass is cached too) plus the response's ``ETag`` and
+  ``Last-Modified`` validators.  Pages younger than ``fresh_seconds``
+  are served straight from disk; older pages are revalidated with a
+  conditional GET and a ``304`` simply refreshes the entry.
+* **Searches** — the hit list returned by the Learn search API, which
+  has no validators and is therefore expired after ``fresh_seconds``.
+
+The cache is bounded by ``max_bytes``; when a write pushes it over the
+limit, the least recently used entries are deleted.  A read records use
+in the entry's access time only, so the modification time — which the
+:class:`~azext_prototype.knowledge.local_index.LocalIndex` signs pages
+by — changes only when a page is written.  All operations are
+thread-safe and never raise.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_CACHE_DIRNAME = "prototype_learn_cache"
+
+DEFAULT_FRESH_SECONDS = 24 * 60 * 60  # 1 day
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # 32 MB
+
+# Upper bound on stored page text — callers truncate further per request.
+MAX_PAGE_CHARS = 64_000
+
+
+def _cache_dir() -> str:
+    """Return the default on-disk location of the document cache."""
+    base = os.environ.get("AZURE_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".azure")
+    return os.path.join(base, _CACHE_DIRNAME)
+
+
+class DocumentCache:
+    """Cross-session cache of Learn search results and page text.
+
+    Parameters
+    ----------
+    directory:
+        Cache directory.  Defaults to ``~/.azure/prototype_learn_cache``.
+    fresh_seconds:
+        Age below which entries are used without any network request.
+    max_bytes:
+        Total size limit; least recently used entries are evicted above it.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        fresh_seconds: int = DEFAULT_FRESH_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self._dir = directory or _cache_dir()
+        self._fresh = fresh_seconds
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def directory(self) -> str:
+        return self._dir
+
+    # ----------------------------------------------------------
+    # Pages
+    # ----------------------------------------------------------
+
+    def get_page(self, url: str) -> dict | None:
+        """Return the stored page entry for *url* (fresh or stale), or ``None``.
+
+        The entry has ``text``, ``etag``, ``last_modified``, ``fetched_at``
+        and ``fresh`` keys.  Use :meth:`validators` to revalidate a stale
+        entry.
+        """
+        entry = self._read(self._key("page", url))
+        if entry is None or not isinstance(entry.get("text"), str):
+            self._count(hit=False)
+            return None
+        entry["fresh"] = time.time() - entry.get("fetched_at", 0) < self._fresh
+        self._count(hit=entry["fresh"])
+        return entry
+
+    def put_page(self, url: str, text: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        """Store the extracted *text* of *url* with its HTTP validators."""
+        self._write(
+            self._key("page", url),
+            {
+                "url": url,
+                "text": text[:MAX_PAGE_CHARS],
+                "etag": etag if isinstance(etag, str) else None,
+                "last_modified": last_modified if isinstance(last_modified, str) else None,
+                "fetched_at": time.time(),
+            },
+        )
+
+    def touch_page(self, url: str) -> None:
+        """Mark a stored page as freshly validated (after a ``304``)."""
+        key = self._key("page", url)
+        entry = self._read(key)
+        if entry is not None:
+            entry.pop("fresh", None)
+            entry["fetched_at"] = time.time()
+            self._write(key, entry)
+
+    @staticmethod
+    def validators(entry: dict) -> dict[str, str]:
+        """Return conditional-request headers for a stored page entry."""
+        headers: dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    # ----------------------------------------------------------
+    # Searches
+    # ----------------------------------------------------------
+
+    def get_search(self, query: str, max_results: int) -> list[dict] | None:
+        """Return fresh cached hits for *query*, or ``None``."""
+        entry = self._read(self._key("search", f"{_normalize(query)}|{max_results}"))
+        if (
+            entry is None
+            or not isinstance(entry.get("hits"), list)
+            or time.time() - entry.get("fetched_at", 0) >= self._fresh
+        ):
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return entry["hits"]
+
+    def put_search(self, query: str, max_results: int, hits: list[dict]) -> None:
+        """Store the search *hits* for *query*."""
+        self._write(
+            self._key("search", f"{_normalize(query)}|{max_results}"),
+            {"query": query, "hits": hits, "fetched_at": time.time()},
+        )
+
+    # ----------------------------------------------------------
+    # Maintenance
+    # ----------------------------------------------------------
+
+    def clear(self) -> None:
+        """Delete every cached entry and reset stats."""
+        for path, _size, _last_used in self._entries():
+            _remove(path)
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> dict:
+        """Return cache statistics."""
+        entries = self._entries()
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": self._hits / lookups if lookups else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "evictions": self._evictions,
+        }
+
+    # ----------------------------------------------------------
+    # Internal
+    # ----------------------------------------------------------
+
+    @staticmethod
+    def _key(kind: str, value: str) -> str:
+        return f"{kind}-{hashlib.sha256(value.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _read(self, name: str) -> dict | None:
+        path = os.path.join(self._dir, name)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                entry = json.load(fh)
+                mtime_ns = os.fstat(fh.fileno()).st_mtime_ns
+            os.utime(path, ns=(time.time_ns(), mtime_ns))  # Record use for LRU eviction
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def _write(self, name: str, entry: dict) -> None:
+        path = os.path.join(self._dir, name)
+        tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(entry, fh)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug("Could not write document cache entry %s: %s", path, e)
+            _remove(tmp)
+            return
+        self._evict()
+
+    def _entries(self) -> list[tuple[str, int, float]]:
+        """Return ``(path, size, last_used)`` for every entry in the cache.
+
+        ``last_used`` is the later of the access and modification times.
+        """
+        entries = []
+        try:
+            names = os.listdir(self._dir)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self._dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, max(st.st_atime, st.st_mtime)))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under ``max_bytes``."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self._max_bytes:
+            return
+        for path, size, _last_used in sorted(entries, key=lambda e: e[2]):
+            _remove(path)
+            total -= size
+            with self._lock:
+                self._evictions += 1
+            if total <= self._max_bytes:
+                break
+
+
+def _normalize(query: str) -> str:
+    """Lower-case, collapse whitespace."""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ------------------------------------------------------------------
+# Process-wide default instance
+# ------------------------------------------------------------------
+
+_default_cache: DocumentCache | None = None
+_default_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentCache:
+    """Return the process-wide :class:`DocumentCache`."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None or _default_cache.directory != _cache_dir():
+            _default_cache = DocumentCache()
+        return _default_cache
@@ -0,0 +1,450 @@
+"""Offline full-text index over knowledge files and cached Learn pages.
+
+A small BM25 inverted index that lets documentation lookups be answered
+locally — with no network dependency — before falling back to a live
+Microsoft Learn search.  Indexed sources:
+
+* ``knowledge/`` — ``services/``, ``tools/``, ``languages/``, ``roles/``
+  and ``constraints.md`` (chunked per markdown heading), plus
+  ``service-registry.yaml`` (one document per service).
+* ``governance/policies/**/*.policy.yaml`` (one document per rule).
+* Learn pages in the persistent
+  :class:`~azext_prototype.knowledge.doc_cache.DocumentCache`.
+
+The index is persisted under the user's Azure config directory and
+refreshed incrementally: only files whose size or mtime changed are
+re-read, and only those whose content actually changed are
+re-tokenized.
+
+Module-level helpers follow the ``web_search`` pattern — they return
+empty results on failure and never raise.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+_KNOWLEDGE_DIR = Path(__file__).parent
+_POLICIES_DIR = _KNOWLEDGE_DIR.parent / "governance" / "policies"
+_KNOWLEDGE_SUBDIRS = ("services", "tools", "languages", "roles")
+
+_INDEX_VERSION = 1
+
+# BM25 parameters
+_K1 = 1.5
+_B = 0.75
+
+# Stored text per document — scoring uses the full chunk.
+_MAX_DOC_CHARS = 4000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_HEADING_RE = re.compile(r"^(#{1,3})\s+(.*\S)\s*$")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in into is it its of on or "
+    "should that the this to use using what when which with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens with stopwords removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+@dataclass
+class IndexHit:
+    """One search result from :meth:`LocalIndex.search`."""
+
+    title: str
+    source: str  # File path or page URL
+    text: str
+    score: float
+    coverage: float  # Fraction of distinct query terms present in the document
+    url: str = ""
+
+
+def _index_path(key: str) -> str:
+    """Return where the persisted index for *key* lives."""
+    base = os.environ.get("AZURE_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".azure")
+    return os.path.join(base, f"prototype_knowledge_index-{key}.json")
+
+
+# ======================================================================
+# Document extraction
+# ======================================================================
+
+
+def _chunk_markdown(text: str, label: str) -> list[dict]:
+    """Split markdown into one document per heading (levels 1–3).
+
+    Headings inside fenced code blocks (e.g. ``# comment`` lines in a
+    Terraform sample) are not treated as section breaks.
+    """
+    docs: list[dict] = []
+    title = label
+    lines: list[str] = []
+    in_fence = False
+
+    def _flush() -> None:
+        body = "\n".join(lines).strip()
+        if body:
+            docs.append({"title": title, "text": body})
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING_RE.match(line)
+        if match:
+            _flush()
+            title = f"{label} — {match.group(2)}"
+            lines = [line]
+        else:
+            lines.append(line)
+    _flush()
+    return docs
+
+
+def _registry_docs(text: str) -> list[dict]:
+    data = yaml.safe_load(text) or {}
+    services = data.get("services", data) if isinstance(data, dict) else {}
+    docs = []
+    for name, entry in (services or {}).items():
+        if isinstance(entry, dict):
+            body = yaml.safe_dump({name: entry}, sort_keys=False)
+            docs.append({"title": f"service-registry — {entry.get('display_name', name)}", "text": body})
+    return docs
+
+
+def _policy_docs(text: str, label: str) -> list[dict]:
+    data = yaml.safe_load(text) or {}
+    if not isinstance(data, dict):
+        return []
+    name = (data.get("metadata") or {}).get("name", label)
+    docs = []
+    for rule in data.get("rules") or []:
+        if isinstance(rule, dict):
+            body = yaml.safe_dump(rule, sort_keys=False)
+            docs.append({"title": f"{name} policy — {rule.get('id', '')}".rstrip(" —"), "text": body})
+    return docs
+
+
+def _page_docs(text: str) -> list[dict]:
+    entry = json.loads(text)
+    if not isinstance(entry, dict) or not isinstance(entry.get("text"), str):
+        return []
+    url = entry.get("url", "")
+    return [{"title": url, "text": entry["text"], "url": url}]
+
+
+# ======================================================================
+# Index
+# ======================================================================
+
+
+class LocalIndex:
+    """Persistent, incrementally refreshed BM25 index.
+
+    Parameters
+    ----------
+    knowledge_dir:
+        Knowledge tree to index (defaults to the built-in ``knowledge/``).
+    policies_dir:
+        Governance policy tree (defaults to the built-in policies).
+    pages_dir:
+        Learn document cache directory; ``None`` uses the default cache.
+    index_path:
+        Where to persist the index.  Defaults to a file under the user's
+        Azure config directory keyed by the indexed directories.
+    """
+
+    def __init__(
+        self,
+        knowledge_dir: str | Path | None = None,
+        policies_dir: str | Path | None = None,
+        pages_dir: str | None = None,
+        index_path: str | None = None,
+    ) -> None:
+        from azext_prototype.knowledge.doc_cache import _cache_dir
+
+        self._knowledge_dir = Path(knowledge_dir) if knowledge_dir else _KNOWLEDGE_DIR
+        self._policies_dir = Path(policies_dir) if policies_dir else _POLICIES_DIR
+        self._pages_dir = pages_dir or _cache_dir()
+        key = hashlib.sha256(
+            f"{self._knowledge_dir}|{self._policies_dir}|{self._pages_dir}".encode("utf-8")
+        ).hexdigest()[:12]
+        self._index_path = index_path or _index_path(key)
+        self._lock = threading.Lock()
+
+        # path -> {"sig": [mtime_ns, size], "sha": str, "docs": [{title, text, url?, tf}]}
+        self._files: dict[str, dict] = {}
+        self._loaded = False
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._docs: list[tuple[str, dict]] = []  # (source, doc)
+        self._avgdl = 0.0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the filesystem.
+
+        Returns the number of files re-indexed.  The index is saved only
+        when something changed.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+            current = self._discover()
+            changed = 0
+            touched = False
+            removed = [p for p in self._files if p not in current]
+            for path in removed:
+                del self._files[path]
+
+            for path, (kind, label) in current.items():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                sig = [st.st_mtime_ns, st.st_size]
+                known = self._files.get(path)
+                if known is not None and known["sig"] == sig:
+                    continue
+                try:
+                    raw = Path(path).read_bytes()
+                except OSError:
+                    continue
+                sha = hashlib.sha256(raw).hexdigest()
+                if known is not None and known["sha"] == sha:
+                    known["sig"] = sig
+                    touched = True
+                    continue
+                self._files[path] = {"sig": sig, "sha": sha, "docs": self._extract(kind, label, raw)}
+                changed += 1
+
+            if changed or removed or not self._postings:
+                self._build_postings()
+            if changed or removed or touched:
+                self._save()
+            return changed
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 3,
+        min_coverage: float = 0.0,
+        source_filter: str | None = None,
+    ) -> list[IndexHit]:
+        """Return the best-matching documents for *query*.
+
+        Args:
+            min_coverage: Minimum fraction of distinct query terms a
+                document must contain to be returned.
+            source_filter: Only consider documents whose source path or
+                URL ends with this string.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            scores: dict[int, float] = {}
+            matched: dict[int, int] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings:
+                    dl = self._docs[doc_id][1]["len"]
+                    denom = tf + _K1 * (1 - _B + _B * dl / (self._avgdl or 1))
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (_K1 + 1) / denom
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+            hits: list[IndexHit] = []
+            for doc_id, score in sorted(scores.items(), key=lambda kv: kv[1], reverse=True):
+                coverage = matched[doc_id] / len(terms)
+                if coverage < min_coverage:
+                    continue
+                source, doc = self._docs[doc_id]
+                if source_filter and not source.replace("\\", "/").endswith(source_filter):
+                    continue
+                hits.append(
+                    IndexHit(
+                        title=doc["title"],
+                        source=source,
+                        text=doc["text"],
+                        score=score,
+                        coverage=coverage,
+                        url=doc.get("url", ""),
+                    )
+                )
+                if len(hits) >= max_results:
+                    break
+            return hits
+
+    @property
+    def document_count(self) -> int:
+        return len(self._docs)
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _discover(self) -> dict[str, tuple[str, str]]:
+        """Return ``{path: (kind, label)}`` for every indexable file."""
+        found: dict[str, tuple[str, str]] = {}
+        kdir = self._knowledge_dir
+        for sub in _KNOWLEDGE_SUBDIRS:
+            for path in sorted((kdir / sub).glob("*.md")):
+                found[str(path)] = ("markdown", f"{sub}/{path.stem}")
+        if (kdir / "constraints.md").is_file():
+            found[str(kdir / "constraints.md")] = ("markdown", "constraints")
+        if (kdir / "service-registry.yaml").is_file():
+            found[str(kdir / "service-registry.yaml")] = ("registry", "service-registry")
+        for path in sorted(self._policies_dir.rglob("*.policy.yaml")):
+            found[str(path)] = ("policy", path.name[: -len(".policy.yaml")])
+        try:
+            for name in sorted(os.listdir(self._pages_dir)):
+                if name.startswith("page-") and name.endswith(".json"):
+                    found[os.path.join(self._pages_dir, name)] = ("page", "")
+        except OSError:
+            pass
+        return found
+
+    @staticmethod
+    def _extract(kind: str, label: str, raw: bytes) -> list[dict]:
+        try:
+            text = raw.decode("utf-8", errors="replace")
+            if kind == "registry":
+                docs = _registry_docs(text)
+            elif kind == "policy":
+                docs = _policy_docs(text, label)
+            elif kind == "page":
+                docs = _page_docs(text)
+            else:
+                docs = _chunk_markdown(text, label)
+        except Exception as e:
+            logger.debug("Could not index %s: %s", label or kind, e)
+            return []
+
+        for doc in docs:
+            tokens = tokenize(doc["title"] + "\n" + doc["text"])
+            tf: dict[str, int] = {}
+            for token in tokens:
+                tf[token] = tf.get(token, 0) + 1
+            doc["tf"] = tf
+            doc["len"] = len(tokens)
+            doc["text"] = doc["text"][:_MAX_DOC_CHARS]
+        return docs
+
+    def _build_postings(self) -> None:
+        self._docs = [(path, doc) for path, entry in sorted(self._files.items()) for doc in entry["docs"]]
+        postings: dict[str, list[tuple[int, int]]] = {}
+        total = 0
+        for doc_id, (_path, doc) in enumerate(self._docs):
+            total += doc["len"]
+            for term, tf in doc["tf"].items():
+                postings.setdefault(term, []).append((doc_id, tf))
+        self._postings = postings
+        self._avgdl = total / len(self._docs) if self._docs else 0.0
+
+    def _load(self) -> None:
+        try:
+            with open(self._index_path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == _INDEX_VERSION and isinstance(data.get("files"), dict):
+            self._files = data["files"]
+
+    def _save(self) -> None:
+        tmp = f"{self._index_path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self._index_path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({"version": _INDEX_VERSION, "files": self._files}, fh)
+            os.replace(tmp, self._index_path)
+        except OSError as e:
+            logger.debug("Could not save knowledge index %s: %s", self._index_path, e)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+# ======================================================================
+# Module-level helpers
+# ======================================================================
+
+_indexes: dict[tuple[str, str], LocalIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_local_index(knowledge_dir: str | Path | None = None) -> LocalIndex:
+    """Return the process-wide index for *knowledge_dir*, brought up to date.
+
+    The refresh only stats the indexed files unless something changed,
+    so calling this before every lookup is cheap.
+    """
+    from azext_prototype.knowledge.doc_cache import _cache_dir
+
+    kdir = str(Path(knowledge_dir) if knowledge_dir else _KNOWLEDGE_DIR)
+    key = (kdir, _cache_dir())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = LocalIndex(knowledge_dir=kdir)
+            _indexes[key] = index
+    index.refresh()
+    return index
+
+
+def search_local(
+    query: str,
+    max_results: int = 3,
+    max_chars_per_result: int = 3000,
+    min_coverage: float = 0.6,
+) -> str:
+    """Answer *query* from the local index as formatted markdown.
+
+    Returns the same shape as
+    :func:`~azext_prototype.knowledge.web_search.search_and_fetch`, or an
+    empty string when no document covers at least *min_coverage* of the
+    query terms.
+    """
+    from azext_prototype.knowledge.web_search import format_search_results
+
+    try:
+        hits = get_local_index().search(query, max_results=max_results, min_coverage=min_coverage)
+    except Exception:
+        logger.debug("Local index search failed for: %s", query, exc_info=True)
+        return ""
+    if not hits:
+        return ""
+
+    results = []
+    for hit in hits:
+        text = hit.text
+        if len(text) > max_chars_per_result:
+            text = text[:max_chars_per_result] + "\n\n[... truncated ...]"
+        results.append({"title": hit.title, "url": hit.url, "content": text})
+    return format_search_results(results)
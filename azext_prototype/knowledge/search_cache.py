@@ -1,87 +1,274 @@
-"""In-memory TTL cache for web search results.
+"""In-memory LRU/TTL caches.
 
-Provides a simple, session-scoped cache that avoids redundant HTTP
-requests when multiple agents search for similar queries.
+:class:`LRUCache` is the shared in-process cache primitive: ``get`` and
+``put`` are O(1) (an ordered dict kept in recency order), entries can
+expire after a TTL, capacity can be bounded by entry count and by
+bytes, and all operations are thread-safe so one instance can be shared
+by agents running on the orchestrator's worker threads.
+
+:class:`SearchCache` specialises it for web search results — keys are
+normalised queries — so multiple agents searching for similar queries
+avoid redundant HTTP requests.
+
+Named caches register themselves so :func:`cache_stats` can report hit
+ratios and eviction counts (shown by ``az prototype status``).
 """
 
 from __future__ import annotations
 
 import re
+import threading
 import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# Every named cache alive in this process, for cache_stats().
+_registry: weakref.WeakSet[LRUCache] = weakref.WeakSet()
 
 
-class SearchCache:
-    """In-memory cache with TTL expiry and LRU eviction.
+class LRUCache:
+    """Thread-safe LRU cache with optional TTL and byte budget.
 
     Parameters
     ----------
-    ttl_seconds:
-        Time-to-live for cached entries (default 30 minutes).
     max_entries:
-        Maximum number of cached entries (default 50).  When exceeded,
-        the oldest entry is evicted.
+        Maximum number of entries; the least recently used is evicted
+        when exceeded.
+    ttl_seconds:
+        Time-to-live for entries, or ``None`` for no expiry.
+    max_bytes:
+        Optional total size budget, measured with *sizeof*.
+    sizeof:
+        Returns the size of a value in bytes.  Defaults to ``len()`` of
+        the UTF-8 encoding for strings and 0 for anything else.
+    name:
+        When given, the cache is included in :func:`cache_stats`.
     """
 
-    def __init__(self, ttl_seconds: int = 1800, max_entries: int = 50) -> None:
-        self._ttl = ttl_seconds
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl_seconds: float | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+        name: str | None = None,
+    ) -> None:
         self._max_entries = max_entries
-        self._store: dict[str, tuple[float, str]] = {}  # key → (timestamp, result)
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof or _default_sizeof
+        self.name = name
+
+        # key → (timestamp, value, size), least recently used first
+        self._store: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        # key → timestamp, oldest insertion first (TTL purge / "oldest" stat)
+        self._born: OrderedDict[Hashable, float] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        if name:
+            _registry.add(self)
 
     # ----------------------------------------------------------
     # Public API
     # ----------------------------------------------------------
 
-    def get(self, query: str) -> str | None:
-        """Return cached result for *query*, or ``None`` if missing/expired."""
-        key = self._normalize(query)
-        entry = self._store.get(key)
-        if entry is None:
-            self._misses += 1
-            return None
-
-        ts, result = entry
-        if time.monotonic() - ts > self._ttl:
-            del self._store[key]
-            self._misses += 1
-            return None
-
-        self._hits += 1
-        return result
-
-    def put(self, query: str, result: str) -> None:
-        """Store *result* under normalised *query* with the current timestamp."""
-        key = self._normalize(query)
-        # Evict oldest if at capacity (and this is a new key)
-        if key not in self._store and len(self._store) >= self._max_entries:
-            oldest_key = min(self._store, key=lambda k: self._store[k][0])
-            del self._store[oldest_key]
-        self._store[key] = (time.monotonic(), result)
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for *key*, or *default* if missing/expired."""
+        key = self._key(key)
+        with self._lock:
+            entry = self._store.get(key)  # entries are tuples, never None
+            if entry is None:
+                self._misses += 1
+                return default
+            if self._expired(entry[0], time.monotonic()):
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._store.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store *value* under *key* with the current timestamp."""
+        key = self._key(key)
+        size = self._sizeof(value)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._store:
+                self._remove(key)
+            self._purge_expired(now)
+            self._store[key] = (now, value, size)
+            self._born[key] = now
+            self._bytes += size
+            while len(self._store) > self._max_entries or (
+                self._max_bytes is not None and self._bytes > self._max_bytes and len(self._store) > 1
+            ):
+                oldest_key = next(iter(self._store))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop *key* if present."""
+        key = self._key(key)
+        with self._lock:
+            if key in self._store:
+                self._remove(key)
+
+    def invalidate_all(self) -> None:
+        """Drop every entry but keep the hit/miss/eviction counters."""
+        with self._lock:
+            self._store.clear()
+            self._born.clear()
+            self._bytes = 0
 
     def clear(self) -> None:
         """Flush all entries and reset stats."""
-        self._store.clear()
-        self._hits = 0
-        self._misses = 0
+        with self._lock:
+            self._store.clear()
+            self._born.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
 
     def stats(self) -> dict:
         """Return cache statistics."""
-        oldest = None
-        if self._store:
-            oldest = min(ts for ts, _ in self._store.values())
-        return {
-            "hits": self._hits,
-            "misses": self._misses,
-            "entries": len(self._store),
-            "oldest": oldest,
-        }
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "entries": len(self._store),
+                "bytes": self._bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "oldest": next(iter(self._born.values())) if self._born else None,
+            }
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """Return live ``(key, value)`` pairs, least recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            return [(k, entry[1]) for k, entry in self._store.items() if not self._expired(entry[0], now)]
+
+    def __contains__(self, key: Hashable) -> bool:
+        key = self._key(key)
+        with self._lock:
+            entry = self._store.get(key)
+            return entry is not None and not self._expired(entry[0], time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._store)
 
     # ----------------------------------------------------------
     # Internal
     # ----------------------------------------------------------
 
+    def _key(self, key: Hashable) -> Hashable:
+        """Map a caller key to a storage key — identity by default."""
+        return key
+
+    def _expired(self, ts: float, now: float) -> bool:
+        return self._ttl is not None and now - ts > self._ttl
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._store.pop(key)
+        self._born.pop(key, None)
+        self._bytes -= size
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop expired entries — amortised O(1) via insertion order."""
+        while self._born:
+            key, ts = next(iter(self._born.items()))
+            if not self._expired(ts, now):
+                break
+            self._remove(key)
+            self._expirations += 1
+
+
+class SearchCache(LRUCache):
+    """Web search result cache keyed by normalised query.
+
+    Parameters
+    ----------
+    ttl_seconds:
+        Time-to-live for cached entries (default 30 minutes).
+    max_entries:
+        Maximum number of cached entries (default 50).  When exceeded,
+        the least recently used entry is evicted.
+    max_bytes:
+        Total size budget for cached results (default 4 MB).
+    """
+
+    def __init__(self, ttl_seconds: int = 1800, max_entries: int = 50, max_bytes: int = 4 * 1024 * 1024) -> None:
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds, max_bytes=max_bytes, name="search")
+
+    def _key(self, key: Hashable) -> Hashable:
+        return self._normalize(key) if isinstance(key, str) else key
+
     @staticmethod
     def _normalize(query: str) -> str:
         """Lower-case, collapse whitespace."""
         return re.sub(r"\s+", " ", query.strip().lower())
+
+
+# ----------------------------------------------------------
+# Metrics
+# ----------------------------------------------------------
+
+
+def _default_sizeof(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return 0
+
+
+def cache_stats() -> dict[str, dict]:
+    """Return stats for every named cache in this process, summed by name."""
+    totals: dict[str, dict] = {}
+    for cache in list(_registry):
+        stats = cache.stats()
+        agg = totals.setdefault(
+            cache.name or "", {"hits": 0, "misses": 0, "entries": 0, "bytes": 0, "evictions": 0, "expirations": 0}
+        )
+        for field in agg:
+            agg[field] += stats[field]
+    for agg in totals.values():
+        lookups = agg["hits"] + agg["misses"]
+        agg["hit_ratio"] = agg["hits"] / lookups if lookups else 0.0
+    return dict(sorted(totals.items()))
+
+
+def format_cache_stats(stats: dict[str, dict]) -> list[str]:
+    """Render :func:`cache_stats`-style output as one line per cache."""
+    lines = []
+    for name, s in stats.items():
+        lookups = s.get("hits", 0) + s.get("misses", 0)
+        parts = [f"{s.get('entries', 0)} entries", _format_bytes(s.get("bytes", 0))]
+        if lookups:
+            parts.append(f"hit ratio {s.get('hit_ratio', 0.0):.0%} ({s['hits']}/{lookups})")
+        if s.get("evictions"):
+            parts.append(f"{s['evictions']} evicted")
+        if s.get("expirations"):
+            parts.append(f"{s['expirations']} expired")
+        lines.append(f"  {name:<14} {', '.join(parts)}")
+    return lines
+
+
+def _format_bytes(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    if size >= 1024:
+        return f"{size / 1024:.0f} KB"
+    return f"{size} B"
@@ -4,6 +4,10 @@ Module-level functions (following the ``deploy_helpers.py`` pattern) that
 search the Microsoft Learn API, fetch page content, and format results
 for injection into agent context.
 
+Search hits and extracted page text are kept in the persistent
+:class:`~azext_prototype.knowledge.doc_cache.DocumentCache`, and pages
+are fetched concurrently, so repeated builds resolve searches from disk.
+
 All functions return empty results on failure — never raise.
 """
 
@@ -11,14 +15,18 @@ from __future__ import annotations
 
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from html.parser import HTMLParser
 
 import requests
 
+from azext_prototype.knowledge.doc_cache import DocumentCache, get_document_cache
+
 logger = logging.getLogger(__name__)
 
 _SEARCH_URL = "https://learn.microsoft.com/api/search"
 _HTTP_TIMEOUT = 10  # seconds
+_MAX_FETCH_WORKERS = 6
 
 
 # ------------------------------------------------------------------
@@ -69,11 +77,18 @@ def _html_to_text(html: str) -> str:
 # ------------------------------------------------------------------
 
 
-def search_learn(query: str, max_results: int = 3) -> list[dict]:
+def search_learn(query: str, max_results: int = 3, cache: DocumentCache | None = None) -> list[dict]:
     """Search Microsoft Learn and return a list of ``{title, url, description}`` dicts.
 
-    Returns an empty list on any failure (timeout, network error, bad response).
+    Results are served from *cache* (the persistent document cache by
+    default) while fresh.  Returns an empty list on any failure
+    (timeout, network error, bad response).
     """
+    cache = cache or get_document_cache()
+    cached = cache.get_search(query, max_results)
+    if cached is not None:
+        return cached
+
     try:
         resp = requests.get(
             _SEARCH_URL,
@@ -98,21 +113,45 @@ def search_learn(query: str, max_results: int = 3) -> list[dict]:
         if url:
             results.append({"title": title, "url": url, "description": description})
 
-    return results[:max_results]
+    results = results[:max_results]
+    if results:
+        cache.put_search(query, max_results, results)
+    return results
 
 
-def fetch_page_content(url: str, max_chars: int = 8000) -> str:
+def fetch_page_content(url: str, max_chars: int = 8000, cache: DocumentCache | None = None) -> str:
     """Fetch a learn.microsoft.com page and return plain-text content.
 
+    The extracted text is stored in *cache* (the persistent document
+    cache by default).  Fresh entries are returned without a request;
+    stale ones are revalidated with ``If-None-Match`` /
+    ``If-Modified-Since`` and reused on ``304``.  If revalidation fails
+    the stale text is returned rather than nothing.
+
     Returns empty string on any failure.  Truncates to *max_chars*.
     """
-    try:
-        resp = requests.get(url, timeout=_HTTP_TIMEOUT)
-        resp.raise_for_status()
-        text = _html_to_text(resp.text)
-    except Exception:
-        logger.debug("Page fetch failed for: %s", url)
-        return ""
+    cache = cache or get_document_cache()
+    entry = cache.get_page(url)
+
+    if entry is not None and entry["fresh"]:
+        text = entry["text"]
+    else:
+        headers = cache.validators(entry) if entry is not None else {}
+        try:
+            resp = requests.get(url, headers=headers, timeout=_HTTP_TIMEOUT)
+            if entry is not None and resp.status_code == 304:
+                cache.touch_page(url)
+                text = entry["text"]
+            else:
+                resp.raise_for_status()
+                text = _html_to_text(resp.text)
+                cache.put_page(url, text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        except Exception:
+            if entry is None:
+                logger.debug("Page fetch failed for: %s", url)
+                return ""
+            logger.debug("Revalidation failed for %s; using cached copy", url)
+            text = entry["text"]
 
     if len(text) > max_chars:
         text = text[:max_chars] + "\n\n[... truncated ...]"
@@ -127,24 +166,49 @@ def search_and_fetch(
     """Search Microsoft Learn, fetch top results, return formatted markdown.
 
     Combines :func:`search_learn` and :func:`fetch_page_content` into a
-    single convenience call.  Returns empty string if nothing found.
+    single convenience call; the pages are fetched concurrently.
+    Returns empty string if nothing found.
     """
     hits = search_learn(query, max_results=max_results)
     if not hits:
         return ""
 
-    fetched: list[dict] = []
-    for hit in hits:
-        content = fetch_page_content(hit["url"], max_chars=max_chars_per_result)
-        if content:
-            fetched.append({**hit, "content": content})
+    if len(hits) == 1:
+        contents = [fetch_page_content(hits[0]["url"], max_chars=max_chars_per_result)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(hits), _MAX_FETCH_WORKERS)) as pool:
+            contents = list(pool.map(lambda hit: fetch_page_content(hit["url"], max_chars=max_chars_per_result), hits))
 
+    fetched = [{**hit, "content": content} for hit, content in zip(hits, contents) if content]
     if not fetched:
         return ""
 
     return format_search_results(fetched)
 
 
+def search_and_fetch_many(
+    queries: list[str],
+    max_results: int = 3,
+    max_chars_per_result: int = 3000,
+) -> list[str]:
+    """Run :func:`search_and_fetch` for several queries concurrently.
+
+    Returns one formatted result per query, in the same order (empty
+    string where nothing was found).
+    """
+    if len(queries) <= 1:
+        return [
+            search_and_fetch(q, max_results=max_results, max_chars_per_result=max_chars_per_result) for q in queries
+        ]
+    with ThreadPoolExecutor(max_workers=min(len(queries), _MAX_FETCH_WORKERS)) as pool:
+        return list(
+            pool.map(
+                lambda q: search_and_fetch(q, max_results=max_results, max_chars_per_result=max_chars_per_result),
+                queries,
+            )
+        )
+
+
 def format_search_results(results: list[dict]) -> str:
     """Format a list of fetched results into a markdown context string.
 
@@ -15,7 +15,7 @@ from __future__ import annotations
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable
 
 if TYPE_CHECKING:
     from azext_prototype.ui.console import Console
@@ -52,6 +52,7 @@ class MCPHandlerConfig:
     agents: list[str] | None = None  # None = all agents
     enabled: bool = True
     timeout: int = 30  # Default seconds per tool call
+    max_concurrency: int = 4  # Concurrent tool calls routed to this handler
     max_retries: int = 2
     max_result_bytes: int = 8192  # Truncate results exceeding this
     settings: dict[str, Any] = field(default_factory=dict)
@@ -130,6 +131,7 @@ class MCPHandler(ABC):
         self.project_config = project_config or {}
         self.logger = logging.getLogger(f"mcp.{self.name}")
         self._connected = False
+        self._tools_changed_callback: Callable[[str], None] | None = None
 
     # ------------------------------------------------------------------ #
     # Abstract methods — handlers MUST implement
@@ -168,6 +170,17 @@ class MCPHandler(ABC):
         """Check if connection is healthy. Override for custom checks."""
         return self._connected
 
+    def notify_tools_changed(self) -> None:
+        """Signal that the server's tool list changed.
+
+        Handlers call this when they receive a
+        ``notifications/tools/list_changed`` message.  The manager caches
+        each handler's tool catalog after connect and only calls
+        :meth:`list_tools` again after this notification.
+        """
+        if self._tools_changed_callback is not None:
+            self._tools_changed_callback(self.name)
+
     # ------------------------------------------------------------------ #
     # Provided by base (handlers don't override)
     # ------------------------------------------------------------------ #
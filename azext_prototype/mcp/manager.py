@@ -4,7 +4,12 @@ The MCPManager is the primary interface for the rest of the extension
 to interact with MCP handlers.  It provides:
 
 - Lazy connection: handlers connect on first tool access, not at startup
+- Tool catalog cache: each handler's tools are listed once on connect and
+  re-listed only on ``tools/list_changed``; OpenAI schemas are
+  precomputed per (stage, agent) scope
 - Tool routing: maps tool names to handlers and dispatches calls
+- Parallel dispatch: independent tool calls from one model turn run
+  concurrently, bounded per handler, with per-call timeouts
 - Circuit breaker: marks handlers as failed after consecutive errors
 - OpenAI schema conversion: formats tools for AI provider consumption
 - Context manager: clean shutdown when session ends
@@ -14,8 +19,12 @@ from __future__ import annotations
 
 import logging
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from typing import TYPE_CHECKING, Any
 
+from azext_prototype.knowledge.search_cache import LRUCache
 from azext_prototype.mcp.base import MCPToolDefinition, MCPToolResult
 from azext_prototype.mcp.registry import MCPRegistry
 
@@ -27,6 +36,27 @@ logger = logging.getLogger(__name__)
 # Circuit breaker: mark handler as failed after this many consecutive errors
 _CIRCUIT_BREAKER_THRESHOLD = 3
 
+# Upper bound on worker threads for one batch of parallel tool calls
+# (per-handler limits come from MCPHandlerConfig.max_concurrency)
+_MAX_PARALLEL_TOOL_CALLS = 8
+
+# Distinct (stage, agent) scopes whose tool lists / schemas are kept
+_MAX_CACHED_SCOPES = 64
+
+
+class _CallStart:
+    """Marks when a parallel tool call acquired its handler's slot."""
+
+    __slots__ = ("event", "at")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.at = 0.0
+
+    def mark(self) -> None:
+        self.at = time.monotonic()
+        self.event.set()
+
 
 class MCPManager:
     """Lifecycle manager for MCP handlers.
@@ -46,6 +76,11 @@ class MCPManager:
         self._connected_handlers: set[str] = set()
         self._failed_handlers: set[str] = set()
         self._error_counts: dict[str, int] = {}  # handler_name -> consecutive errors
+        self._catalog: dict[str, list[MCPToolDefinition]] = {}  # handler_name -> tools
+        # (stage, agent) -> tools / OpenAI schemas
+        self._scope_tools = LRUCache(max_entries=_MAX_CACHED_SCOPES, name="mcp-tools")
+        self._scope_schemas = LRUCache(max_entries=_MAX_CACHED_SCOPES, name="mcp-schemas")
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
         self._lock = threading.Lock()
 
     # ------------------------------------------------------------------ #
@@ -57,7 +92,16 @@ class MCPManager:
         stage: str | None = None,
         agent: str | None = None,
     ) -> list[MCPToolDefinition]:
-        """Get tools from scoped handlers. Lazily connects on first access."""
+        """Get tools from scoped handlers. Lazily connects on first access.
+
+        Results are cached per ``(stage, agent)`` scope until a handler
+        connects, fails, or reports a tool-list change.
+        """
+        key = (stage, agent)
+        cached = self._scope_tools.get(key)
+        if cached is not None:
+            return list(cached)
+
         handlers = self._registry.get_for_scope(stage, agent)
         tools: list[MCPToolDefinition] = []
 
@@ -71,7 +115,7 @@ class MCPManager:
                 if handler.name in self._failed_handlers:
                     continue
 
-            handler_tools = handler.list_tools()
+            handler_tools = self._get_catalog(handler)
             for tool in handler_tools:
                 if tool.name in self._tool_map:
                     existing_handler = self._tool_map[tool.name]
@@ -86,16 +130,26 @@ class MCPManager:
                 self._tool_map[tool.name] = handler.name
                 tools.append(tool)
 
-        return tools
+        self._scope_tools.put(key, tools)
+        return list(tools)
 
     def get_tools_as_openai_schema(
         self,
         stage: str | None = None,
         agent: str | None = None,
     ) -> list[dict]:
-        """Convert scoped tools to OpenAI function-calling format."""
+        """Convert scoped tools to OpenAI function-calling format.
+
+        The schema list is precomputed once per ``(stage, agent)`` scope,
+        so repeated agent calls make no handler round trips.
+        """
+        key = (stage, agent)
+        cached = self._scope_schemas.get(key)
+        if cached is not None:
+            return list(cached)
+
         tools = self.get_tools_for_scope(stage, agent)
-        return [
+        schemas = [
             {
                 "type": "function",
                 "function": {
@@ -106,6 +160,25 @@ class MCPManager:
             }
             for tool in tools
         ]
+        self._scope_schemas.put(key, schemas)
+        return list(schemas)
+
+    def refresh_tools(self, handler_name: str | None = None) -> None:
+        """Drop cached tool catalogs so the next lookup re-lists tools.
+
+        Refreshes a single handler when *handler_name* is given, otherwise
+        every handler.  Called automatically when a handler signals
+        ``tools/list_changed`` via :meth:`MCPHandler.notify_tools_changed`.
+        """
+        with self._lock:
+            if handler_name is None:
+                self._catalog.clear()
+                self._tool_map.clear()
+            else:
+                self._catalog.pop(handler_name, None)
+                for tool_name in [t for t, h in self._tool_map.items() if h == handler_name]:
+                    del self._tool_map[tool_name]
+            self._invalidate_scopes()
 
     # ------------------------------------------------------------------ #
     # Tool invocation
@@ -113,9 +186,79 @@ class MCPManager:
 
     def call_tool(self, tool_name: str, arguments: dict) -> MCPToolResult:
         """Route a tool call to the correct handler. Thread-safe."""
+        handler, error = self._resolve_handler(tool_name)
+        if error is not None:
+            return error
+
+        result = self._invoke(handler, tool_name, arguments)
+        self._record_result(handler.name, result)
+        return result
+
+    def call_tools(
+        self,
+        calls: list[tuple[str, dict]],
+        timeout: float | None = None,
+    ) -> list[MCPToolResult]:
+        """Invoke several independent tool calls concurrently.
+
+        Each handler runs at most ``config.max_concurrency`` calls at a
+        time.  A call that exceeds its timeout (*timeout*, or the
+        handler's ``timeout`` × attempts) yields an error result; the
+        timeout starts once the call gets a slot, so time spent queued
+        behind other calls to the same handler does not count.  Every
+        result — including timeouts — counts toward the circuit breaker.
+
+        Returns results in the same order as *calls*.
+        """
+        if len(calls) <= 1:
+            return [self.call_tool(name, args) for name, args in calls]
+
+        results: list[MCPToolResult | None] = [None] * len(calls)
+        pending: list[tuple[int, Any, Any, float, _CallStart]] = []  # (index, handler, future, budget, start)
+        executor = ThreadPoolExecutor(
+            max_workers=min(len(calls), _MAX_PARALLEL_TOOL_CALLS),
+            thread_name_prefix="mcp-tool",
+        )
+        try:
+            for idx, (name, args) in enumerate(calls):
+                handler, error = self._resolve_handler(name)
+                if error is not None:
+                    results[idx] = error
+                    continue
+                budget = timeout if timeout is not None else self._call_timeout(handler)
+                start = _CallStart()
+                future = executor.submit(self._invoke, handler, name, args, start)
+                pending.append((idx, handler, future, budget, start))
+
+            for idx, handler, future, budget, start in pending:
+                name = calls[idx][0]
+                try:
+                    # Queued calls wait for a slot; a handler whose slots are
+                    # held by overrunning calls must still not hang the batch.
+                    if not start.event.wait(budget * len(pending)):
+                        raise FutureTimeoutError
+                    result = future.result(timeout=max(0.0, start.at + budget - time.monotonic()))
+                except FutureTimeoutError:
+                    future.cancel()
+                    logger.warning("MCP tool '%s' timed out", name)
+                    result = MCPToolResult(
+                        content="",
+                        is_error=True,
+                        error_message=f"Tool '{name}' timed out",
+                    )
+                self._record_result(handler.name, result)
+                results[idx] = result
+        finally:
+            # Don't block on calls that overran their timeout
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return [r for r in results if r is not None]
+
+    def _resolve_handler(self, tool_name: str) -> tuple[Any, MCPToolResult | None]:
+        """Return ``(handler, None)`` or ``(None, error_result)``."""
         handler_name = self._tool_map.get(tool_name)
         if not handler_name:
-            return MCPToolResult(
+            return None, MCPToolResult(
                 content="",
                 is_error=True,
                 error_message=f"Unknown tool: {tool_name}",
@@ -123,21 +266,54 @@ class MCPManager:
 
         handler = self._registry.get(handler_name)
         if handler is None or handler_name in self._failed_handlers:
-            return MCPToolResult(
+            return None, MCPToolResult(
                 content="",
                 is_error=True,
                 error_message=f"Handler '{handler_name}' is unavailable",
             )
+        return handler, None
 
-        result = handler.call_tool(tool_name, arguments)
+    def _invoke(
+        self,
+        handler: Any,
+        tool_name: str,
+        arguments: dict,
+        start: _CallStart | None = None,
+    ) -> MCPToolResult:
+        """Call the handler under its concurrency limit.  Never raises."""
+        with self._semaphore_for(handler):
+            if start is not None:
+                start.mark()
+            try:
+                return handler.call_tool(tool_name, arguments)
+            except Exception as exc:  # handlers must not raise, but be defensive
+                logger.warning("MCP handler '%s' raised from call_tool: %s", handler.name, exc)
+                return MCPToolResult(content="", is_error=True, error_message=str(exc))
 
-        # Circuit breaker tracking
+    def _semaphore_for(self, handler: Any) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(handler.name)
+            if sem is None:
+                limit = max(1, getattr(handler.config, "max_concurrency", 4))
+                sem = threading.BoundedSemaphore(limit)
+                self._semaphores[handler.name] = sem
+            return sem
+
+    @staticmethod
+    def _call_timeout(handler: Any) -> float:
+        """Wall-clock budget for one call: per-attempt timeout × attempts."""
+        config = handler.config
+        return float(config.timeout) * (max(0, config.max_retries) + 1)
+
+    def _record_result(self, handler_name: str, result: MCPToolResult) -> None:
+        """Circuit breaker tracking for one tool result."""
         with self._lock:
             if result.is_error:
                 count = self._error_counts.get(handler_name, 0) + 1
                 self._error_counts[handler_name] = count
                 if count >= _CIRCUIT_BREAKER_THRESHOLD:
                     self._failed_handlers.add(handler_name)
+                    self._invalidate_scopes()
                     logger.warning(
                         "Circuit breaker tripped for handler '%s' after %d errors",
                         handler_name,
@@ -150,8 +326,6 @@ class MCPManager:
             else:
                 self._error_counts[handler_name] = 0
 
-        return result
-
     # ------------------------------------------------------------------ #
     # Lifecycle
     # ------------------------------------------------------------------ #
@@ -168,10 +342,13 @@ class MCPManager:
                         handler.name,
                         exc,
                     )
-        self._connected_handlers.clear()
-        self._tool_map.clear()
-        self._error_counts.clear()
-        self._failed_handlers.clear()
+        with self._lock:
+            self._connected_handlers.clear()
+            self._tool_map.clear()
+            self._error_counts.clear()
+            self._failed_handlers.clear()
+            self._catalog.clear()
+            self._invalidate_scopes()
 
     def __enter__(self) -> MCPManager:
         return self
@@ -183,8 +360,27 @@ class MCPManager:
     # Internal
     # ------------------------------------------------------------------ #
 
+    def _get_catalog(self, handler: Any) -> list[MCPToolDefinition]:
+        """Return the cached tool catalog for *handler*, listing on miss."""
+        with self._lock:
+            cached = self._catalog.get(handler.name)
+        if cached is not None:
+            return cached
+        tools = list(handler.list_tools())
+        with self._lock:
+            self._catalog[handler.name] = tools
+        return tools
+
+    def _invalidate_scopes(self) -> None:
+        """Drop per-scope tool and schema caches.  Caller holds the lock."""
+        self._scope_tools.invalidate_all()
+        self._scope_schemas.invalidate_all()
+
     def _ensure_connected(self, handler: Any) -> None:
-        """Connect a handler, marking it as failed on error."""
+        """Connect a handler, marking it as failed on error.
+
+        On success the handler's tool catalog is listed once and cached.
+        """
         with self._lock:
             if handler.name in self._connected_handlers:
                 return
@@ -192,6 +388,9 @@ class MCPManager:
                 handler.connect()
                 if handler._connected:
                     self._connected_handlers.add(handler.name)
+                    self._catalog[handler.name] = list(handler.list_tools())
+                    handler._tools_changed_callback = self.refresh_tools
+                    self._invalidate_scopes()
                 else:
                     self._failed_handlers.add(handler.name)
                     logger.warning(
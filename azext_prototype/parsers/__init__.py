@@ -7,14 +7,31 @@ from azext_prototype.parsers.binary_reader import (
     classify_file,
     read_file,
 )
-from azext_prototype.parsers.file_extractor import parse_file_blocks, write_parsed_files
+from azext_prototype.parsers.file_extractor import (
+    FileBlockParser,
+    FileWriter,
+    iter_file_blocks,
+    parse_file_blocks,
+    write_parsed_files,
+)
+from azext_prototype.parsers.image_pipeline import (
+    ImagePipeline,
+    PipelineStats,
+    process_images,
+)
 
 __all__ = [
     "parse_file_blocks",
+    "iter_file_blocks",
+    "FileBlockParser",
+    "FileWriter",
     "write_parsed_files",
     "classify_file",
     "read_file",
     "ReadResult",
     "FileCategory",
     "EmbeddedImage",
+    "ImagePipeline",
+    "PipelineStats",
+    "process_images",
 ]
@@ -17,12 +17,21 @@ This module provides a robust, reusable parser that handles:
 - Nested directory paths (``infra/modules/network.tf``)
 - Unclosed trailing blocks (treated as complete)
 - Blocks without filenames (skipped)
+
+For streamed responses, :class:`FileBlockParser` accepts chunks as they
+arrive and emits each file as soon as its fence closes, and
+:class:`FileWriter` writes them atomically, skipping files whose content
+is unchanged.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import os
 import re
+import tempfile
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import Any, Callable
 
@@ -68,30 +77,104 @@ def parse_file_blocks(content: str) -> dict[str, str]:
     >>> parse_file_blocks(text)
     {'main.tf': 'resource "azurerm_resource_group" "rg" {}'}
     """
-    files: dict[str, str] = {}
-    lines = content.split("\n")
+    parser = FileBlockParser()
+    files = dict(parser.feed(content))
+    files.update(parser.close())
+    return files
+
+
+def iter_file_blocks(chunks: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Yield ``(path, content)`` pairs from a stream of text chunks.
+
+    Each pair is yielded as soon as its closing fence arrives, so
+    callers can start writing files while the model is still
+    generating (e.g. when consuming ``AIProvider.stream_chat``).
+    """
+    parser = FileBlockParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+class FileBlockParser:
+    """Incremental, push-based parser for fenced file blocks.
+
+    Feed arbitrary text chunks with :meth:`feed`; each call returns the
+    ``(path, content)`` pairs whose closing fence was completed by that
+    chunk.  Call :meth:`close` once the stream ends to flush an unclosed
+    trailing block.  Fence semantics match :func:`parse_file_blocks`:
+    a block opened with N backticks is only closed by a line of at
+    least N backticks, so longer fences may wrap nested code blocks.
+
+    Only the current partial line and the lines of the open block are
+    held in memory — completed blocks are handed off immediately.
+    """
+
+    def __init__(self) -> None:
+        self._pending = ""  # partial line carried over between chunks
+        self._current_file: str | None = None
+        self._current_content: list[str] = []
+        self._fence_len = 0
+        self._closed = False
+
+    @property
+    def current_file(self) -> str | None:
+        """Path of the block currently being accumulated, if any."""
+        return self._current_file
 
-    current_file: str | None = None
-    current_content: list[str] = []
-    fence_len: int = 0  # length of opening backtick fence
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        """Consume *chunk* and return any file blocks it completed."""
+        if self._closed:
+            raise ValueError("FileBlockParser is closed")
+        if not chunk:
+            return []
 
-    for line in lines:
+        events: list[tuple[str, str]] = []
+        data = self._pending + chunk
+        lines = data.split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            event = self._feed_line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def close(self) -> list[tuple[str, str]]:
+        """Flush the trailing partial line and any unclosed block."""
+        if self._closed:
+            return []
+        self._closed = True
+
+        events: list[tuple[str, str]] = []
+        event = self._feed_line(self._pending)
+        self._pending = ""
+        if event is not None:
+            events.append(event)
+
+        if self._current_file and self._current_content:
+            logger.debug("Flushing unclosed file block: %s", self._current_file)
+            events.append((self._current_file, "\n".join(self._current_content)))
+        self._current_file = None
+        self._current_content = []
+        return events
+
+    def _feed_line(self, line: str) -> tuple[str, str] | None:
         stripped = line.rstrip()
 
         # --- Try to match a closing fence ---
-        if current_file is not None:
+        if self._current_file is not None:
             # A closing fence must have at least as many backticks as the
             # opening fence and nothing else on the line.
-            if stripped.startswith("`" * fence_len) and stripped == "`" * len(stripped):
-                files[current_file] = "\n".join(current_content)
-                current_file = None
-                current_content = []
-                fence_len = 0
-                continue
+            if stripped.startswith("`" * self._fence_len) and stripped == "`" * len(stripped):
+                event = (self._current_file, "\n".join(self._current_content))
+                self._current_file = None
+                self._current_content = []
+                self._fence_len = 0
+                return event
 
             # We're inside a block: accumulate
-            current_content.append(line)
-            continue
+            self._current_content.append(line)
+            return None
 
         # --- Try to match an opening fence with a filename ---
         m = _FENCE_RE.match(stripped)
@@ -99,21 +182,10 @@ def parse_file_blocks(content: str) -> dict[str, str]:
             candidate = m.group(2)
             # Require at least one dot (extension) or slash (directory path)
             if "." in candidate or "/" in candidate:
-                # Flush any previous unclosed block (shouldn't happen normally)
-                if current_file and current_content:
-                    files[current_file] = "\n".join(current_content)
-
-                fence_len = len(m.group(1))
-                current_file = candidate
-                current_content = []
-                continue
-
-    # Handle unclosed trailing block
-    if current_file and current_content:
-        files[current_file] = "\n".join(current_content)
-        logger.debug("Flushing unclosed file block: %s", current_file)
-
-    return files
+                self._fence_len = len(m.group(1))
+                self._current_file = candidate
+                self._current_content = []
+        return None
 
 
 def write_parsed_files(
@@ -141,24 +213,159 @@ def write_parsed_files(
     print_fn:
         Optional callable for verbose output.  Defaults to ``print``.
 
+    Files whose on-disk content already matches are left untouched
+    (see :class:`FileWriter`), so their mtimes are preserved.
+
     Returns
     -------
     list[Path]:
-        Absolute paths of files that were written.
+        Absolute paths of every file in *files*, including files that
+        were skipped because their content was already up to date.
     """
     _print = print_fn or print
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
+    writer = FileWriter(output_path)
     written: list[Path] = []
 
     for filename, content in files.items():
-        file_path = output_path / filename
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content, encoding="utf-8")
-        written.append(file_path)
+        writer.write(filename, content)
+        written.append(output_path / filename)
 
         if verbose:
             display = f"{label}/{filename}" if label else filename
             _print(f"   {display}")
 
     return written
+
+
+# ------------------------------------------------------------------
+# Atomic, hash-aware writer
+# ------------------------------------------------------------------
+
+
+def content_hash(content: str | bytes) -> str:
+    """Return the SHA-256 hex digest of *content* (str is UTF-8 encoded)."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+_umask: int | None = None
+
+
+def _new_file_mode() -> int:
+    """Mode ``open()`` would give a new file: ``0o666`` less the umask."""
+    global _umask
+    if _umask is None:
+        # The umask can only be read by setting it; do so once.
+        _umask = os.umask(0o022)
+        os.umask(_umask)
+    return 0o666 & ~_umask
+
+
+def write_file_atomic(path: Path, content: str) -> None:
+    """Write *content* to *path* via a temp file + ``os.replace``.
+
+    Readers never observe a half-written file, even if the process is
+    interrupted mid-write.  The file keeps its existing permissions (a
+    new file gets the umask default), rather than ``mkstemp``'s 0600.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except OSError:
+        mode = _new_file_mode()
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class FileWriter:
+    """Companion writer for :class:`FileBlockParser`.
+
+    Writes each file atomically and skips the write entirely when the
+    file on disk already has identical content, so unchanged files keep
+    their mtime.  Per-file hashes and sizes are recorded in
+    :attr:`manifest` (``relative path -> {"sha256", "size"}``).
+
+    Parameters
+    ----------
+    output_dir:
+        Root directory under which files are written.
+    known_hashes:
+        Optional ``relative path -> sha256`` mapping from a previous run.
+        When the new content hash matches and the file on disk has the
+        expected size, the write is skipped without reading it back.
+    root:
+        Directory that manifest keys and *known_hashes* are relative to.
+        Defaults to *output_dir*; stage writers pass the project root so
+        keys match the project-relative paths stored in ``BuildState``.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        known_hashes: dict[str, str] | None = None,
+        root: str | Path | None = None,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self._root = Path(root) if root is not None else None
+        self._known = dict(known_hashes or {})
+        self.manifest: dict[str, dict] = {}
+        self.written: list[Path] = []
+        self.skipped: list[Path] = []
+
+    def write(self, filename: str, content: str) -> bool:
+        """Write one file.  Returns ``True`` if the file changed on disk."""
+        file_path = self.output_dir / filename
+        key = self.key_for(filename)
+        encoded = content.encode("utf-8")
+        digest = content_hash(encoded)
+        self.manifest[key] = {"sha256": digest, "size": len(encoded)}
+
+        if self._is_unchanged(key, file_path, digest, len(encoded)):
+            self.skipped.append(file_path)
+            return False
+
+        write_file_atomic(file_path, content)
+        self._known[key] = digest
+        self.written.append(file_path)
+        return True
+
+    def write_all(self, files: Iterable[tuple[str, str]]) -> list[Path]:
+        """Write every ``(path, content)`` pair; return paths that changed."""
+        changed: list[Path] = []
+        for filename, content in files:
+            if self.write(filename, content):
+                changed.append(self.output_dir / filename)
+        return changed
+
+    def key_for(self, filename: str) -> str:
+        """Return the manifest key for *filename* (relative to ``root``)."""
+        if self._root is None:
+            return filename
+        return str((self.output_dir / filename).relative_to(self._root))
+
+    def _is_unchanged(self, key: str, file_path: Path, digest: str, size: int) -> bool:
+        try:
+            on_disk = file_path.stat().st_size
+        except OSError:
+            return False
+        if on_disk != size:
+            return False
+        if self._known.get(key) == digest:
+            return True
+        try:
+            return content_hash(file_path.read_bytes()) == digest
+        except OSError:
+            return False
@@ -0,0 +1,338 @@
+"""Image pipeline — deduplicate, downscale, and re-encode vision inputs.
+
+Artifact directories routinely contain the same logo or screenshot many
+times over (once as a standalone file and again embedded in every DOCX
+and PPTX that references it), and most images are far larger than the
+resolution vision models actually consume.  This module shrinks the
+image payload before it is sent to the model:
+
+  1. **Exact dedup** — identical bytes are dropped via a SHA-256 hash.
+  2. **Perceptual dedup** — near-identical images (re-saved, re-scaled
+     or re-compressed copies) are dropped via a 64-bit difference hash.
+  3. **Downscale** — images are resized to fit the model's effective
+     input resolution (``MAX_LONG_EDGE`` × ``MAX_SHORT_EDGE``).
+  4. **Re-encode** — opaque images become JPEG, images with alpha become
+     WebP (or PNG when WebP support is unavailable).  The original bytes
+     are kept whenever re-encoding does not make the image smaller.
+
+Processed variants are cached on disk under
+``.prototype/cache/images/`` keyed by the source content hash, so
+re-running ``az prototype design`` against the same artifacts is free.
+
+Pillow is optional.  Without it only exact dedup is applied and every
+image is passed through unchanged.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Vision models tile images after fitting them inside 2048×2048 and then
+# scaling the short edge down to 768px — anything larger is discarded
+# server-side, so we discard it client-side instead.
+MAX_LONG_EDGE = 2048
+MAX_SHORT_EDGE = 768
+
+JPEG_QUALITY = 85
+WEBP_QUALITY = 85
+
+# Hamming distance (out of 64 bits) at or below which two difference
+# hashes are treated as the same picture.
+PHASH_THRESHOLD = 4
+
+CACHE_DIR = ".prototype/cache/images"
+
+# Bump when the processing parameters change so stale variants are ignored.
+_PIPELINE_VERSION = 1
+
+# ---------------------------------------------------------------------------
+# Data structures
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class PipelineStats:
+    """Summary of one :meth:`ImagePipeline.process` run."""
+
+    images_in: int = 0
+    images_out: int = 0
+    duplicates_exact: int = 0
+    duplicates_perceptual: int = 0
+    resized: int = 0
+    reencoded: int = 0
+    cache_hits: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.duplicates_exact + self.duplicates_perceptual
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(0, self.bytes_in - self.bytes_out)
+
+    def summary(self) -> str:
+        """One-line human-readable summary for console output."""
+        parts = [f"{self.images_out} of {self.images_in} image(s) kept"]
+        if self.duplicates:
+            parts.append(f"{self.duplicates} duplicate(s) removed")
+        if self.resized:
+            parts.append(f"{self.resized} downscaled")
+        parts.append(f"{_format_bytes(self.bytes_in)} → {_format_bytes(self.bytes_out)}")
+        return ", ".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+class ImagePipeline:
+    """Deduplicate, downscale and re-encode image dicts for the vision API.
+
+    Operates on the ``{"filename", "data", "mime"}`` dicts produced by
+    ``DesignStage._read_artifacts`` (``data`` is base64).
+
+    Parameters
+    ----------
+    project_dir:
+        Project root.  When given, processed variants are cached under
+        ``<project_dir>/.prototype/cache/images/``.  When ``None`` the
+        pipeline runs without a disk cache.
+    max_long_edge, max_short_edge:
+        Target resolution bounds.
+    """
+
+    def __init__(
+        self,
+        project_dir: str | None = None,
+        max_long_edge: int = MAX_LONG_EDGE,
+        max_short_edge: int = MAX_SHORT_EDGE,
+    ) -> None:
+        self._cache_dir = Path(project_dir) / CACHE_DIR if project_dir else None
+        self._max_long = max_long_edge
+        self._max_short = max_short_edge
+        self.stats = PipelineStats()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def process(self, images: list[dict]) -> list[dict]:
+        """Return a deduplicated, downscaled copy of *images*.
+
+        Order is preserved (first occurrence wins).  Images that cannot
+        be decoded are passed through unchanged.  :attr:`stats` is reset
+        and repopulated on every call.
+        """
+        self.stats = PipelineStats(images_in=len(images))
+        seen_hashes: set[str] = set()
+        seen_dhashes: list[int] = []
+        output: list[dict] = []
+
+        for image in images:
+            data = image.get("data") or ""
+            try:
+                raw = base64.b64decode(data)
+            except Exception:
+                # Nothing to hash: two such images are not known to be
+                # duplicates, so each one is kept as-is.
+                output.append(dict(image))
+                continue
+            self.stats.bytes_in += len(raw)
+
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest in seen_hashes:
+                self.stats.duplicates_exact += 1
+                continue
+            seen_hashes.add(digest)
+
+            variant = self._load_cached(digest)
+            if variant is None:
+                variant = self._transform(raw, image.get("mime") or "image/png")
+                self._store_cached(digest, variant)
+            else:
+                self.stats.cache_hits += 1
+
+            dhash = variant.get("dhash")
+            if dhash is not None:
+                if any(_hamming(dhash, other) <= PHASH_THRESHOLD for other in seen_dhashes):
+                    self.stats.duplicates_perceptual += 1
+                    continue
+                seen_dhashes.append(dhash)
+
+            if variant.get("resized"):
+                self.stats.resized += 1
+            if variant.get("reencoded"):
+                self.stats.reencoded += 1
+
+            if variant.get("data") is None:
+                out_bytes = len(raw)
+                output.append(dict(image))
+            else:
+                out_bytes = variant["size"]
+                output.append({**image, "data": variant["data"], "mime": variant["mime"]})
+            self.stats.bytes_out += out_bytes
+
+        self.stats.images_out = len(output)
+        return output
+
+    # ------------------------------------------------------------------
+    # Transformation
+    # ------------------------------------------------------------------
+
+    def _transform(self, raw: bytes, mime: str) -> dict:
+        """Decode, resize and re-encode *raw*.
+
+        Returns a variant dict.  ``data`` is ``None`` when the original
+        bytes should be used as-is (undecodable, or no smaller encoding
+        was found).
+        """
+        variant: dict = {"data": None, "mime": mime, "size": len(raw), "dhash": None}
+        try:
+            from PIL import Image
+        except ImportError:
+            return variant
+
+        try:
+            with Image.open(io.BytesIO(raw)) as img:
+                img.load()
+                variant["dhash"] = _difference_hash(img)
+
+                # Animated GIFs and multi-frame TIFFs: the model only sees
+                # the first frame anyway.
+                if getattr(img, "n_frames", 1) > 1:
+                    img.seek(0)
+
+                target = _fit_size(img.width, img.height, self._max_long, self._max_short)
+                resized = target != (img.width, img.height)
+                work = img.resize(target, Image.Resampling.LANCZOS) if resized else img.copy()
+
+                encoded, out_mime = _encode(work)
+        except Exception as e:
+            logger.debug("Image pipeline could not process image: %s", e)
+            return variant
+
+        if not resized and len(encoded) >= len(raw):
+            return variant
+
+        variant.update(
+            data=base64.b64encode(encoded).decode("utf-8"),
+            mime=out_mime,
+            size=len(encoded),
+            resized=resized,
+            reencoded=True,
+        )
+        return variant
+
+    # ------------------------------------------------------------------
+    # Disk cache
+    # ------------------------------------------------------------------
+
+    def _cache_path(self, digest: str) -> Path | None:
+        if self._cache_dir is None:
+            return None
+        return self._cache_dir / f"{digest[:32]}-{self._max_long}x{self._max_short}-v{_PIPELINE_VERSION}.json"
+
+    def _load_cached(self, digest: str) -> dict | None:
+        path = self._cache_path(digest)
+        if path is None or not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _store_cached(self, digest: str, variant: dict) -> None:
+        path = self._cache_path(digest)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(variant), encoding="utf-8")
+        except OSError as e:
+            logger.debug("Could not write image cache %s: %s", path, e)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _fit_size(width: int, height: int, max_long: int, max_short: int) -> tuple[int, int]:
+    """Return the largest size ≤ (*max_long*, *max_short*) preserving aspect."""
+    if width <= 0 or height <= 0:
+        return width, height
+    scale = min(1.0, max_long / max(width, height), max_short / min(width, height))
+    if scale >= 1.0:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _has_alpha(img) -> bool:
+    if img.mode in ("RGBA", "LA"):
+        return img.getextrema()[-1][0] < 255
+    if img.mode == "P":
+        return "transparency" in img.info
+    return False
+
+
+def _encode(img) -> tuple[bytes, str]:
+    """Encode *img* compactly — JPEG when opaque, WebP/PNG when not."""
+    buf = io.BytesIO()
+    if _has_alpha(img):
+        try:
+            img.convert("RGBA").save(buf, format="WEBP", quality=WEBP_QUALITY, method=4)
+            return buf.getvalue(), "image/webp"
+        except (OSError, KeyError, ValueError):
+            buf = io.BytesIO()
+            img.convert("RGBA").save(buf, format="PNG", optimize=True)
+            return buf.getvalue(), "image/png"
+    img.convert("RGB").save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buf.getvalue(), "image/jpeg"
+
+
+def _difference_hash(img) -> int:
+    """64-bit difference hash (dHash) — robust to scaling and recompression."""
+    from PIL import Image
+
+    small = img.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _format_bytes(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    if size >= 1024:
+        return f"{size / 1024:.0f} KB"
+    return f"{size} B"
+
+
+def process_images(images: list[dict], project_dir: str | None = None) -> tuple[list[dict], PipelineStats]:
+    """Convenience wrapper — run a one-off :class:`ImagePipeline`."""
+    pipeline = ImagePipeline(project_dir)
+    return pipeline.process(images), pipeline.stats
@@ -11,7 +11,8 @@ startup path.
 Public API
 ----------
 - ``check_tool(req)``         — check one ``ToolRequirement``
-- ``check_all(iac_tool)``     — check all requirements, skipping inapplicable
+- ``check_all(iac_tool)``     — check all requirements concurrently, skipping
+  inapplicable ones and reusing cached versions for unchanged binaries
 - ``check_all_or_fail(...)``  — same, but raises on any failure
 - ``get_requirement(name)``   — lookup by display name (case-insensitive)
 - ``parse_version(s)``        — ``"1.45.3"`` → ``(1, 45, 3)``
@@ -20,13 +21,17 @@ Public API
 
 from __future__ import annotations
 
+import json
 import logging
 import os
+import platform
 import re
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +84,7 @@ class ToolRequirement:
     constraint: str = ""  # e.g. ">=1.5.0", "~1.45.0", "^2.0.0"
     condition: str | None = None  # Only check when iac_tool matches
     install_hint: str = ""  # URL or install guidance
+    in_process: Callable[[], str | None] | None = None  # Version without a subprocess
 
 
 @dataclass
@@ -93,6 +99,29 @@ class CheckResult:
     install_hint: str = ""
 
 
+# ======================================================================
+# In-process version probes
+# ======================================================================
+
+
+def _python_version() -> str:
+    """Version of the running interpreter (no ``python --version`` spawn)."""
+    return platform.python_version()
+
+
+def _azure_cli_version() -> str | None:
+    """Version of the ``azure.cli.core`` hosting this extension, if any.
+
+    The extension always runs inside the Azure CLI, so this avoids a
+    second full CLI bootstrap just to run ``az version``.
+    """
+    try:
+        from azure.cli.core import __version__  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    return __version__
+
+
 # ======================================================================
 # Tool registry
 # ======================================================================
@@ -105,6 +134,7 @@ TOOL_REQUIREMENTS: list[ToolRequirement] = [
         version_pattern=r"Python\s+(?P<version>\d+\.\d+\.\d+)",
         constraint=_PYTHON_VERSION,
         install_hint="https://www.python.org/downloads/",
+        in_process=_python_version,
     ),
     ToolRequirement(
         name="Azure CLI",
@@ -113,6 +143,7 @@ TOOL_REQUIREMENTS: list[ToolRequirement] = [
         version_pattern=r"(?P<version>\d+\.\d+\.\d+)",
         constraint=_AZURE_CLI_VERSION,
         install_hint="https://learn.microsoft.com/cli/azure/install-azure-cli",
+        in_process=_azure_cli_version,
     ),
     ToolRequirement(
         name="GitHub CLI",
@@ -250,14 +281,20 @@ def _find_tool(command: str) -> str | None:
 # ======================================================================
 
 
-def _get_tool_version(req: ToolRequirement) -> tuple[str | None, str | None]:
+def _get_tool_version(req: ToolRequirement, path: str | None = None) -> tuple[str | None, str | None]:
     """Run the tool's version command and extract the version string.
 
     Returns ``(version, path)`` — e.g. ``("1.45.3", "/usr/bin/terraform")``.
     Either or both may be ``None`` if the tool is missing, times out, or
-    produces unparseable output.
+    produces unparseable output.  Requirements with an ``in_process``
+    probe are answered without spawning a subprocess when possible.
     """
-    path = _find_tool(req.command)
+    if req.in_process is not None:
+        version = req.in_process()
+        if version:
+            return version, path or _find_tool(req.command)
+
+    path = path or _find_tool(req.command)
     if path is None:
         return None, None
 
@@ -293,7 +330,11 @@ def _get_tool_version(req: ToolRequirement) -> tuple[str | None, str | None]:
 def check_tool(req: ToolRequirement) -> CheckResult:
     """Check whether a single tool requirement is satisfied."""
     version, resolved_path = _get_tool_version(req)
+    return _evaluate(req, version, resolved_path)
+
 
+def _evaluate(req: ToolRequirement, version: str | None, resolved_path: str | None) -> CheckResult:
+    """Build a :class:`CheckResult` for *req* given the detected *version*."""
     if version is None:
         return CheckResult(
             name=req.name,
@@ -348,18 +389,36 @@ def check_tool(req: ToolRequirement) -> CheckResult:
     )
 
 
-def check_all(iac_tool: str | None = None) -> list[CheckResult]:
+def check_all(iac_tool: str | None = None, use_cache: bool = True) -> list[CheckResult]:
     """Check all tool requirements, skipping conditional ones that don't apply.
 
+    Checks run concurrently.  When *use_cache* is true, versions detected
+    by spawning a tool are persisted (see :func:`_cache_path`) keyed by
+    the resolved binary path plus its size and mtime, so only tools whose
+    binary changed are re-probed on the next run.
+
     Parameters
     ----------
     iac_tool:
         The IaC tool in use (``"terraform"`` or ``"bicep"``).  Requirements
         with a ``condition`` that doesn't match are skipped.
+    use_cache:
+        Set to ``False`` to force every tool to be re-probed.
     """
+    applicable = [req for req in TOOL_REQUIREMENTS if req.condition is None or req.condition == iac_tool]
+    cache = _load_cache() if use_cache else {}
+    before = dict(cache)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(applicable))) as executor:
+        futures = {req.name: executor.submit(_check_with_cache, req, cache) for req in applicable}
+        checked = {name: future.result() for name, future in futures.items()}
+
+    if use_cache and cache != before:
+        _save_cache(cache)
+
     results: list[CheckResult] = []
     for req in TOOL_REQUIREMENTS:
-        if req.condition is not None and req.condition != iac_tool:
+        if req.name not in checked:
             results.append(
                 CheckResult(
                     name=req.name,
@@ -370,7 +429,7 @@ def check_all(iac_tool: str | None = None) -> list[CheckResult]:
                 )
             )
             continue
-        results.append(check_tool(req))
+        results.append(checked[req.name])
     return results
 
 
@@ -390,6 +449,75 @@ def check_all_or_fail(iac_tool: str | None = None) -> list[CheckResult]:
     return results
 
 
+# ======================================================================
+# Version cache
+# ======================================================================
+
+_CACHE_FILE = "prototype_tool_versions.json"
+
+
+def _cache_path() -> str:
+    """Location of the persisted tool-version cache.
+
+    Lives in the Azure CLI config dir (``$AZURE_CONFIG_DIR`` or
+    ``~/.azure``) so it is shared by every project on the machine.
+    """
+    config_dir = os.environ.get("AZURE_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".azure")
+    return os.path.join(config_dir, _CACHE_FILE)
+
+
+def _load_cache() -> dict[str, dict]:
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: dict[str, dict]) -> None:
+    path = _cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug("Could not write tool version cache: %s", e)
+
+
+def _fingerprint(path: str) -> dict | None:
+    """Size + mtime of the resolved binary (symlinks followed)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"path": os.path.realpath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _check_with_cache(req: ToolRequirement, cache: dict[str, dict]) -> CheckResult:
+    """Check *req*, reusing a cached version when its binary is unchanged.
+
+    In-process probes are never cached (they are already free).
+    """
+    if req.in_process is not None and req.in_process():
+        return check_tool(req)
+
+    path = _find_tool(req.command)
+    fingerprint = _fingerprint(path) if path else None
+    entry = cache.get(req.name)
+    if fingerprint and entry and entry.get("fingerprint") == fingerprint and entry.get("version"):
+        return _evaluate(req, entry["version"], path)
+
+    result = check_tool(req)
+    if fingerprint and result.installed_version:
+        cache[req.name] = {"fingerprint": fingerprint, "version": result.installed_version}
+    else:
+        cache.pop(req.name, None)
+    return result
+
+
 def get_requirement(name: str) -> ToolRequirement | None:
     """Look up a tool requirement by display name (case-insensitive)."""
     lower = name.lower()
@@ -6,12 +6,27 @@ Provides reusable push utilities used by ``backlog_session.py``:
 - **Azure DevOps**: Create Features/User Stories/Tasks via ``az boards``
 - **Auth checks**: Verify CLI tools are authenticated
 - **Formatters**: Convert structured items to provider-specific bodies
+- **API push engine**: Concurrent, resumable push through the GitHub
+  REST API and the Azure DevOps ``$batch`` API
 """
 
+from __future__ import annotations
+
+import base64
+import hashlib
 import json
 import logging
+import os
 import subprocess
-from typing import Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Iterator
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -386,3 +401,597 @@ def _link_parent(org: str, project: str, child_id: int, parent_id: int) -> None:
         )
     except (FileNotFoundError, subprocess.SubprocessError):
         logger.warning("Could not link work item %s to parent %s", child_id, parent_id)
+
+
+# ======================================================================
+# API Push Engine
+# ======================================================================
+#
+# The functions above spawn one CLI process per work item (plus one per
+# parent link), which makes large backlogs slow to push.  The engine
+# below talks to the GitHub REST API and the Azure DevOps work item
+# ``$batch`` API over a pooled HTTP session instead, with a concurrency
+# limit that backs off on rate-limit responses.
+#
+# Every work item gets a stable key derived from its content; the key is
+# embedded in the created item (an HTML comment in GitHub issue bodies,
+# a tag in DevOps) and progress is recorded per key in
+# ``BacklogState``.  Items already pushed are skipped, and a create that
+# may have reached the server before failing is looked up by key before
+# it is retried, so re-running a push never creates duplicates.
+
+GITHUB_API = "https://api.github.com"
+DEVOPS_API = "https://dev.azure.com"
+DEFAULT_CONCURRENCY = 4
+
+# Azure DevOps resource ID for ``az account get-access-token``.
+_DEVOPS_RESOURCE = "499b84ac-1321-427f-aa17-267ca6975798"
+_DEVOPS_API_VERSION = "7.0"
+_DEVOPS_BATCH_SIZE = 200  # Service limit per $batch request
+_MAX_RETRIES = 4
+_TIMEOUT = 30
+
+_KEY_MARKER = "prototype-backlog-id"
+_KEY_TAG_PREFIX = "prototype-"
+
+
+def item_keys(items: list[dict], parent_key: str = "", target: str = "") -> list[str]:
+    """Return a stable idempotency key for each item in *items*.
+
+    Keys are derived from the item's epic, type and title plus its
+    parent's key and the push *target* (see :func:`push_target`);
+    identical siblings are told apart by occurrence, so *items* must be
+    the full sibling list rather than a subset of it.
+    """
+    keys: list[str] = []
+    seen: dict[tuple, int] = {}
+    for item in items:
+        ident = (target, parent_key, item.get("epic", ""), item.get("type", ""), item.get("title", ""))
+        n = seen.get(ident, 0)
+        seen[ident] = n + 1
+        raw = json.dumps([*ident, n])
+        keys.append(hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12])
+    return keys
+
+
+def push_target(provider: str, org: str, project: str) -> str:
+    """Identify the repository or project a push creates items in."""
+    return f"{provider}:{org}/{project}".lower()
+
+
+def _cli_output(cmd: list[str]) -> str:
+    """Return the stripped stdout of *cmd*, or ``""`` on any failure."""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except (FileNotFoundError, subprocess.SubprocessError):
+        return ""
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def resolve_push_auth(provider: str) -> dict[str, str] | None:
+    """Return HTTP auth headers for the provider's REST API, or ``None``.
+
+    GitHub uses ``$GH_TOKEN``/``$GITHUB_TOKEN`` or ``gh auth token``.
+    Azure DevOps uses ``$AZURE_DEVOPS_EXT_PAT`` or an Entra access token
+    from ``az account get-access-token``.  ``None`` means the caller
+    should fall back to the CLI-based push.
+    """
+    if provider == "github":
+        token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or _cli_output(["gh", "auth", "token"])
+        return {"Authorization": f"Bearer {token}"} if token else None
+
+    pat = os.environ.get("AZURE_DEVOPS_EXT_PAT")
+    if pat:
+        encoded = base64.b64encode(f":{pat}".encode("utf-8")).decode("ascii")
+        return {"Authorization": f"Basic {encoded}"}
+    token = _cli_output(
+        [
+            "az",
+            "account",
+            "get-access-token",
+            "--resource",
+            _DEVOPS_RESOURCE,
+            "--query",
+            "accessToken",
+            "--output",
+            "tsv",
+        ]
+    )
+    return {"Authorization": f"Bearer {token}"} if token else None
+
+
+class _RateGate:
+    """Concurrency limit shared by all requests of one client.
+
+    A rate-limit response pauses *every* worker until the server's
+    ``Retry-After`` (or reset time) has passed.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._slots:
+            with self._lock:
+                delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            yield
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+class _ApiClient:
+    """Pooled HTTP session with rate-limit handling and retries."""
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict[str, str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = _MAX_RETRIES,
+        backoff: float = 1.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._gate = _RateGate(concurrency)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency))
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(headers)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def send(self, method: str, path: str, idempotent: bool = False, **kwargs: Any) -> tuple[Any, str, bool]:
+        """Send a request and return ``(data, error, ambiguous)``.
+
+        Rate-limited requests are always retried (they were not applied).
+        Transport errors and 5xx responses are retried only when
+        *idempotent*; otherwise they are returned with ``ambiguous=True``
+        because the server may already have applied the request.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", _TIMEOUT)
+        error = ""
+        for attempt in range(self.max_retries):
+            if attempt:
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+            with self._gate.slot():
+                try:
+                    resp = self._session.request(method, url, **kwargs)
+                except requests.exceptions.ConnectTimeout as e:
+                    error = f"Connection timed out: {e}"
+                    continue
+                except requests.RequestException as e:
+                    error = f"Request failed: {e}"
+                    if idempotent:
+                        continue
+                    return None, error, True
+
+            delay = _rate_limit_delay(resp)
+            if delay is not None:
+                self._gate.pause(delay)
+                error = f"Rate limited (HTTP {resp.status_code})"
+                continue
+            if resp.status_code >= 500:
+                error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+                if idempotent:
+                    continue
+                return None, error, True
+            if resp.status_code >= 400:
+                return None, f"HTTP {resp.status_code}: {_error_message(resp)}", False
+            try:
+                return resp.json(), "", False
+            except ValueError:
+                return {}, "", False
+        return None, error, False
+
+
+def _rate_limit_delay(resp: Any) -> float | None:
+    """Return how long to wait if *resp* is a rate-limit response."""
+    headers = resp.headers or {}
+    if resp.status_code not in (403, 429):
+        return None
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return 60.0
+    if headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            return max(0.0, float(headers.get("X-RateLimit-Reset", "0")) - time.time())
+        except ValueError:
+            return 60.0
+    return 60.0 if resp.status_code == 429 else None
+
+
+def _error_message(resp: Any) -> str:
+    try:
+        data = resp.json()
+    except ValueError:
+        return resp.text[:200]
+    if isinstance(data, dict) and data.get("message"):
+        return str(data["message"])
+    return resp.text[:200]
+
+
+class GitHubPushClient:
+    """Create GitHub issues through the REST API."""
+
+    def __init__(self, owner: str, repo: str, client: _ApiClient) -> None:
+        self._repo_path = f"/repos/{owner}/{repo}"
+        self._client = client
+
+    def create_issue(self, item: dict, key: str, labels: list[str] | None = None) -> dict[str, Any]:
+        """Create one issue; returns ``{url, number}`` or ``{error}``."""
+        title = item.get("title", "Untitled")
+        epic = item.get("epic", "")
+        all_labels = list(labels or [])
+        if item.get("effort"):
+            all_labels.append(f"effort/{item['effort']}")
+        if epic:
+            all_labels.append(epic.lower().replace(" ", "-"))
+        payload = {
+            "title": f"[{epic}] {title}" if epic else title,
+            "body": f"{format_github_body(item)}\n\n<!-- {_KEY_MARKER}: {key} -->",
+            "labels": all_labels,
+        }
+
+        error = ""
+        for attempt in range(self._client.max_retries):
+            if attempt:
+                existing = self.find_issue(key)
+                if existing is not None:
+                    return existing
+                time.sleep(self._client.backoff * (2 ** (attempt - 1)))
+            data, error, ambiguous = self._client.send("POST", f"{self._repo_path}/issues", json=payload)
+            if data is not None:
+                return _issue_result(data)
+            if not ambiguous:
+                return {"error": error}
+        return {"error": error, "ambiguous": True}
+
+    def find_issue(self, key: str) -> dict[str, Any] | None:
+        """Return the issue carrying *key*, searching the newest issues."""
+        marker = f"<!-- {_KEY_MARKER}: {key} -->"
+        data, _error, _ = self._client.send(
+            "GET",
+            f"{self._repo_path}/issues",
+            idempotent=True,
+            params={"state": "all", "sort": "created", "direction": "desc", "per_page": 100},
+        )
+        for issue in data if isinstance(data, list) else []:
+            if marker in (issue.get("body") or ""):
+                return _issue_result(issue)
+        return None
+
+
+def _issue_result(data: dict) -> dict[str, Any]:
+    return {"url": data.get("html_url", ""), "number": str(data.get("number", ""))}
+
+
+class DevOpsPushClient:
+    """Create Azure DevOps work items through the ``$batch`` API."""
+
+    def __init__(self, org: str, project: str, client: _ApiClient) -> None:
+        self._org = org
+        self._project = project
+        self._client = client
+
+    def create_work_items(self, specs: list[dict]) -> dict[str, dict[str, Any]]:
+        """Create work items in one batch; returns ``{key: {url, id} | {error}}``.
+
+        Each spec has ``key``, ``type``, ``item`` and optional ``parent_id``.
+        Parents are linked in the same request, so no separate relation
+        call is needed.
+        """
+        results: dict[str, dict[str, Any]] = {}
+        remaining = list(specs)
+        error = ""
+        ambiguous = False
+        for attempt in range(self._client.max_retries):
+            if attempt:
+                # The previous batch may have been applied — find what exists
+                for spec in list(remaining):
+                    existing = self.find_work_item(spec["key"])
+                    if existing is not None:
+                        results[spec["key"]] = existing
+                        remaining.remove(spec)
+                if not remaining:
+                    return results
+                time.sleep(self._client.backoff * (2 ** (attempt - 1)))
+
+            body = [self._batch_request(spec) for spec in remaining]
+            data, error, ambiguous = self._client.send(
+                "POST",
+                f"/{self._org}/_apis/wit/$batch",
+                params={"api-version": _DEVOPS_API_VERSION},
+                json=body,
+            )
+            if data is not None:
+                entries = data.get("value", []) if isinstance(data, dict) else []
+                for i, spec in enumerate(remaining):
+                    entry = entries[i] if i < len(entries) else {}
+                    results[spec["key"]] = self._entry_result(entry)
+                return results
+            if not ambiguous:
+                break
+
+        for spec in remaining:
+            results[spec["key"]] = {"error": error, "ambiguous": True} if ambiguous else {"error": error}
+        return results
+
+    def find_work_item(self, key: str) -> dict[str, Any] | None:
+        """Return the work item tagged with *key*, if any."""
+        query = (
+            "SELECT [System.Id] FROM WorkItems "
+            f"WHERE [System.TeamProject] = @project AND [System.Tags] CONTAINS '{_KEY_TAG_PREFIX}{key}'"
+        )
+        data, _error, _ = self._client.send(
+            "POST",
+            f"/{self._org}/{quote(self._project)}/_apis/wit/wiql",
+            idempotent=True,
+            params={"api-version": _DEVOPS_API_VERSION},
+            json={"query": query},
+        )
+        items = data.get("workItems", []) if isinstance(data, dict) else []
+        if not items:
+            return None
+        wi_id = items[0].get("id", "")
+        return {"url": self._html_url(wi_id), "id": wi_id}
+
+    def _batch_request(self, spec: dict) -> dict:
+        item = spec["item"]
+        ops: list[dict] = [
+            {"op": "add", "path": "/fields/System.Title", "value": item.get("title", "Untitled")},
+            {"op": "add", "path": "/fields/System.Description", "value": format_devops_description(item)},
+            {"op": "add", "path": "/fields/System.Tags", "value": f"{_KEY_TAG_PREFIX}{spec['key']}"},
+        ]
+        epic = item.get("epic", "")
+        if epic:
+            ops.append({"op": "add", "path": "/fields/System.AreaPath", "value": f"{self._project}\\{epic}"})
+        if spec.get("parent_id"):
+            ops.append(
+                {
+                    "op": "add",
+                    "path": "/relations/-",
+                    "value": {
+                        "rel": "System.LinkTypes.Hierarchy-Reverse",
+                        "url": f"{self._client.base_url}/{self._org}/_apis/wit/workItems/{spec['parent_id']}",
+                    },
+                }
+            )
+        return {
+            "method": "PATCH",
+            "uri": (
+                f"/{quote(self._project)}/_apis/wit/workitems/${quote(spec['type'])}"
+                f"?api-version={_DEVOPS_API_VERSION}"
+            ),
+            "headers": {"Content-Type": "application/json-patch+json"},
+            "body": ops,
+        }
+
+    def _entry_result(self, entry: dict) -> dict[str, Any]:
+        code = entry.get("code", 0)
+        raw = entry.get("body", {})
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                raw = {"message": raw}
+        body: dict[str, Any] = raw if isinstance(raw, dict) else {}
+        if not 200 <= code < 300:
+            return {"error": body.get("message") or f"HTTP {code}"}
+        wi_id = body.get("id", "")
+        url = body.get("_links", {}).get("html", {}).get("href", "") or self._html_url(wi_id)
+        return {"url": url, "id": wi_id}
+
+    def _html_url(self, wi_id: Any) -> str:
+        return f"{self._client.base_url}/{self._org}/{quote(self._project)}/_workitems/edit/{wi_id}"
+
+
+class BacklogPushEngine:
+    """Push backlog items concurrently through the provider REST APIs.
+
+    Parameters
+    ----------
+    provider:
+        ``"github"`` or ``"devops"``.
+    org, project:
+        GitHub owner/repo or DevOps organization/project.
+    auth_headers:
+        Headers from :func:`resolve_push_auth`.
+    state:
+        Optional :class:`~.backlog_state.BacklogState` used to record
+        per-item progress so an interrupted push can be resumed.
+    api_base:
+        Override the API endpoint (GitHub Enterprise, or a local stand-in).
+    concurrency:
+        Maximum number of requests in flight.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        org: str,
+        project: str,
+        auth_headers: dict[str, str],
+        state: Any = None,
+        api_base: str | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = _MAX_RETRIES,
+        backoff: float = 1.0,
+    ) -> None:
+        self._provider = provider
+        self._target = push_target(provider, org, project)
+        self._state = state
+        self._concurrency = max(1, concurrency)
+        headers = dict(auth_headers)
+        if provider == "github":
+            headers.setdefault("Accept", "application/vnd.github+json")
+            base = api_base or GITHUB_API
+        else:
+            headers.setdefault("Content-Type", "application/json")
+            base = api_base or DEVOPS_API
+        self._client = _ApiClient(base, headers, self._concurrency, max_retries, backoff)
+        self._github = GitHubPushClient(org, project, self._client)
+        self._devops = DevOpsPushClient(org, project, self._client)
+
+    def push(self, pending: list[tuple[int, dict]], items: list[dict] | None = None) -> dict[int, dict[str, Any]]:
+        """Push *pending* ``(index, item)`` pairs.
+
+        *items* is the full backlog the indexes refer to (by default the
+        state's items); keys are derived from it so an item keeps its key
+        whichever subset of the backlog is pushed.
+
+        Returns ``{index: result}`` where a result is ``{url, ...}`` on
+        success (``children`` lists URLs of created child work items and
+        ``child_errors`` any child failures) or ``{error}``.
+        """
+        if items is None and self._state is not None:
+            items = self._state.state.get("items")
+        keys = self._top_level_keys(pending, items or [])
+        try:
+            if self._provider == "github":
+                return self._push_github(pending, keys)
+            return self._push_devops(pending, keys)
+        finally:
+            self._client.close()
+
+    def _top_level_keys(self, pending: list[tuple[int, dict]], items: list[dict]) -> list[str]:
+        """Keys for *pending*, numbered by occurrence within *items*."""
+        if all(0 <= idx < len(items) and items[idx] == item for idx, item in pending):
+            full = item_keys(items, target=self._target)
+            return [full[idx] for idx, _ in pending]
+        return item_keys([item for _, item in pending], target=self._target)
+
+    # ------------------------------------------------------------------ #
+    # GitHub
+    # ------------------------------------------------------------------ #
+
+    def _push_github(self, pending: list[tuple[int, dict]], keys: list[str]) -> dict[int, dict[str, Any]]:
+        results: dict[int, dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=self._concurrency) as pool:
+            futures = {pool.submit(self._push_issue, key, item): idx for (idx, item), key in zip(pending, keys)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def _push_issue(self, key: str, item: dict) -> dict[str, Any]:
+        record = self._record(key)
+        if record and record.get("status") == "pushed":
+            return {"url": record.get("url", ""), "number": record.get("id", "")}
+        if record and record.get("status") == "in_flight":
+            existing = self._github.find_issue(key)
+            if existing is not None:
+                self._save_record(key, "pushed", existing["number"], existing["url"])
+                return existing
+
+        self._save_record(key, "in_flight")
+        result = self._github.create_issue(item, key)
+        if "error" in result:
+            self._save_record(key, "in_flight" if result.get("ambiguous") else None)
+        else:
+            self._save_record(key, "pushed", result["number"], result["url"])
+        return result
+
+    # ------------------------------------------------------------------ #
+    # Azure DevOps
+    # ------------------------------------------------------------------ #
+
+    def _push_devops(self, pending: list[tuple[int, dict]], keys: list[str]) -> dict[int, dict[str, Any]]:
+        features = self._create_level(
+            [{"key": key, "type": "Feature", "item": item} for (_, item), key in zip(pending, keys)]
+        )
+
+        results: dict[int, dict[str, Any]] = {}
+        story_specs: list[dict] = []
+        story_owner: dict[str, int] = {}
+        for (idx, item), key in zip(pending, keys):
+            result = dict(features[key])
+            results[idx] = result
+            if "error" in result:
+                continue
+            result["children"] = []
+            result["child_errors"] = []
+            children = item.get("children", [])
+            for child, child_key in zip(children, item_keys(children, key)):
+                story_specs.append({"key": child_key, "type": "User Story", "item": child, "parent_id": result["id"]})
+                story_owner[child_key] = idx
+
+        stories = self._create_level(story_specs)
+        task_specs: list[dict] = []
+        for spec in story_specs:
+            owner = results[story_owner[spec["key"]]]
+            story = stories[spec["key"]]
+            if "error" in story:
+                owner["child_errors"].append(f"{spec['item'].get('title', '')}: {story['error']}")
+                continue
+            if story.get("url"):
+                owner["children"].append(story["url"])
+            tasks = [
+                {"title": t.get("title", ""), "description": ""}
+                for t in spec["item"].get("tasks", [])
+                if isinstance(t, dict) and not t.get("done", False)
+            ]
+            for task, task_key in zip(tasks, item_keys(tasks, spec["key"])):
+                task_specs.append({"key": task_key, "type": "Task", "item": task, "parent_id": story["id"]})
+                story_owner[task_key] = story_owner[spec["key"]]
+
+        tasks_created = self._create_level(task_specs)
+        for spec in task_specs:
+            task = tasks_created[spec["key"]]
+            if "error" in task:
+                owner = results[story_owner[spec["key"]]]
+                owner["child_errors"].append(f"{spec['item'].get('title', '')}: {task['error']}")
+        return results
+
+    def _create_level(self, specs: list[dict]) -> dict[str, dict[str, Any]]:
+        """Create one hierarchy level, batching and running batches concurrently."""
+        results: dict[str, dict[str, Any]] = {}
+        to_create: list[dict] = []
+        for spec in specs:
+            record = self._record(spec["key"])
+            if record and record.get("status") == "pushed":
+                results[spec["key"]] = {"url": record.get("url", ""), "id": record.get("id", "")}
+                continue
+            if record and record.get("status") == "in_flight":
+                existing = self._devops.find_work_item(spec["key"])
+                if existing is not None:
+                    self._save_record(spec["key"], "pushed", existing["id"], existing["url"])
+                    results[spec["key"]] = existing
+                    continue
+            self._save_record(spec["key"], "in_flight")
+            to_create.append(spec)
+
+        batches = [to_create[i : i + _DEVOPS_BATCH_SIZE] for i in range(0, len(to_create), _DEVOPS_BATCH_SIZE)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self._concurrency, len(batches))) as pool:
+                for batch_results in pool.map(self._devops.create_work_items, batches):
+                    for key, result in batch_results.items():
+                        if "error" in result:
+                            self._save_record(key, "in_flight" if result.get("ambiguous") else None)
+                        else:
+                            self._save_record(key, "pushed", result["id"], result["url"])
+                        results[key] = result
+        return results
+
+    # ------------------------------------------------------------------ #
+    # Progress records
+    # ------------------------------------------------------------------ #
+
+    def _record(self, key: str) -> dict | None:
+        return self._state.get_push_record(key) if self._state is not None else None
+
+    def _save_record(self, key: str, status: str | None, work_item_id: Any = "", url: str = "") -> None:
+        if self._state is not None:
+            self._state.record_push(key, status, work_item_id, url)
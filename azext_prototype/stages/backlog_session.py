@@ -26,12 +26,14 @@ from azext_prototype.agents.base import AgentCapability, AgentContext
 from azext_prototype.agents.registry import AgentRegistry
 from azext_prototype.ai.token_tracker import TokenTracker
 from azext_prototype.stages.backlog_push import (
+    BacklogPushEngine,
     check_devops_ext,
     check_gh_auth,
     push_devops_feature,
     push_devops_story,
     push_devops_task,
     push_github_issue,
+    resolve_push_auth,
 )
 from azext_prototype.stages.backlog_state import BacklogState
 from azext_prototype.stages.escalation import EscalationTracker
@@ -637,25 +639,33 @@ class BacklogSession:
                 items_pushed=len(pushed),
             )
 
-        # Auth check
-        if provider == "github":
-            if not check_gh_auth():
-                _print("  GitHub CLI not authenticated. Run 'gh auth login' first.")
-                return BacklogResult(
-                    items_generated=len(self._backlog_state._state.get("items", [])),
-                    cancelled=True,
-                )
-        else:
-            if not check_devops_ext():
-                _print("  Azure DevOps extension not available. Run 'az extension add --name azure-devops'.")
-                return BacklogResult(
-                    items_generated=len(self._backlog_state._state.get("items", [])),
-                    cancelled=True,
-                )
+        # Auth: REST API when a token is available, otherwise the CLIs
+        auth = resolve_push_auth(provider)
+        if auth is None:
+            if provider == "github":
+                if not check_gh_auth():
+                    _print("  GitHub CLI not authenticated. Run 'gh auth login' first.")
+                    return BacklogResult(
+                        items_generated=len(self._backlog_state._state.get("items", [])),
+                        cancelled=True,
+                    )
+            else:
+                if not check_devops_ext():
+                    _print("  Azure DevOps extension not available. Run 'az extension add --name azure-devops'.")
+                    return BacklogResult(
+                        items_generated=len(self._backlog_state._state.get("items", [])),
+                        cancelled=True,
+                    )
 
         _print(f"  Pushing {len(pending)} item(s)...")
         _print("")
 
+        results: dict[int, dict] = {}
+        if auth is not None:
+            engine = BacklogPushEngine(provider, org, project, auth, state=self._backlog_state)
+            with self._maybe_spinner(f"Creating {len(pending)} item(s)...", use_styled):
+                results = engine.push(pending)
+
         push_urls = []
         pushed_count = 0
         failed_count = 0
@@ -663,11 +673,11 @@ class BacklogSession:
         for idx, item in pending:
             title = item.get("title", "Untitled")
 
-            with self._maybe_spinner(f"Creating: {title}...", use_styled):
-                if provider == "github":
-                    result = push_github_issue(org, project, item)
-                else:
-                    result = push_devops_feature(org, project, item)
+            if idx in results:
+                result = results[idx]
+            else:
+                with self._maybe_spinner(f"Creating: {title}...", use_styled):
+                    result = self._push_item_cli(provider, org, project, item)
 
             if "error" in result:
                 _print(f"    x {title}: {result['error']}")
@@ -687,30 +697,11 @@ class BacklogSession:
                 self._backlog_state.mark_item_pushed(idx, url)
                 if url:
                     push_urls.append(url)
+                push_urls.extend(result.get("children", []))
+                for child_error in result.get("child_errors", []):
+                    _print(f"      ! {child_error}")
                 pushed_count += 1
 
-                # Push children for DevOps hierarchical items
-                if provider == "devops":
-                    parent_id = result.get("id")
-                    children = item.get("children", [])
-                    for child in children:
-                        child_result = push_devops_story(
-                            org,
-                            project,
-                            child,
-                            parent_id=parent_id,
-                        )
-                        if "error" not in child_result:
-                            child_url = child_result.get("url", "")
-                            if child_url:
-                                push_urls.append(child_url)
-                            # Push pending tasks as DevOps Task work items
-                            story_id = child_result.get("id")
-                            for task in child.get("tasks", []):
-                                if isinstance(task, dict) and not task.get("done", False):
-                                    task_item = {"title": task.get("title", ""), "description": ""}
-                                    push_devops_task(org, project, task_item, parent_id=story_id)
-
         _print("")
         _print(f"  Done: {pushed_count} pushed, {failed_count} failed")
 
@@ -741,10 +732,12 @@ class BacklogSession:
         title = item.get("title", "Untitled")
 
         with self._maybe_spinner(f"Creating: {title}...", use_styled):
-            if provider == "github":
-                result = push_github_issue(org, project, item)
+            auth = resolve_push_auth(provider)
+            if auth is not None:
+                engine = BacklogPushEngine(provider, org, project, auth, state=self._backlog_state)
+                result = engine.push([(idx, item)])[idx]
             else:
-                result = push_devops_feature(org, project, item)
+                result = self._push_item_cli(provider, org, project, item)
 
         if "error" in result:
             _print(f"  x {title}: {result['error']}")
@@ -753,28 +746,46 @@ class BacklogSession:
             url = result.get("url", "")
             _print(f"  v {title}: {url}")
             self._backlog_state.mark_item_pushed(idx, url)
+            for child_url in result.get("children", []):
+                _print(f"    v {child_url}")
+            for child_error in result.get("child_errors", []):
+                _print(f"    ! {child_error}")
 
-            # Push children for DevOps hierarchical items
-            if provider == "devops":
-                parent_id = result.get("id")
-                children = item.get("children", [])
-                for child in children:
-                    child_result = push_devops_story(
-                        org,
-                        project,
-                        child,
-                        parent_id=parent_id,
-                    )
-                    if "error" not in child_result:
-                        child_url = child_result.get("url", "")
-                        if child_url:
-                            _print(f"    v {child.get('title', '')}: {child_url}")
-                        # Push pending tasks as DevOps Task work items
-                        story_id = child_result.get("id")
-                        for task in child.get("tasks", []):
-                            if isinstance(task, dict) and not task.get("done", False):
-                                task_item = {"title": task.get("title", ""), "description": ""}
-                                push_devops_task(org, project, task_item, parent_id=story_id)
+    @staticmethod
+    def _push_item_cli(provider: str, org: str, project: str, item: dict) -> dict:
+        """Push one item (and its DevOps children) through the gh/az CLIs.
+
+        Fallback for when no API token is available.  Returns the same
+        shape as :meth:`BacklogPushEngine.push` results.
+        """
+        if provider == "github":
+            return push_github_issue(org, project, item)
+
+        result = push_devops_feature(org, project, item)
+        if "error" in result:
+            return result
+
+        # Push children for DevOps hierarchical items
+        result["children"] = []
+        parent_id = result.get("id")
+        for child in item.get("children", []):
+            child_result = push_devops_story(
+                org,
+                project,
+                child,
+                parent_id=parent_id,
+            )
+            if "error" not in child_result:
+                child_url = child_result.get("url", "")
+                if child_url:
+                    result["children"].append(child_url)
+                # Push pending tasks as DevOps Task work items
+                story_id = child_result.get("id")
+                for task in child.get("tasks", []):
+                    if isinstance(task, dict) and not task.get("done", False):
+                        task_item = {"title": task.get("title", ""), "description": ""}
+                        push_devops_task(org, project, task_item, parent_id=story_id)
+        return result
 
     # ------------------------------------------------------------------ #
     # Slash commands
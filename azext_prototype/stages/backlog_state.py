@@ -13,6 +13,8 @@ The state structure tracks:
 - Provider — github | devops
 - Push status — per-item: pending | pushed | failed
 - Push results — per-item: URL/ID of created work item
+- Push records — per work item key: progress of the API push engine,
+  so an interrupted push resumes without creating duplicates
 - Context hash — SHA-256 of design context + scope (cache key)
 - Conversation history — for session resumption
 """
@@ -21,6 +23,7 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -41,6 +44,7 @@ def _default_backlog_state() -> dict[str, Any]:
         "project": "",
         "push_status": [],
         "push_results": [],
+        "push_records": {},
         "context_hash": "",
         "conversation_history": [],
         "_metadata": {
@@ -67,6 +71,7 @@ class BacklogState:
         self._path = Path(project_dir) / BACKLOG_STATE_FILE
         self._state: dict[str, Any] = _default_backlog_state()
         self._loaded = False
+        self._lock = threading.RLock()
 
     @property
     def exists(self) -> bool:
@@ -107,20 +112,21 @@ class BacklogState:
         """Save the current state to YAML."""
         self._path.parent.mkdir(parents=True, exist_ok=True)
 
-        now = datetime.now(timezone.utc).isoformat()
-        if not self._state["_metadata"]["created"]:
-            self._state["_metadata"]["created"] = now
-        self._state["_metadata"]["last_updated"] = now
-
-        with open(self._path, "w", encoding="utf-8") as f:
-            yaml.dump(
-                self._state,
-                f,
-                default_flow_style=False,
-                allow_unicode=True,
-                sort_keys=False,
-                width=120,
-            )
+        with self._lock:
+            now = datetime.now(timezone.utc).isoformat()
+            if not self._state["_metadata"]["created"]:
+                self._state["_metadata"]["created"] = now
+            self._state["_metadata"]["last_updated"] = now
+
+            with open(self._path, "w", encoding="utf-8") as f:
+                yaml.dump(
+                    self._state,
+                    f,
+                    default_flow_style=False,
+                    allow_unicode=True,
+                    sort_keys=False,
+                    width=120,
+                )
         logger.info("Saved backlog state to %s", self._path)
 
     def reset(self) -> None:
@@ -187,6 +193,28 @@ class BacklogState:
             self._state["push_results"][idx] = f"error: {error}"
             self.save()
 
+    def get_push_record(self, key: str) -> dict | None:
+        """Return the API push progress record for work item *key*."""
+        with self._lock:
+            record = self._state.get("push_records", {}).get(key)
+            return dict(record) if isinstance(record, dict) else None
+
+    def record_push(self, key: str, status: str | None, work_item_id: Any = "", url: str = "") -> None:
+        """Record API push progress for work item *key* and save.
+
+        *status* is ``"in_flight"`` before a create request is sent and
+        ``"pushed"`` once it succeeded; ``None`` drops the record.
+        Records survive :meth:`set_items`, so re-pushing an edited
+        backlog skips work items that already exist.  Thread-safe.
+        """
+        with self._lock:
+            records = self._state.setdefault("push_records", {})
+            if status is None:
+                records.pop(key, None)
+            else:
+                records[key] = {"status": status, "id": work_item_id, "url": url}
+            self.save()
+
     def get_pending_items(self) -> list[tuple[int, dict]]:
         """Return items not yet pushed as (index, item) tuples."""
         result = []
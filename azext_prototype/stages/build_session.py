@@ -9,9 +9,12 @@ Phases:
 
 1. **Template detection** — Match workload templates (optional starting points)
 2. **Deployment plan** — Derive fine-grained, dependency-ordered stages from
-   the design architecture (via the cloud-architect agent)
+   the design architecture (rule-based, with the cloud-architect agent for
+   ambiguous designs)
 3. **Staged generation** — Generate code per stage using the appropriate agent,
-   with policy checking and interactive resolution after each stage
+   with policy checking and interactive resolution after each stage, then
+   QA review and remediation of the generated stages (batched or concurrent,
+   see :mod:`~.qa_pipeline`)
 4. **QA review** — Cross-cutting review of all generated code
 5. **Build report** — Structured summary of what was built
 6. **Review loop** — User feedback drives regeneration of specific stages
@@ -23,6 +26,7 @@ import json
 import logging
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Callable, Iterator
@@ -34,8 +38,13 @@ from azext_prototype.agents.registry import AgentRegistry
 from azext_prototype.ai.token_tracker import TokenTracker
 from azext_prototype.config import ProjectConfig
 from azext_prototype.naming import create_naming_strategy
-from azext_prototype.parsers.file_extractor import parse_file_blocks, write_parsed_files
-from azext_prototype.stages.build_state import BuildState
+from azext_prototype.parsers.file_extractor import FileWriter, parse_file_blocks
+from azext_prototype.stages.build_state import BuildState, stage_layer
+from azext_prototype.stages.deployment_planner import (
+    DeploymentPlanner,
+    detect_services,
+    service_category,
+)
 from azext_prototype.stages.escalation import EscalationTracker
 from azext_prototype.stages.intent import (
     IntentKind,
@@ -43,6 +52,19 @@ from azext_prototype.stages.intent import (
     read_files_for_session,
 )
 from azext_prototype.stages.policy_resolver import PolicyResolver
+from azext_prototype.stages.qa_pipeline import (
+    QA_BATCH_TOKENS,
+    QA_MODE_BATCH,
+    QA_MODES,
+    QA_PARALLELISM,
+    QA_REVIEW_PREAMBLE,
+    FileContentCache,
+    batch_review_instructions,
+    estimate_tokens,
+    pack_stages,
+    qa_has_issues,
+    split_batch_findings,
+)
 from azext_prototype.stages.qa_router import route_error_to_qa
 from azext_prototype.ui.console import Console, DiscoveryPrompt
 from azext_prototype.ui.console import console as default_console
@@ -164,6 +186,9 @@ class BuildSession:
 
         qa_agents = registry.find_by_capability(AgentCapability.QA)
         self._qa_agent = qa_agents[0] if qa_agents else None
+        self._file_cache = FileContentCache(agent_context.project_dir)
+        # Stages reviewed by QA this session, by stage number
+        self._qa_reviewed: dict[int, dict] = {}
 
         # Escalation tracker
         self._escalation_tracker = EscalationTracker(agent_context.project_dir)
@@ -195,6 +220,9 @@ class BuildSession:
                 {"naming": {"strategy": "simple"}, "project": {"name": self._project_name}}
             )
 
+        # Rule-based planner — the architect is only asked about ambiguous designs
+        self._planner = DeploymentPlanner(self._iac_tool, self._naming, self._project_name)
+
     # ------------------------------------------------------------------ #
     # Public API
     # ------------------------------------------------------------------ #
@@ -280,7 +308,7 @@ class BuildSession:
 
             if old_arch:
                 with self._maybe_spinner("Analyzing design changes...", use_styled):
-                    diff_result = self._diff_architectures(old_arch, architecture, existing_stages)
+                    diff_result = self._diff_architectures(old_arch, architecture, existing_stages, templates)
             else:
                 # Legacy build with no snapshot text — treat all as modified
                 diff_result = {
@@ -390,6 +418,7 @@ class BuildSession:
             pending = self._build_state.get_pending_stages()
             total_stages = len(self._build_state._state["deployment_stages"])
         generated_count = len(self._build_state.get_generated_stages())
+        qa_stages: list[dict] = []
 
         for stage in pending:
             stage_num = stage["stage"]
@@ -397,6 +426,11 @@ class BuildSession:
             category = stage.get("category", "infra")
             services = stage.get("services", [])
 
+            # Review (and remediate) a finished layer before generating
+            # the stages that build on it
+            if qa_stages and stage_layer(stage) > max(stage_layer(s) for s in qa_stages):
+                self._flush_stage_qa(qa_stages, architecture, templates, use_styled, _print)
+
             svc_names = [s.get("computed_name") or s.get("name", "") for s in services]
             svc_display = ", ".join(svc_names[:3])
             if len(svc_names) > 3:
@@ -504,14 +538,16 @@ class BuildSession:
                     written_paths = self._write_stage_files(stage, content)
                     self._build_state.mark_stage_generated(stage_num, written_paths, agent.name)
 
-            # Per-stage QA validation
+            # Queue for QA validation
             if category in ("infra", "data", "integration", "app"):
-                self._run_stage_qa(stage, architecture, templates, use_styled, _print)
+                qa_stages.append(stage)
 
             if use_styled:
                 self._console.print_token_status(self._token_tracker.format_status())
             _print("")
 
+        self._flush_stage_qa(qa_stages, architecture, templates, use_styled, _print)
+
         # ---- Phase 4: Advisory QA review ----
         if not skip_generation and scope == "all" and self._qa_agent:
             _print("Running advisory review...")
@@ -723,13 +759,28 @@ class BuildSession:
         architecture: str,
         templates: list,
     ) -> list[dict]:
-        """Ask the architect to derive a deployment plan from the design.
-
-        Falls back to :meth:`_fallback_deployment_plan` when no architect
-        agent is available or the AI response cannot be parsed.
+        """Derive a deployment plan from the design.
+
+        Small designs whose services are all recognised are planned by
+        :class:`~.deployment_planner.DeploymentPlanner` in milliseconds and
+        reproducibly.  Any other design goes to the architect with the
+        rule-based draft as a starting point: ambiguous designs (nothing
+        recognised, services the rules do not cover, or services the
+        design rejects) and designs large enough that stage granularity
+        is a judgement call.
+
+        Falls back to the draft, or :meth:`_fallback_deployment_plan`, when
+        no architect agent is available or the AI response cannot be parsed.
         """
+        detection = detect_services(architecture, templates)
+        draft = self._planner.plan(detection) if detection.services else []
+        if draft and not detection.needs_review:
+            logger.info("Deployment plan derived from rules (%d stages)", len(draft))
+            return draft
+
+        fallback = draft or self._fallback_deployment_plan(templates)
         if not self._architect_agent or not self._context.ai_provider:
-            return self._fallback_deployment_plan(templates)
+            return fallback
 
         template_context = ""
         if templates:
@@ -745,6 +796,23 @@ class BuildSession:
         )
         if template_context:
             task += f"## Template Starting Points\n{template_context}\n\n"
+        if draft:
+            task += (
+                "## Rule-based Draft\n"
+                "These stages were derived from the services recognised in the design, one "
+                "stage per service. Confirm them against the design: merge or split stages "
+                "where the design groups services differently, and drop any service the "
+                "design does not actually want"
+            )
+            if detection.unknown:
+                task += f". Add stages for: {', '.join(detection.unknown)}"
+            if detection.excluded:
+                task += (
+                    f". The design mentions {', '.join(detection.excluded)} only as rejected or "
+                    "out of scope, so the draft leaves them out — do not add them unless the "
+                    "design clearly requires them"
+                )
+            task += f".\n```json\n{json.dumps({'stages': draft}, indent=2)}\n```\n\n"
 
         task += f"## Naming Convention\n{naming_instructions}\n\n"
         task += (
@@ -795,10 +863,10 @@ class BuildSession:
         if response:
             self._token_tracker.record(response)
         if not response or not response.content:
-            return self._fallback_deployment_plan(templates)
+            return fallback
 
         stages = self._parse_deployment_plan(response.content)
-        return stages if stages else self._fallback_deployment_plan(templates)
+        return stages if stages else fallback
 
     def _parse_deployment_plan(self, content: str) -> list[dict]:
         """Parse deployment plan JSON from architect response.
@@ -993,37 +1061,7 @@ class BuildSession:
     @staticmethod
     def _categorise_service(service_type: str) -> str:
         """Categorise a template service type into a stage category."""
-        _INFRA_TYPES = {
-            "virtual-network",
-            "key-vault",
-            "container-app-environment",
-            "app-service-plan",
-            "managed-identity",
-            "resource-group",
-            "api-management",
-            "front-door",
-            "cdn-profile",
-            "dns-zone",
-            "application-insights",
-            "log-analytics",
-            "network-security-group",
-            "private-endpoint",
-        }
-        _DATA_TYPES = {
-            "sql-database",
-            "cosmos-db",
-            "redis-cache",
-            "storage-account",
-            "databricks",
-            "data-factory",
-            "event-hub",
-            "service-bus",
-        }
-        if service_type in _INFRA_TYPES:
-            return "infra"
-        if service_type in _DATA_TYPES:
-            return "data"
-        return "app"
+        return service_category(service_type)
 
     # ------------------------------------------------------------------ #
     # Internal — plan adjustment
@@ -1035,14 +1073,20 @@ class BuildSession:
         architecture: str,
         templates: list,
     ) -> list[dict] | None:
-        """Ask the architect to adjust the deployment plan."""
+        """Adjust the deployment plan from user feedback.
+
+        Simple edits ("remove stage 3", "add redis") are applied by the
+        rule-based planner; anything else goes to the architect.
+        """
+        current_stages = self._build_state._state.get("deployment_stages", [])
+        adjusted = self._planner.apply_feedback(current_stages, feedback)
+        if adjusted is not None:
+            return adjusted
+
         if not self._architect_agent or not self._context.ai_provider:
             return None
 
-        current_plan = json.dumps(
-            self._build_state._state.get("deployment_stages", []),
-            indent=2,
-        )
+        current_plan = json.dumps(current_stages, indent=2)
 
         task = (
             "Adjust this deployment plan based on user feedback.\n\n"
@@ -1070,15 +1114,23 @@ class BuildSession:
         old_arch: str,
         new_arch: str,
         existing_stages: list[dict],
+        templates: list | None = None,
     ) -> dict:
-        """Ask the architect to compare old and new architectures.
+        """Compare old and new architectures against the current plan.
 
         Returns a dict classifying each existing stage as unchanged,
         modified, or removed, plus any new stages to add.
 
-        Falls back to marking all stages as modified when the architect
-        is unavailable or the response cannot be parsed.
+        The service sets are diffed structurally by the rule-based planner;
+        the architect is asked only when either design is ambiguous or a
+        stage cannot be mapped to known services.  Falls back to marking
+        all stages as modified when the architect is unavailable or the
+        response cannot be parsed.
         """
+        structural = self._planner.diff(old_arch, new_arch, existing_stages, templates)
+        if structural is not None:
+            return structural
+
         all_modified_fallback: dict = {
             "unchanged": [],
             "modified": [s["stage"] for s in existing_stages],
@@ -1471,9 +1523,12 @@ class BuildSession:
         """Extract file blocks from AI response and write to disk.
 
         Filters out blocked filenames (e.g. ``versions.tf`` for Terraform)
-        before writing.
+        before writing.  Files whose content hash matches the hash
+        recorded in build state are not rewritten; per-file hashes and
+        the exact change set are recorded on the stage.
 
-        Returns a list of written file paths relative to the project dir.
+        Returns a list of the stage's file paths relative to the project
+        dir (including files skipped as unchanged).
         """
         if not content:
             return []
@@ -1507,10 +1562,24 @@ class BuildSession:
 
             cleaned[normalized] = file_content
 
-        written = write_parsed_files(cleaned, output_dir, verbose=False)
-
         project_root = Path(self._context.project_dir)
-        return [str(p.relative_to(project_root)) for p in written]
+        stage_num = stage.get("stage")
+        writer = FileWriter(
+            output_dir,
+            known_hashes=self._build_state.get_file_hashes(stage_num) if stage_num is not None else {},
+            root=project_root,
+        )
+        changed = writer.write_all(cleaned.items())
+        if writer.skipped:
+            logger.info("Stage %s: %d unchanged file(s) not rewritten", stage_num, len(writer.skipped))
+
+        if stage_num is not None:
+            self._build_state.record_file_hashes(
+                stage_num,
+                writer.manifest,
+                [str(p.relative_to(project_root)) for p in changed],
+            )
+        return [writer.key_for(name) for name in cleaned]
 
     # ------------------------------------------------------------------ #
     # Internal — review loop helpers
@@ -1635,6 +1704,18 @@ class BuildSession:
             _print("")
             _print(self._build_state.format_stage_status())
             _print("")
+            if cmd == "/status":
+                from azext_prototype.knowledge.search_cache import (
+                    cache_stats,
+                    format_cache_stats,
+                )
+
+                cache_lines = format_cache_stats(cache_stats())
+                if cache_lines:
+                    _print("  Caches:")
+                    for line in cache_lines:
+                        _print(line)
+                    _print("")
         elif cmd == "/files":
             _print("")
             _print(self._build_state.format_files_list())
@@ -1713,7 +1794,6 @@ class BuildSession:
 
     def _collect_stage_file_content(self, stage: dict, max_bytes: int = 20_000) -> str:
         """Collect content of generated files for a single stage."""
-        project_root = Path(self._context.project_dir)
         parts: list[str] = []
         total = 0
 
@@ -1726,17 +1806,11 @@ class BuildSession:
                 parts.append("\n(remaining files omitted — size cap reached)")
                 break
 
-            full_path = project_root / filepath
-            try:
-                content = full_path.read_text(encoding="utf-8")
-            except (OSError, UnicodeDecodeError):
+            content = self._file_cache.read(filepath)
+            if content is None:
                 parts.append(f"```{filepath}\n(could not read file)\n```")
                 continue
 
-            per_file_cap = 8_000
-            if len(content) > per_file_cap:
-                content = content[:per_file_cap] + "\n... (truncated)"
-
             block = f"```{filepath}\n{content}\n```"
             total += len(block)
             parts.append(block)
@@ -1752,95 +1826,211 @@ class BuildSession:
         _print: Callable,
     ) -> None:
         """Run QA review + remediation loop for a single generated stage."""
-        if not self._qa_agent:
+        self._run_qa_reviews([stage], architecture, templates, use_styled, _print)
+
+    def _flush_stage_qa(
+        self,
+        qa_stages: list[dict],
+        architecture: str,
+        templates: list,
+        use_styled: bool,
+        _print: Callable,
+    ) -> None:
+        """Run a QA round over the queued *qa_stages* and empty the queue."""
+        if not qa_stages or not self._qa_agent:
+            qa_stages.clear()
             return
+        _print(f"QA review of {len(qa_stages)} stage(s)...")
+        self._run_qa_reviews(list(qa_stages), architecture, templates, use_styled, _print)
+        qa_stages.clear()
+        if use_styled:
+            self._console.print_token_status(self._token_tracker.format_status())
+        _print("")
 
-        stage_num = stage["stage"]
-        orchestrator = AgentOrchestrator(self._registry, self._context)
+    def _run_qa_reviews(
+        self,
+        stages: list[dict],
+        architecture: str,
+        templates: list,
+        use_styled: bool,
+        _print: Callable,
+    ) -> None:
+        """Run QA review + remediation rounds over generated *stages*.
+
+        Each round reviews the stages still awaiting QA (see
+        :meth:`_review_stages`), then remediates every stage with
+        findings by re-invoking its IaC agent.  Remediated stages — and
+        the stages already reviewed this session that build on them (a
+        higher layer, see :func:`~.build_state.stage_layer`) — are
+        re-reviewed in the next round, up to
+        ``_MAX_STAGE_REMEDIATION_ATTEMPTS`` times.
+        """
+        if not self._qa_agent:
+            return
 
+        pending = list(stages)
         for attempt in range(_MAX_STAGE_REMEDIATION_ATTEMPTS + 1):
-            # 1. Collect this stage's files
-            file_content = self._collect_stage_file_content(stage)
-            if not file_content:
+            # 1. Collect each stage's files
+            items: list[tuple[dict, str]] = []
+            for stage in pending:
+                file_content = self._collect_stage_file_content(stage)
+                if file_content:
+                    items.append((stage, file_content))
+            if not items:
                 return
 
-            # 2. Build QA task
-            if attempt == 0:
-                qa_task = (
-                    f"Review the generated code for Stage {stage_num}: {stage['name']} "
-                    "using your Mandatory Review Checklist. "
-                    "Flag any issues — missing managed identity config, hardcoded secrets, "
-                    "undefined references, missing outputs, incomplete scripts, etc.\n\n"
-                    "Provide specific fixes (corrected file contents) for each issue.\n\n"
-                    f"## Stage {stage_num} Files\n\n{file_content}"
-                )
-            else:
-                qa_task = (
-                    f"Re-review the REMEDIATED code for Stage {stage_num}: {stage['name']}. "
-                    "Report ONLY remaining issues that were NOT fixed.\n\n"
-                    f"## Stage {stage_num} Files\n\n{file_content}"
-                )
+            # 2. Review
+            findings = self._review_stages(items, attempt, use_styled)
+            for stage, _ in items:
+                self._qa_reviewed[stage["stage"]] = stage
+
+            # 3. Check which stages have issues
+            to_fix: list[tuple[dict, str]] = []
+            for stage, _ in items:
+                stage_num = stage["stage"]
+                qa_content = findings.get(str(stage_num), "")
+                if not qa_has_issues(qa_content):
+                    _print(f"       Stage {stage_num} passed QA.")
+                elif attempt >= _MAX_STAGE_REMEDIATION_ATTEMPTS:
+                    _print(f"       Stage {stage_num}: QA issues remain after {attempt} remediation(s). Proceeding.")
+                    _print(f"       Remaining: {qa_content[:200]}")
+                else:
+                    to_fix.append((stage, qa_content))
 
-            # 3. Run QA
-            with self._maybe_spinner(f"QA reviewing Stage {stage_num}...", use_styled):
-                qa_result = orchestrator.delegate(
-                    from_agent="build-session",
-                    to_agent_name=self._qa_agent.name,
-                    sub_task=qa_task,
-                )
-            if qa_result:
-                self._token_tracker.record(qa_result)
+            # 4. Remediate — re-invoke IaC agent with QA findings
+            pending = []
+            for stage, qa_content in to_fix:
+                _print(f"       Stage {stage['stage']}: QA found issues — remediating (attempt {attempt + 1})...")
+                if self._remediate_stage(stage, architecture, templates, qa_content, use_styled):
+                    pending.append(stage)
+            if not pending:
+                return
 
-            qa_content = qa_result.content if qa_result else ""
+            # 5. Re-check reviewed stages that consume a remediated one
+            remediated = {stage["stage"] for stage in pending}
+            lowest = min(stage_layer(stage) for stage in pending)
+            for num, stage in sorted(self._qa_reviewed.items()):
+                if num not in remediated and stage_layer(stage) > lowest:
+                    _print(f"       Stage {num}: re-checking against remediated upstream stage(s).")
+                    pending.append(stage)
+
+    def _review_stages(self, items: list[tuple[dict, str]], attempt: int, use_styled: bool) -> dict[str, str]:
+        """Review ``(stage, file_content)`` pairs; return findings by stage number.
+
+        ``build.qa_mode`` picks how stages are grouped into requests:
+        ``batch`` (default) packs consecutive stages into one request up
+        to ``build.qa_batch_tokens``; ``parallel`` sends one request per
+        stage.  Requests run concurrently (``build.qa_parallelism``).  A
+        stage missing from a batched answer is reviewed again on its own.
+        """
+        by_id = {str(stage["stage"]): (stage, content) for stage, content in items}
+        mode = self._config.get("build.qa_mode", QA_MODE_BATCH)
+        budget = int(self._config.get("build.qa_batch_tokens", QA_BATCH_TOKENS) or QA_BATCH_TOKENS)
+        groups = pack_stages(
+            [(sid, estimate_tokens(content)) for sid, (_, content) in by_id.items()],
+            budget,
+            mode if mode in QA_MODES else QA_MODE_BATCH,
+        )
 
-            # 4. Check if issues found
-            has_issues = qa_content and any(
-                kw in qa_content.lower() for kw in ["critical", "error", "missing", "fix", "issue", "broken"]
+        if len(by_id) == 1:
+            message = f"QA reviewing Stage {next(iter(by_id))}..."
+        else:
+            message = f"QA reviewing {len(by_id)} stages in {len(groups)} request(s)..."
+
+        findings: dict[str, str] = {}
+        with self._maybe_spinner(message, use_styled):
+            missing: list[str] = []
+            for group, qa_content in zip(groups, self._delegate_qa([self._qa_task(g, by_id, attempt) for g in groups])):
+                if len(group) == 1:
+                    findings[group[0]] = qa_content
+                    continue
+                sections = split_batch_findings(qa_content, group)
+                findings.update(sections)
+                missing.extend(sid for sid in group if sid not in sections)
+            if missing:
+                retried = self._delegate_qa([self._qa_task([sid], by_id, attempt) for sid in missing])
+                findings.update(zip(missing, retried))
+        return findings
+
+    def _qa_task(self, stage_ids: list[str], by_id: dict[str, tuple[dict, str]], attempt: int) -> str:
+        """QA request for *stage_ids*; every request starts with the shared preamble."""
+        task = QA_REVIEW_PREAMBLE
+        if attempt:
+            task += (
+                "This is a re-review after remediation of these stages or of stages they depend on. "
+                "Report ONLY issues that remain, including any caused by the upstream changes.\n\n"
             )
+        if len(stage_ids) > 1:
+            task += batch_review_instructions(stage_ids)
+        for sid in stage_ids:
+            stage, content = by_id[sid]
+            task += f"## Stage {sid}: {stage['name']} — Files\n\n{content}\n\n"
+        return task.rstrip() + "\n"
+
+    def _delegate_qa(self, tasks: list[str]) -> list[str]:
+        """Send QA *tasks* concurrently; return the response texts in order."""
+        if self._qa_agent is None:
+            return ["" for _ in tasks]
+        qa_name = self._qa_agent.name
+
+        def _review(task: str) -> Any:
+            orchestrator = AgentOrchestrator(self._registry, self._context)
+            return orchestrator.delegate(from_agent="build-session", to_agent_name=qa_name, sub_task=task)
+
+        if len(tasks) == 1:
+            results = [_review(tasks[0])]
+        else:
+            workers = max(1, min(int(self._config.get("build.qa_parallelism", QA_PARALLELISM) or 1), len(tasks)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qa") as pool:
+                results = list(pool.map(_review, tasks))
 
-            if not has_issues:
-                _print(f"       Stage {stage_num} passed QA.")
-                return
-
-            # 5. If at max attempts, report and move on
-            if attempt >= _MAX_STAGE_REMEDIATION_ATTEMPTS:
-                _print(f"       Stage {stage_num}: QA issues remain after {attempt} remediation(s). Proceeding.")
-                if qa_content:
-                    _print(f"       Remaining: {qa_content[:200]}")
-                return
-
-            # 6. Remediate — re-invoke IaC agent with QA findings
-            _print(f"       Stage {stage_num}: QA found issues — remediating (attempt {attempt + 1})...")
+        contents: list[str] = []
+        for result in results:
+            if result:
+                self._token_tracker.record(result)
+            contents.append(result.content if result else "")
+        return contents
 
-            agent, task = self._build_stage_task(stage, architecture, templates)
-            if not agent:
-                return
+    def _remediate_stage(
+        self,
+        stage: dict,
+        architecture: str,
+        templates: list,
+        qa_content: str,
+        use_styled: bool,
+    ) -> bool:
+        """Regenerate *stage* with QA findings; False when no agent can."""
+        agent, task = self._build_stage_task(stage, architecture, templates)
+        if not agent:
+            return False
 
-            task += (
-                "\n\n## QA Review Findings (MUST FIX)\n"
-                "The QA engineer found the following issues. "
-                "You MUST address ALL of them:\n\n"
-                f"{qa_content}\n"
-            )
+        task += (
+            "\n\n## QA Review Findings (MUST FIX)\n"
+            "The QA engineer found the following issues. "
+            "You MUST address ALL of them:\n\n"
+            f"{qa_content}\n"
+        )
 
-            with self._maybe_spinner(f"Remediating Stage {stage_num}...", use_styled):
-                response = agent.execute(self._context, task)
+        stage_num = stage["stage"]
+        with self._maybe_spinner(f"Remediating Stage {stage_num}...", use_styled):
+            response = agent.execute(self._context, task)
 
-            if response:
-                self._token_tracker.record(response)
-            content = response.content if response else ""
-            written_paths = self._write_stage_files(stage, content)
-            self._build_state.mark_stage_generated(stage_num, written_paths, agent.name)
+        if response:
+            self._token_tracker.record(response)
+        content = response.content if response else ""
+        written_paths = self._write_stage_files(stage, content)
+        self._build_state.mark_stage_generated(stage_num, written_paths, agent.name)
+        return True
 
     def _collect_generated_file_content(self, max_bytes: int = 50_000) -> str:
         """Collect content of all generated files for QA review.
 
-        Iterates generated stages, reads each file from disk, and builds
-        a formatted string with fenced code blocks.  Applies *max_bytes*
-        cap to avoid blowing the context window — individual large files
-        are truncated and collection stops once the cap is reached.
+        Iterates generated stages and builds a formatted string with
+        fenced code blocks from the cached file contents.  Applies
+        *max_bytes* cap to avoid blowing the context window — individual
+        large files are truncated and collection stops once the cap is
+        reached.
         """
-        project_root = Path(self._context.project_dir)
         parts: list[str] = []
         total = 0
 
@@ -1861,18 +2051,11 @@ class BuildSession:
                     parts.append("\n(remaining files omitted — size cap reached)")
                     return "\n\n".join(parts)
 
-                full_path = project_root / filepath
-                try:
-                    content = full_path.read_text(encoding="utf-8")
-                except (OSError, UnicodeDecodeError):
+                content = self._file_cache.read(filepath)
+                if content is None:
                     parts.append(f"```{filepath}\n(could not read file)\n```")
                     continue
 
-                # Truncate individual large files
-                per_file_cap = 8_000
-                if len(content) > per_file_cap:
-                    content = content[:per_file_cap] + "\n... (truncated)"
-
                 block = f"```{filepath}\n{content}\n```"
                 total += len(block)
                 parts.append(block)
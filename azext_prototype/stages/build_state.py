@@ -14,19 +14,33 @@ The state structure tracks:
 - Policy check results and user-approved overrides
 - Build conversation history for the review loop
 - Aggregated resource list for multi-resource telemetry
+
+Every save also writes a compact JSON *stage index* next to
+``build.yaml`` — each stage's deploy-relevant fields with a digest, a
+revision number and a bounded log of stage change events
+(added/updated/removed) — so the deploy side can sync without parsing
+the full YAML file.  Revisions count up within a *generation*, a random
+ID chosen whenever the index is started afresh (missing, unreadable or
+from another version), so a revision is only compared with revisions
+of the same generation.
 """
 
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
+import os
 import re
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from azext_prototype.stages.fingerprint import mapping_digest
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,7 +66,107 @@ def _ensure_unique_id(slug: str, existing: set[str]) -> str:
     return f"{slug}-{len(existing)}"
 
 
+def diff_file_hashes(old: dict[str, dict], new: dict[str, dict]) -> list[str]:
+    """Return paths added, removed, or modified between two file manifests.
+
+    Manifests map a project-relative path to ``{"sha256": ..., "size": ...}``
+    as recorded in a stage's ``file_hashes``.  The result is sorted.
+    """
+    changed = set(old) ^ set(new)
+    for path in set(old) & set(new):
+        if (old[path] or {}).get("sha256") != (new[path] or {}).get("sha256"):
+            changed.add(path)
+    return sorted(changed)
+
+
 BUILD_STATE_FILE = ".prototype/state/build.yaml"
+BUILD_INDEX_FILE = ".prototype/state/build_index.json"
+STAGE_INDEX_VERSION = 2
+
+# Build-stage fields the deploy side consumes; a change to any of them
+# is a stage change event.
+SYNCED_STAGE_FIELDS = (
+    "name",
+    "category",
+    "services",
+    "deploy_mode",
+    "manual_instructions",
+    "dir",
+    "files",
+    "file_hashes",
+)
+# Carried in the index but not digested (numbering and build progress)
+_INDEXED_EXTRA_FIELDS = ("id", "stage", "status")
+# Change events kept in the index
+_INDEX_EVENT_LIMIT = 500
+
+# Deploy layers by stage category; a stage in a higher layer builds on
+# the stages of every lower one.  Unlisted categories (app, docs…) are
+# the top layer.
+_CATEGORY_LAYER = {"infra": 0, "data": 1, "integration": 2}
+_TOP_LAYER = 3
+
+
+def stage_layer(stage: dict) -> int:
+    """Deploy layer of *stage*: infra 0, data 1, integration 2, anything else 3."""
+    return _CATEGORY_LAYER.get(stage.get("category", "infra"), _TOP_LAYER)
+
+
+def stage_build_id(stage: dict) -> str:
+    """The stable ID of a build stage (``id``, or a slug of its name)."""
+    return stage.get("id") or _slugify(stage.get("name", "stage"))
+
+
+def stage_sync_digest(stage: dict) -> str:
+    """Digest of the fields of *stage* that deploy consumes."""
+    return mapping_digest({key: stage[key] for key in SYNCED_STAGE_FIELDS if key in stage})
+
+
+def load_stage_index(build_state_path: str | Path) -> dict | None:
+    """Return the stage index written alongside *build_state_path*.
+
+    Returns ``None`` when there is no index, it cannot be read, or it
+    does not describe the current ``build.yaml`` (e.g. the YAML was
+    edited by hand) — callers then parse ``build.yaml`` itself.
+    """
+    build_path = Path(build_state_path)
+    index = _read_index(build_path.with_name(Path(BUILD_INDEX_FILE).name))
+    if index is None:
+        return None
+    try:
+        stat = build_path.stat()
+    except OSError:
+        return None
+    if index.get("build_file") != {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}:
+        return None
+    return index
+
+
+def stage_changes_since(index: dict, revision: int | None) -> set[str] | None:
+    """IDs of stages changed in *index* after *revision*.
+
+    Returns ``None`` when the event log no longer reaches back to
+    *revision* (or *revision* is unknown); the caller then compares
+    stage digests instead.
+    """
+    events = index.get("events", [])
+    if revision is None or revision > index.get("revision", 0):
+        return None
+    # Every revision has at least one event, so the log is complete after
+    # *revision* only if it still holds an event from *revision* itself.
+    if revision < index.get("revision", 0) and (not events or events[0]["revision"] > revision):
+        return None
+    return {e["id"] for e in events if e["revision"] > revision and e.get("id")}
+
+
+def _read_index(path: Path) -> dict | None:
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != STAGE_INDEX_VERSION:
+        return None
+    return index
 
 
 def _default_build_state() -> dict[str, Any]:
@@ -97,6 +211,7 @@ class BuildState:
     def __init__(self, project_dir: str):
         self._project_dir = project_dir
         self._path = Path(project_dir) / BUILD_STATE_FILE
+        self._index_path = Path(project_dir) / BUILD_INDEX_FILE
         self._state: dict[str, Any] = _default_build_state()
         self._loaded = False
 
@@ -151,6 +266,7 @@ class BuildState:
                 width=120,
             )
         logger.info("Saved build state to %s", self._path)
+        self._write_stage_index()
 
     def reset(self) -> None:
         """Reset state to defaults and save."""
@@ -158,6 +274,70 @@ class BuildState:
         self._loaded = False
         self.save()
 
+    def _write_stage_index(self) -> None:
+        """Write the stage index for the ``build.yaml`` just saved.
+
+        Stages are compared with the previous index by digest; each
+        added, updated or removed stage becomes a change event and bumps
+        the revision.  Without a usable previous index a new generation
+        starts at revision 0.  On failure the index is removed so readers
+        fall back to ``build.yaml``.
+        """
+        previous = _read_index(self._index_path) or {}
+        generation = previous.get("generation")
+        if not generation:
+            previous, generation = {}, uuid.uuid4().hex
+        old_stages = previous.get("stages", {})
+        revision = previous.get("revision", 0)
+
+        stages: dict[str, dict] = {}
+        order: list[str] = []
+        changes: list[tuple[str, str]] = []
+        for stage in self._state["deployment_stages"]:
+            sid = stage_build_id(stage)
+            digest = stage_sync_digest(stage)
+            fields = SYNCED_STAGE_FIELDS + _INDEXED_EXTRA_FIELDS
+            stages[sid] = {"digest": digest, "stage": {key: stage[key] for key in fields if key in stage}}
+            order.append(sid)
+            old = old_stages.get(sid)
+            if old is None:
+                changes.append(("added", sid))
+            elif old.get("digest") != digest:
+                changes.append(("updated", sid))
+        changes.extend(("removed", sid) for sid in old_stages if sid not in stages)
+
+        iac_tool = self._state.get("iac_tool", "terraform")
+        events = list(previous.get("events", []))
+        if changes or order != previous.get("order") or iac_tool != previous.get("iac_tool"):
+            revision += 1
+            now = datetime.now(timezone.utc).isoformat()
+            events.extend({"revision": revision, "change": change, "id": sid, "at": now} for change, sid in changes)
+            if not changes:
+                events.append({"revision": revision, "change": "reordered", "id": None, "at": now})
+            events = events[-_INDEX_EVENT_LIMIT:]
+
+        try:
+            stat = self._path.stat()
+            index = {
+                "version": STAGE_INDEX_VERSION,
+                "generation": generation,
+                "revision": revision,
+                "iac_tool": iac_tool,
+                "build_file": {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size},
+                "order": order,
+                "stages": stages,
+                "events": events,
+            }
+            tmp = self._index_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(index, separators=(",", ":"), default=str), encoding="utf-8")
+            os.replace(tmp, self._index_path)
+        except (OSError, TypeError, ValueError):
+            logger.debug("Could not write build stage index", exc_info=True)
+            try:
+                self._index_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
     # ------------------------------------------------------------------ #
     # Deployment plan management
     # ------------------------------------------------------------------ #
@@ -182,6 +362,8 @@ class BuildState:
                 "status": "pending",
                 "dir": "",
                 "files": [],
+                "file_hashes": {},   # path → {"sha256", "size"}
+                "changed_files": [], # paths changed by the last write
             }
         """
         self._state["deployment_stages"] = stages
@@ -219,6 +401,29 @@ class BuildState:
 
         self.save()
 
+    def get_file_hashes(self, stage_num: int) -> dict[str, str]:
+        """Return ``{project-relative path: sha256}`` recorded for a stage."""
+        stage = self.get_stage(stage_num)
+        if not stage:
+            return {}
+        return {path: entry.get("sha256", "") for path, entry in (stage.get("file_hashes") or {}).items()}
+
+    def record_file_hashes(self, stage_num: int, manifest: dict[str, dict], changed: list[str]) -> None:
+        """Record per-file hashes and the exact change set for a stage.
+
+        *manifest* maps project-relative paths to ``{"sha256", "size"}``
+        and replaces the stage's previous manifest (mirroring how
+        ``files`` is replaced on regeneration).  *changed* lists the
+        paths whose content actually changed on disk.  Not saved —
+        callers follow up with :meth:`mark_stage_generated` or
+        :meth:`save`.
+        """
+        stage = self.get_stage(stage_num)
+        if not stage:
+            return
+        stage["file_hashes"] = dict(manifest)
+        stage["changed_files"] = sorted(changed)
+
     def mark_stage_accepted(self, stage_num: int) -> None:
         """Mark a deployment stage as accepted after review."""
         for stage in self._state["deployment_stages"]:
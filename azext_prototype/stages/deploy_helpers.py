@@ -3,7 +3,9 @@
 Provides reusable deployment utilities used by both ``deploy_stage.py`` and
 ``deploy_session.py``:
 
-- **Execution primitives**: Terraform/Bicep/app deploy, plan, and rollback functions
+- **Execution primitives**: Terraform/Bicep/app deploy, plan, and rollback functions.
+  Deploy and preview functions accept ``on_output`` / ``cancel_event`` to
+  stream output live through :func:`~.process_runner.run_streaming`.
 - **DeploymentOutputCapture**: collect and persist Terraform/Bicep outputs
 - **DeployScriptGenerator**: create deploy.sh scripts for app directories
 - **RollbackManager**: track deployment state for potential rollback
@@ -14,12 +16,25 @@ import logging
 import os
 import re
 import secrets
+import shlex
 import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+from azext_prototype.stages.fingerprint import deploy_variables, stage_fingerprint
+from azext_prototype.stages.process_runner import (
+    RunResult,
+    TerraformProgress,
+    run_streaming,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -363,7 +378,49 @@ def get_deploy_location(infra_dir: Path) -> str | None:
     return None
 
 
-def _terraform_init(infra_dir: Path, env: dict[str, str] | None = None) -> dict:
+def _run(
+    cmd: list[str],
+    *,
+    cwd: Path | None = None,
+    env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    keep_stdout: bool = False,
+) -> subprocess.CompletedProcess | RunResult:
+    """Run a deploy command, streaming it when the caller is watching.
+
+    With neither *on_output* nor *cancel_event* the command runs under
+    ``subprocess.run(capture_output=True)``.  Otherwise each output line
+    is passed to *on_output* as it arrives and only a bounded tail is
+    kept (see :func:`~.process_runner.run_streaming`).
+    """
+    if on_output is None and cancel_event is None:
+        kwargs: dict[str, Any] = {"cwd": str(cwd)} if cwd is not None else {}
+        return subprocess.run(cmd, capture_output=True, text=True, check=False, env=env, **kwargs)
+    return run_streaming(cmd, cwd=cwd, env=env, on_line=on_output, cancel_event=cancel_event, keep_stdout=keep_stdout)
+
+
+def _cancelled(result: subprocess.CompletedProcess | RunResult, command: str) -> dict | None:
+    """Return a failed result dict if *result* was cancelled, else ``None``."""
+    if isinstance(result, RunResult) and result.cancelled:
+        return {"status": "failed", "error": "Cancelled by user.", "command": command, "cancelled": True}
+    return None
+
+
+def _phase_failed(phase: dict, command: str) -> dict:
+    """Turn a failed init/validate ``{"ok": False, ...}`` into a deploy result."""
+    result = {"status": "failed", "error": phase["error"], "command": command}
+    if phase.get("cancelled"):
+        result["cancelled"] = True
+    return result
+
+
+def _terraform_init(
+    infra_dir: Path,
+    env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict:
     """Run ``terraform init`` with automatic backend fallback.
 
     1. Attempt normal init.
@@ -373,16 +430,12 @@ def _terraform_init(infra_dir: Path, env: dict[str, str] | None = None) -> dict:
 
     Returns ``{"ok": True}`` on success or ``{"ok": False, "error": ...}``.
     """
-    result = subprocess.run(
-        ["terraform", "init", "-input=false", "-no-color"],
-        capture_output=True,
-        text=True,
-        cwd=str(infra_dir),
-        check=False,
-        env=env,
-    )
+    stream = {"on_output": on_output, "cancel_event": cancel_event}
+    result = _run(["terraform", "init", "-input=false", "-no-color"], cwd=infra_dir, env=env, **stream)
     if result.returncode == 0:
         return {"ok": True}
+    if isinstance(result, RunResult) and result.cancelled:
+        return {"ok": False, "error": "Cancelled by user.", "cancelled": True}
 
     error = result.stderr.strip() or result.stdout.strip()
 
@@ -391,14 +444,7 @@ def _terraform_init(infra_dir: Path, env: dict[str, str] | None = None) -> dict:
     if "Duplicate required providers" in error:
         _deduplicate_providers(infra_dir)
         # Retry after dedup
-        result = subprocess.run(
-            ["terraform", "init", "-input=false", "-no-color"],
-            capture_output=True,
-            text=True,
-            cwd=str(infra_dir),
-            check=False,
-            env=env,
-        )
+        result = _run(["terraform", "init", "-input=false", "-no-color"], cwd=infra_dir, env=env, **stream)
         if result.returncode == 0:
             return {"ok": True}
         error = result.stderr.strip() or result.stdout.strip()
@@ -410,13 +456,8 @@ def _terraform_init(infra_dir: Path, env: dict[str, str] | None = None) -> dict:
             "Remote backend config incomplete in %s — falling back to local state.",
             infra_dir,
         )
-        result = subprocess.run(
-            ["terraform", "init", "-input=false", "-no-color", "-backend=false"],
-            capture_output=True,
-            text=True,
-            cwd=str(infra_dir),
-            check=False,
-            env=env,
+        result = _run(
+            ["terraform", "init", "-input=false", "-no-color", "-backend=false"], cwd=infra_dir, env=env, **stream
         )
         if result.returncode == 0:
             return {"ok": True, "warning": "Using local state (remote backend config incomplete)."}
@@ -475,21 +516,23 @@ def _deduplicate_providers(infra_dir: Path) -> None:
             pass
 
 
-def _terraform_validate(infra_dir: Path, env: dict[str, str] | None = None) -> dict:
+def _terraform_validate(
+    infra_dir: Path,
+    env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict:
     """Run ``terraform validate``.  Requires init to have run first.
 
     Returns ``{"ok": True}`` on success or ``{"ok": False, "error": ...}``.
     """
-    result = subprocess.run(
-        ["terraform", "validate", "-no-color"],
-        capture_output=True,
-        text=True,
-        cwd=str(infra_dir),
-        check=False,
-        env=env,
+    result = _run(
+        ["terraform", "validate", "-no-color"], cwd=infra_dir, env=env, on_output=on_output, cancel_event=cancel_event
     )
     if result.returncode == 0:
         return {"ok": True}
+    if isinstance(result, RunResult) and result.cancelled:
+        return {"ok": False, "error": "Cancelled by user.", "cancelled": True}
     error = result.stderr.strip() or result.stdout.strip()
     return {"ok": False, "error": error}
 
@@ -498,6 +541,9 @@ def deploy_terraform(
     infra_dir: Path,
     subscription: str,
     env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    inputs: dict[str, Any] | None = None,
 ) -> dict:
     """Execute Terraform deployment in the given directory.
 
@@ -506,42 +552,174 @@ def deploy_terraform(
     ``-input=false`` and ``-no-color`` to prevent interactive prompts
     and produce clean captured output.
 
+    The plan runs with ``-detailed-exitcode``; when it reports no
+    changes, apply is skipped and the result carries ``no_changes``.
+    If a dry run saved a plan for exactly this stage content, variables
+    and upstream *inputs* (see :func:`plan_terraform`), that plan is
+    applied directly without init/validate/plan.
+
+    When *on_output* is given, output is streamed as it is produced and
+    ``terraform apply`` runs with ``-json`` so per-resource progress
+    (``[3/12] Created azurerm_key_vault.main (14s)``) can be shown.
+    Setting *cancel_event* terminates the running command.
+
     Returns a result dict with ``status`` and optional ``error`` /
     ``command`` keys.
     """
+    fingerprint = terraform_fingerprint(infra_dir, subscription, env=env, inputs=inputs)
+    saved = load_saved_plan(infra_dir, fingerprint)
+    clear_saved_plan(infra_dir)
+    if saved is not None:
+        if not saved["changes"]:
+            logger.info("Saved plan for %s has no changes; skipping apply.", infra_dir)
+            return {"status": "deployed", "tool": "terraform", "no_changes": True, "saved_plan": True}
+        logger.info("Applying saved plan for %s", infra_dir)
+        applied = _terraform_apply(infra_dir, env=env, on_output=on_output, cancel_event=cancel_event)
+        if not applied.pop("stale", False):
+            applied["saved_plan"] = True
+            return applied
+        logger.info("Saved plan for %s is stale; re-planning.", infra_dir)
+
     # Phase 1: init with automatic backend/provider dedup fallback
-    init = _terraform_init(infra_dir, env=env)
+    init = _terraform_init(infra_dir, env=env, on_output=on_output, cancel_event=cancel_event)
     if not init["ok"]:
-        return {"status": "failed", "error": init["error"], "command": "terraform init"}
+        return _phase_failed(init, "terraform init")
 
     # Phase 2: validate
-    validate = _terraform_validate(infra_dir, env=env)
+    validate = _terraform_validate(infra_dir, env=env, on_output=on_output, cancel_event=cancel_event)
     if not validate["ok"]:
-        return {"status": "failed", "error": validate["error"], "command": "terraform validate"}
+        return _phase_failed(validate, "terraform validate")
+
+    # Phase 3: plan (exit code 0 = no changes, 2 = changes, 1 = error)
+    cmd = _terraform_plan_cmd(subscription, save=True)
+    cmd_str = " ".join(cmd)
+    logger.info("Running: %s (cwd=%s)", cmd_str, infra_dir)
+    result = _run(cmd, cwd=infra_dir, env=env, on_output=on_output, cancel_event=cancel_event)
+    cancelled = _cancelled(result, cmd_str)
+    if cancelled:
+        return cancelled
+    if result.returncode == 0:
+        _remove_plan_file(infra_dir)
+        return {"status": "deployed", "tool": "terraform", "no_changes": True}
+    if result.returncode != 2:
+        error = result.stderr.strip() or result.stdout.strip()
+        logger.error("Terraform error: %s", error)
+        return {"status": "failed", "error": error, "command": cmd_str}
 
-    # Phase 3: plan + apply
-    commands = [
-        ["terraform", "plan", "-input=false", "-no-color", "-var", f"subscription_id={subscription}", "-out=tfplan"],
-        ["terraform", "apply", "-input=false", "-no-color", "tfplan"],
-    ]
+    # Phase 4: apply
+    applied = _terraform_apply(infra_dir, env=env, on_output=on_output, cancel_event=cancel_event)
+    applied.pop("stale", None)
+    return applied
+
+
+def _terraform_plan_cmd(subscription: str, save: bool) -> list[str]:
+    cmd = ["terraform", "plan", "-input=false", "-no-color", "-var", f"subscription_id={subscription}"]
+    if save:
+        cmd += ["-detailed-exitcode", f"-out={_PLAN_FILE}"]
+    return cmd
+
+
+def _terraform_apply(
+    infra_dir: Path,
+    env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict:
+    """Apply the plan file in *infra_dir*.
+
+    A failure caused by the plan being stale (state changed since it was
+    made) is flagged with ``stale`` so the caller can re-plan.
+    """
+    streaming = on_output is not None
+    cmd = ["terraform", "apply", "-input=false", "-json" if streaming else "-no-color", _PLAN_FILE]
+    cmd_str = " ".join(cmd)
+    progress = TerraformProgress()
+
+    def _apply_line(line: str) -> None:
+        message = progress.feed(line)
+        if message is not None and on_output is not None:
+            on_output(message)
+
+    logger.info("Running: %s (cwd=%s)", cmd_str, infra_dir)
+    result = _run(cmd, cwd=infra_dir, env=env, on_output=_apply_line if streaming else None, cancel_event=cancel_event)
+    _remove_plan_file(infra_dir)
+    cancelled = _cancelled(result, cmd_str)
+    if cancelled:
+        return cancelled
+    if result.returncode != 0:
+        error = progress.error_text() or result.stderr.strip() or result.stdout.strip()
+        logger.error("Terraform error: %s", error)
+        return {"status": "failed", "error": error, "command": cmd_str, "stale": "plan is stale" in error.lower()}
+
+    deployed: dict[str, Any] = {"status": "deployed", "tool": "terraform"}
+    if progress.summary:
+        deployed["summary"] = progress.summary
+    if progress.outputs:
+        deployed["outputs"] = progress.outputs
+    return deployed
+
+
+# ----------------------------------------------------------------------
+# Saved plans
+# ----------------------------------------------------------------------
+
+_PLAN_FILE = "tfplan"
+_PLAN_META = ".prototype-plan.json"
 
-    for cmd in commands:
-        cmd_str = " ".join(cmd)
-        logger.info("Running: %s (cwd=%s)", cmd_str, infra_dir)
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=str(infra_dir),
-            check=False,
-            env=env,
-        )
-        if result.returncode != 0:
-            error = result.stderr.strip() or result.stdout.strip()
-            logger.error("Terraform error: %s", error)
-            return {"status": "failed", "error": error, "command": cmd_str}
 
-    return {"status": "deployed", "tool": "terraform"}
+def terraform_fingerprint(
+    infra_dir: Path,
+    subscription: str,
+    env: dict[str, str] | None = None,
+    inputs: dict[str, Any] | None = None,
+) -> str:
+    """Fingerprint everything a Terraform plan for *infra_dir* depends on."""
+    variables = {"subscription_id": subscription, **deploy_variables(env)}
+    return stage_fingerprint(infra_dir, variables=variables, inputs=inputs)
+
+
+def load_saved_plan(infra_dir: Path, fingerprint: str) -> dict | None:
+    """Return the saved plan metadata if it matches *fingerprint*.
+
+    A plan with changes also needs its plan file on disk.
+    """
+    try:
+        meta = json.loads((infra_dir / _PLAN_META).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("fingerprint") != fingerprint:
+        return None
+    if meta.get("changes") and not (infra_dir / _PLAN_FILE).is_file():
+        return None
+    return meta
+
+
+def save_plan(infra_dir: Path, fingerprint: str, changes: bool) -> None:
+    """Record that the plan file in *infra_dir* was made for *fingerprint*."""
+    meta = {
+        "fingerprint": fingerprint,
+        "changes": changes,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        (infra_dir / _PLAN_META).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    except OSError:
+        logger.debug("Could not save plan metadata in %s", infra_dir, exc_info=True)
+
+
+def clear_saved_plan(infra_dir: Path) -> None:
+    """Forget any saved plan — each one is applied at most once."""
+    try:
+        (infra_dir / _PLAN_META).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _remove_plan_file(infra_dir: Path) -> None:
+    try:
+        (infra_dir / _PLAN_FILE).unlink(missing_ok=True)
+    except OSError:
+        pass
 
 
 def deploy_bicep(
@@ -549,11 +727,15 @@ def deploy_bicep(
     subscription: str,
     resource_group: str,
     env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
 ) -> dict:
     """Execute Bicep deployment for a stage directory.
 
     Supports subscription-level and resource-group-level scopes.
-    Auto-discovers template and parameter files.
+    Auto-discovers template and parameter files.  With *on_output*,
+    ``az`` progress and warnings (stderr) are streamed live; the JSON
+    result on stdout is kept whole for output capture.
     """
     main_bicep = infra_dir / "main.bicep"
     if not main_bicep.exists():
@@ -602,8 +784,13 @@ def deploy_bicep(
         cmd_parts.extend(["--parameters", str(params_file)])
 
     logger.info("Running: %s", " ".join(cmd_parts))
-    result = subprocess.run(cmd_parts, capture_output=True, text=True, check=False, env=env)
+    result = _run(cmd_parts, env=env, on_output=on_output, cancel_event=cancel_event, keep_stdout=True)
+    if isinstance(result, RunResult) and on_output is not None:
+        on_output(f"Deployment finished in {result.elapsed:.0f}s")
 
+    cancelled = _cancelled(result, "az deployment create")
+    if cancelled:
+        return cancelled
     if result.returncode != 0:
         error = result.stderr.strip() or result.stdout.strip()
         logger.error("Bicep deployment error: %s", error)
@@ -622,28 +809,58 @@ def plan_terraform(
     infra_dir: Path,
     subscription: str,
     env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    save: bool = False,
+    inputs: dict[str, Any] | None = None,
+    init_lock: AbstractContextManager | None = None,
 ) -> dict:
-    """Run ``terraform plan`` for display (no ``-out``).
+    """Run ``terraform plan`` for display.
 
-    Returns the plan output text for preview / dry-run mode.
+    Returns the plan output text for preview / dry-run mode.  When
+    *on_output* is given the plan is streamed as it is produced and the
+    result is marked ``streamed`` — ``output`` then holds only the
+    bounded tail, since the caller has already shown the full text.
+
+    With *save*, the plan is written to ``tfplan`` (``-detailed-exitcode``)
+    and recorded against the stage fingerprint, so a following
+    :func:`deploy_terraform` with the same content, variables and
+    *inputs* applies it directly.  ``changes`` reports whether the plan
+    has anything to do.
+
+    Plans for several stages may run at once; pass a shared *init_lock*
+    so their ``terraform init`` runs take turns on the plugin cache.
     """
-    init = _terraform_init(infra_dir, env=env)
+    with init_lock or nullcontext():
+        init = _terraform_init(infra_dir, env=env, on_output=on_output, cancel_event=cancel_event)
     if not init["ok"]:
         return {"status": "failed", "error": init["error"]}
 
-    result = subprocess.run(
-        ["terraform", "plan", "-input=false", "-no-color", "-var", f"subscription_id={subscription}"],
-        capture_output=True,
-        text=True,
-        cwd=str(infra_dir),
-        check=False,
+    # Fingerprint after init: provider de-duplication may rewrite files
+    fingerprint = terraform_fingerprint(infra_dir, subscription, env=env, inputs=inputs) if save else ""
+    result = _run(
+        _terraform_plan_cmd(subscription, save=save),
+        cwd=infra_dir,
         env=env,
+        on_output=on_output,
+        cancel_event=cancel_event,
     )
+    cancelled = _cancelled(result, "terraform plan")
+    if cancelled:
+        return cancelled
+
+    failed = result.returncode not in (0, 2) if save else result.returncode != 0
+    changes = None
+    if save and not failed:
+        changes = result.returncode == 2
+        save_plan(infra_dir, fingerprint, changes)
 
     return {
         "status": "previewed",
         "output": result.stdout.strip(),
-        "error": result.stderr.strip() if result.returncode != 0 else None,
+        "error": result.stderr.strip() if failed else None,
+        "streamed": on_output is not None,
+        "changes": changes,
     }
 
 
@@ -652,8 +869,13 @@ def whatif_bicep(
     subscription: str,
     resource_group: str,
     env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
 ) -> dict:
-    """Run ``az deployment group what-if`` to preview Bicep changes."""
+    """Run ``az deployment group what-if`` to preview Bicep changes.
+
+    Streams like :func:`plan_terraform` when *on_output* is given.
+    """
     main_bicep = infra_dir / "main.bicep"
     if not main_bicep.exists():
         bicep_files = sorted(infra_dir.glob("*.bicep"))
@@ -699,24 +921,156 @@ def whatif_bicep(
     if params_file:
         cmd_parts.extend(["--parameters", str(params_file)])
 
-    result = subprocess.run(cmd_parts, capture_output=True, text=True, check=False, env=env)
+    result = _run(cmd_parts, env=env, on_output=on_output, cancel_event=cancel_event)
+    cancelled = _cancelled(result, "az deployment what-if")
+    if cancelled:
+        return cancelled
 
     return {
         "status": "previewed",
         "output": result.stdout.strip(),
         "error": result.stderr.strip() if result.returncode != 0 else None,
+        "streamed": on_output is not None,
     }
 
 
+# ----------------------------------------------------------------------
+# Concurrent preflight
+# ----------------------------------------------------------------------
+
+# Stages validated / planned concurrently up to this many at a time
+PREFLIGHT_PARALLELISM = 4
+# Project-local provider cache shared by every stage's ``terraform init``
+PLUGIN_CACHE_DIR = ".prototype/cache/terraform-plugins"
+
+_COPY_IGNORE = shutil.ignore_patterns(".terraform", "*.tfstate", "*.tfstate.backup", _PLAN_FILE, _PLAN_META)
+
+
+def plugin_cache_env(project_dir: Path, env: dict[str, str] | None = None) -> dict[str, str]:
+    """Return a copy of *env* with ``TF_PLUGIN_CACHE_DIR`` set.
+
+    Providers are then downloaded once per project instead of once per
+    stage.  A cache directory already configured in the environment wins.
+    """
+    merged = dict(env) if env else {**os.environ}
+    if not merged.get("TF_PLUGIN_CACHE_DIR"):
+        cache_dir = Path(project_dir) / PLUGIN_CACHE_DIR
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        merged["TF_PLUGIN_CACHE_DIR"] = str(cache_dir.resolve())
+    return merged
+
+
+def _working_copy(project_dir: Path, stage_dir: Path, root: Path) -> Path:
+    """Mirror *stage_dir* under *root* so it can be initialised in isolation.
+
+    The stage's own files are copied (without ``.terraform``, state or
+    saved plans).  Everything beside it on the way down from the project
+    root is symlinked, so relative module sources such as ``../modules``
+    still resolve.
+    """
+    project_dir = Path(project_dir).resolve()
+    try:
+        parts = stage_dir.resolve().relative_to(project_dir).parts
+    except ValueError:
+        parts = ()
+    if not parts:
+        work = root / (stage_dir.name or "stage")
+        shutil.copytree(stage_dir, work, ignore=_COPY_IGNORE)
+        return work
+
+    src, dst = project_dir, root
+    for part in parts:
+        dst.mkdir(parents=True, exist_ok=True)
+        for child in src.iterdir():
+            if child.name in (part, ".git", ".prototype"):
+                continue
+            try:
+                (dst / child.name).symlink_to(child, target_is_directory=child.is_dir())
+            except OSError:
+                pass  # no symlink support — only references to siblings break
+        src, dst = src / part, dst / part
+    shutil.copytree(src, dst, ignore=_COPY_IGNORE)
+    return dst
+
+
+def validate_terraform_stages(
+    stage_dirs: list[Path],
+    project_dir: Path,
+    env: dict[str, str] | None = None,
+    max_parallel: int = PREFLIGHT_PARALLELISM,
+) -> list[dict]:
+    """Run ``terraform init -backend=false`` and ``validate`` for every stage.
+
+    Stages are checked concurrently, up to *max_parallel* at a time, each
+    in a temporary working copy so the real stage directories and their
+    backend state are never touched.  All inits share the project plugin
+    cache (see :func:`plugin_cache_env`) and take turns, since the cache
+    is not safe for concurrent installs; validation runs in parallel.
+
+    Returns one result per entry of *stage_dirs*, in the same order:
+    ``{"ok": True, "elapsed": s}`` or ``{"ok": False, "phase": "init" |
+    "validate", "error": ..., "elapsed": s}``.
+    """
+    if not stage_dirs:
+        return []
+    tool_env = plugin_cache_env(project_dir, env)
+    init_lock = threading.Lock()
+
+    def _validate(stage_dir: Path) -> dict:
+        start = time.monotonic()
+        with tempfile.TemporaryDirectory(prefix="prototype-preflight-") as tmp:
+            phase = "init"
+            try:
+                work = _working_copy(project_dir, stage_dir, Path(tmp))
+                with init_lock:
+                    result = _run(
+                        ["terraform", "init", "-backend=false", "-input=false", "-no-color"], cwd=work, env=tool_env
+                    )
+                if result.returncode == 0:
+                    phase = "validate"
+                    result = _run(["terraform", "validate", "-no-color"], cwd=work, env=tool_env)
+            except OSError as exc:  # terraform missing, or the copy failed
+                return {"ok": False, "phase": phase, "error": str(exc), "elapsed": round(time.monotonic() - start, 1)}
+        elapsed = round(time.monotonic() - start, 1)
+        if result.returncode == 0:
+            return {"ok": True, "elapsed": elapsed}
+        error = (result.stderr or result.stdout or "").strip()
+        return {"ok": False, "phase": phase, "error": error, "elapsed": elapsed}
+
+    workers = max(1, min(max_parallel, len(stage_dirs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preflight") as pool:
+        return list(pool.map(_validate, stage_dirs))
+
+
+# Sub-app deploy scripts run concurrently up to this many at a time
+APP_PARALLELISM = 4
+# What a failed sub-app does to the others (``deploy.app_failure_policy``)
+APP_FAILURE_POLICIES = ("continue", "fail-fast")
+# How often the sub-app scheduler checks for cancellation
+_APP_POLL_INTERVAL = 0.1
+
+
 def deploy_app_stage(
     stage_dir: Path,
     subscription: str,
     resource_group: str,
     env: dict[str, str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    max_parallel: int = APP_PARALLELISM,
+    fail_fast: bool = False,
 ) -> dict:
     """Deploy a single application stage directory.
 
     Looks for ``deploy.sh`` in the stage directory or in subdirectories.
+    Sub-app scripts are independent, so up to *max_parallel* of them run
+    at once.  With *on_output*, script output is streamed live (prefixed
+    with the app name for sub-app scripts).
+
+    Every sub-app's outcome is reported in ``app_results``.  The stage
+    fails if any sub-app fails; by default the others still run to
+    completion, while *fail_fast* terminates the running scripts and
+    skips those not yet started.
     """
     # Build app env: merge auth env with legacy SUBSCRIPTION_ID / RESOURCE_GROUP
     app_env = dict(env) if env else {**os.environ}
@@ -726,42 +1080,100 @@ def deploy_app_stage(
     deploy_script = stage_dir / "deploy.sh"
     if deploy_script.exists():
         logger.info("Running deploy script: %s", deploy_script)
-        result = subprocess.run(
-            ["bash", str(deploy_script)],
-            capture_output=True,
-            text=True,
-            check=False,
-            cwd=str(stage_dir),
-            env=app_env,
+        result = _run(
+            ["bash", str(deploy_script)], cwd=stage_dir, env=app_env, on_output=on_output, cancel_event=cancel_event
         )
+        cancelled = _cancelled(result, "deploy.sh")
+        if cancelled:
+            return cancelled
         if result.returncode != 0:
             return {"status": "failed", "error": result.stderr.strip()}
         return {"status": "deployed", "method": "deploy_script"}
 
     # Look for sub-app directories with their own deploy scripts
-    deployed_apps = []
-    for app_dir in sorted(stage_dir.iterdir()):
-        if app_dir.is_dir():
-            app_deploy = app_dir / "deploy.sh"
-            if app_deploy.exists():
-                logger.info("Deploying app: %s", app_dir.name)
-                result = subprocess.run(
-                    ["bash", str(app_deploy)],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                    cwd=str(app_dir),
-                    env=app_env,
-                )
-                if result.returncode == 0:
-                    deployed_apps.append(app_dir.name)
-                else:
-                    logger.warning("App %s deploy failed: %s", app_dir.name, result.stderr)
+    app_dirs = [d for d in sorted(stage_dir.iterdir()) if d.is_dir() and (d / "deploy.sh").exists()]
+    if not app_dirs:
+        return {"status": "skipped", "reason": "No deploy scripts found"}
+
+    # Scripts can only be stopped mid-run when they are started with a cancel event
+    stop = threading.Event() if fail_fast or cancel_event is not None else None
+    output_lock = threading.Lock()
+
+    def _locked(prefix: str) -> Callable[[str], None] | None:
+        prefixed = _prefixed(on_output, prefix)
+        if prefixed is None:
+            return None
+
+        def _emit(line: str) -> None:
+            with output_lock:
+                prefixed(line)
+
+        return _emit
+
+    def _deploy_app(app_dir: Path) -> dict:
+        if stop is not None and stop.is_set():
+            return {"status": "skipped"}
+        logger.info("Deploying app: %s", app_dir.name)
+        start = time.monotonic()
+        result = _run(
+            ["bash", str(app_dir / "deploy.sh")],
+            cwd=app_dir,
+            env=app_env,
+            on_output=_locked(app_dir.name),
+            cancel_event=stop,
+        )
+        elapsed = round(time.monotonic() - start, 1)
+        if isinstance(result, RunResult) and result.cancelled:
+            return {"status": "cancelled", "elapsed": elapsed}
+        if result.returncode != 0:
+            logger.warning("App %s deploy failed: %s", app_dir.name, result.stderr)
+            error = result.stderr.strip() or result.stdout.strip() or f"exit code {result.returncode}"
+            if fail_fast and stop is not None:
+                stop.set()  # before this worker picks up the next app
+            return {"status": "failed", "error": error, "elapsed": elapsed}
+        return {"status": "deployed", "elapsed": elapsed}
+
+    app_results: dict[str, dict] = {}
+    workers = max(1, min(max_parallel, len(app_dirs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deploy-app") as pool:
+        futures = {pool.submit(_deploy_app, app_dir): app_dir.name for app_dir in app_dirs}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=_APP_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if stop is not None and cancel_event is not None and cancel_event.is_set():
+                stop.set()
+            for future in done:
+                app_results[futures[future]] = future.result()
+
+    # Report in directory order regardless of completion order
+    app_results = {d.name: app_results[d.name] for d in app_dirs}
+    deployed_apps = [name for name, r in app_results.items() if r["status"] == "deployed"]
+    failed_apps = [name for name, r in app_results.items() if r["status"] == "failed"]
+
+    if cancel_event is not None and cancel_event.is_set():
+        return {
+            "status": "failed",
+            "error": "Cancelled by user.",
+            "cancelled": True,
+            "apps": deployed_apps,
+            "app_results": app_results,
+        }
+    if failed_apps:
+        return {
+            "status": "failed",
+            "error": "\n".join(f"{name}: {app_results[name]['error']}" for name in failed_apps),
+            "apps": deployed_apps,
+            "failed_apps": failed_apps,
+            "app_results": app_results,
+        }
+    return {"status": "deployed", "apps": deployed_apps, "app_results": app_results}
 
-    if deployed_apps:
-        return {"status": "deployed", "apps": deployed_apps}
 
-    return {"status": "skipped", "reason": "No deploy scripts found"}
+def _prefixed(on_output: Callable[[str], None] | None, prefix: str) -> Callable[[str], None] | None:
+    """Wrap *on_output* so every line is prefixed with ``prefix | ``."""
+    if on_output is None:
+        return None
+    return lambda line: on_output(f"{prefix} | {line}")
 
 
 def rollback_terraform(infra_dir: Path, env: dict[str, str] | None = None) -> dict:
@@ -830,6 +1242,50 @@ def rollback_bicep(
 # ======================================================================
 
 
+def terraform_state_path(infra_dir: Path) -> Path | None:
+    """Return the local state file for *infra_dir*.
+
+    Honours a ``backend "local" { path = ... }`` block recorded by
+    ``terraform init``.  Returns ``None`` when the state lives in a
+    remote backend and cannot be read from disk.
+    """
+    try:
+        init_state = json.loads((infra_dir / ".terraform" / "terraform.tfstate").read_text(encoding="utf-8"))
+        backend = init_state.get("backend") or {}
+    except (OSError, ValueError, AttributeError):
+        backend = {}
+    if backend.get("type") not in (None, "local"):
+        return None
+    path = (backend.get("config") or {}).get("path") or "terraform.tfstate"
+    return infra_dir / path
+
+
+def read_terraform_state_outputs(infra_dir: Path) -> dict | None:
+    """Read the raw ``outputs`` block from *infra_dir*'s local state.
+
+    Returns ``None`` when there is no readable local state.
+    """
+    path = terraform_state_path(infra_dir)
+    if path is None:
+        return None
+    try:
+        outputs = json.loads(path.read_text(encoding="utf-8")).get("outputs")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return outputs if isinstance(outputs, dict) else None
+
+
+def _redacted_outputs(outputs: dict) -> bool:
+    """Whether any output in an ``apply -json`` outputs event lacks its value.
+
+    Terraform leaves the value out of the event for sensitive outputs.
+    """
+    return any(isinstance(entry, dict) and "value" not in entry for entry in outputs.values())
+
+
+_PROVIDERS = ("terraform", "bicep")
+
+
 class DeploymentOutputCapture:
     """Capture and persist deployment outputs from Terraform / Bicep.
 
@@ -837,99 +1293,173 @@ class DeploymentOutputCapture:
     need connection strings, endpoints, and resource IDs.  This class
     captures those outputs into a well-known JSON file so that
     subsequent deploy.sh scripts and build agents can reference them.
+
+    Outputs are stored per stage under ``stages``, each with its
+    provider, source (``state``, ``apply``, ``cli`` or ``deployment``)
+    and capture time, so one stage never overwrites another.  Flat
+    ``terraform`` / ``bicep`` views (later stages win) are kept for
+    deploy scripts generated before per-stage capture.  A key → stage
+    index makes :meth:`get` a dict lookup, and the ``PROTOTYPE_*``
+    variables are precomputed and written to :attr:`ENV_FILE` for
+    downstream stages to source.
     """
 
     OUTPUT_FILE = ".prototype/state/deployment_outputs.json"
+    ENV_FILE = ".prototype/state/deployment_outputs.env"
 
     def __init__(self, project_dir: str):
         self.project_dir = Path(project_dir)
         self._outputs: dict = self._load()
+        self._index: dict[str, str] = {}
+        self._env: dict[str, str] = {}
+        self._reindex()
 
     # --- Helpers ---
 
     @staticmethod
     def _flatten_outputs(outputs: dict) -> dict:
-        """Flatten {value, type} wrapper dicts into plain key-value pairs."""
+        """Flatten {value, type} wrapper dicts into plain key-value pairs.
+
+        Sensitive outputs reported without a value (``apply -json``
+        stream) are skipped.
+        """
         flat = {}
         for key, obj in outputs.items():
             if isinstance(obj, dict) and "value" in obj:
                 flat[key] = obj["value"]
+            elif isinstance(obj, dict) and obj.get("sensitive"):
+                continue
             else:
                 flat[key] = obj
         return flat
 
+    def _record(self, stage: str, provider: str, source: str, raw: dict) -> dict:
+        flat = self._flatten_outputs(raw)
+        now = datetime.now(timezone.utc).isoformat()
+        self._outputs.setdefault("stages", {})[stage] = {
+            "provider": provider,
+            "source": source,
+            "captured_at": now,
+            "outputs": flat,
+            "sensitive": sorted(k for k, obj in raw.items() if isinstance(obj, dict) and obj.get("sensitive")),
+        }
+        self._outputs["last_capture"] = now
+        self._reindex()
+        self._save()
+        logger.info("Captured %d %s outputs for %s (%s).", len(flat), provider.title(), stage, source)
+        return flat
+
+    def _reindex(self) -> None:
+        """Rebuild the flat provider views, the key index and the env mapping."""
+        stages = self._outputs.get("stages")
+        if not stages:
+            # Files written before per-stage capture hold one flat dict per provider
+            stages = {
+                provider: {"provider": provider, "source": "legacy", "outputs": dict(self._outputs[provider])}
+                for provider in _PROVIDERS
+                if isinstance(self._outputs.get(provider), dict) and self._outputs[provider]
+            }
+            if not stages:
+                return
+            self._outputs["stages"] = stages
+
+        merged: dict[str, dict] = {provider: {} for provider in _PROVIDERS}
+        self._index = {}
+        for name, entry in stages.items():
+            for key, value in entry.get("outputs", {}).items():
+                self._index[key] = name
+                merged.setdefault(entry.get("provider", "terraform"), {})[key] = value
+        for provider, values in merged.items():
+            if values:
+                self._outputs[provider] = values
+            else:
+                self._outputs.pop(provider, None)
+
+        self._env = {"PROTOTYPE_" + re.sub(r"\W", "_", key).upper(): _env_value(self.get(key)) for key in self._index}
+
     # --- Terraform ---
 
-    def capture_terraform(self, infra_dir: Path) -> dict:
-        """Run `terraform output -json` and persist results."""
-        try:
-            result = subprocess.run(
-                ["terraform", "output", "-json"],
-                capture_output=True,
-                text=True,
-                check=True,
-                cwd=str(infra_dir),
-            )
-            outputs = json.loads(result.stdout)
-            flat = self._flatten_outputs(outputs)
-
-            self._outputs["terraform"] = flat
-            self._outputs["last_capture"] = datetime.now(timezone.utc).isoformat()
-            self._save()
-            logger.info("Captured %d Terraform outputs.", len(flat))
-            return flat
-        except (subprocess.CalledProcessError, json.JSONDecodeError, FileNotFoundError) as e:
-            logger.warning("Could not capture Terraform outputs: %s", e)
-            return {}
+    def capture_terraform(self, infra_dir: Path, stage: str | None = None, outputs: dict | None = None) -> dict:
+        """Capture a Terraform stage's outputs and persist them under *stage*.
+
+        Outputs are read straight from the stage's local state file.
+        For a remote backend, *outputs* (the ``outputs`` event of an
+        ``apply -json`` stream) is used, and ``terraform output -json``
+        runs only when neither is available — or when the event omits
+        the value of a sensitive output.
+        """
+        raw, source = read_terraform_state_outputs(infra_dir), "state"
+        if raw is None and outputs and not _redacted_outputs(outputs):
+            raw, source = outputs, "apply"
+        if raw is None:
+            try:
+                result = subprocess.run(
+                    ["terraform", "output", "-json"],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    cwd=str(infra_dir),
+                )
+                raw, source = json.loads(result.stdout), "cli"
+            except (subprocess.CalledProcessError, json.JSONDecodeError, FileNotFoundError) as e:
+                logger.warning("Could not capture Terraform outputs: %s", e)
+                return {}
+        return self._record(stage or infra_dir.name, "terraform", source, raw)
 
     # --- Bicep ---
 
-    def capture_bicep(self, deployment_output: str) -> dict:
-        """Parse Bicep deployment JSON output and persist results."""
+    def capture_bicep(self, deployment_output: str, stage: str | None = None) -> dict:
+        """Parse Bicep deployment JSON output and persist results under *stage*."""
         try:
             data = json.loads(deployment_output)
             outputs = data.get("properties", {}).get("outputs", {})
-            flat = self._flatten_outputs(outputs)
-
-            self._outputs["bicep"] = flat
-            self._outputs["last_capture"] = datetime.now(timezone.utc).isoformat()
-            self._save()
-            logger.info("Captured %d Bicep outputs.", len(flat))
-            return flat
         except (json.JSONDecodeError, KeyError, AttributeError) as e:
             logger.warning("Could not parse Bicep deployment output: %s", e)
             return {}
+        return self._record(stage or "bicep", "bicep", "deployment", outputs)
 
     # --- Accessors ---
 
-    def get(self, key: str, default: Any = None) -> Any:
+    def get(self, key: str, default: Any = None, *, stage: str | None = None) -> Any:
         """Get a captured output value by key.
 
-        Searches across all providers (terraform, bicep).
+        Without *stage*, returns the value from the last stage that
+        produced *key*.
         """
-        for provider in ("terraform", "bicep"):
-            provider_outputs = self._outputs.get(provider, {})
-            if key in provider_outputs:
-                return provider_outputs[key]
+        name = stage or self._index.get(key)
+        entry = self._outputs.get("stages", {}).get(name) if name else None
+        if entry and key in entry.get("outputs", {}):
+            return entry["outputs"][key]
         return default
 
+    def provenance(self, key: str) -> dict | None:
+        """Where *key* came from: stage, provider, source and capture time."""
+        name = self._index.get(key)
+        if name is None:
+            return None
+        entry = self._outputs["stages"][name]
+        return {
+            "stage": name,
+            "provider": entry.get("provider"),
+            "source": entry.get("source"),
+            "captured_at": entry.get("captured_at"),
+        }
+
     def get_all(self) -> dict:
         """Return all captured outputs."""
         return self._outputs.copy()
 
+    def by_stage(self) -> dict[str, dict]:
+        """Return ``{stage: {key: value}}`` for every captured stage."""
+        return {name: dict(entry.get("outputs", {})) for name, entry in self._outputs.get("stages", {}).items()}
+
     def to_env_vars(self) -> dict[str, str]:
         """Convert captured outputs to environment variable mapping.
 
         This is used by deploy.sh scripts so they can reference
         infrastructure outputs without hard-coding values.
         """
-        env_vars = {}
-        for provider in ("terraform", "bicep"):
-            provider_outputs = self._outputs.get(provider, {})
-            for key, value in provider_outputs.items():
-                env_name = f"PROTOTYPE_{key.upper()}"
-                env_vars[env_name] = str(value)
-        return env_vars
+        return dict(self._env)
 
     # --- Persistence ---
 
@@ -948,6 +1478,15 @@ class DeploymentOutputCapture:
         path.parent.mkdir(parents=True, exist_ok=True)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(self._outputs, f, indent=2)
+        with open(self.project_dir / self.ENV_FILE, "w", encoding="utf-8") as f:
+            f.writelines(f"{name}={shlex.quote(value)}\n" for name, value in self._env.items())
+
+
+def _env_value(value: Any) -> str:
+    """Render an output value for an environment variable (JSON for lists/maps)."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
 
 
 # ======================================================================
@@ -959,7 +1498,8 @@ class DeployScriptGenerator:
     """Generate deploy.sh scripts for application directories.
 
     Each generated script:
-    - Reads infrastructure outputs from deployment_outputs.json
+    - Sources the precomputed ``PROTOTYPE_*`` outputs from deployment_outputs.env
+      (falling back to parsing deployment_outputs.json)
     - Sets environment variables for connection strings / endpoints
     - Deploys the application using az webapp deploy, az containerapp up, etc.
     """
@@ -979,8 +1519,14 @@ PROJECT_ROOT="$(cd "$SCRIPT_DIR/../.." && pwd)"
 echo "🚀 Deploying: {app_name} (environment: $ENVIRONMENT)"
 
 # Load infrastructure outputs
+OUTPUTS_ENV="$PROJECT_ROOT/.prototype/state/deployment_outputs.env"
 OUTPUTS_FILE="$PROJECT_ROOT/.prototype/state/deployment_outputs.json"
-if [ -f "$OUTPUTS_FILE" ]; then
+if [ -f "$OUTPUTS_ENV" ]; then
+    echo "   Loading infrastructure outputs..."
+    set -a
+    . "$OUTPUTS_ENV"
+    set +a
+elif [ -f "$OUTPUTS_FILE" ]; then
     echo "   Loading infrastructure outputs..."
     # Export all PROTOTYPE_* env vars from outputs
     while IFS='=' read -r key value; do
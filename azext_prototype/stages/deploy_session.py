@@ -19,21 +19,28 @@ Phases:
 from __future__ import annotations
 
 import logging
+import os
 import re
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Iterator
+from typing import TYPE_CHECKING, Any, Callable, Iterator
 
 from azext_prototype.agents.base import AgentCapability, AgentContext
 from azext_prototype.agents.registry import AgentRegistry
 from azext_prototype.ai.token_tracker import TokenTracker
 from azext_prototype.config import ProjectConfig
-from azext_prototype.parsers.file_extractor import parse_file_blocks, write_parsed_files
+from azext_prototype.parsers.file_extractor import FileWriter, parse_file_blocks
 from azext_prototype.stages.deploy_helpers import (
+    APP_FAILURE_POLICIES,
+    APP_PARALLELISM,
+    PREFLIGHT_PARALLELISM,
     DeploymentOutputCapture,
     RollbackManager,
     _az,
+    _prefixed,
     build_deploy_env,
     check_az_login,
     deploy_app_stage,
@@ -42,20 +49,43 @@ from azext_prototype.stages.deploy_helpers import (
     get_current_subscription,
     get_current_tenant,
     plan_terraform,
+    plugin_cache_env,
     resolve_stage_secrets,
     rollback_bicep,
     rollback_terraform,
     set_deployment_context,
+    validate_terraform_stages,
     whatif_bicep,
 )
-from azext_prototype.stages.deploy_state import DeployState
+from azext_prototype.stages.deploy_state import (
+    DeployState,
+    _format_display_id,
+    stage_output_key,
+)
+from azext_prototype.stages.error_signatures import (
+    ACTION_GUIDANCE,
+    ACTION_REGISTER_PROVIDER,
+    ErrorSignatureDB,
+    KnownFix,
+    error_signature,
+)
 from azext_prototype.stages.escalation import EscalationTracker
+from azext_prototype.stages.fingerprint import deploy_variables, stage_fingerprint
 from azext_prototype.stages.intent import IntentKind, build_deploy_classifier
 from azext_prototype.stages.qa_router import route_error_to_qa
+from azext_prototype.stages.rollback_planner import (
+    ROLLBACK_PARALLELISM,
+    RollbackPlan,
+    plan_rollback,
+    stage_dependencies,
+)
 from azext_prototype.tracking import ChangeTracker
 from azext_prototype.ui.console import Console, DiscoveryPrompt
 from azext_prototype.ui.console import console as default_console
 
+if TYPE_CHECKING:
+    from azext_prototype.stages.build_state import BuildState
+
 logger = logging.getLogger(__name__)
 
 # Maximum auto-remediation cycles per stage before falling through to interactive
@@ -115,6 +145,11 @@ _SLASH_COMMANDS = frozenset(
 )
 
 
+def _stage_list(stages: list[dict]) -> str:
+    """``"Stage 2, Stage 3"`` for display."""
+    return ", ".join(f"Stage {s['stage']}" for s in stages)
+
+
 # -------------------------------------------------------------------- #
 # DeployResult — public interface consumed by DeployStage
 # -------------------------------------------------------------------- #
@@ -168,6 +203,9 @@ class DeploySession:
         Styled console for output.
     deploy_state:
         Pre-initialised deploy state (for re-entrant deploys).
+    cancel_event:
+        Event that stops the running deploy command when set; see
+        :meth:`cancel`.
     """
 
     def __init__(
@@ -177,6 +215,7 @@ class DeploySession:
         *,
         console: Console | None = None,
         deploy_state: DeployState | None = None,
+        cancel_event: threading.Event | None = None,
     ) -> None:
         self._context = agent_context
         self._registry = registry
@@ -206,6 +245,12 @@ class DeploySession:
         if self._escalation_tracker.exists:
             self._escalation_tracker.load()
 
+        # Known deploy failures, matched before any AI remediation
+        self._error_signatures = ErrorSignatureDB(agent_context.project_dir)
+        if self._error_signatures.exists:
+            self._error_signatures.load()
+        self._error_signatures.learn_from_escalations(self._escalation_tracker)
+
         # Project config
         config = ProjectConfig(agent_context.project_dir)
         config.load()
@@ -231,6 +276,30 @@ class DeploySession:
         self._resource_group: str = ""
         self._tenant: str | None = None
         self._deploy_env: dict[str, str] | None = None
+        # Live output of running deploy commands, and a way to stop them
+        # (a caller such as the TUI may share its own event)
+        self._output_fn: Callable[[str], None] | None = None
+        self._cancel_event = cancel_event or threading.Event()
+
+    # ------------------------------------------------------------------ #
+    # Public API — Cancellation
+    # ------------------------------------------------------------------ #
+
+    def cancel(self) -> None:
+        """Terminate the deploy command currently running (thread-safe)."""
+        self._cancel_event.set()
+
+    def _stream_output(self, print_fn: Callable[[str], None] | None) -> None:
+        """Route streamed command output to *print_fn*, or the styled console.
+
+        Tool output is printed without markup so brackets in Terraform or
+        ``az`` messages are shown verbatim.
+        """
+        self._cancel_event.clear()
+        if print_fn is None:
+            self._output_fn = lambda line: self._console.print(f"    {line}", markup=False, highlight=False)
+        else:
+            self._output_fn = lambda line: print_fn(f"    {line}")
 
     # ------------------------------------------------------------------ #
     # Internal — resolve deployment context
@@ -309,6 +378,7 @@ class DeploySession:
         use_styled = input_fn is None and print_fn is None
         _input = input_fn or (lambda p: self._prompt.prompt(p))
         _print = print_fn or self._console.print
+        self._stream_output(print_fn)
 
         # ---- Phase 1: Load build state ----
         build_path = Path(self._context.project_dir) / ".prototype" / "state" / "build.yaml"
@@ -476,6 +546,7 @@ class DeploySession:
     ) -> DeployResult:
         """Non-interactive what-if / terraform plan preview."""
         _print = print_fn or self._console.print
+        self._stream_output(print_fn)
 
         # Load stages
         if not self._deploy_state._state["deployment_stages"]:
@@ -498,7 +569,8 @@ class DeploySession:
         _print("  " + "=" * 40)
         _print("")
 
-        for stage in stages:
+        previews = self._preview_stages(stages)
+        for stage, result in zip(stages, previews):
             stage_num = stage["stage"]
             category = stage.get("category", "infra")
             stage_dir = Path(self._context.project_dir) / stage.get("dir", "")
@@ -510,21 +582,15 @@ class DeploySession:
                 _print("")
                 continue
 
-            if category in ("infra", "data", "integration"):
-                dry_env = self._deploy_env
-                if self._iac_tool == "terraform":
-                    generated = resolve_stage_secrets(stage_dir, self._config)
-                    if generated:
-                        dry_env = dict(self._deploy_env) if self._deploy_env else {}
-                        dry_env.update(generated)
-                    result = plan_terraform(stage_dir, self._subscription, env=dry_env)
-                else:
-                    result = whatif_bicep(stage_dir, self._subscription, self._resource_group, env=self._deploy_env)
-
-                if result.get("output"):
+            if result is not None:
+                if result.get("output") and not result.get("streamed"):
                     _print(result["output"])
                 if result.get("error"):
                     _print(f"    Error: {result['error']}")
+                elif result.get("changes") is False:
+                    _print("    No changes — the next deploy will mark this stage deployed without applying.")
+                elif result.get("changes"):
+                    _print("    Plan saved — the next deploy applies it directly if nothing changes.")
             else:
                 _print("    (Application stage — no preview available)")
 
@@ -532,6 +598,65 @@ class DeploySession:
 
         return DeployResult()
 
+    def _preview_stages(self, stages: list[dict[str, Any]]) -> list[dict[str, Any] | None]:
+        """Plan (or what-if) every infra stage concurrently.
+
+        Returns one result per stage, ``None`` for stages with nothing to
+        preview.  Plans are saved in the real stage directories, where the
+        next deploy looks for them.  Environments are resolved up front on
+        this thread, since resolving generates and stores secrets; with
+        more than one stage running, streamed lines are prefixed by stage.
+        """
+        jobs: dict[int, tuple[dict[str, Any], Path, dict[str, str] | None]] = {}
+        for index, stage in enumerate(stages):
+            stage_dir = Path(self._context.project_dir) / stage.get("dir", "")
+            if stage.get("category", "infra") not in ("infra", "data", "integration") or not stage_dir.is_dir():
+                continue
+            if self._iac_tool == "terraform":
+                env = plugin_cache_env(Path(self._context.project_dir), self._stage_env(stage_dir))
+            else:
+                env = self._deploy_env
+            jobs[index] = (stage, stage_dir, env)
+        if not jobs:
+            return [None] * len(stages)
+
+        stream = self._stream_kwargs()
+        output_lock = threading.Lock()
+        init_lock = threading.Lock()
+
+        def _stream_for(stage: dict[str, Any]) -> dict[str, Any]:
+            if not stream or len(jobs) == 1:
+                return stream
+            prefixed = _prefixed(stream["on_output"], f"Stage {stage['stage']}")
+            assert prefixed is not None
+
+            def _emit(line: str) -> None:
+                with output_lock:
+                    prefixed(line)
+
+            return {**stream, "on_output": _emit}
+
+        def _preview(stage: dict[str, Any], stage_dir: Path, env: dict[str, str] | None) -> dict[str, Any]:
+            if self._iac_tool == "terraform":
+                return plan_terraform(
+                    stage_dir,
+                    self._subscription,
+                    env=env,
+                    save=True,
+                    inputs=self._upstream_inputs(stage),
+                    init_lock=init_lock,
+                    **_stream_for(stage),
+                )
+            return whatif_bicep(stage_dir, self._subscription, self._resource_group, env=env, **_stream_for(stage))
+
+        workers = max(1, min(self._preflight_parallelism(), len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dry-run") as pool:
+            futures = {index: pool.submit(_preview, *job) for index, job in jobs.items()}
+            return [futures[index].result() if index in futures else None for index in range(len(stages))]
+
+    def _preflight_parallelism(self) -> int:
+        return int(self._config.get("deploy.preflight_parallelism", PREFLIGHT_PARALLELISM) or 1)
+
     # ------------------------------------------------------------------ #
     # Public API — Single-stage deploy (non-interactive)
     # ------------------------------------------------------------------ #
@@ -549,6 +674,7 @@ class DeploySession:
     ) -> DeployResult:
         """Non-interactive single-stage deploy (for ``--stage N``)."""
         _print = print_fn or self._console.print
+        self._stream_output(print_fn)
 
         # Load stages
         if not self._deploy_state._state["deployment_stages"]:
@@ -569,11 +695,14 @@ class DeploySession:
         result = self._deploy_single_stage(stage)
 
         if result.get("status") == "deployed":
-            _print(f"  Stage {stage_num} deployed successfully.")
+            if result.get("no_changes"):
+                _print(f"  Stage {stage_num} is up to date (no changes).")
+            else:
+                _print(f"  Stage {stage_num} deployed successfully.")
 
             # Capture outputs for infra stages
             if stage.get("category") in ("infra", "data", "integration"):
-                self._capture_stage_outputs(stage)
+                self._capture_stage_outputs(stage, result)
         else:
             _print(f"  Stage {stage_num} failed: {result.get('error', 'unknown error')}")
 
@@ -779,9 +908,14 @@ class DeploySession:
 
         return results
 
-    def _check_terraform_validate(self) -> list[dict[str, str]]:
-        """Validate Terraform syntax for all infrastructure stages before deployment."""
-        results: list[dict[str, str]] = []
+    def _check_terraform_validate(self) -> list[dict[str, Any]]:
+        """Validate Terraform syntax for all infrastructure stages before deployment.
+
+        Stages are validated concurrently in isolated working copies (see
+        :func:`~.deploy_helpers.validate_terraform_stages`); each result
+        records how long its stage took in ``elapsed``.
+        """
+        checked: list[tuple[dict[str, Any], Path]] = []
         for stage in self._deploy_state._state.get("deployment_stages", []):
             if stage.get("category") not in ("infra", "data", "integration"):
                 continue
@@ -791,47 +925,30 @@ class DeploySession:
             tf_files = list(stage_dir.glob("*.tf"))
             if not tf_files:
                 continue
-            # Quick init + validate (no backend, no real provider download if cached)
-            init = subprocess.run(
-                ["terraform", "init", "-backend=false", "-input=false", "-no-color"],
-                capture_output=True,
-                text=True,
-                cwd=str(stage_dir),
-                check=False,
-            )
-            if init.returncode != 0:
-                results.append(
-                    {
-                        "name": f"Terraform Validate (Stage {stage['stage']})",
-                        "status": "fail",
-                        "message": f"Init failed: {(init.stderr or init.stdout).strip()[:200]}",
-                    }
-                )
-                continue
-            val = subprocess.run(
-                ["terraform", "validate", "-no-color"],
-                capture_output=True,
-                text=True,
-                cwd=str(stage_dir),
-                check=False,
-            )
-            if val.returncode != 0:
-                error = (val.stderr or val.stdout).strip()[:200]
-                results.append(
-                    {
-                        "name": f"Terraform Validate (Stage {stage['stage']})",
-                        "status": "fail",
-                        "message": error,
-                    }
-                )
+            checked.append((stage, stage_dir))
+
+        outcomes = validate_terraform_stages(
+            [stage_dir for _, stage_dir in checked],
+            Path(self._context.project_dir),
+            env=self._deploy_env,
+            max_parallel=self._preflight_parallelism(),
+        )
+        results: list[dict[str, Any]] = []
+        for (stage, _), outcome in zip(checked, outcomes):
+            if outcome["ok"]:
+                status, message = "pass", "Syntax valid."
+            elif outcome["phase"] == "init":
+                status, message = "fail", f"Init failed: {outcome['error'][:200]}"
             else:
-                results.append(
-                    {
-                        "name": f"Terraform Validate (Stage {stage['stage']})",
-                        "status": "pass",
-                        "message": "Syntax valid.",
-                    }
-                )
+                status, message = "fail", outcome["error"][:200]
+            results.append(
+                {
+                    "name": f"Terraform Validate (Stage {stage['stage']})",
+                    "status": status,
+                    "message": message,
+                    "elapsed": outcome["elapsed"],
+                }
+            )
         return results
 
     # ------------------------------------------------------------------ #
@@ -845,16 +962,32 @@ class DeploySession:
         _print: Callable[[str], None],
         _input: Callable[[str], str],
     ) -> None:
-        """Deploy all pending stages sequentially."""
-        pending = self._deploy_state.get_pending_stages()
+        """Deploy pending stages, and deployed stages that changed, sequentially.
+
+        A deployed stage is redeployed only when its fingerprint (files,
+        resolved variables, upstream outputs) no longer matches its last
+        successful deploy; ``force`` redeploys every stage.  When a stage's
+        captured outputs change, the later stages consuming them are
+        queued as well.
+        """
+        changed = self._requeue_changed_stages(force=force)
+        queue = self._deploy_state.get_pending_stages()
         total = len(self._deploy_state._state["deployment_stages"])
         deployed_count = len(self._deploy_state.get_deployed_stages())
 
-        if not pending:
+        if not queue:
             _print("  All stages already deployed.")
             return
 
-        for stage in pending:
+        if changed:
+            _print(f"  Changed since last deploy: {_stage_list(changed)}")
+        if deployed_count:
+            _print(f"  Skipping {deployed_count} unchanged stage(s).")
+        if changed or deployed_count:
+            _print("")
+
+        while queue:
+            stage = queue.pop(0)
             stage_num = stage["stage"]
             stage_name = stage["name"]
             category = stage.get("category", "infra")
@@ -874,11 +1007,19 @@ class DeploySession:
                 result = self._deploy_single_stage(stage)
 
             if result.get("status") == "deployed":
-                _print("         Deployed successfully.")
-
-                # Capture outputs after infra stages
-                if category in ("infra", "data", "integration"):
-                    self._capture_stage_outputs(stage)
+                if result.get("no_changes"):
+                    _print("         Up to date (no changes).")
+                else:
+                    _print("         Deployed successfully.")
+
+                # Capture outputs after infra stages; changed outputs
+                # invalidate the deployed stages that consume them
+                if category in ("infra", "data", "integration") and self._capture_stage_outputs(stage, result):
+                    downstream = self._requeue_changed_stages(after=stage_num)
+                    if downstream:
+                        _print(f"         Outputs changed — redeploying {_stage_list(downstream)}.")
+                        deployed_count -= len(downstream)
+                        queue = sorted(queue + downstream, key=lambda s: s["stage"])
             elif result.get("status") == "awaiting_manual":
                 instructions = result.get("instructions", "No instructions provided.")
                 _print("         Manual step required:")
@@ -898,6 +1039,9 @@ class DeploySession:
                 else:
                     _print("         Pausing deployment. Use /deploy to continue.")
                     break
+            elif result.get("cancelled"):
+                _print("         Cancelled.")
+                break
             elif result.get("status") == "failed":
                 _print(f"         Failed: {result.get('error', 'unknown error')[:120]}")
                 remediated = self._handle_deploy_failure(stage, result, use_styled, _print, _input)
@@ -932,22 +1076,32 @@ class DeploySession:
         self._rollback_mgr.snapshot_stage(stage_num, category, self._iac_tool, build_stage_id=build_stage_id)
         self._deploy_state.mark_stage_deploying(stage_num)
 
-        # Resolve generated secrets for Terraform stages (TF_VAR_* env vars)
-        stage_env = self._deploy_env
-        if self._iac_tool == "terraform":
-            generated = resolve_stage_secrets(stage_dir, self._config)
-            if generated:
-                stage_env = dict(self._deploy_env) if self._deploy_env else {}
-                stage_env.update(generated)
+        stage_env = self._stage_env(stage_dir)
+        fingerprint = self._stage_fingerprint(stage)
 
-        # Dispatch by category
+        # Dispatch by category; command output streams to the session
+        stream = self._stream_kwargs()
         if category in ("infra", "data", "integration"):
             if self._iac_tool == "terraform":
-                result = deploy_terraform(stage_dir, self._subscription, env=stage_env)
+                result = deploy_terraform(
+                    stage_dir, self._subscription, env=stage_env, inputs=self._upstream_inputs(stage), **stream
+                )
             else:
-                result = deploy_bicep(stage_dir, self._subscription, self._resource_group, env=self._deploy_env)
+                result = deploy_bicep(
+                    stage_dir, self._subscription, self._resource_group, env=self._deploy_env, **stream
+                )
         elif category in ("app", "schema", "cicd", "external"):
-            result = deploy_app_stage(stage_dir, self._subscription, self._resource_group, env=self._deploy_env)
+            result = deploy_app_stage(
+                stage_dir,
+                self._subscription,
+                self._resource_group,
+                env=self._app_env(),
+                max_parallel=self._app_parallelism(),
+                fail_fast=self._app_failure_policy() == "fail-fast",
+                **stream,
+            )
+            if result.get("app_results"):
+                self._deploy_state.record_app_results(stage_num, result["app_results"])
         elif category == "docs":
             # Documentation stages don't deploy — mark as deployed
             self._deploy_state.mark_stage_deployed(stage_num)
@@ -956,14 +1110,18 @@ class DeploySession:
         else:
             # Unknown category — try IaC
             if self._iac_tool == "terraform":
-                result = deploy_terraform(stage_dir, self._subscription, env=stage_env)
+                result = deploy_terraform(
+                    stage_dir, self._subscription, env=stage_env, inputs=self._upstream_inputs(stage), **stream
+                )
             else:
-                result = deploy_bicep(stage_dir, self._subscription, self._resource_group, env=self._deploy_env)
+                result = deploy_bicep(
+                    stage_dir, self._subscription, self._resource_group, env=self._deploy_env, **stream
+                )
 
         # Update state based on result
         if result.get("status") == "deployed":
             output = result.get("deployment_output", "")
-            self._deploy_state.mark_stage_deployed(stage_num, output)
+            self._deploy_state.mark_stage_deployed(stage_num, output, fingerprint=fingerprint)
             self._deploy_state.save()
         elif result.get("status") == "failed":
             self._deploy_state.mark_stage_failed(stage_num, result.get("error", ""))
@@ -972,23 +1130,124 @@ class DeploySession:
 
         return result
 
+    def _upstream_inputs(self, stage: dict[str, Any]) -> dict[str, str]:
+        """Digests of the outputs of stages before *stage* — part of its fingerprint."""
+        return self._deploy_state.upstream_outputs(stage["stage"])
+
+    def _stage_env(self, stage_dir: Path) -> dict[str, str] | None:
+        """Deploy env for *stage_dir*, with generated Terraform secrets (``TF_VAR_*``) merged in."""
+        stage_env = self._deploy_env
+        if self._iac_tool == "terraform":
+            generated = resolve_stage_secrets(stage_dir, self._config)
+            if generated:
+                stage_env = dict(self._deploy_env) if self._deploy_env else {}
+                stage_env.update(generated)
+        return stage_env
+
+    def _app_env(self) -> dict[str, str] | None:
+        """Deploy env for app stages, with the captured ``PROTOTYPE_*`` outputs exported."""
+        exported = self._output_capture.to_env_vars()
+        if not exported:
+            return self._deploy_env
+        return {**(self._deploy_env or os.environ), **exported}
+
+    def _app_parallelism(self) -> int:
+        """``deploy.app_parallelism``, or the default when it is not a number."""
+        value = self._config.get("deploy.app_parallelism", APP_PARALLELISM)
+        try:
+            return max(1, int(value or 1))
+        except (TypeError, ValueError):
+            logger.warning("Invalid deploy.app_parallelism %r, using %d", value, APP_PARALLELISM)
+            return APP_PARALLELISM
+
+    def _app_failure_policy(self) -> str:
+        """``deploy.app_failure_policy``, or ``continue`` when it is not a known policy."""
+        policy = str(self._config.get("deploy.app_failure_policy", "continue") or "continue").strip().lower()
+        if policy not in APP_FAILURE_POLICIES:
+            logger.warning(
+                "Unknown deploy.app_failure_policy %r (expected %s), using 'continue'",
+                policy,
+                " or ".join(APP_FAILURE_POLICIES),
+            )
+            return "continue"
+        return policy
+
+    def _stage_fingerprint(self, stage: dict[str, Any]) -> str | None:
+        """Fingerprint of what deploying *stage* now would apply.
+
+        Covers the stage's files, the variables passed to the tool (secret
+        values are only hashed) and the outputs of upstream stages.
+        ``None`` for manual steps, docs and missing directories.
+        """
+        if stage.get("deploy_mode") == "manual" or stage.get("category") == "docs":
+            return None
+        stage_dir = Path(self._context.project_dir) / stage.get("dir", "")
+        if not stage_dir.is_dir():
+            return None
+        variables = {
+            "subscription": self._subscription,
+            "resource_group": self._resource_group,
+            "iac_tool": self._iac_tool,
+            **deploy_variables(self._stage_env(stage_dir)),
+        }
+        return stage_fingerprint(stage_dir, variables=variables, inputs=self._upstream_inputs(stage))
+
+    def _requeue_changed_stages(self, *, force: bool = False, after: int = 0) -> list[dict[str, Any]]:
+        """Reset deployed stages after *after* whose content changed back to pending.
+
+        Stages deployed before fingerprints were recorded fall back to the
+        ``_code_updated`` flag set by the build-state sync.  Returns the
+        stages that were reset.
+        """
+        changed: list[dict[str, Any]] = []
+        for stage in self._deploy_state.get_deployed_stages():
+            if stage["stage"] <= after or stage.get("deploy_mode") == "manual" or stage.get("category") == "docs":
+                continue
+            if force:
+                stale = True
+            elif stage.get("deploy_fingerprint"):
+                stale = self._stage_fingerprint(stage) != stage["deploy_fingerprint"]
+            else:
+                stale = bool(stage.get("_code_updated"))
+            if stale:
+                stage["deploy_status"] = "pending"
+                changed.append(stage)
+        if changed:
+            self._deploy_state.save()
+        return changed
+
+    def _stream_kwargs(self) -> dict[str, Any]:
+        """``on_output`` / ``cancel_event`` for the deploy helpers, when streaming."""
+        if self._output_fn is None:
+            return {}
+        return {"on_output": self._output_fn, "cancel_event": self._cancel_event}
+
     # ------------------------------------------------------------------ #
     # Internal — Output capture
     # ------------------------------------------------------------------ #
 
-    def _capture_stage_outputs(self, stage: dict[str, Any]) -> None:
-        """Capture Terraform/Bicep outputs after a successful stage deploy."""
+    def _capture_stage_outputs(self, stage: dict[str, Any], result: dict[str, Any] | None = None) -> bool:
+        """Capture Terraform/Bicep outputs after a successful stage deploy.
+
+        Terraform outputs come from the stage's state file, or from the
+        ``outputs`` carried by the deploy *result* for remote backends.
+        Returns True when the stage's outputs changed since the last capture.
+        """
         stage_dir = Path(self._context.project_dir) / stage.get("dir", "")
+        key = stage_output_key(stage)
 
         if self._iac_tool == "terraform":
-            outputs = self._output_capture.capture_terraform(stage_dir)
+            streamed = (result or {}).get("outputs")
+            outputs = self._output_capture.capture_terraform(stage_dir, stage=key, outputs=streamed)
         else:
             deploy_output = stage.get("deploy_output", "")
-            outputs = self._output_capture.capture_bicep(deploy_output) if deploy_output else {}
+            outputs = self._output_capture.capture_bicep(deploy_output, stage=key) if deploy_output else {}
 
         if outputs:
-            self._deploy_state._state["captured_outputs"] = self._output_capture.get_all()
+            self._deploy_state._state["captured_outputs"] = self._output_capture.by_stage()
             self._deploy_state.save()
+            return self._deploy_state.record_stage_outputs(stage["stage"], outputs)
+        return False
 
     # ------------------------------------------------------------------ #
     # Internal — QA error routing
@@ -1059,9 +1318,22 @@ class DeploySession:
     ) -> dict[str, Any] | None:
         """Closed-loop remediation: QA diagnoses -> architect guides -> IaC/dev fixes -> redeploy.
 
+        Known failures (see :mod:`~.error_signatures`) short-circuit the
+        loop: local fixes are applied without any agent, and recorded
+        guidance replaces the QA and architect calls.  Successful AI
+        remediations are recorded so the next occurrence is known.
+
         Returns the final deploy result, or ``None`` if remediation cannot be
         attempted (no agents / no AI provider).
         """
+        known = self._error_signatures.match(result.get("error", ""))
+        if known is not None and known.action != ACTION_GUIDANCE:
+            fixed = self._remediate_known_failure(stage, known, use_styled, _print)
+            if fixed is not None:
+                if fixed.get("status") == "deployed":
+                    return fixed
+                result = fixed
+
         # Guard: need at minimum QA + one fix agent + AI provider
         has_fix_agent = bool(self._iac_agents.get(self._iac_tool) or self._dev_agent)
         if not self._qa_agent or not has_fix_agent or not self._context.ai_provider:
@@ -1080,29 +1352,41 @@ class DeploySession:
                 _print(f"  Auto-remediation exhausted ({current_attempts} attempts) for {stage_info}.")
                 break
 
-            # 1. QA diagnosis
-            qa_result = route_error_to_qa(
-                error_text,
-                f"Deploy {stage_info}",
-                self._qa_agent,
-                self._context,
-                self._token_tracker,
-                _print,
-                services=svc_names,
-                escalation_tracker=self._escalation_tracker,
-                source_agent="deploy-session",
-                source_stage="deploy",
-            )
+            attempt_error = error_text
+            known = self._error_signatures.match(error_text)
+            if known is not None and known.action == ACTION_GUIDANCE:
+                # 1-2. Recorded diagnosis and guidance — no QA / architect round trips
+                _print(f"  Known failure: {known.title} — using the recorded fix guidance.")
+                qa_diagnosis = known.diagnosis
+                architect_guidance = known.guidance
+                if known.knowledge:
+                    architect_guidance += f"\n\nReference: {known.knowledge}"
+            else:
+                known = None
+
+                # 1. QA diagnosis
+                qa_result = route_error_to_qa(
+                    error_text,
+                    f"Deploy {stage_info}",
+                    self._qa_agent,
+                    self._context,
+                    self._token_tracker,
+                    _print,
+                    services=svc_names,
+                    escalation_tracker=self._escalation_tracker,
+                    source_agent="deploy-session",
+                    source_stage="deploy",
+                )
 
-            if not qa_result["diagnosed"]:
-                _print("")
-                _print(f"  Error: {error_text[:500]}")
-                break
+                if not qa_result["diagnosed"]:
+                    _print("")
+                    _print(f"  Error: {error_text[:500]}")
+                    break
 
-            qa_diagnosis = qa_result.get("content", "")
+                qa_diagnosis = qa_result.get("content", "")
 
-            # 2. Architect fix guidance
-            architect_guidance = self._get_architect_fix_guidance(stage, error_text, qa_diagnosis)
+                # 2. Architect fix guidance
+                architect_guidance = self._get_architect_fix_guidance(stage, error_text, qa_diagnosis)
 
             # 3. Mark stage as remediating
             self._deploy_state.mark_stage_remediating(stage_num)
@@ -1138,8 +1422,8 @@ class DeploySession:
                 _print("  No file blocks found in fix response.")
                 break
 
-            # 6. Check downstream impact
-            downstream = self._check_downstream_impact(stage, architect_guidance)
+            # 6. Check downstream impact (known fixes stay within the stage)
+            downstream = [] if known else self._check_downstream_impact(stage, architect_guidance)
 
             # 7. Reset and re-deploy
             self._deploy_state.reset_stage_to_pending(stage_num)
@@ -1147,12 +1431,18 @@ class DeploySession:
             with self._maybe_spinner(f"Re-deploying {stage_info}...", use_styled):
                 final_result = self._deploy_single_stage(stage)
 
-            if final_result.get("status") == "deployed":
+            deployed = final_result.get("status") == "deployed"
+            if known is not None:
+                self._error_signatures.record_outcome(known, succeeded=deployed)
+            elif deployed:
+                self._learn_remediation(attempt_error, qa_diagnosis, architect_guidance, stage_info)
+
+            if deployed:
                 _print(f"  {stage_info} deployed successfully after remediation.")
 
                 # Capture outputs for infra stages
                 if stage.get("category") in ("infra", "data", "integration"):
-                    self._capture_stage_outputs(stage)
+                    self._capture_stage_outputs(stage, final_result)
 
                 # Regenerate downstream stages if needed
                 if downstream:
@@ -1166,6 +1456,68 @@ class DeploySession:
 
         return final_result
 
+    def _remediate_known_failure(
+        self,
+        stage: dict[str, Any],
+        fix: KnownFix,
+        use_styled: bool,
+        _print: Callable[[str], None],
+    ) -> dict[str, Any] | None:
+        """Apply a fix that needs no agent, then redeploy the stage.
+
+        Returns the redeploy result, or ``None`` if the fix could not be
+        applied.
+        """
+        stage_num = stage["stage"]
+        stage_info = f"Stage {stage_num}: {stage['name']}"
+        _print(f"  Known failure: {fix.title} — applying the known fix.")
+
+        if fix.action == ACTION_REGISTER_PROVIDER:
+            namespace = fix.params.get("namespace", "")
+            _print(f"  Registering resource provider {namespace}...")
+            try:
+                registered = subprocess.run(
+                    [_az(), "provider", "register", "--namespace", namespace, "--wait"],
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                    env=self._deploy_env,
+                )
+            except FileNotFoundError:
+                return None
+            if registered.returncode != 0:
+                _print(f"  Provider registration failed: {(registered.stderr or registered.stdout).strip()[:200]}")
+                return None
+        else:
+            return None
+
+        self._deploy_state.add_deploy_log_entry(stage_num, "remediating", f"known fix: {fix.key}")
+        self._deploy_state.reset_stage_to_pending(stage_num)
+        with self._maybe_spinner(f"Re-deploying {stage_info}...", use_styled):
+            result = self._deploy_single_stage(stage)
+
+        if result.get("status") == "deployed":
+            _print(f"  {stage_info} deployed successfully after remediation.")
+            if stage.get("category") in ("infra", "data", "integration"):
+                self._capture_stage_outputs(stage, result)
+        else:
+            _print(f"  Re-deploy failed: {result.get('error', 'unknown error')[:120]}")
+        return result
+
+    def _learn_remediation(self, error_text: str, diagnosis: str, guidance: str, stage_info: str) -> None:
+        """Remember a successful AI remediation and resolve the matching blockers."""
+        try:
+            self._error_signatures.learn(error_text, diagnosis, guidance)
+            signature = error_signature(error_text)
+            summary = next((line.strip() for line in guidance.splitlines() if line.strip()), "")
+            for entry in self._escalation_tracker.get_active_blockers():
+                if error_signature(entry.blocker) == signature:
+                    self._escalation_tracker.resolve(
+                        entry, f"Fixed by deploy remediation ({stage_info}): {summary[:200]}"
+                    )
+        except Exception:
+            logger.debug("Could not record remediation", exc_info=True)
+
     def _collect_stage_file_content(self, stage: dict, max_bytes: int = 20_000) -> str:
         """Collect content of generated files for a single deploy stage.
 
@@ -1280,7 +1632,11 @@ class DeploySession:
     def _write_stage_files(self, stage: dict, content: str) -> list[str]:
         """Extract file blocks from AI response and write to disk.
 
-        Returns a list of written file paths relative to the project dir.
+        Files whose content hash matches the hash recorded in build
+        state are not rewritten, so unchanged files keep their mtimes.
+
+        Returns a list of the stage's file paths relative to the project
+        dir (including files skipped as unchanged).
         """
         if not content:
             return []
@@ -1310,51 +1666,79 @@ class DeploySession:
 
             cleaned[normalized] = file_content
 
-        written = write_parsed_files(cleaned, output_dir, verbose=False)
-
         project_root = Path(self._context.project_dir)
-        written_relative = [str(p.relative_to(project_root)) for p in written]
+        known_hashes: dict[str, str] = {}
+        try:
+            bs = self._load_build_state()
+            build_stage = self._match_build_stage(bs, stage) if bs is not None else None
+            if bs is not None and build_stage:
+                known_hashes = bs.get_file_hashes(build_stage["stage"])
+        except Exception:
+            logger.debug("Could not read recorded file hashes", exc_info=True)
+
+        writer = FileWriter(output_dir, known_hashes=known_hashes, root=project_root)
+        changed = writer.write_all(cleaned.items())
+        written_relative = [writer.key_for(name) for name in cleaned]
+        changed_relative = [str(p.relative_to(project_root)) for p in changed]
+
+        # The deploy stage now reflects what is on disk; keep its manifest
+        # in step so the next build→deploy sync doesn't flag it as changed.
+        stage["file_hashes"] = writer.manifest
 
         # Sync build state with updated file list
-        self._sync_build_state(stage, written_relative)
+        self._sync_build_state(stage, written_relative, writer.manifest, changed_relative)
 
         return written_relative
 
-    def _sync_build_state(self, stage: dict, written_paths: list[str]) -> None:
+    def _load_build_state(self) -> BuildState | None:
+        """Return a loaded :class:`BuildState`, or ``None`` if absent."""
+        from azext_prototype.stages.build_state import BuildState
+
+        bs = BuildState(self._context.project_dir)
+        if not bs.exists:
+            return None
+        bs.load()
+        return bs
+
+    @staticmethod
+    def _match_build_stage(bs, stage: dict) -> dict | None:
+        """Find the build stage for a deploy *stage*.
+
+        Uses ``build_stage_id`` when available, falling back to stage
+        number for legacy state files.
+        """
+        build_stage_id = stage.get("build_stage_id")
+        if build_stage_id:
+            target = bs.get_stage_by_id(build_stage_id)
+            if target:
+                return target
+        return bs.get_stage(stage["stage"])
+
+    def _sync_build_state(
+        self,
+        stage: dict,
+        written_paths: list[str],
+        manifest: dict[str, dict] | None = None,
+        changed_paths: list[str] | None = None,
+    ) -> None:
         """Best-effort sync of build.yaml after remediation writes.
 
-        Updates the matching stage's ``files`` list and marks it as
-        ``generated`` so subsequent builds stay consistent.  Uses
-        ``build_stage_id`` for matching when available, falling back
-        to stage number for legacy state files.
+        Updates the matching stage's ``files`` list (and, when given, its
+        per-file hash *manifest* and exact *changed_paths*) and marks it
+        as ``generated`` so subsequent builds stay consistent.
         """
         try:
-            from azext_prototype.stages.build_state import BuildState
+            bs = self._load_build_state()
+            if bs is None:
+                return
 
-            bs = BuildState(self._context.project_dir)
-            if not bs.exists:
+            target = self._match_build_stage(bs, stage)
+            if target is None:
                 return
-            bs.load()
-
-            build_stage_id = stage.get("build_stage_id")
-            matched = False
-
-            if build_stage_id:
-                # Match by stable ID
-                target = bs.get_stage_by_id(build_stage_id)
-                if target:
-                    target["files"] = written_paths
-                    target["status"] = "generated"
-                    matched = True
-
-            if not matched:
-                # Fallback: match by stage number
-                stage_num = stage["stage"]
-                for build_stage in bs.state.get("deployment_stages", []):
-                    if build_stage["stage"] == stage_num:
-                        build_stage["files"] = written_paths
-                        build_stage["status"] = "generated"
-                        break
+            target["files"] = written_paths
+            target["status"] = "generated"
+            if manifest is not None:
+                bs.record_file_hashes(target["stage"], manifest, changed_paths or [])
 
             bs.save()
         except Exception:
@@ -1578,19 +1962,9 @@ class DeploySession:
             _print(f"  Stage {stage_num} is not deployed (status: {stage.get('deploy_status')}).")
             return False
 
-        stage_dir = Path(self._context.project_dir) / stage.get("dir", "")
-        category = stage.get("category", "infra")
-
         _print(f"  Rolling back Stage {stage_num}: {stage['name']}...")
 
-        if category in ("infra", "data", "integration"):
-            if self._iac_tool == "terraform":
-                result = rollback_terraform(stage_dir, env=self._deploy_env)
-            else:
-                result = rollback_bicep(stage_dir, self._subscription, self._resource_group, env=self._deploy_env)
-        else:
-            # App stages — no automated rollback, mark as rolled back
-            result = {"status": "rolled_back"}
+        result = self._destroy_stage(stage)
 
         if result.get("status") == "rolled_back":
             self._deploy_state.mark_stage_rolled_back(stage_num)
@@ -1600,35 +1974,134 @@ class DeploySession:
             _print(f"  Rollback failed: {result.get('error', 'unknown error')[:200]}")
             return False
 
+    def _destroy_stage(self, stage: dict[str, Any]) -> dict[str, Any]:
+        """Tear down one stage's resources; safe to call from a worker thread."""
+        stage_dir = Path(self._context.project_dir) / stage.get("dir", "")
+        if stage.get("category", "infra") not in ("infra", "data", "integration"):
+            # App stages — no automated rollback, mark as rolled back
+            return {"status": "rolled_back"}
+        try:
+            if self._iac_tool == "terraform":
+                return rollback_terraform(stage_dir, env=self._deploy_env)
+            return rollback_bicep(stage_dir, self._subscription, self._resource_group, env=self._deploy_env)
+        except OSError as e:
+            return {"status": "failed", "error": str(e)}
+
     def _rollback_all(
         self,
         _print: Callable[[str], None],
         _input: Callable[[str], str],
     ) -> None:
-        """Roll back all deployed stages in reverse order."""
-        candidates = self._deploy_state.get_rollback_candidates()
-        if not candidates:
+        """Roll back all deployed stages, dependents first, wave by wave.
+
+        Stages in a wave share no dependency and are destroyed
+        concurrently (Terraform only, see :meth:`_rollback_parallelism`).
+        Progress is kept in the deploy state, so an interrupted rollback
+        resumes with the stages still deployed.  A failed stage keeps the
+        stages it depends on deployed; the rest of the plan goes ahead.
+        """
+        plan = self._rollback_plan()
+        resumed = self._deploy_state.rollback_plan
+        if not plan.waves:
+            if resumed:
+                self._deploy_state.finish_rollback()
             _print("  No deployed stages to roll back.")
             return
 
-        _print(f"  Rolling back {len(candidates)} stage(s) in reverse order...")
+        if resumed:
+            done = len(resumed.get("completed", []))
+            _print(f"  Resuming interrupted rollback ({done} stage(s) already rolled back).")
+        _print(f"  Rolling back {plan.stage_count} stage(s) in {len(plan.waves)} wave(s):")
+        for number, wave in enumerate(plan.waves, 1):
+            names = ", ".join(f"{_format_display_id(s)} ({s['name']})" for s in wave)
+            _print(f"    Wave {number}: {names}")
         _print("")
+        _print("  Proceed? (Y/n)")
+        try:
+            answer = _input("  > ").strip().lower()
+        except (EOFError, KeyboardInterrupt):
+            _print("  Rollback cancelled.")
+            return
+        if answer in ("n", "no"):
+            _print("  Rollback cancelled.")
+            return
 
-        for stage in candidates:
-            stage_num = stage["stage"]
-            _print(f"  Roll back Stage {stage_num}: {stage['name']}? (Y/n)")
-            try:
-                answer = _input("  > ").strip().lower()
-            except (EOFError, KeyboardInterrupt):
-                _print("  Rollback cancelled.")
-                return
+        self._deploy_state.start_rollback(plan.keys())
+        blocked: set[str] = set()
+        for number, wave in enumerate(plan.waves, 1):
+            ready = []
+            for stage in wave:
+                key = stage_output_key(stage)
+                if plan.dependents.get(key, set()) & blocked:
+                    blocked.add(key)
+                    _print(
+                        f"  Keeping Stage {_format_display_id(stage)}: a stage that depends on it is still deployed."
+                    )
+                else:
+                    ready.append(stage)
+            if not ready:
+                continue
+            _print(f"  Wave {number}: rolling back {len(ready)} stage(s)...")
+            for stage, result in zip(ready, self._rollback_wave(ready)):
+                key = stage_output_key(stage)
+                display_id = _format_display_id(stage)
+                if result.get("status") == "rolled_back":
+                    self._deploy_state.mark_stage_rolled_back(stage["stage"], stage.get("substage_label"))
+                    self._deploy_state.record_rollback_result(key)
+                    _print(f"  Stage {display_id} rolled back.")
+                else:
+                    error = result.get("error", "unknown error")
+                    self._deploy_state.record_rollback_result(key, error)
+                    blocked.add(key)
+                    _print(f"  Stage {display_id} rollback failed: {error[:200]}")
+            _print("")
 
-            if answer in ("n", "no"):
-                _print(f"  Skipping Stage {stage_num}. Stopping rollback.")
-                return  # Must stop — can't skip and continue in reverse order
+        if blocked:
+            _print(f"  {len(blocked)} stage(s) still deployed. Run /rollback all to retry.")
+        else:
+            self._deploy_state.finish_rollback()
+            _print("  All stages rolled back.")
 
-            self._rollback_stage(stage_num, _print)
-            _print("")
+    def _rollback_plan(self) -> RollbackPlan:
+        """Plan the rollback of every deployed stage.
+
+        When resuming, the recorded waves are kept as long as they still
+        cover every deployed stage.
+        """
+        stages = self._deploy_state._state["deployment_stages"]
+        deps = stage_dependencies(
+            stages, self._context.project_dir, self._deploy_state._state.get("captured_outputs") or {}
+        )
+        plan = plan_rollback(self._deploy_state.get_deployed_stages(), deps)
+        recorded = self._deploy_state.rollback_plan
+        if not recorded or not plan.waves:
+            return plan
+
+        by_key = {stage_output_key(s): s for wave in plan.waves for s in wave}
+        recorded_keys = {key for wave in recorded.get("waves", []) for key in wave}
+        if not by_key.keys() <= recorded_keys:
+            return plan
+        waves = [[by_key[key] for key in wave if key in by_key] for wave in recorded["waves"]]
+        return RollbackPlan(waves=[wave for wave in waves if wave], dependents=plan.dependents)
+
+    def _rollback_wave(self, stages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Destroy *stages* concurrently; results are in the order given."""
+        if len(stages) == 1:
+            return [self._destroy_stage(stages[0])]
+        workers = max(1, min(self._rollback_parallelism(), len(stages)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rollback") as pool:
+            futures = [pool.submit(self._destroy_stage, stage) for stage in stages]
+            return [future.result() for future in futures]
+
+    def _rollback_parallelism(self) -> int:
+        """Concurrent destroys per wave.
+
+        Bicep rollbacks run one at a time: each is a ``--mode Complete``
+        deployment to the shared resource group, and concurrent ones race.
+        """
+        if self._iac_tool != "terraform":
+            return 1
+        return int(self._config.get("deploy.rollback_parallelism", ROLLBACK_PARALLELISM) or 1)
 
     # ------------------------------------------------------------------ #
     # Internal — Slash commands
@@ -1703,7 +2176,7 @@ class DeploySession:
         if result.get("status") == "deployed":
             _print(f"  Stage {display_id} deployed successfully.")
             if stage.get("category") in ("infra", "data", "integration"):
-                self._capture_stage_outputs(stage)
+                self._capture_stage_outputs(stage, result)
         elif result.get("status") == "awaiting_manual":
             instructions = result.get("instructions", "No instructions provided.")
             _print(f"  Stage {display_id} requires manual action:")
@@ -1820,7 +2293,7 @@ class DeploySession:
                     if result.get("status") == "deployed":
                         _print(f"  Stage {display_id} redeployed successfully.")
                         if stage.get("category") in ("infra", "data", "integration"):
-                            self._capture_stage_outputs(stage)
+                            self._capture_stage_outputs(stage, result)
                     elif result.get("status") == "awaiting_manual":
                         _print(f"  Stage {display_id} requires manual action:")
                         _print(f"    {result.get('instructions', '')}")
@@ -1849,15 +2322,18 @@ class DeploySession:
                                 if generated:
                                     plan_env = dict(self._deploy_env) if self._deploy_env else {}
                                     plan_env.update(generated)
-                                result = plan_terraform(stage_dir, self._subscription, env=plan_env)
+                                result = plan_terraform(
+                                    stage_dir, self._subscription, env=plan_env, **self._stream_kwargs()
+                                )
                             else:
                                 result = whatif_bicep(
                                     stage_dir,
                                     self._subscription,
                                     self._resource_group,
                                     env=self._deploy_env,
+                                    **self._stream_kwargs(),
                                 )
-                        if result.get("output"):
+                        if result.get("output") and not result.get("streamed"):
                             _print(result["output"])
                         if result.get("error"):
                             _print(f"  Error: {result['error']}")
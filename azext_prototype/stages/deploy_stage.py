@@ -84,6 +84,7 @@ class DeployStage(BaseStage):
         tenant = kwargs.get("tenant")
         client_id = kwargs.get("client_id")
         client_secret = kwargs.get("client_secret")
+        cancel_event = kwargs.get("cancel_event")  # threading.Event | None
 
         self.state = StageState.IN_PROGRESS
 
@@ -104,7 +105,7 @@ class DeployStage(BaseStage):
             return {"status": "reset"}
 
         # Create session
-        session = DeploySession(agent_context, registry)
+        session = DeploySession(agent_context, registry, cancel_event=cancel_event)
 
         # --dry-run (with optional --stage N)
         if dry_run:
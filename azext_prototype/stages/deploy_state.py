@@ -15,6 +15,11 @@ The state structure tracks:
 - Captured Terraform/Bicep outputs
 - Build-deploy correspondence via stable ``build_stage_id``
 - Substage splitting for 1:N divergence
+- Per-stage content fingerprints of the last successful deploy, so
+  unchanged stages are skipped and downstream stages are redeployed
+  when an upstream output changes
+- Progress of a dependency-ordered rollback, so an interrupted one
+  resumes
 """
 
 from __future__ import annotations
@@ -28,7 +33,15 @@ from typing import Any
 
 import yaml
 
-from azext_prototype.stages.build_state import _slugify
+from azext_prototype.stages.build_state import (
+    _slugify,
+    diff_file_hashes,
+    load_stage_index,
+    stage_build_id,
+    stage_changes_since,
+    stage_sync_digest,
+)
+from azext_prototype.stages.fingerprint import mapping_digest
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +57,7 @@ class SyncResult:
     orphaned: int = 0
     updated_code: int = 0
     details: list[str] = field(default_factory=list)
+    changed_files: list[str] = field(default_factory=list)
 
 
 def _default_deploy_state() -> dict[str, Any]:
@@ -57,12 +71,15 @@ def _default_deploy_state() -> dict[str, Any]:
         "preflight_results": [],
         "deploy_log": [],
         "rollback_log": [],
+        "rollback_plan": None,
         "captured_outputs": {},
         "conversation_history": [],
         "_metadata": {
             "created": None,
             "last_updated": None,
             "iteration": 0,
+            "build_generation": None,
+            "build_revision": None,
         },
     }
 
@@ -81,9 +98,67 @@ def _enrich_deploy_fields(stage: dict) -> dict:
     stage.setdefault("substage_label", None)
     stage.setdefault("_is_substage", False)
     stage.setdefault("_destruction_declined", False)
+    stage.setdefault("deploy_fingerprint", None)
+    stage.setdefault("output_digest", None)
     return stage
 
 
+def _deploy_stage_from_build(build_stage: dict) -> dict:
+    """Create a deploy stage from a build stage."""
+    stage = dict(build_stage)
+    stage["build_stage_id"] = stage_build_id(build_stage)
+    stage["build_digest"] = stage_sync_digest(build_stage)
+    return _enrich_deploy_fields(stage)
+
+
+def _apply_build_stage(ds: dict, bs: dict, result: SyncResult) -> None:
+    """Copy build-sourced fields of *bs* onto deploy stage *ds*.
+
+    Deploy state (status, timestamps, substage structure) is kept.  A
+    deployed stage whose code changed is flagged ``_code_updated`` and
+    counted in *result*.
+    """
+    # Check if code changed — exact per-file hashes when both sides
+    # have them, file-list comparison for legacy state.
+    old_dir = ds.get("dir", "")
+    new_dir = bs.get("dir", "")
+    old_files = ds.get("files", [])
+    new_files = bs.get("files", [])
+    old_hashes = ds.get("file_hashes") or {}
+    new_hashes = bs.get("file_hashes") or {}
+    if old_hashes and new_hashes:
+        changed_files = diff_file_hashes(old_hashes, new_hashes)
+        code_changed = (old_dir != new_dir) or bool(changed_files)
+    else:
+        changed_files = []
+        code_changed = (old_dir != new_dir) or (sorted(old_files) != sorted(new_files))
+
+    # Update build-sourced fields
+    ds["name"] = bs.get("name", ds["name"])
+    ds["category"] = bs.get("category", ds.get("category", "infra"))
+    ds["services"] = bs.get("services", ds.get("services", []))
+    ds["deploy_mode"] = bs.get("deploy_mode", ds.get("deploy_mode", "auto"))
+    ds["manual_instructions"] = bs.get("manual_instructions", ds.get("manual_instructions"))
+    ds["build_digest"] = stage_sync_digest(bs)
+    if not ds.get("_is_substage"):
+        ds["dir"] = new_dir
+        ds["files"] = new_files
+        ds["file_hashes"] = dict(new_hashes)
+
+    if code_changed and ds.get("deploy_status") == "deployed":
+        ds["_code_updated"] = True
+        result.updated_code += 1
+        result.changed_files.extend(f for f in changed_files if f not in result.changed_files)
+
+
+def stage_output_key(stage: dict) -> str:
+    """Stable key for a stage's outputs — survives renumbering."""
+    key = str(stage.get("build_stage_id") or stage.get("stage"))
+    if stage.get("substage_label"):
+        key += f":{stage['substage_label']}"
+    return key
+
+
 class DeployState:
     """Manages persistent deploy state in YAML format.
 
@@ -177,6 +252,10 @@ class DeployState:
         ``deploy_status``, ``deploy_timestamp``, ``deploy_output``,
         ``deploy_error``, ``rollback_timestamp``, ``build_stage_id``.
 
+        Stages are read from the build stage index when it is current
+        (see :func:`~.build_state.load_stage_index`), so ``build.yaml``
+        itself is only parsed when the index is missing or stale.
+
         Returns True if stages were imported, False if build.yaml not found
         or contained no deployment stages.
         """
@@ -185,29 +264,32 @@ class DeployState:
             logger.warning("Build state not found at %s", path)
             return False
 
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                build_data = yaml.safe_load(f) or {}
-        except (yaml.YAMLError, IOError) as e:
-            logger.warning("Could not read build state: %s", e)
-            return False
+        index = load_stage_index(path)
+        if index is not None:
+            build_stages = [index["stages"][sid]["stage"] for sid in index.get("order", [])]
+            iac_tool = index.get("iac_tool", "terraform")
+        else:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    build_data = yaml.safe_load(f) or {}
+            except (yaml.YAMLError, IOError) as e:
+                logger.warning("Could not read build state: %s", e)
+                return False
+            build_stages = build_data.get("deployment_stages", [])
+            iac_tool = build_data.get("iac_tool", "terraform")
 
-        build_stages = build_data.get("deployment_stages", [])
         if not build_stages:
             logger.warning("Build state has no deployment_stages.")
             return False
 
-        enriched: list[dict] = []
-        for stage in build_stages:
-            enriched_stage = dict(stage)
-            # Set build_stage_id from the build stage's id field
-            enriched_stage["build_stage_id"] = stage.get("id") or _slugify(stage.get("name", "stage"))
-            _enrich_deploy_fields(enriched_stage)
-            enriched.append(enriched_stage)
-
+        enriched = [_deploy_stage_from_build(stage) for stage in build_stages]
         self._state["deployment_stages"] = enriched
-        self._state["iac_tool"] = build_data.get("iac_tool", "terraform")
-        self.save()
+        self._state["iac_tool"] = iac_tool
+        self._set_build_revision(index)
+        if index is not None:
+            self.renumber_stages()
+        else:
+            self.save()
 
         logger.info("Imported %d stages from build state.", len(enriched))
         return True
@@ -224,6 +306,12 @@ class DeployState:
         - **Orphans** deploy stages whose build stage was removed (sets ``removed``)
         - Falls back to name+category matching for legacy stages
 
+        When the build stage index is current, only the stages named in
+        its change events since the last sync are reconciled (or, if the
+        event log no longer reaches back that far, those whose digest
+        differs); an unchanged index costs nothing.  Otherwise
+        ``build.yaml`` is parsed and every stage is reconciled.
+
         Returns a :class:`SyncResult` summarising the changes.
         """
         result = SyncResult()
@@ -232,6 +320,33 @@ class DeployState:
             result.details.append("Build state not found.")
             return result
 
+        index = load_stage_index(path)
+        if index is not None and index.get("order"):
+            order = list(index["order"])
+            stored = self._state["_metadata"].get("build_revision")
+            if self._state["_metadata"].get("build_generation") != index.get("generation"):
+                stored = None  # revisions of another index generation are not comparable
+            if stored == index["revision"] and self._state["deployment_stages"]:
+                known = {ds.get("build_stage_id") for ds in self._state["deployment_stages"]}
+                result.matched = sum(1 for bid in order if bid in known)
+                return result
+            build_by_bid = {sid: index["stages"][sid]["stage"] for sid in order}
+            digests = {sid: index["stages"][sid]["digest"] for sid in order}
+            touched = stage_changes_since(index, stored)
+            if touched is None:
+                touched = {
+                    ds.get("build_stage_id")
+                    for ds in self._state["deployment_stages"]
+                    if ds.get("build_digest") != digests.get(ds.get("build_stage_id"))
+                }
+                known = {ds.get("build_stage_id") for ds in self._state["deployment_stages"]}
+                touched.update(bid for bid in order if bid not in known)
+            self._reconcile_build_stages(order, build_by_bid, touched, result)
+            self._state["iac_tool"] = index.get("iac_tool", self._state.get("iac_tool", "terraform"))
+            self._set_build_revision(index)
+            self.renumber_stages()
+            return result
+
         try:
             with open(path, "r", encoding="utf-8") as f:
                 build_data = yaml.safe_load(f) or {}
@@ -244,121 +359,97 @@ class DeployState:
             result.details.append("Build state has no deployment_stages.")
             return result
 
-        existing = self._state["deployment_stages"]
+        build_by_bid: dict[str, dict] = {}
+        for bs in build_stages:
+            build_by_bid.setdefault(stage_build_id(bs), bs)
+        order = list(build_by_bid)
+        touched = set(order) | {ds.get("build_stage_id") for ds in self._state["deployment_stages"]}
+        self._reconcile_build_stages(order, build_by_bid, touched, result)
+        self._state["iac_tool"] = build_data.get("iac_tool", self._state.get("iac_tool", "terraform"))
+        self._set_build_revision(None)
+        self.renumber_stages()
 
-        # Index existing deploy stages by build_stage_id
-        deploy_by_bid: dict[str, list[dict]] = {}
+        return result
+
+    def _set_build_revision(self, index: dict | None) -> None:
+        """Record the build stage index position deploy is in sync with."""
+        metadata = self._state["_metadata"]
+        metadata["build_generation"] = index.get("generation") if index else None
+        metadata["build_revision"] = index["revision"] if index else None
+
+    def _reconcile_build_stages(
+        self,
+        order: list[str],
+        build_by_bid: dict[str, dict],
+        touched: set[str],
+        result: SyncResult,
+    ) -> None:
+        """Reconcile the deploy stages of the *touched* build stage IDs.
+
+        *order* lists every current build stage ID and *build_by_bid*
+        maps them to their build stage.  Deploy stages are re-ordered to
+        follow *order*; stages of removed build stages go last.  Every
+        lookup is a dict access, so the cost grows with the number of
+        touched stages, not with the square of the stage count.
+        """
+        existing = self._state["deployment_stages"]
+        deploy_by_bid: dict[str | None, list[dict]] = {}
+        legacy: dict[tuple[Any, Any], dict] = {}
         for ds in existing:
             bid = ds.get("build_stage_id")
             if bid:
                 deploy_by_bid.setdefault(bid, []).append(ds)
+            else:
+                legacy.setdefault((ds.get("name"), ds.get("category")), ds)
+        unmatched_legacy = {id(ds) for ds in existing if not ds.get("build_stage_id")}
 
-        # Track which build_stage_ids we've matched
-        matched_bids: set[str] = set()
-        new_stages: list[dict] = []
-
-        for bs in build_stages:
-            bid = bs.get("id") or _slugify(bs.get("name", "stage"))
-            matched_bids.add(bid)
+        result.matched += sum(1 for bid in order if bid in deploy_by_bid)
 
+        for bid in order:
+            if bid not in touched:
+                continue
+            bs = build_by_bid[bid]
             if bid in deploy_by_bid:
-                # Update matched deploy stages with build-sourced fields
                 for ds in deploy_by_bid[bid]:
-                    # Check if code changed
-                    old_dir = ds.get("dir", "")
-                    new_dir = bs.get("dir", "")
-                    old_files = ds.get("files", [])
-                    new_files = bs.get("files", [])
-                    code_changed = (old_dir != new_dir) or (sorted(old_files) != sorted(new_files))
-
-                    # Update build-sourced fields
-                    ds["name"] = bs.get("name", ds["name"])
-                    ds["category"] = bs.get("category", ds.get("category", "infra"))
-                    ds["services"] = bs.get("services", ds.get("services", []))
-                    ds["deploy_mode"] = bs.get("deploy_mode", ds.get("deploy_mode", "auto"))
-                    ds["manual_instructions"] = bs.get("manual_instructions", ds.get("manual_instructions"))
-                    if not ds.get("_is_substage"):
-                        ds["dir"] = new_dir
-                        ds["files"] = new_files
-
-                    if code_changed and ds.get("deploy_status") == "deployed":
-                        ds["_code_updated"] = True
-                        result.updated_code += 1
+                    _apply_build_stage(ds, bs, result)
+                continue
 
+            # Legacy fallback: match by name+category
+            legacy_match = legacy.pop((bs.get("name"), bs.get("category")), None)
+            if legacy_match is not None:
+                unmatched_legacy.discard(id(legacy_match))
+                legacy_match["build_stage_id"] = bid
+                legacy_match["build_digest"] = stage_sync_digest(bs)
+                legacy_match["deploy_mode"] = bs.get("deploy_mode", "auto")
+                legacy_match["manual_instructions"] = bs.get("manual_instructions")
+                deploy_by_bid[bid] = [legacy_match]
                 result.matched += 1
             else:
-                # Legacy fallback: match by name+category
-                legacy_match = None
-                for ds in existing:
-                    if (
-                        not ds.get("build_stage_id")
-                        and ds.get("name") == bs.get("name")
-                        and ds.get("category") == bs.get("category")
-                    ):
-                        legacy_match = ds
-                        break
-
-                if legacy_match:
-                    legacy_match["build_stage_id"] = bid
-                    legacy_match["deploy_mode"] = bs.get("deploy_mode", "auto")
-                    legacy_match["manual_instructions"] = bs.get("manual_instructions")
-                    result.matched += 1
-                    matched_bids.add(bid)
-                else:
-                    # Create new deploy stage
-                    new_ds = dict(bs)
-                    new_ds["build_stage_id"] = bid
-                    _enrich_deploy_fields(new_ds)
-                    new_stages.append(new_ds)
-                    result.created += 1
-                    result.details.append(f"New stage: {bs.get('name', '?')}")
+                # Create new deploy stage
+                deploy_by_bid[bid] = [_deploy_stage_from_build(bs)]
+                result.created += 1
+                result.details.append(f"New stage: {bs.get('name', '?')}")
 
         # Rebuild ordered list
         ordered: list[dict] = []
-        processed_bids: set[str] = set()
-
-        for bs in build_stages:
-            bid = bs.get("id") or _slugify(bs.get("name", "stage"))
-            if bid in deploy_by_bid and bid not in processed_bids:
-                # Add existing deploy stages for this build stage (in existing order)
-                ordered.extend(deploy_by_bid[bid])
-                processed_bids.add(bid)
-            elif bid not in processed_bids:
-                # Add newly created stage
-                for ns in new_stages:
-                    if ns.get("build_stage_id") == bid:
-                        ordered.append(ns)
-                processed_bids.add(bid)
-
-        # Also add legacy-matched stages that weren't in deploy_by_bid
-        for ds in existing:
-            if ds not in ordered and ds.get("build_stage_id") in matched_bids:
+        placed: set[int] = set()
+        for bid in order:
+            for ds in deploy_by_bid.get(bid, []):
                 ordered.append(ds)
+                placed.add(id(ds))
 
         # Orphaned stages (build stage removed)
-        for bid, deploy_stages in deploy_by_bid.items():
-            if bid not in matched_bids:
-                for ds in deploy_stages:
-                    if ds.get("deploy_status") not in ("removed", "destroyed"):
-                        ds["deploy_status"] = "removed"
-                        result.orphaned += 1
-                        result.details.append(f"Removed: {ds.get('name', '?')}")
-                    ordered.append(ds)
-
-        # Also catch any existing stages not yet in ordered
         for ds in existing:
-            if ds not in ordered:
-                if ds.get("build_stage_id") not in matched_bids:
-                    if ds.get("deploy_status") not in ("removed", "destroyed"):
-                        ds["deploy_status"] = "removed"
-                        result.orphaned += 1
-                ordered.append(ds)
+            if id(ds) in placed:
+                continue
+            orphan = ds.get("build_stage_id") in touched or id(ds) in unmatched_legacy
+            if orphan and ds.get("deploy_status") not in ("removed", "destroyed"):
+                ds["deploy_status"] = "removed"
+                result.orphaned += 1
+                result.details.append(f"Removed: {ds.get('name', '?')}")
+            ordered.append(ds)
 
         self._state["deployment_stages"] = ordered
-        self._state["iac_tool"] = build_data.get("iac_tool", self._state.get("iac_tool", "terraform"))
-        self.renumber_stages()
-
-        return result
 
     # ------------------------------------------------------------------ #
     # Stage splitting
@@ -459,14 +550,20 @@ class DeployState:
             self.add_deploy_log_entry(stage_num, "deploying")
             self.save()
 
-    def mark_stage_deployed(self, stage_num: int, output: str = "") -> None:
-        """Mark a stage as successfully deployed."""
+    def mark_stage_deployed(self, stage_num: int, output: str = "", fingerprint: str | None = None) -> None:
+        """Mark a stage as successfully deployed.
+
+        *fingerprint* is the content fingerprint of what was deployed; a
+        later deploy skips the stage while it still matches.
+        """
         stage = self.get_stage(stage_num)
         if stage:
             stage["deploy_status"] = "deployed"
             stage["deploy_timestamp"] = datetime.now(timezone.utc).isoformat()
             stage["deploy_output"] = output
             stage["deploy_error"] = ""
+            stage["deploy_fingerprint"] = fingerprint
+            stage.pop("_code_updated", None)
             self.add_deploy_log_entry(stage_num, "deployed")
             self.save()
 
@@ -477,15 +574,18 @@ class DeployState:
             stage["deploy_status"] = "failed"
             stage["deploy_timestamp"] = datetime.now(timezone.utc).isoformat()
             stage["deploy_error"] = error
+            stage["deploy_fingerprint"] = None
             self.add_deploy_log_entry(stage_num, "failed", error)
             self.save()
 
-    def mark_stage_rolled_back(self, stage_num: int) -> None:
-        """Mark a stage as rolled back."""
-        stage = self.get_stage(stage_num)
+    def mark_stage_rolled_back(self, stage_num: int, substage_label: str | None = None) -> None:
+        """Mark a stage (or one of its substages) as rolled back."""
+        stage = self._find_stage(stage_num, substage_label)
         if stage:
             stage["deploy_status"] = "rolled_back"
             stage["rollback_timestamp"] = datetime.now(timezone.utc).isoformat()
+            stage["deploy_fingerprint"] = None
+            stage["output_digest"] = None
             self.add_rollback_log_entry(stage_num)
             self.save()
 
@@ -519,6 +619,8 @@ class DeployState:
         stage = self.get_stage(stage_num)
         if stage:
             stage["deploy_status"] = "destroyed"
+            stage["deploy_fingerprint"] = None
+            stage["output_digest"] = None
             self.add_deploy_log_entry(stage_num, "destroyed")
             self.save()
 
@@ -586,6 +688,14 @@ class DeployState:
     # Stage queries
     # ------------------------------------------------------------------ #
 
+    def _find_stage(self, stage_num: int, substage_label: str | None) -> dict | None:
+        if substage_label is None:
+            return self.get_stage(stage_num)
+        for stage in self._state["deployment_stages"]:
+            if stage["stage"] == stage_num and stage.get("substage_label") == substage_label:
+                return stage
+        return None
+
     def get_stage(self, stage_num: int) -> dict | None:
         """Return a specific stage by number.
 
@@ -597,6 +707,40 @@ class DeployState:
                 return stage
         return None
 
+    def record_app_results(self, stage_num: int, app_results: dict[str, dict]) -> None:
+        """Record the per-app outcome of an app stage with several deploy scripts."""
+        stage = self.get_stage(stage_num)
+        if stage:
+            stage["app_results"] = app_results
+            self.save()
+
+    def record_stage_outputs(self, stage_num: int, outputs: dict) -> bool:
+        """Record a digest of the outputs captured from *stage_num*.
+
+        Returns True when the outputs differ from the last recorded ones,
+        i.e. when downstream stages consuming them may need a redeploy.
+        """
+        stage = self.get_stage(stage_num)
+        if not stage:
+            return False
+        digest = mapping_digest(outputs)
+        changed = stage.get("output_digest") != digest
+        stage["output_digest"] = digest
+        self.save()
+        return changed
+
+    def upstream_outputs(self, stage_num: int) -> dict[str, str]:
+        """Output digests of the stages before *stage_num*, keyed by build stage.
+
+        Part of a stage's fingerprint: when an upstream output changes,
+        every stage after it fingerprints differently.
+        """
+        return {
+            stage_output_key(s): s["output_digest"]
+            for s in self._state["deployment_stages"]
+            if s.get("stage", 0) < stage_num and s.get("output_digest")
+        }
+
     def get_all_stages_for_num(self, stage_num: int) -> list[dict]:
         """Return all stages/substages with the given stage number."""
         return [s for s in self._state["deployment_stages"] if s["stage"] == stage_num]
@@ -642,6 +786,49 @@ class DeployState:
                     return False
         return True
 
+    @property
+    def rollback_plan(self) -> dict | None:
+        """The rollback in progress, or ``None``.
+
+        ``{"started", "waves": [[stage_key]], "completed": [stage_key],
+        "failed": {stage_key: error}}`` — keys are
+        :func:`stage_output_key` values, which survive renumbering.
+        """
+        return self._state.get("rollback_plan")
+
+    def start_rollback(self, waves: list[list[str]]) -> None:
+        """Record the waves of a rollback about to run.
+
+        Resuming keeps the stages already completed; earlier failures
+        are retried.
+        """
+        plan = self._state.get("rollback_plan") or {
+            "started": datetime.now(timezone.utc).isoformat(),
+            "completed": [],
+        }
+        plan["waves"] = waves
+        plan["failed"] = {}
+        self._state["rollback_plan"] = plan
+        self.save()
+
+    def record_rollback_result(self, stage_key: str, error: str | None = None) -> None:
+        """Record that a planned stage was rolled back, or failed with *error*."""
+        plan = self._state.get("rollback_plan")
+        if not plan:
+            return
+        if error is None:
+            if stage_key not in plan["completed"]:
+                plan["completed"].append(stage_key)
+            plan["failed"].pop(stage_key, None)
+        else:
+            plan["failed"][stage_key] = error[:500]
+        self.save()
+
+    def finish_rollback(self) -> None:
+        """Clear the rollback plan once every planned stage is rolled back."""
+        self._state["rollback_plan"] = None
+        self.save()
+
     # ------------------------------------------------------------------ #
     # Preflight
     # ------------------------------------------------------------------ #
@@ -649,7 +836,7 @@ class DeployState:
     def set_preflight_results(self, results: list[dict]) -> None:
         """Store preflight check results.
 
-        Each result dict: ``{name, status, message, fix_command?}``
+        Each result dict: ``{name, status, message, fix_command?, elapsed?}``
         where ``status`` is ``'pass'``, ``'warn'``, or ``'fail'``.
         """
         self._state["preflight_results"] = results
@@ -769,6 +956,11 @@ class DeployState:
                 svc_names = [s.get("computed_name") or s.get("name", "?") for s in services]
                 lines.append(f"      Resources: {', '.join(svc_names)}")
 
+            app_results = stage.get("app_results")
+            if app_results and status not in ("removed", "destroyed"):
+                apps = [f"{name} ({result.get('status', '?')})" for name, result in app_results.items()]
+                lines.append(f"      Apps: {', '.join(apps)}")
+
             if deploy_mode == "manual" and stage.get("manual_instructions"):
                 preview = stage["manual_instructions"][:80]
                 lines.append(f"      Instructions: {preview}...")
@@ -835,7 +1027,8 @@ class DeployState:
         for r in results:
             status = r.get("status", "?")
             icon = {"pass": "v", "warn": "!", "fail": "x"}.get(status, "?")
-            lines.append(f"  [{icon}] {r.get('name', '?')}: {r.get('message', '')}")
+            elapsed = f" ({r['elapsed']}s)" if r.get("elapsed") is not None else ""
+            lines.append(f"  [{icon}] {r.get('name', '?')}: {r.get('message', '')}{elapsed}")
 
             fix = r.get("fix_command")
             if fix and status in ("warn", "fail"):
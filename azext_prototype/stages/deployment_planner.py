@@ -0,0 +1,936 @@
+"""Rule-based deployment planning — deterministic stages from a design.
+
+The build session used to ask the cloud-architect agent for every
+deployment plan, plan adjustment and design diff.  Those calls take tens
+of seconds and are not reproducible: an unchanged design can yield a
+different plan on each run.  :class:`DeploymentPlanner` derives the same
+information from a catalog of service rules instead:
+
+1. **Detect** — match service aliases in the architecture text and map
+   template service types onto catalog entries.  Phrases that look like
+   Azure services but have no rule are reported as *unknown*.
+2. **Plan** — one stage per service (Foundation first, Documentation
+   last), ordered topologically over the catalog's ``depends_on`` edges
+   with ties broken by category, layer and first appearance.
+3. **Diff** — compare the service sets of two architectures and classify
+   the existing stages as unchanged, modified or removed.
+
+Every method returns ``None`` (or a :class:`Detection` whose
+``ambiguous`` flag is set) when the rules cannot answer with confidence;
+the caller then falls back to the architect agent.
+"""
+
+from __future__ import annotations
+
+import copy
+import heapq
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+# -------------------------------------------------------------------- #
+# Service catalog
+# -------------------------------------------------------------------- #
+
+
+@dataclass(frozen=True)
+class ServiceRule:
+    """How one Azure service is recognised, categorised and ordered."""
+
+    type: str
+    display: str
+    category: str  # infra | data | app
+    layer: int
+    resource_type: str
+    naming_key: str
+    aliases: tuple[str, ...] = ()
+    depends_on: tuple[str, ...] = ()
+    implies: tuple[str, ...] = ()
+    template_types: tuple[str, ...] = ()
+
+
+# Layers: 0 foundation, 1 monitoring, 2 networking, 3 security,
+# 4 data, 5 messaging, 6 AI, 7 hosting, 8 gateway/edge, 9 applications.
+_RULES: tuple[ServiceRule, ...] = (
+    ServiceRule("resource-group", "Resource Group", "infra", 0, "Microsoft.Resources/resourceGroups", "resource_group"),
+    ServiceRule(
+        "managed-identity",
+        "Managed Identity",
+        "infra",
+        0,
+        "Microsoft.ManagedIdentity/userAssignedIdentities",
+        "managed_identity",
+        aliases=(r"managed[\s-]identit(?:y|ies)",),
+        template_types=("user-assigned",),
+    ),
+    ServiceRule(
+        "log-analytics",
+        "Log Analytics",
+        "infra",
+        1,
+        "Microsoft.OperationalInsights/workspaces",
+        "log_analytics",
+        aliases=(r"log[\s-]analytics",),
+    ),
+    ServiceRule(
+        "application-insights",
+        "Application Insights",
+        "infra",
+        1,
+        "Microsoft.Insights/components",
+        "application_insights",
+        aliases=(r"app(?:lication)?[\s-]?insights",),
+        depends_on=("log-analytics",),
+        implies=("log-analytics",),
+    ),
+    ServiceRule(
+        "virtual-network",
+        "Virtual Network",
+        "infra",
+        2,
+        "Microsoft.Network/virtualNetworks",
+        "virtual_network",
+        aliases=(r"virtual[\s-]networks?", r"vnets?"),
+    ),
+    ServiceRule(
+        "network-security-group",
+        "Network Security Group",
+        "infra",
+        2,
+        "Microsoft.Network/networkSecurityGroups",
+        "network_security_group",
+        depends_on=("virtual-network",),
+    ),
+    ServiceRule("dns-zone", "DNS Zone", "infra", 2, "Microsoft.Network/privateDnsZones", "dns_zone"),
+    ServiceRule(
+        "private-endpoint",
+        "Private Endpoints",
+        "infra",
+        8,
+        "Microsoft.Network/privateEndpoints",
+        "private_endpoint",
+        depends_on=("virtual-network",),
+    ),
+    ServiceRule(
+        "key-vault",
+        "Key Vault",
+        "infra",
+        3,
+        "Microsoft.KeyVault/vaults",
+        "key_vault",
+        aliases=(r"key[\s-]?vaults?",),
+    ),
+    ServiceRule(
+        "container-registry",
+        "Container Registry",
+        "infra",
+        3,
+        "Microsoft.ContainerRegistry/registries",
+        "container_registry",
+        aliases=(r"container[\s-]registry", r"acr"),
+    ),
+    ServiceRule(
+        "storage-account",
+        "Storage Account",
+        "data",
+        4,
+        "Microsoft.Storage/storageAccounts",
+        "storage_account",
+        aliases=(
+            r"storage[\s-]accounts?",
+            r"blob[\s-]storage",
+            r"azure[\s-]storage",
+            r"data[\s-]lake(?:[\s-]storage)?",
+            r"adls(?:[\s-]?gen2)?",
+        ),
+        template_types=("storage",),
+    ),
+    ServiceRule(
+        "sql-database",
+        "SQL Database",
+        "data",
+        4,
+        "Microsoft.Sql/servers/databases",
+        "sql_database",
+        aliases=(r"azure[\s-]sql(?:[\s-]database)?", r"sql[\s-]database", r"sql[\s-]server"),
+    ),
+    ServiceRule(
+        "cosmos-db",
+        "Cosmos DB",
+        "data",
+        4,
+        "Microsoft.DocumentDB/databaseAccounts",
+        "cosmos_db",
+        aliases=(r"cosmos(?:[\s-]?db)?",),
+    ),
+    ServiceRule(
+        "postgresql",
+        "PostgreSQL",
+        "data",
+        4,
+        "Microsoft.DBforPostgreSQL/flexibleServers",
+        "postgresql",
+        aliases=(r"postgre(?:s|sql)",),
+    ),
+    ServiceRule("mysql", "MySQL", "data", 4, "Microsoft.DBforMySQL/flexibleServers", "mysql", aliases=(r"mysql",)),
+    ServiceRule(
+        "redis-cache",
+        "Redis Cache",
+        "data",
+        4,
+        "Microsoft.Cache/redis",
+        "redis_cache",
+        aliases=(r"redis(?:[\s-]cache)?",),
+    ),
+    ServiceRule(
+        "databricks",
+        "Databricks",
+        "data",
+        4,
+        "Microsoft.Databricks/workspaces",
+        "databricks",
+        aliases=(r"databricks",),
+        depends_on=("storage-account",),
+    ),
+    ServiceRule(
+        "data-factory",
+        "Data Factory",
+        "data",
+        4,
+        "Microsoft.DataFactory/factories",
+        "data_factory",
+        aliases=(r"data[\s-]factory", r"adf"),
+        depends_on=("storage-account", "sql-database", "cosmos-db"),
+    ),
+    ServiceRule(
+        "service-bus",
+        "Service Bus",
+        "data",
+        5,
+        "Microsoft.ServiceBus/namespaces",
+        "service_bus",
+        aliases=(r"service[\s-]bus",),
+    ),
+    ServiceRule(
+        "event-hub",
+        "Event Hubs",
+        "data",
+        5,
+        "Microsoft.EventHub/namespaces",
+        "event_hub",
+        aliases=(r"event[\s-]hubs?",),
+    ),
+    ServiceRule(
+        "event-grid",
+        "Event Grid",
+        "infra",
+        5,
+        "Microsoft.EventGrid/topics",
+        "event_grid",
+        aliases=(r"event[\s-]grid",),
+    ),
+    ServiceRule(
+        "signalr",
+        "SignalR",
+        "infra",
+        5,
+        "Microsoft.SignalRService/signalR",
+        "signalr",
+        aliases=(r"signal[\s-]?r",),
+    ),
+    ServiceRule(
+        "openai",
+        "Azure OpenAI",
+        "infra",
+        6,
+        "Microsoft.CognitiveServices/accounts",
+        "openai_account",
+        aliases=(r"open[\s-]?ai", r"aoai"),
+    ),
+    ServiceRule(
+        "cognitive-services",
+        "AI Services",
+        "infra",
+        6,
+        "Microsoft.CognitiveServices/accounts",
+        "cognitive_account",
+        aliases=(
+            r"cognitive[\s-]services?",
+            r"ai[\s-]services",
+            r"document[\s-]intelligence",
+            r"form[\s-]recognizer",
+            r"computer[\s-]vision",
+            r"speech[\s-]services?",
+            r"language[\s-]services?",
+        ),
+    ),
+    ServiceRule(
+        "ai-search",
+        "AI Search",
+        "infra",
+        6,
+        "Microsoft.Search/searchServices",
+        "search_service",
+        aliases=(r"(?:ai|cognitive)[\s-]search",),
+    ),
+    ServiceRule(
+        "container-app-environment",
+        "Container Apps Environment",
+        "infra",
+        7,
+        "Microsoft.App/managedEnvironments",
+        "container_app_environment",
+        aliases=(r"container[\s-]apps?[\s-]environments?", r"managed[\s-]environments?"),
+        depends_on=("log-analytics", "virtual-network"),
+        implies=("log-analytics",),
+    ),
+    ServiceRule(
+        "app-service-plan",
+        "App Service Plan",
+        "infra",
+        7,
+        "Microsoft.Web/serverfarms",
+        "app_service_plan",
+        aliases=(r"app[\s-]service[\s-]plans?",),
+        depends_on=("virtual-network",),
+    ),
+    ServiceRule(
+        "aks",
+        "Kubernetes Service",
+        "infra",
+        7,
+        "Microsoft.ContainerService/managedClusters",
+        "aks",
+        aliases=(r"aks", r"kubernetes(?:[\s-]service)?"),
+        depends_on=("virtual-network", "log-analytics", "container-registry"),
+    ),
+    ServiceRule(
+        "api-management",
+        "API Management",
+        "infra",
+        8,
+        "Microsoft.ApiManagement/service",
+        "api_management",
+        aliases=(r"api[\s-]management", r"apim"),
+        depends_on=("virtual-network", "key-vault", "application-insights"),
+    ),
+    ServiceRule(
+        "front-door",
+        "Front Door",
+        "infra",
+        8,
+        "Microsoft.Cdn/profiles",
+        "front_door",
+        aliases=(r"front[\s-]?door",),
+    ),
+    ServiceRule("cdn-profile", "CDN Profile", "infra", 8, "Microsoft.Cdn/profiles", "cdn_profile"),
+    ServiceRule(
+        "container-apps",
+        "Container App",
+        "app",
+        9,
+        "Microsoft.App/containerApps",
+        "container_app",
+        aliases=(r"container[\s-]apps?",),
+        depends_on=("container-app-environment", "container-registry", "key-vault"),
+        implies=("container-app-environment",),
+    ),
+    ServiceRule(
+        "functions",
+        "Function App",
+        "app",
+        9,
+        "Microsoft.Web/sites",
+        "function_app",
+        aliases=(r"azure[\s-]functions?", r"function[\s-]apps?"),
+        depends_on=("storage-account", "key-vault", "application-insights"),
+        implies=("storage-account",),
+    ),
+    ServiceRule(
+        "app-service",
+        "App Service",
+        "app",
+        9,
+        "Microsoft.Web/sites",
+        "app_service",
+        aliases=(r"app[\s-]services?(?![\s-]plan)", r"azure[\s-]web[\s-]apps?"),
+        depends_on=("app-service-plan", "key-vault", "application-insights"),
+        implies=("app-service-plan",),
+    ),
+    ServiceRule(
+        "static-web-app",
+        "Static Web App",
+        "app",
+        9,
+        "Microsoft.Web/staticSites",
+        "static_web_app",
+        aliases=(r"static[\s-]web[\s-]apps?",),
+    ),
+)
+
+_BY_TYPE: dict[str, ServiceRule] = {r.type: r for r in _RULES}
+_BY_TEMPLATE_TYPE: dict[str, ServiceRule] = {t: r for r in _RULES for t in (r.type, *r.template_types)}
+_BY_RESOURCE_TYPE: dict[str, list[str]] = {}
+for _rule in _RULES:
+    _BY_RESOURCE_TYPE.setdefault(_rule.resource_type.lower(), []).append(_rule.type)
+
+_ALIAS_RES: dict[str, re.Pattern] = {
+    r.type: re.compile(r"\b(?:" + "|".join(r.aliases) + r")\b", re.IGNORECASE) for r in _RULES if r.aliases
+}
+
+_FOUNDATION_TYPES = frozenset({"resource-group", "managed-identity"})
+_CATEGORY_RANK = {"infra": 0, "data": 0, "app": 1}
+
+# Services the rules deliberately do not plan — their stage boundaries
+# depend on the design (shared vs dedicated, manual steps, pipelines).
+_UNSUPPORTED_RE = re.compile(
+    r"\b(?:application[\s-]gateway|(?:azure[\s-])?firewall(?![\s-]rules?)|(?:azure[\s-])?bastion|nat[\s-]gateway"
+    r"|load[\s-]balancer|vpn[\s-]gateway|expressroute|traffic[\s-]manager|notification[\s-]hubs?|iot[\s-]hub"
+    r"|stream[\s-]analytics|synapse"
+    r"|logic[\s-]apps?|machine[\s-]learning|communication[\s-]services|spring[\s-]apps|digital[\s-]twins"
+    r"|purview|web[\s-]?pubsub|microsoft[\s-]fabric|virtual[\s-]machines?|ci/cd|github[\s-]actions"
+    r"|azure[\s-]pipelines)\b",
+    re.IGNORECASE,
+)
+
+# "Azure <Name>" phrases, to spot services the catalog does not know.
+_AZURE_PHRASE_RE = re.compile(r"\bAzure\s+([A-Z][\w-]*(?:\s+(?:for\s+)?[A-Z][\w-]*){0,3})")
+_AZURE_PHRASE_IGNORE = frozenset(
+    {
+        "ad", "active", "entra", "monitor", "policy", "policies", "devops", "portal", "cli", "powershell",
+        "subscription", "subscriptions", "region", "regions", "resource", "resources", "well-architected",
+        "landing", "rbac", "defender", "advisor", "sdk", "sdks", "identity", "verified", "cloud", "services",
+        "service", "cost", "role", "roles", "managed", "private", "native", "best", "architecture",
+        "government", "china", "marketplace", "bicep", "terraform", "developer", "tenant", "security",
+        "blueprints", "lighthouse", "arc", "dns", "free", "pricing", "support", "documentation", "account",
+        "naming", "tags", "quickstart", "samples", "functions", "storage", "sql",
+    }
+)  # fmt: skip
+
+_SEGMENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Cues that a mention is rejected or out of scope rather than planned:
+# before the mention ("instead of Cosmos DB") or after it, within the
+# same clause ("Redis caching is out of scope").
+_NEGATED_BEFORE_RE = re.compile(
+    r"\b(?:no|not|never|without|instead\s+of|rather\s+than|avoid(?:s|ed|ing)?|except|excluding|considered"
+    r"|reject(?:s|ed|ing)?|drop(?:s|ped|ping)?|won'?t\s+use|don'?t\s+use|do\s+not\s+use)\b",
+    re.IGNORECASE,
+)
+_NEGATED_AFTER_RE = re.compile(
+    r"\b(?:rejected|ruled\s+out|out\s+of\s+scope|excluded|deferred|dropped|optional|later\s+phase"
+    r"|future\s+phase|not\s+(?:needed|required|used|included|in\s+scope|part\s+of))\b",
+    re.IGNORECASE,
+)
+_CLAUSE_END_CHARS = ".;!?\n"
+
+# Designs with more catalog services than this are planned by the rules
+# but confirmed by the architect, who owns stage granularity.
+RULES_ONLY_MAX_SERVICES = 2
+_STAGE_DIR_RE = re.compile(r"^(.*?/?)stage-\d+(-.*)?$")
+
+
+def service_rule(service_type: str) -> ServiceRule | None:
+    """Return the catalog rule for a service or template type, if any."""
+    return _BY_TEMPLATE_TYPE.get(service_type)
+
+
+def service_category(service_type: str) -> str:
+    """Categorise a service type as ``infra``, ``data`` or ``app``."""
+    rule = service_rule(service_type)
+    return rule.category if rule else "app"
+
+
+# -------------------------------------------------------------------- #
+# Detection
+# -------------------------------------------------------------------- #
+
+
+@dataclass
+class PlannedService:
+    """One service instance that will get a deployment stage."""
+
+    type: str
+    name: str = ""
+    tier: str = ""
+    source: str = "architecture"  # architecture | template | implied
+
+    @property
+    def rule(self) -> ServiceRule:
+        return _BY_TYPE[self.type]
+
+
+@dataclass
+class Detection:
+    """Services recognised in an architecture (plus matched templates)."""
+
+    services: list[PlannedService] = field(default_factory=list)
+    unknown: list[str] = field(default_factory=list)
+    # Services mentioned only as rejected or out of scope (not planned)
+    excluded: list[str] = field(default_factory=list)
+    # Any negated mention, even of a service that is also planned
+    negated: bool = False
+    from_architecture: bool = False
+
+    @property
+    def types(self) -> set[str]:
+        return {s.type for s in self.services}
+
+    @property
+    def ambiguous(self) -> bool:
+        """True when the architect should decide instead of the rules."""
+        return bool(self.unknown) or self.negated or not self.from_architecture
+
+    @property
+    def needs_review(self) -> bool:
+        """True when the architect should confirm the rule-based draft.
+
+        Only small, unambiguous designs (at most
+        :data:`RULES_ONLY_MAX_SERVICES` services named in the
+        architecture) are planned by the rules alone.
+        """
+        named = sum(1 for s in self.services if s.source == "architecture")
+        return self.ambiguous or named > RULES_ONLY_MAX_SERVICES
+
+
+def detect_services(architecture: str, templates: list | None = None) -> Detection:
+    """Extract the services an architecture (and its templates) describes.
+
+    Template services come first, keeping their own names and tiers; the
+    architecture then adds every catalog service it mentions that no
+    template already covers, followed by services those imply (e.g. a
+    Container Apps environment for container apps).  A service mentioned
+    only as rejected or out of scope ("we considered Cosmos DB but
+    rejected it") is not planned; it is listed in ``excluded`` and makes
+    the design ambiguous.
+    """
+    detection = Detection()
+    text = architecture or ""
+
+    # Architecture mentions, in order of first appearance
+    spans: list[tuple[int, int]] = []
+    hits: list[tuple[int, int, str]] = []
+    for svc_type, pattern in _ALIAS_RES.items():
+        for m in pattern.finditer(text):
+            hits.append((m.start(), m.end(), svc_type))
+            spans.append(m.span())
+    hits.sort()
+
+    mentioned: list[tuple[int, str]] = []
+    negated_types: dict[str, str] = {}
+    affirmed: set[str] = set()
+    for i, (start, end, svc_type) in enumerate(hits):
+        prev_end = hits[i - 1][1] if i else 0
+        next_start = hits[i + 1][0] if i + 1 < len(hits) else len(text)
+        if _is_negated(text, start, end, prev_end, next_start):
+            negated_types.setdefault(svc_type, text[start:end])
+            continue
+        if svc_type not in affirmed:
+            affirmed.add(svc_type)
+            mentioned.append((start, svc_type))
+    detection.negated = bool(negated_types)
+    detection.excluded = [name for svc_type, name in negated_types.items() if svc_type not in affirmed]
+    detection.from_architecture = bool(mentioned)
+
+    unknown: list[str] = []
+    for m in _UNSUPPORTED_RE.finditer(text):
+        unknown.append(m.group(0))
+        spans.append(m.span())
+    for m in _AZURE_PHRASE_RE.finditer(text):
+        phrase = m.group(1)
+        if phrase.split()[0].lower() in _AZURE_PHRASE_IGNORE:
+            continue
+        if any(start < m.end() and m.start(1) < end for start, end in spans):
+            continue
+        unknown.append(f"Azure {phrase}")
+
+    # Template services.  A template instance also covers other catalog
+    # types with the same ARM resource (e.g. OpenAI on cognitive-services).
+    covered: set[str] = set()
+    for t in templates or []:
+        for svc in getattr(t, "services", []):
+            rule = service_rule(svc.type)
+            if rule is None:
+                unknown.append(f"{svc.name} ({svc.type})")
+                continue
+            detection.services.append(PlannedService(rule.type, svc.name, svc.tier or "", "template"))
+            covered.update(_BY_RESOURCE_TYPE[rule.resource_type.lower()])
+
+    for _, svc_type in mentioned:
+        if svc_type not in covered:
+            detection.services.append(PlannedService(svc_type))
+            covered.add(svc_type)
+
+    # Implied services (transitively)
+    idx = 0
+    while idx < len(detection.services):
+        for implied in detection.services[idx].rule.implies:
+            if implied not in covered:
+                detection.services.append(PlannedService(implied, source="implied"))
+                covered.add(implied)
+        idx += 1
+
+    detection.unknown = list(dict.fromkeys(u.strip() for u in unknown))
+    return detection
+
+
+def _is_negated(text: str, start: int, end: int, prev_end: int, next_start: int) -> bool:
+    """Whether the mention at ``text[start:end]`` is rejected or out of scope.
+
+    Only the part of its clause between the neighbouring service
+    mentions is considered, so "SQL Database instead of Cosmos DB"
+    negates Cosmos DB but not SQL Database.
+    """
+    clause_start = max(text.rfind(c, 0, start) for c in _CLAUSE_END_CHARS) + 1
+    clause_ends = [i for i in (text.find(c, end) for c in _CLAUSE_END_CHARS) if i >= 0]
+    clause_end = min(clause_ends, default=len(text))
+    before = text[max(clause_start, prev_end) : start]
+    after = text[end : min(clause_end, next_start)]
+    return bool(_NEGATED_BEFORE_RE.search(before) or _NEGATED_AFTER_RE.search(after))
+
+
+# -------------------------------------------------------------------- #
+# Planner
+# -------------------------------------------------------------------- #
+
+
+class DeploymentPlanner:
+    """Turn detected services into deployment stages and plan diffs.
+
+    Parameters
+    ----------
+    iac_tool:
+        ``terraform`` or ``bicep`` — used in infrastructure stage dirs.
+    naming:
+        Naming strategy used to compute resource names.
+    project_name:
+        Project name, the service segment for singleton resources.
+    """
+
+    def __init__(self, iac_tool: str, naming: Any, project_name: str) -> None:
+        self._iac_tool = iac_tool
+        self._naming = naming
+        self._project_name = project_name
+
+    # ------------------------------------------------------------------ #
+    # Plan derivation
+    # ------------------------------------------------------------------ #
+
+    def plan(self, detection: Detection) -> list[dict]:
+        """Build a numbered stage list: Foundation, services, Documentation."""
+        stages = [self._foundation_stage()]
+        for svc in self._ordered(s for s in detection.services if s.type not in _FOUNDATION_TYPES):
+            stages.append(self.build_stage(svc))
+        stages.append(
+            {
+                "name": "Documentation",
+                "category": "docs",
+                "dir": "concept/docs",
+                "services": [],
+                "status": "pending",
+                "files": [],
+                "deploy_mode": "auto",
+                "manual_instructions": None,
+            }
+        )
+        return renumber(stages)
+
+    def build_stage(self, svc: PlannedService) -> dict:
+        """Return a stage dict (numbered 0 until renumbered) for *svc*."""
+        rule = svc.rule
+        slug = svc.name or rule.type
+        name = svc.name.replace("-", " ").title() if svc.name else rule.display
+        if rule.category == "app":
+            stage_dir = f"concept/apps/stage-0-{slug}"
+        else:
+            stage_dir = f"concept/infra/{self._iac_tool}/stage-0-{slug}"
+        return {
+            "stage": 0,
+            "name": name,
+            "category": rule.category,
+            "dir": stage_dir,
+            "services": [
+                {
+                    "name": slug,
+                    "computed_name": self._naming.resolve(rule.naming_key, svc.name or self._project_name),
+                    "resource_type": rule.resource_type,
+                    "sku": svc.tier,
+                }
+            ],
+            "status": "pending",
+            "files": [],
+            "deploy_mode": "auto",
+            "manual_instructions": None,
+        }
+
+    def _foundation_stage(self) -> dict:
+        return {
+            "stage": 0,
+            "name": "Foundation",
+            "category": "infra",
+            "dir": f"concept/infra/{self._iac_tool}/stage-0-foundation",
+            "services": [
+                {
+                    "name": rule.type,
+                    "computed_name": self._naming.resolve(rule.naming_key, self._project_name),
+                    "resource_type": rule.resource_type,
+                    "sku": "",
+                }
+                for rule in (_BY_TYPE["resource-group"], _BY_TYPE["managed-identity"])
+            ],
+            "status": "pending",
+            "files": [],
+            "deploy_mode": "auto",
+            "manual_instructions": None,
+        }
+
+    @staticmethod
+    def _ordered(services) -> list[PlannedService]:
+        """Kahn's algorithm over ``depends_on``, ties by (category, layer, appearance)."""
+        services = list(services)
+        by_type: dict[str, list[int]] = {}
+        for i, svc in enumerate(services):
+            by_type.setdefault(svc.type, []).append(i)
+
+        indegree = [0] * len(services)
+        dependents: dict[int, list[int]] = {i: [] for i in range(len(services))}
+        for i, svc in enumerate(services):
+            for dep in svc.rule.depends_on:
+                for j in by_type.get(dep, []):
+                    dependents[j].append(i)
+                    indegree[i] += 1
+
+        def key(i: int) -> tuple:
+            rule = services[i].rule
+            return (_CATEGORY_RANK[rule.category], rule.layer, i)
+
+        ready = [key(i) for i in range(len(services)) if indegree[i] == 0]
+        heapq.heapify(ready)
+        order: list[int] = []
+        while ready:
+            i = heapq.heappop(ready)[-1]
+            order.append(i)
+            for j in dependents[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    heapq.heappush(ready, key(j))
+        # Cycles cannot come from the catalog, but never drop a service
+        order.extend(sorted((i for i in range(len(services)) if i not in set(order)), key=key))
+        return [services[i] for i in order]
+
+    # ------------------------------------------------------------------ #
+    # Design diff
+    # ------------------------------------------------------------------ #
+
+    def diff(
+        self, old_arch: str, new_arch: str, existing_stages: list[dict], templates: list | None = None
+    ) -> dict | None:
+        """Structurally compare two architectures against the current plan.
+
+        Returns the same shape as the architect's diff response, or
+        ``None`` when either design is ambiguous or a stage cannot be
+        mapped to catalog services.
+        """
+        old = detect_services(old_arch, templates)
+        new = detect_services(new_arch, templates)
+        if old.ambiguous or new.ambiguous:
+            return None
+
+        stage_types: dict[int, set[str]] = {}
+        for stage in existing_stages:
+            if stage.get("category") == "docs":
+                continue
+            types = self.stage_types(stage, old.types | new.types)
+            if types is None:
+                return None
+            stage_types[stage["stage"]] = types
+
+        removed_types = old.types - new.types
+        planned = set().union(*stage_types.values()) if stage_types else set()
+        changed_types = {t for t in old.types & new.types if _mentions(old_arch, t) != _mentions(new_arch, t)}
+
+        unchanged: list[int] = []
+        modified: list[int] = []
+        removed: list[int] = []
+        for num, types in stage_types.items():
+            real = types - _FOUNDATION_TYPES
+            if real and real <= removed_types:
+                removed.append(num)
+            elif types & (removed_types | changed_types):
+                modified.append(num)
+            else:
+                unchanged.append(num)
+
+        added_services = [s for s in new.services if s.type not in old.types and s.type not in planned]
+        added = [self.build_stage(s) for s in self._ordered(added_services) if s.type not in _FOUNDATION_TYPES]
+
+        if removed or added or modified:
+            docs = [s["stage"] for s in existing_stages if s.get("category") == "docs"]
+            modified.extend(docs)
+        else:
+            unchanged.extend(s["stage"] for s in existing_stages if s.get("category") == "docs")
+
+        # A new service that existing stages depend on changes their wiring
+        # and deployment order — that needs a full re-derive.
+        restructured = any(s.type in _BY_TYPE[t].depends_on for s in added_services for t in planned if t in _BY_TYPE)
+
+        return {
+            "unchanged": sorted(unchanged),
+            "modified": sorted(modified),
+            "removed": sorted(removed),
+            "added": [{k: v for k, v in s.items() if k != "stage"} for s in added],
+            "plan_restructured": restructured,
+            "summary": _diff_summary(removed_types, added, len(modified)),
+        }
+
+    @staticmethod
+    def stage_types(stage: dict, hints: set[str] | None = None) -> set[str] | None:
+        """Map a stage's services to catalog types, or ``None`` if any is unknown."""
+        types: set[str] = set()
+        for svc in stage.get("services", []):
+            svc_type = _service_type(svc, hints or set())
+            if svc_type is None:
+                return None
+            types.add(svc_type)
+        if not types and stage.get("name", "").lower() == "foundation":
+            types.add("resource-group")
+        return types or None
+
+    # ------------------------------------------------------------------ #
+    # Plan adjustment
+    # ------------------------------------------------------------------ #
+
+    def apply_feedback(self, stages: list[dict], feedback: str) -> list[dict] | None:
+        """Apply simple edit requests to *stages*.
+
+        Understands "remove stage 3", "remove stages 2 and 4", "remove
+        redis" and "add key vault".  Anything else returns ``None`` so
+        the architect handles it.
+        """
+        text = feedback.strip().rstrip(".!").strip()
+
+        m = _REMOVE_STAGES_RE.fullmatch(text)
+        if m:
+            nums = {int(n) for n in re.findall(r"\d+", m.group(1))}
+            existing = {s["stage"] for s in stages}
+            if not nums <= existing:
+                return None
+            return renumber([copy.deepcopy(s) for s in stages if s["stage"] not in nums])
+
+        m = _REMOVE_SERVICE_RE.fullmatch(text)
+        if m:
+            svc_type = _target_type(m.group(1))
+            if svc_type is None or svc_type in _FOUNDATION_TYPES:
+                return None
+            result: list[dict] = []
+            found = False
+            for stage in stages:
+                types = self.stage_types(stage, {svc_type})
+                if types and svc_type in types:
+                    found = True
+                    if types == {svc_type}:
+                        continue
+                    stage = copy.deepcopy(stage)
+                    stage["services"] = [s for s in stage["services"] if _service_type(s, {svc_type}) != svc_type]
+                    result.append(stage)
+                else:
+                    result.append(copy.deepcopy(stage))
+            return renumber(result) if found else None
+
+        m = _ADD_SERVICE_RE.fullmatch(text)
+        if m:
+            svc_type = _target_type(m.group(1))
+            if svc_type is None or svc_type in _FOUNDATION_TYPES:
+                return None
+            rule = _BY_TYPE[svc_type]
+            if any(svc_type in (self.stage_types(s, {svc_type}) or set()) for s in stages):
+                return None
+            rank = (_CATEGORY_RANK[rule.category], rule.layer)
+            insert_at = len(stages)
+            for i, stage in enumerate(stages):
+                if stage.get("category") == "docs" or _stage_rank(stage) > rank:
+                    insert_at = i
+                    break
+            result = [copy.deepcopy(s) for s in stages]
+            result.insert(insert_at, self.build_stage(PlannedService(svc_type)))
+            return renumber(result)
+
+        return None
+
+
+_REMOVE_STAGES_RE = re.compile(
+    r"(?:please\s+)?(?:remove|drop|delete|skip)\s+stages?\s+(\d+(?:\s*(?:,|and|&)\s*\d+)*)", re.IGNORECASE
+)
+_REMOVE_SERVICE_RE = re.compile(r"(?:please\s+)?(?:remove|drop|delete)\s+(?:the\s+)?(.+?)(?:\s+stage)?", re.IGNORECASE)
+_ADD_SERVICE_RE = re.compile(r"(?:please\s+)?add\s+(?:an?\s+|the\s+)?(.+?)(?:\s+stage)?", re.IGNORECASE)
+
+
+# -------------------------------------------------------------------- #
+# Helpers
+# -------------------------------------------------------------------- #
+
+
+def renumber(stages: list[dict]) -> list[dict]:
+    """Number stages from 1 and rewrite ``stage-N`` in their dirs to match."""
+    for idx, stage in enumerate(stages, start=1):
+        stage["stage"] = idx
+        match = _STAGE_DIR_RE.match(stage.get("dir", ""))
+        if match:
+            stage["dir"] = f"{match.group(1)}stage-{idx}{match.group(2) or ''}"
+    return stages
+
+
+def _target_type(phrase: str) -> str | None:
+    """Resolve a free-text service phrase to exactly one catalog type."""
+    phrase = phrase.strip()
+    if phrase.lower() in _BY_TEMPLATE_TYPE:
+        return _BY_TEMPLATE_TYPE[phrase.lower()].type
+    hits = [t for t, pattern in _ALIAS_RES.items() if pattern.fullmatch(phrase)]
+    if not hits:
+        bare = re.sub(r"^azure\s+", "", phrase, flags=re.IGNORECASE)
+        hits = [t for t, pattern in _ALIAS_RES.items() if pattern.fullmatch(bare)]
+    return hits[0] if len(hits) == 1 else None
+
+
+def _service_type(svc: dict, hints: set[str]) -> str | None:
+    """Map a plan service entry (name / resource_type) to a catalog type."""
+    name = str(svc.get("name", "")).lower()
+    if name in _BY_TEMPLATE_TYPE:
+        return _BY_TEMPLATE_TYPE[name].type
+    by_name = [t for t, pattern in _ALIAS_RES.items() if pattern.search(name.replace("-", " "))]
+    if len(by_name) == 1:
+        return by_name[0]
+    candidates = _BY_RESOURCE_TYPE.get(str(svc.get("resource_type", "")).lower(), [])
+    if len(candidates) == 1:
+        return candidates[0]
+    narrowed = [t for t in candidates if t in hints] or [t for t in by_name if t in hints]
+    return narrowed[0] if len(narrowed) == 1 else None
+
+
+def _stage_rank(stage: dict) -> tuple[int, int]:
+    rules = [_BY_TYPE[t] for t in (DeploymentPlanner.stage_types(stage) or ()) if t in _BY_TYPE]
+    if rules:
+        return max((_CATEGORY_RANK[r.category], r.layer) for r in rules)
+    return (_CATEGORY_RANK.get(stage.get("category", "infra"), 1), 0)
+
+
+def _mentions(text: str, svc_type: str) -> set[str]:
+    """Normalised sentences of *text* that mention *svc_type*."""
+    pattern = _ALIAS_RES.get(svc_type)
+    if pattern is None:
+        return set()
+    return {" ".join(seg.lower().split()) for seg in _SEGMENT_SPLIT_RE.split(text) if pattern.search(seg)}
+
+
+def _diff_summary(removed: set[str], added: list[dict], modified: int) -> str:
+    parts = []
+    if added:
+        parts.append("Added " + ", ".join(s["name"] for s in added))
+    if removed:
+        parts.append("removed " + ", ".join(_BY_TYPE[t].display for t in sorted(removed)))
+    if modified:
+        parts.append(f"{modified} stage(s) affected")
+    if not parts:
+        return "No service changes detected."
+    summary = "; ".join(parts)
+    return summary[0].upper() + summary[1:] + "."
@@ -14,8 +14,11 @@ from __future__ import annotations
 
 import json
 import logging
+import queue
 import re
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -38,6 +41,9 @@ _NEW_SECTION_RE = re.compile(
     re.DOTALL,
 )
 
+# Upper bound on concurrent section calls in parallel generation mode
+_MAX_SECTION_WORKERS = 6
+
 
 def _format_section_elapsed(seconds: float) -> str:
     """Format elapsed seconds as ``12s`` or ``1m04s`` when >= 60."""
@@ -48,6 +54,73 @@ def _format_section_elapsed(seconds: float) -> str:
     return f"{minutes}m{secs:02d}s"
 
 
+def _section_headings(markdown: str) -> list[str]:
+    """Names of the ``##`` section headings in *markdown*, in order."""
+    return [ln[3:].strip() for ln in markdown.splitlines() if ln.startswith("## ")]
+
+
+def _split_sections(markdown: str) -> list[str]:
+    """Split *markdown* into chunks that each start at a ``##`` heading.
+
+    Text before the first heading is its own chunk; joining the chunks
+    gives back *markdown*.
+    """
+    starts = [m.start() for m in re.finditer(r"^## ", markdown, re.MULTILINE)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [markdown[a:b] for a, b in zip(starts, starts[1:] + [len(markdown)])]
+
+
+def _apply_consistency_edits(draft: str, content: str) -> str | None:
+    """Apply the consistency pass's JSON edit set to *draft*.
+
+    The edit set is ``{"renames": {old: new}, "edits": [{"section",
+    "find", "replace"}]}``.  Renames apply to section bodies only; an
+    edit replaces the first occurrence of ``find`` in its section.  Edits
+    whose text is not found, or that would add, drop or rename a section
+    heading, are skipped.  Returns ``None`` when *content* is not an
+    edit set.
+    """
+    fence_match = re.search(r"```(?:json)?\s*\n(.*?)```", content, re.DOTALL)
+    try:
+        edit_set = json.loads(fence_match.group(1) if fence_match else content.strip())
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if not isinstance(edit_set, dict):
+        return None
+
+    chunks = _split_sections(draft)
+    for edit in edit_set.get("edits") or []:
+        if not isinstance(edit, dict) or not isinstance(edit.get("find"), str) or not edit["find"]:
+            continue
+        section = str(edit.get("section") or "").strip().lower()
+        for i, chunk in enumerate(chunks):
+            headings = _section_headings(chunk)
+            if section and [h.lower() for h in headings] != [section]:
+                continue
+            if edit["find"] not in chunk:
+                continue
+            edited = chunk.replace(edit["find"], str(edit.get("replace") or ""), 1)
+            if _section_headings(edited) == headings:
+                chunks[i] = edited
+            else:
+                logger.info("Skipping consistency edit that changes section headings")
+            break
+
+    renames = edit_set.get("renames") or {}
+    if isinstance(renames, dict):
+        for old, new in renames.items():
+            if not isinstance(old, str) or not old.strip() or not isinstance(new, str):
+                continue
+            pattern = re.compile(rf"(?<![\w-]){re.escape(old)}(?![\w-])")
+            for i, chunk in enumerate(chunks):
+                heading, sep, body = chunk.partition("\n") if chunk.startswith("## ") else ("", "", chunk)
+                chunks[i] = heading + sep + pattern.sub(lambda _m, n=new: n, body)
+
+    result = "".join(chunks)
+    return result if _section_headings(result) == _section_headings(draft) else None
+
+
 def _extract_new_sections(content: str) -> list[dict]:
     """Parse ``[NEW_SECTION: {...}]`` markers from AI response content."""
     results = []
@@ -116,6 +189,7 @@ class DesignStage(BaseStage):
         reset = kwargs.get("reset", False)
         interactive = kwargs.get("interactive", False)
         skip_discovery = kwargs.get("skip_discovery", False)
+        parallel_sections = kwargs.get("parallel_sections", False)
         # Accept injected I/O callables (for tests / TUI)
         input_fn = kwargs.get("input_fn")
         print_fn = kwargs.get("print_fn")
@@ -160,6 +234,11 @@ class DesignStage(BaseStage):
             result = self._read_artifacts_with_progress(artifacts_path, ui)
             artifact_content = result["content"]
             artifact_images = result.get("images", [])
+            image_stats = None
+            if artifact_images:
+                from azext_prototype.parsers.image_pipeline import process_images
+
+                artifact_images, image_stats = process_images(artifact_images, agent_context.project_dir)
 
             if result["read"]:
                 _print(f"  Read {len(result['read'])} file(s):")
@@ -173,6 +252,8 @@ class DesignStage(BaseStage):
                 _print(
                     f"  [bright_cyan]\u2192[/bright_cyan] Extracted {len(artifact_images)} image(s) for vision analysis"
                 )
+                if image_stats and (image_stats.duplicates or image_stats.bytes_saved):
+                    _print(f"    [dim]{image_stats.summary()}[/dim]")
 
             if result["failed"]:
                 _print(f"  Could not read {len(result['failed'])} file(s):")
@@ -287,7 +368,9 @@ class DesignStage(BaseStage):
 
         primary_architect = architect_agents[0]
 
-        # 4. Plan and generate architecture iteratively (per-section)
+        # 4. Plan and generate architecture per section — iteratively, or
+        #    all at once followed by a consistency pass (parallel mode)
+        parallel_sections = parallel_sections or bool(config.get("design.parallel_sections", False))
         sections = self._plan_architecture(
             ui,
             agent_context,
@@ -317,6 +400,7 @@ class DesignStage(BaseStage):
             section_fn=section_fn,
             update_task_fn=update_task_fn,
             status_fn=status_fn,
+            parallel=parallel_sections,
         )
 
         if update_task_fn:
@@ -628,12 +712,30 @@ class DesignStage(BaseStage):
         section_fn=None,
         update_task_fn=None,
         status_fn=None,
+        parallel: bool = False,
     ) -> tuple[str, dict]:
         """Generate each architecture section iteratively.
 
         Returns ``(full_markdown, merged_usage)`` where *merged_usage*
         accumulates token counts across all section calls.
+
+        When *parallel* is true the work is delegated to
+        :meth:`_generate_sections_parallel`.
         """
+        if parallel:
+            return self._generate_sections_parallel(
+                ui,
+                agent_context,
+                architect,
+                config,
+                sections,
+                additional_context,
+                _print,
+                section_fn=section_fn,
+                update_task_fn=update_task_fn,
+                status_fn=status_fn,
+            )
+
         cfg = config.to_dict()
         name = cfg.get("project", {}).get("name", "unnamed")
         region = cfg.get("project", {}).get("location", "eastus")
@@ -703,31 +805,10 @@ class DesignStage(BaseStage):
             spinner_msg = f"Generating architecture ({section_name})..."
             if ui and not status_fn:
                 with ui.spinner(spinner_msg):
-                    response = architect.execute(agent_context, prompt)
+                    response = self._execute_section(architect, agent_context, prompt, section_name)
             else:
                 _print(spinner_msg)
-                response = architect.execute(agent_context, prompt)
-
-            # Handle truncation for this section
-            for _ in range(3):
-                if response.finish_reason != "length":
-                    break
-                logger.info("Section '%s' truncated, requesting continuation", section_name)
-                cont_task = (
-                    "Your previous response was cut off. Continue EXACTLY where "
-                    "you left off — do not repeat any content already generated. "
-                    "Pick up mid-sentence if necessary."
-                )
-                cont = architect.execute(agent_context, cont_task)
-                response = type(response)(
-                    content=response.content + cont.content,
-                    model=cont.model,
-                    usage={
-                        k: response.usage.get(k, 0) + cont.usage.get(k, 0)
-                        for k in set(response.usage) | set(cont.usage)
-                    },
-                    finish_reason=cont.finish_reason,
-                )
+                response = self._execute_section(architect, agent_context, prompt, section_name)
 
             section_elapsed = time.monotonic() - section_start
             elapsed_str = _format_section_elapsed(section_elapsed)
@@ -758,6 +839,222 @@ class DesignStage(BaseStage):
 
         return "\n\n".join(accumulated), merged_usage
 
+    def _generate_sections_parallel(
+        self,
+        ui: Console | None,
+        agent_context: AgentContext,
+        architect,
+        config: ProjectConfig,
+        sections: list[dict],
+        additional_context: str,
+        _print,
+        section_fn=None,
+        update_task_fn=None,
+        status_fn=None,
+    ) -> tuple[str, dict]:
+        """Generate all planned sections concurrently, then reconcile them.
+
+        Each section prompt carries only the shared plan summary and the
+        requirements — never other sections — so every section can be
+        requested at once and wall time approaches that of the slowest
+        section.  ``[NEW_SECTION:]`` markers found in a wave are generated
+        in a follow-up wave.  A single consistency pass then reconciles
+        names, cross-references and duplicated content across the draft:
+        the architect returns only renames and targeted edits, which are
+        applied locally, so the pass does not regenerate the document.
+
+        Returns ``(full_markdown, merged_usage)`` like the iterative path.
+        """
+        cfg = config.to_dict()
+        name = cfg.get("project", {}).get("name", "unnamed")
+        region = cfg.get("project", {}).get("location", "eastus")
+        iac_tool = cfg.get("project", {}).get("iac_tool", "terraform")
+
+        merged_usage: dict[str, int] = {}
+        contents: list[str] = []
+
+        def _plan_summary() -> str:
+            return "\n".join(f"- {s['name']}: {s.get('context', '')}" for s in sections)
+
+        def _section_prompt(section: dict, plan_summary: str) -> str:
+            section_name = section["name"]
+            return (
+                f"## Task\n"
+                f'Generate the "{section_name}" section of the architecture document.\n\n'
+                f"## Section Focus\n{section.get('context', '')}\n\n"
+                f"## Project Context\n"
+                f"- Name: {name}, Region: {region}, IaC: {iac_tool}\n\n"
+                f"## Requirements\n{additional_context}\n\n"
+                f"## Architecture Plan\n{plan_summary}\n\n"
+                f"## Instructions\n"
+                f'Generate ONLY the "{section_name}" section. Use markdown with a ## heading.\n'
+                f"The other sections in the plan are being written at the same time. Refer to them "
+                f"by name where relevant instead of repeating their content, and use the service "
+                f"names from the requirements so the sections agree.\n"
+                f"If while writing this section you determine an additional section is needed "
+                f"that is not in the architecture plan, include a line at the very end:\n"
+                f'[NEW_SECTION: {{"name": "Section Name", "context": "Brief description"}}]'
+            )
+
+        use_spinner = bool(ui and not status_fn)
+        if status_fn:
+            status_fn("Generating architecture...", "start")
+
+        wave = list(sections)
+        while wave:
+            plan_summary = _plan_summary()
+            spinner_msg = f"Generating architecture ({len(wave)} sections in parallel)..."
+            if not use_spinner:
+                _print(spinner_msg)
+            with ui.spinner(spinner_msg) if use_spinner and ui is not None else nullcontext():
+                responses = self._run_section_wave(
+                    wave,
+                    lambda s, summary=plan_summary: _section_prompt(s, summary),
+                    architect,
+                    agent_context,
+                    _print,
+                    update_task_fn,
+                )
+
+            next_wave: list[dict] = []
+            for response in responses:
+                contents.append(_NEW_SECTION_RE.sub("", response.content).rstrip())
+                for k, v in response.usage.items():
+                    merged_usage[k] = merged_usage.get(k, 0) + v
+                for ns in _extract_new_sections(response.content):
+                    if not any(s["name"].lower() == ns["name"].lower() for s in sections):
+                        sections.append(ns)
+                        next_wave.append(ns)
+                        if section_fn:
+                            section_fn([(ns["name"], 3)])
+            wave = next_wave
+
+        draft = "\n\n".join(contents)
+
+        # Single consistency pass over the assembled draft
+        if section_fn:
+            section_fn([("Consistency Review", 3)])
+        if update_task_fn:
+            update_task_fn("design-section-consistency-review", "in_progress")
+
+        review_prompt = (
+            "## Task\n"
+            "The sections below were written in parallel from the same plan. List the edits "
+            "that make them one consistent architecture document.\n\n"
+            f"## Architecture Plan\n{_plan_summary()}\n\n"
+            f"## Draft Document\n{draft}\n\n"
+            "## Instructions\n"
+            "- Find service names, SKUs, resource names and cross-references that disagree between sections.\n"
+            "- Find content duplicated across sections; it belongs in one section only.\n"
+            "- Do NOT rewrite the document. Return ONLY a JSON object of edits:\n"
+            "```json\n"
+            '{"renames": {"name used in some sections": "name to use everywhere"},\n'
+            ' "edits": [{"section": "Section Name", "find": "exact text in that section", '
+            '"replace": "replacement text"}]}\n'
+            "```\n"
+            "- Copy `find` verbatim from the draft; an empty `replace` removes the text.\n"
+            "- Never change ## headings. Return `{}` when the sections already agree."
+        )
+        review_start = time.monotonic()
+        with ui.spinner("Reconciling architecture sections...") if use_spinner and ui is not None else nullcontext():
+            review = self._execute_section(architect, agent_context, review_prompt, "Consistency Review")
+        for k, v in review.usage.items():
+            merged_usage[k] = merged_usage.get(k, 0) + v
+
+        output = _apply_consistency_edits(draft, review.content or "")
+        if output is None:
+            logger.warning("Consistency pass returned no usable edits, keeping the parallel draft")
+            output = draft
+        _print(f"  Consistency Review...Done. ({_format_section_elapsed(time.monotonic() - review_start)})")
+
+        if update_task_fn:
+            update_task_fn("design-section-consistency-review", "completed")
+        if status_fn:
+            status_fn("Generating architecture...", "end")
+
+        return output, merged_usage
+
+    def _run_section_wave(
+        self,
+        wave: list[dict],
+        prompt_for,
+        architect,
+        agent_context: AgentContext,
+        _print,
+        update_task_fn=None,
+    ) -> list:
+        """Generate *wave* concurrently, returning responses in plan order.
+
+        Progress callbacks run on the calling thread: a section is marked
+        in progress when a worker picks it up and completed (with its
+        elapsed time) as soon as it finishes.  The first section error is
+        re-raised, as in the iterative path.
+        """
+        started: queue.SimpleQueue = queue.SimpleQueue()
+        results: list = [None] * len(wave)
+
+        def _task_id(section: dict) -> str:
+            return "design-section-" + re.sub(r"[^a-z0-9]+", "-", section["name"].lower()).strip("-")
+
+        def _generate(idx: int):
+            started.put(idx)
+            section_start = time.monotonic()
+            response = self._execute_section(architect, agent_context, prompt_for(wave[idx]), wave[idx]["name"])
+            return response, time.monotonic() - section_start
+
+        def _report_started() -> None:
+            while True:
+                try:
+                    idx = started.get_nowait()
+                except queue.Empty:
+                    return
+                if update_task_fn:
+                    update_task_fn(_task_id(wave[idx]), "in_progress")
+
+        with ThreadPoolExecutor(max_workers=min(len(wave), _MAX_SECTION_WORKERS)) as pool:
+            futures = {pool.submit(_generate, idx): idx for idx in range(len(wave))}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                _report_started()
+                for future in done:
+                    idx = futures[future]
+                    response, elapsed = future.result()
+                    results[idx] = response
+                    _print(f"  {wave[idx]['name']}...Done. ({_format_section_elapsed(elapsed)})")
+                    if update_task_fn:
+                        update_task_fn(_task_id(wave[idx]), "completed")
+
+        return results
+
+    @staticmethod
+    def _execute_section(architect, agent_context: AgentContext, prompt: str, section_name: str):
+        """Run one section prompt, requesting continuations when truncated."""
+        response = architect.execute(agent_context, prompt)
+        for _ in range(3):
+            if response.finish_reason != "length":
+                break
+            logger.info("Section '%s' truncated, requesting continuation", section_name)
+            cont_task = (
+                f"{prompt}\n\n"
+                "## Partial Response\n"
+                "Your response to the task above was cut off after this text:\n\n"
+                f"{response.content}\n\n"
+                "## Continuation\n"
+                "Continue EXACTLY where the partial response stops — do not repeat "
+                "any content already generated. Pick up mid-sentence if necessary."
+            )
+            cont = architect.execute(agent_context, cont_task)
+            response = type(response)(
+                content=response.content + cont.content,
+                model=cont.model,
+                usage={
+                    k: response.usage.get(k, 0) + cont.usage.get(k, 0) for k in set(response.usage) | set(cont.usage)
+                },
+                finish_reason=cont.finish_reason,
+            )
+        return response
+
     # ------------------------------------------------------------------
     # Design task composition
     # ------------------------------------------------------------------
@@ -0,0 +1,470 @@
+"""Deploy error signatures — recognise known failures before asking the AI.
+
+Deploy remediation normally costs four model round trips (QA diagnosis,
+architect guidance, the fix itself, a downstream-impact check).  Many
+failures are well known and need none of that.  This module keeps a
+small, versioned database of error signatures mapped to known fixes:
+
+- **Built-in signatures** — regular expressions for common Azure and
+  Terraform failures (provider not registered, duplicate
+  ``required_providers``, name already taken, SKU not available).  A
+  missing provider registration is fixed locally without any agent; the
+  rest carry a ready-made diagnosis and guidance for the fix agent.
+- **Learned signatures** — normalized error fingerprints recorded from
+  successful remediations and from blockers resolved in the
+  :class:`~.escalation.EscalationTracker`.  A repeat of the same failure
+  replays the recorded diagnosis and guidance instead of asking again.
+
+Matching is a handful of precompiled regular expressions plus one dict
+lookup.  Learned signatures persist to
+``.prototype/state/error_signatures.yaml``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the built-in signatures or the normalization change;
+# learned signatures from an older version are discarded on load.
+SIGNATURE_DB_VERSION = 2
+
+# Fix actions
+ACTION_REGISTER_PROVIDER = "register_provider"
+ACTION_GUIDANCE = "guidance"
+
+# A learned signature that keeps failing is forgotten
+_MAX_LEARNED_FAILURES = 2
+# Normalized error text kept per learned signature (for display / debugging)
+_SAMPLE_CHARS = 300
+# Error text considered when normalizing
+_MAX_ERROR_CHARS = 4000
+
+
+# ======================================================================
+# Normalization
+# ======================================================================
+
+# A quoted identifier after one of these words names an argument or
+# attribute in the code, not a value of this run, and is kept.
+_NAME_CONTEXT_RE = re.compile(
+    r"\b(?:argument|attribute|block(?: type)?|named|parameter|property|field|variable|output)\s*$",
+    re.IGNORECASE,
+)
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+
+
+def _mask_quoted(match: re.Match[str]) -> str:
+    """Mask a quoted value, keeping quoted argument and attribute names."""
+    quoted = match.group(0)
+    preceding = match.string[max(0, match.start() - 40) : match.start()]
+    if _IDENTIFIER_RE.fullmatch(quoted[1:-1]) and _NAME_CONTEXT_RE.search(preceding):
+        return quoted
+    return "<value>"
+
+
+_NORMALIZERS: tuple[tuple[re.Pattern[str], str | Callable[[re.Match[str]], str]], ...] = (
+    (re.compile(r"\x1b\[[0-9;]*[A-Za-z]"), ""),
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"/subscriptions/[^\s\"',]+", re.IGNORECASE), "<resource-id>"),
+    (re.compile(r"\b[0-9a-f]{8}-(?:[0-9a-f]{4}-){3}[0-9a-f]{12}\b", re.IGNORECASE), "<guid>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<time>"),
+    (re.compile(r"\"[^\"\n]*\"|'[^'\n]*'"), _mask_quoted),
+    (re.compile(r"\b[0-9a-f]{8,}\b", re.IGNORECASE), "<hex>"),
+    (re.compile(r"\d+"), "<n>"),
+    (re.compile(r"\s+"), " "),
+)
+
+_ERROR_LINE_RE = re.compile(r"\berror\b", re.IGNORECASE)
+
+
+def normalize_error(error_text: str) -> str:
+    """Reduce *error_text* to the part that identifies the failure.
+
+    Output before the first line mentioning an error (plan chatter,
+    progress lines) is dropped, and everything specific to one run —
+    resource IDs, GUIDs, timestamps, quoted names, numbers — is replaced
+    by a placeholder, so the same failure in another stage or project
+    normalizes to the same text.  Quoted argument and attribute names
+    (``An argument named "sku_name"``) are kept: they tell different
+    failures apart.
+    """
+    text = (error_text or "")[:_MAX_ERROR_CHARS]
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        if _ERROR_LINE_RE.search(line):
+            text = "\n".join(lines[index:])
+            break
+    for pattern, replacement in _NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    return text.strip().lower()
+
+
+def error_signature(error_text: str) -> str:
+    """Stable fingerprint of *error_text* (see :func:`normalize_error`)."""
+    return hashlib.sha256(normalize_error(error_text).encode("utf-8")).hexdigest()[:16]
+
+
+# ======================================================================
+# Data structures
+# ======================================================================
+
+
+@dataclass
+class KnownFix:
+    """A known fix for a recognised failure.
+
+    ``action`` is :data:`ACTION_REGISTER_PROVIDER` (applied without any
+    agent) or :data:`ACTION_GUIDANCE` (the fix agent runs with ``diagnosis`` and
+    ``guidance`` instead of asking QA and the architect).  ``params``
+    holds values captured from the error, e.g. the provider namespace.
+    """
+
+    key: str
+    title: str
+    action: str = ACTION_GUIDANCE
+    diagnosis: str = ""
+    guidance: str = ""
+    knowledge: str = ""
+    params: dict[str, str] = field(default_factory=dict)
+    source: str = "builtin"
+
+    @property
+    def learned(self) -> bool:
+        return self.source != "builtin"
+
+
+@dataclass
+class LearnedSignature:
+    """A normalized error fingerprint recorded from a successful fix."""
+
+    signature: str
+    title: str
+    diagnosis: str
+    guidance: str
+    sample: str = ""
+    source: str = "remediation"
+    created_at: str = ""
+    last_used_at: str = ""
+    successes: int = 0
+    failures: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "signature": self.signature,
+            "title": self.title,
+            "diagnosis": self.diagnosis,
+            "guidance": self.guidance,
+            "sample": self.sample,
+            "source": self.source,
+            "created_at": self.created_at,
+            "last_used_at": self.last_used_at,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LearnedSignature:
+        return cls(
+            signature=data.get("signature", ""),
+            title=data.get("title", ""),
+            diagnosis=data.get("diagnosis", ""),
+            guidance=data.get("guidance", ""),
+            sample=data.get("sample", ""),
+            source=data.get("source", "remediation"),
+            created_at=data.get("created_at", ""),
+            last_used_at=data.get("last_used_at", ""),
+            successes=data.get("successes", 0),
+            failures=data.get("failures", 0),
+        )
+
+    def to_fix(self) -> KnownFix:
+        return KnownFix(
+            key=self.signature,
+            title=self.title,
+            diagnosis=self.diagnosis,
+            guidance=self.guidance,
+            source=self.source,
+        )
+
+
+# ======================================================================
+# Built-in signatures
+# ======================================================================
+
+
+@dataclass(frozen=True)
+class _BuiltinSignature:
+    key: str
+    pattern: re.Pattern[str]
+    title: str
+    action: str
+    diagnosis: str = ""
+    guidance: str = ""
+    knowledge: str = ""
+
+
+BUILTIN_SIGNATURES: tuple[_BuiltinSignature, ...] = (
+    _BuiltinSignature(
+        key="provider-not-registered",
+        pattern=re.compile(
+            r"not registered to use namespace\s+['\"]?(?P<namespace>Microsoft\.[A-Za-z0-9]+)"
+            r"|MissingSubscriptionRegistration[^\n]*?(?P<namespace_>Microsoft\.[A-Za-z0-9]+)",
+            re.IGNORECASE,
+        ),
+        title="Resource provider not registered",
+        action=ACTION_REGISTER_PROVIDER,
+        knowledge="New subscriptions must register a resource provider namespace before creating its resources.",
+    ),
+    _BuiltinSignature(
+        key="duplicate-required-providers",
+        pattern=re.compile(r"Duplicate required providers configuration", re.IGNORECASE),
+        title="Duplicate required_providers blocks",
+        action=ACTION_GUIDANCE,
+        diagnosis=(
+            "terraform init failed because the stage declares required_providers more than once. "
+            "Init already tried merging the blocks automatically, so the duplicates are not a "
+            "plain terraform { required_providers { ... } } wrapper it could remove."
+        ),
+        guidance=(
+            "Keep exactly one terraform block with a single required_providers block in the "
+            "stage (in providers.tf or main.tf) and remove every other required_providers "
+            "declaration. Do not create versions.tf. Do not change any resource."
+        ),
+        knowledge="Terraform allows one required_providers block per module.",
+    ),
+    _BuiltinSignature(
+        key="name-not-available",
+        pattern=re.compile(
+            r"StorageAccountAlreadyTaken|NameNotAvailable|VaultAlreadyExists|WebsiteAlreadyExists"
+            r"|ConflictingServerName|name[^\n]{0,120}?already (?:taken|in use)",
+            re.IGNORECASE,
+        ),
+        title="Globally unique resource name already taken",
+        action=ACTION_GUIDANCE,
+        diagnosis=(
+            "The deployment failed because a resource name that must be globally unique "
+            "(storage account, key vault, web app, server...) is already used by another "
+            "subscription or a soft-deleted resource."
+        ),
+        guidance=(
+            "Make the conflicting resource name unique: append a short random suffix "
+            "(e.g. a random_string resource or uniqueString()) to the name, keeping within "
+            "the resource's length and character limits. Do not change any other resource."
+        ),
+        knowledge="Storage accounts, key vaults and App Service names are global across Azure.",
+    ),
+    _BuiltinSignature(
+        key="sku-not-available",
+        pattern=re.compile(
+            r"SkuNotAvailable|LocationNotAvailableForResourceType|NoRegisteredProviderFound"
+            r"|(?:sku|size)[^\n]{0,120}?not (?:available|supported|allowed) in[^\n]{0,40}?(?:region|location)",
+            re.IGNORECASE,
+        ),
+        title="SKU not available in the region",
+        action=ACTION_GUIDANCE,
+        diagnosis=(
+            "The requested SKU or resource type is not offered in the target region for this "
+            "subscription (capacity restriction or regional availability)."
+        ),
+        guidance=(
+            "Switch the failing resource to a comparable SKU that is generally available in the "
+            "region (e.g. the next size up or the Standard tier), or parameterise its location "
+            "so it can be deployed to a nearby region. Keep all other resources unchanged."
+        ),
+        knowledge="Check availability with: az vm list-skus / az provider show --query resourceTypes[].locations",
+    ),
+)
+
+
+def match_builtin(error_text: str) -> KnownFix | None:
+    """Return the built-in fix for *error_text*, or ``None``."""
+    for builtin in BUILTIN_SIGNATURES:
+        found = builtin.pattern.search(error_text or "")
+        if not found:
+            continue
+        # Alternatives capturing the same value use a trailing underscore
+        params = {k.rstrip("_"): v for k, v in found.groupdict().items() if v}
+        if builtin.action == ACTION_REGISTER_PROVIDER and not params.get("namespace"):
+            continue
+        return KnownFix(
+            key=builtin.key,
+            title=builtin.title,
+            action=builtin.action,
+            diagnosis=builtin.diagnosis,
+            guidance=builtin.guidance,
+            knowledge=builtin.knowledge,
+            params=params,
+        )
+    return None
+
+
+# ======================================================================
+# Signature database
+# ======================================================================
+
+
+class ErrorSignatureDB:
+    """Built-in and learned error signatures for one project.
+
+    Persists learned signatures to ``.prototype/state/error_signatures.yaml``.
+    """
+
+    def __init__(self, project_dir: str) -> None:
+        self._project_dir = project_dir
+        self._learned: dict[str, LearnedSignature] = {}
+        self._path = Path(project_dir) / ".prototype" / "state" / "error_signatures.yaml"
+
+    # ------------------------------------------------------------------
+    # State persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Save learned signatures to YAML."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": SIGNATURE_DB_VERSION,
+            "signatures": [s.to_dict() for s in self._learned.values()],
+        }
+        with open(self._path, "w", encoding="utf-8") as f:
+            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+
+    def load(self) -> None:
+        """Load learned signatures from YAML if the file exists and is current."""
+        if not self._path.exists():
+            return
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError):
+            logger.debug("Could not read %s", self._path, exc_info=True)
+            return
+        if data.get("version") != SIGNATURE_DB_VERSION:
+            logger.info("Discarding learned error signatures from an older version.")
+            return
+        learned = [LearnedSignature.from_dict(s) for s in data.get("signatures", [])]
+        self._learned = {s.signature: s for s in learned if s.signature}
+
+    @property
+    def exists(self) -> bool:
+        return self._path.exists()
+
+    @property
+    def learned(self) -> list[LearnedSignature]:
+        return list(self._learned.values())
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def match(self, error_text: str) -> KnownFix | None:
+        """Return the known fix for *error_text*, or ``None``.
+
+        Built-in signatures are tried first, then the learned ones.
+        """
+        fix = match_builtin(error_text)
+        if fix is not None:
+            return fix
+        learned = self._learned.get(error_signature(error_text))
+        return learned.to_fix() if learned else None
+
+    # ------------------------------------------------------------------
+    # Learning
+    # ------------------------------------------------------------------
+
+    def learn(
+        self,
+        error_text: str,
+        diagnosis: str,
+        guidance: str,
+        *,
+        title: str = "",
+        source: str = "remediation",
+    ) -> LearnedSignature | None:
+        """Record the diagnosis and guidance that fixed *error_text*.
+
+        Errors matched by a built-in signature are not recorded.
+        Returns the stored signature, or ``None`` if nothing was recorded.
+        """
+        if not error_text or not (diagnosis or guidance) or match_builtin(error_text) is not None:
+            return None
+        normalized = normalize_error(error_text)
+        signature = error_signature(error_text)
+        now = datetime.now(timezone.utc).isoformat()
+        entry = self._learned.get(signature)
+        if entry is None:
+            entry = LearnedSignature(
+                signature=signature,
+                title=title or _title_from(normalized),
+                diagnosis=diagnosis,
+                guidance=guidance,
+                sample=normalized[:_SAMPLE_CHARS],
+                source=source,
+                created_at=now,
+            )
+            self._learned[signature] = entry
+        else:
+            entry.diagnosis, entry.guidance = diagnosis, guidance
+        entry.successes += 1
+        entry.last_used_at = now
+        self.save()
+        return entry
+
+    def learn_from_escalations(self, tracker: Any) -> int:
+        """Import blockers resolved in *tracker* that are not known yet.
+
+        The blocker text is the error and its resolution the guidance.
+        Returns the number of signatures added.
+        """
+        added = 0
+        for entry in getattr(tracker, "_entries", []):
+            if not entry.resolved or not entry.resolution or not entry.blocker:
+                continue
+            if match_builtin(entry.blocker) is not None or error_signature(entry.blocker) in self._learned:
+                continue
+            signature = error_signature(entry.blocker)
+            self._learned[signature] = LearnedSignature(
+                signature=signature,
+                title=entry.task_description or _title_from(normalize_error(entry.blocker)),
+                diagnosis=entry.blocker[:1500],
+                guidance=entry.resolution,
+                sample=normalize_error(entry.blocker)[:_SAMPLE_CHARS],
+                source="escalation",
+                created_at=datetime.now(timezone.utc).isoformat(),
+            )
+            added += 1
+        if added:
+            self.save()
+        return added
+
+    def record_outcome(self, fix: KnownFix, succeeded: bool) -> None:
+        """Record whether applying *fix* worked.
+
+        A learned signature that fails more often than it succeeds, and
+        at least :data:`_MAX_LEARNED_FAILURES` times, is forgotten.
+        """
+        entry = self._learned.get(fix.key) if fix.learned else None
+        if entry is None:
+            return
+        entry.last_used_at = datetime.now(timezone.utc).isoformat()
+        if succeeded:
+            entry.successes += 1
+        else:
+            entry.failures += 1
+            if entry.failures >= _MAX_LEARNED_FAILURES and entry.failures > entry.successes:
+                del self._learned[fix.key]
+        self.save()
+
+
+def _title_from(normalized: str) -> str:
+    """Short title for a learned signature: the start of its normalized error."""
+    return normalized.removeprefix("error: ")[:80].strip() or "Recorded deploy failure"
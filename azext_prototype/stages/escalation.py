@@ -335,10 +335,20 @@ class EscalationTracker:
         entry: EscalationEntry,
         print_fn: Callable[[str], None],
     ) -> str:
-        """Level 3: Expand to web search for documentation."""
+        """Level 3: Expand to web search for documentation.
+
+        The offline knowledge index is consulted first; the network is
+        only used when it has nothing relevant.
+        """
         try:
+            from azext_prototype.knowledge.local_index import search_local
             from azext_prototype.knowledge.web_search import search_and_fetch
 
+            local = search_local(entry.blocker, max_results=3)
+            if local:
+                print_fn("\n  Escalation: Found matching documentation in the local knowledge index.")
+                return local
+
             query = f"{entry.blocker} Azure {entry.source_agent}"
             print_fn(f"\n  Escalation: Searching web for: {query}")
 
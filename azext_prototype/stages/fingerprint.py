@@ -0,0 +1,86 @@
+"""Content fingerprints for deployment stages.
+
+A stage fingerprint is a Merkle-style SHA-256 digest: each file in the
+stage directory is hashed on its own, the ``path:digest`` leaves are
+combined in sorted order, and the result is folded together with the
+digests of the stage's variables and upstream inputs.  Two stages with
+the same fingerprint would produce the same Terraform/Bicep plan
+against the same state, so a saved plan or a previous successful
+deploy can be reused.
+
+Variable *values* (which include generated secrets) are only ever
+hashed; the fingerprint never contains them in the clear.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Mapping
+
+# Directories and files produced by the tools themselves, not inputs
+_IGNORED_DIRS = frozenset({".terraform", "__pycache__", ".git", "node_modules"})
+_IGNORED_FILES = frozenset({".terraform.lock.hcl", "tfplan", ".prototype-plan.json"})
+_IGNORED_SUFFIXES = (".tfstate", ".tfstate.backup")
+
+# Environment variables that change what a deployment does
+_VARIABLE_PREFIXES = ("TF_VAR_", "ARM_SUBSCRIPTION_ID", "ARM_TENANT_ID", "ARM_CLIENT_ID")
+
+
+def file_digests(stage_dir: Path) -> dict[str, str]:
+    """Return ``{relative_posix_path: sha256}`` for every input file in *stage_dir*."""
+    digests: dict[str, str] = {}
+    if not stage_dir.is_dir():
+        return digests
+    for path in sorted(stage_dir.rglob("*")):
+        rel = path.relative_to(stage_dir)
+        if any(part in _IGNORED_DIRS for part in rel.parts[:-1]) or not path.is_file():
+            continue
+        if path.name in _IGNORED_FILES or path.name.endswith(_IGNORED_SUFFIXES):
+            continue
+        try:
+            digests[rel.as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            continue
+    return digests
+
+
+def deploy_variables(env: Mapping[str, str] | None) -> dict[str, str]:
+    """Select the environment variables that affect a deployment."""
+    if not env:
+        return {}
+    return {k: v for k, v in env.items() if k.startswith(_VARIABLE_PREFIXES)}
+
+
+def stage_fingerprint(
+    stage_dir: Path,
+    variables: Mapping[str, Any] | None = None,
+    inputs: Mapping[str, Any] | None = None,
+) -> str:
+    """Fingerprint a stage's files, *variables* and upstream *inputs*.
+
+    Parameters
+    ----------
+    stage_dir:
+        Directory holding the stage's generated code.
+    variables:
+        Variable values passed to the tool (``TF_VAR_*``, subscription…).
+    inputs:
+        Outputs captured from upstream stages that this stage consumes.
+    """
+    files = hashlib.sha256()
+    for rel, digest in file_digests(stage_dir).items():
+        files.update(f"{rel}:{digest}\n".encode("utf-8"))
+
+    root = hashlib.sha256()
+    root.update(b"files:" + files.hexdigest().encode("ascii"))
+    root.update(b"\nvariables:" + mapping_digest(variables).encode("ascii"))
+    root.update(b"\ninputs:" + mapping_digest(inputs).encode("ascii"))
+    return root.hexdigest()
+
+
+def mapping_digest(value: Mapping[str, Any] | None) -> str:
+    """SHA-256 of a mapping, independent of key order."""
+    payload = json.dumps(dict(value or {}), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
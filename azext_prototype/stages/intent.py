@@ -12,18 +12,29 @@ Provides a two-tier classifier:
 
 Each session registers its own command definitions via factory functions.
 The classifier picks AI or fallback automatically.
+
+Patterns are compiled when they are registered, and a single combined
+regex rejects inputs with no keyword signal at all before any scoring.
+AI classifications are memoized per normalised input in a persistent
+:class:`ClassificationCache` shared by every session's classifier, so a
+repeated command never costs a second model call.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
 import re
+import threading
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Any, Callable
 
+from azext_prototype.knowledge.search_cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,6 +84,25 @@ class IntentPattern:
     min_confidence: float = 0.5
 
 
+@dataclass(frozen=True)
+class _CompiledPattern:
+    """An :class:`IntentPattern` with lower-cased terms and compiled regexes."""
+
+    pattern: IntentPattern
+    keywords: tuple[str, ...]
+    phrases: tuple[str, ...]
+    regexes: tuple[re.Pattern, ...]
+
+    @classmethod
+    def compile(cls, pattern: IntentPattern) -> _CompiledPattern:
+        return cls(
+            pattern=pattern,
+            keywords=tuple(kw.lower() for kw in pattern.keywords),
+            phrases=tuple(p.lower() for p in pattern.phrases),
+            regexes=tuple(re.compile(rx, re.IGNORECASE) for rx in pattern.regex_patterns),
+        )
+
+
 # -------------------------------------------------------------------- #
 # File-read regex — cross-session
 # -------------------------------------------------------------------- #
@@ -82,6 +112,127 @@ _READ_FILE_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Back-references in a pattern prevent folding it into the combined matcher.
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+# -------------------------------------------------------------------- #
+# AI classification memo — cross-session, persisted
+# -------------------------------------------------------------------- #
+
+_CACHE_FILE = "prototype_intent_cache.json"
+_CACHE_MAX_ENTRIES = 500
+
+
+def _cache_path() -> str:
+    """Location of the persisted classification cache.
+
+    Lives in the Azure CLI config dir (``$AZURE_CONFIG_DIR`` or
+    ``~/.azure``) so it is shared by every project on the machine.
+    """
+    config_dir = os.environ.get("AZURE_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".azure")
+    return os.path.join(config_dir, _CACHE_FILE)
+
+
+def _normalize_input(text: str) -> str:
+    """Lower-case, collapse whitespace, drop trailing punctuation."""
+    return re.sub(r"\s+", " ", text.strip().lower()).rstrip(" ?!.")
+
+
+class ClassificationCache:
+    """Persistent memo of AI intent classifications.
+
+    Entries are keyed by a hash of the classification prompt (i.e. the
+    session's command set) and the normalised user input, so one cache
+    can be shared by every session's classifier.  The file is loaded on
+    first use and rewritten after each new entry; the least recently
+    used entries are dropped beyond *max_entries*.
+    """
+
+    def __init__(self, path: str | None = None, max_entries: int = _CACHE_MAX_ENTRIES) -> None:
+        self._path = path or _cache_path()
+        self._memory = LRUCache(max_entries=max_entries, name="intent")
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def get(self, prompt_key: str, user_input: str) -> dict | None:
+        """Return the memoized classification for *user_input*, or ``None``."""
+        self._ensure_loaded()
+        return self._memory.get(self._key(prompt_key, user_input))
+
+    def put(self, prompt_key: str, user_input: str, result: dict) -> None:
+        """Memoize *result* for *user_input* and persist the cache."""
+        self._ensure_loaded()
+        self._memory.put(self._key(prompt_key, user_input), result)
+        self._save()
+
+    def clear(self) -> None:
+        """Drop every entry, on disk as well."""
+        with self._lock:
+            self._memory.clear()
+            self._loaded = True
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """Return the entry count and on-disk size of the cache."""
+        self._ensure_loaded()
+        try:
+            size = os.path.getsize(self._path)
+        except OSError:
+            size = 0
+        return {"entries": len(self._memory), "bytes": size}
+
+    @staticmethod
+    def _key(prompt_key: str, user_input: str) -> str:
+        raw = f"{prompt_key}\0{_normalize_input(user_input)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return
+            if isinstance(data, dict):
+                for key, value in data.items():
+                    if isinstance(value, dict):
+                        self._memory.put(key, value)
+
+    def _save(self) -> None:
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self._path), exist_ok=True)
+                tmp = self._path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(dict(self._memory.items()), f)
+                os.replace(tmp, self._path)
+            except OSError as e:
+                logger.debug("Could not write intent classification cache: %s", e)
+
+
+_shared_cache: ClassificationCache | None = None
+_shared_lock = threading.Lock()
+
+
+def get_classification_cache() -> ClassificationCache:
+    """Return the process-wide :class:`ClassificationCache`."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None or _shared_cache.path != _cache_path():
+            _shared_cache = ClassificationCache()
+        return _shared_cache
+
 
 # -------------------------------------------------------------------- #
 # IntentClassifier
@@ -97,33 +248,42 @@ class IntentClassifier:
         Optional AI provider for AI-powered classification.
     token_tracker:
         Optional token tracker for recording classification costs.
+    cache:
+        Optional :class:`ClassificationCache` memoizing AI results.
     """
 
     def __init__(
         self,
         ai_provider: Any = None,
         token_tracker: Any = None,
+        cache: ClassificationCache | None = None,
     ) -> None:
         self._ai_provider = ai_provider
         self._token_tracker = token_tracker
-        self._patterns: list[IntentPattern] = []
+        self._cache = cache
+        self._patterns: list[_CompiledPattern] = []
+        self._signal_re: re.Pattern | None = None
         self._command_defs: list[CommandDef] = []
+        self._prompt: str | None = None
+        self._prompt_key = ""
 
     def register(self, pattern: IntentPattern) -> None:
         """Register a keyword/regex fallback pattern."""
-        self._patterns.append(pattern)
+        self.register_many([pattern])
 
     def register_many(self, patterns: list[IntentPattern]) -> None:
         """Register multiple keyword/regex fallback patterns."""
-        self._patterns.extend(patterns)
+        self._patterns.extend(_CompiledPattern.compile(p) for p in patterns)
+        self._signal_re = self._build_signal_matcher()
 
     def add_command_def(self, cmd_def: CommandDef) -> None:
         """Add a command definition for the AI classification prompt."""
-        self._command_defs.append(cmd_def)
+        self.add_command_defs([cmd_def])
 
     def add_command_defs(self, defs: list[CommandDef]) -> None:
         """Add multiple command definitions."""
         self._command_defs.extend(defs)
+        self._prompt = None
 
     # ------------------------------------------------------------------ #
     # Public — classify
@@ -181,11 +341,31 @@ class IntentClassifier:
     def _classify_with_ai(self, user_input: str) -> IntentResult | None:
         """Use the AI provider to classify the input.
 
-        Returns None on any error, allowing fallback to keyword scoring.
+        Results are served from (and stored in) the classification cache
+        when one is configured.  Returns None on any error, allowing
+        fallback to keyword scoring.
         """
         from azext_prototype.ai.provider import AIMessage
 
-        system_prompt = self._build_classification_prompt()
+        if self._prompt is None:
+            self._prompt = self._build_classification_prompt()
+            self._prompt_key = hashlib.sha256(self._prompt.encode("utf-8")).hexdigest()[:16]
+        system_prompt = self._prompt
+
+        if self._cache is not None:
+            cached = self._cache.get(self._prompt_key, user_input)
+            if cached is not None:
+                try:
+                    return IntentResult(
+                        kind=IntentKind(cached["kind"]),
+                        command=cached.get("command", ""),
+                        args=cached.get("args", ""),
+                        original_input=user_input,
+                        confidence=cached.get("confidence", 0.0),
+                    )
+                except (KeyError, ValueError):
+                    pass
+
         messages = [
             AIMessage(role="system", content=system_prompt),
             AIMessage(role="user", content=user_input),
@@ -200,11 +380,24 @@ class IntentClassifier:
             if self._token_tracker:
                 self._token_tracker.record(response)
 
-            return self._parse_ai_response(response.content, user_input)
+            result = self._parse_ai_response(response.content, user_input)
         except Exception:
             logger.debug("AI classification failed, falling back to keywords", exc_info=True)
             return None
 
+        if result is not None and self._cache is not None:
+            self._cache.put(
+                self._prompt_key,
+                user_input,
+                {
+                    "kind": result.kind.value,
+                    "command": result.command,
+                    "args": result.args,
+                    "confidence": result.confidence,
+                },
+            )
+        return result
+
     def _build_classification_prompt(self) -> str:
         """Build the system prompt listing available commands."""
         lines = [
@@ -282,35 +475,59 @@ class IntentClassifier:
     # Internal — keyword/regex fallback
     # ------------------------------------------------------------------ #
 
+    def _build_signal_matcher(self) -> re.Pattern | None:
+        """Combine every keyword, phrase and regex into one alternation.
+
+        Used to reject inputs with no signal in a single scan.  Returns
+        ``None`` (no pre-filter) if the patterns cannot be combined, e.g.
+        because one uses back-references, whose group numbers would shift.
+        """
+        alternatives: list[str] = []
+        for cp in self._patterns:
+            alternatives.extend(re.escape(term) for term in cp.keywords + cp.phrases)
+            for rx in cp.regexes:
+                if _BACKREF_RE.search(rx.pattern):
+                    return None
+                alternatives.append(f"(?:{rx.pattern})")
+        if not alternatives:
+            return None
+        try:
+            return re.compile("|".join(alternatives), re.IGNORECASE)
+        except re.error:
+            return None
+
     def _classify_with_keywords(self, user_input: str) -> IntentResult:
         """Score registered patterns against user input."""
+        if self._signal_re is not None and not self._signal_re.search(user_input):
+            return IntentResult(kind=IntentKind.CONVERSATIONAL, original_input=user_input, confidence=0.0)
+
         lower = user_input.lower()
         best_score = 0.0
         best_pattern: IntentPattern | None = None
 
-        for pattern in self._patterns:
+        for cp in self._patterns:
             score = 0.0
 
             # Keyword scoring: +0.2 each
-            for kw in pattern.keywords:
-                if kw.lower() in lower:
+            for kw in cp.keywords:
+                if kw in lower:
                     score += 0.2
 
             # Phrase scoring: +0.4 each
-            for phrase in pattern.phrases:
-                if phrase.lower() in lower:
+            for phrase in cp.phrases:
+                if phrase in lower:
                     score += 0.4
 
             # Regex scoring: +0.6 each
-            for rx in pattern.regex_patterns:
-                if re.search(rx, user_input, re.IGNORECASE):
+            for rx in cp.regexes:
+                if rx.search(user_input):
                     score += 0.6
 
             score = min(score, 1.0)
 
             if score > best_score:
                 best_score = score
-                best_pattern = pattern
+                best_pattern = cp.pattern
 
         if best_pattern and best_score >= best_pattern.min_confidence:
             args = ""
@@ -374,7 +591,7 @@ def build_discovery_classifier(
     token_tracker: Any = None,
 ) -> IntentClassifier:
     """Build an intent classifier for the discovery session."""
-    c = IntentClassifier(ai_provider=ai_provider, token_tracker=token_tracker)
+    c = IntentClassifier(ai_provider=ai_provider, token_tracker=token_tracker, cache=get_classification_cache())
 
     # Command definitions (for AI prompt)
     c.add_command_defs(
@@ -445,7 +662,7 @@ def build_build_classifier(
     token_tracker: Any = None,
 ) -> IntentClassifier:
     """Build an intent classifier for the build session."""
-    c = IntentClassifier(ai_provider=ai_provider, token_tracker=token_tracker)
+    c = IntentClassifier(ai_provider=ai_provider, token_tracker=token_tracker, cache=get_classification_cache())
 
     c.add_command_defs(
         [
@@ -508,7 +725,7 @@ def build_deploy_classifier(
     token_tracker: Any = None,
 ) -> IntentClassifier:
     """Build an intent classifier for the deploy session."""
-    c = IntentClassifier(ai_provider=ai_provider, token_tracker=token_tracker)
+    c = IntentClassifier(ai_provider=ai_provider, token_tracker=token_tracker, cache=get_classification_cache())
 
     c.add_command_defs(
         [
@@ -629,7 +846,7 @@ def build_backlog_classifier(
     Intentionally omits ``/add`` — "add a story about X" should fall
     through to the AI mutation path.
     """
-    c = IntentClassifier(ai_provider=ai_provider, token_tracker=token_tracker)
+    c = IntentClassifier(ai_provider=ai_provider, token_tracker=token_tracker, cache=get_classification_cache())
 
     c.add_command_defs(
         [
@@ -20,6 +20,10 @@ logger = logging.getLogger(__name__)
 # Default repository for knowledge contributions
 _DEFAULT_REPO = "Azure/az-prototype"
 
+# Fraction of a finding's terms a knowledge section must contain for the
+# finding to count as already covered.
+_GAP_COVERAGE = 0.85
+
 
 # ======================================================================
 # Gap Detection
@@ -34,7 +38,9 @@ def check_knowledge_gap(finding: dict, knowledge_loader: Any) -> bool:
     if the content already exists or the finding is empty.
 
     Uses a substring match on the first 80 characters of the finding's
-    ``context`` field against the loaded service file content.
+    ``context`` field against the loaded service file content, then falls
+    back to the loader's full-text index: a section of the service file
+    containing nearly every term of the context also counts as covered.
     """
     if not finding:
         return False
@@ -59,7 +65,14 @@ def check_knowledge_gap(finding: dict, knowledge_loader: Any) -> bool:
     if not snippet:
         return False
 
-    return snippet.lower() not in content.lower()
+    if snippet.lower() in content.lower():
+        return False
+
+    try:
+        hits = knowledge_loader.search(context, max_results=1, min_coverage=_GAP_COVERAGE, service=service)
+    except Exception:
+        hits = []
+    return not (isinstance(hits, list) and hits)
 
 
 # ======================================================================
@@ -0,0 +1,316 @@
+"""Streaming subprocess runner for long-running deploy commands.
+
+``terraform apply``, ``az deployment ... create`` and app ``deploy.sh``
+scripts can run for many minutes and print a lot.  :func:`run_streaming`
+starts the command with pipes, pumps stdout and stderr on two reader
+threads, and hands each line to an ``on_line`` callback as it arrives.
+The caller (a session on the CLI main thread or a Textual worker)
+shows real progress instead of a silent spinner.
+
+Only a bounded tail of each stream is kept for error reporting, so
+memory stays flat no matter how much the command prints.  Commands
+whose full output is needed afterwards (e.g. the JSON written by
+``az deployment group create``) can ask for it with ``keep_stdout``.
+
+:class:`TerraformProgress` turns ``terraform apply -json`` machine-
+readable events into per-resource progress lines and counts.
+
+Cancellation: set the ``cancel_event`` (or press Ctrl+C) and the child
+is terminated, then killed if it does not exit within a grace period.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Callable
+
+logger = logging.getLogger(__name__)
+
+# Lines kept per stream for error reporting
+TAIL_LINES = 200
+# Seconds to wait for a terminated process before killing it
+_KILL_GRACE = 5.0
+# How often the wait loop checks for cancellation
+_POLL_INTERVAL = 0.1
+
+_STDOUT = "stdout"
+_STDERR = "stderr"
+
+
+@dataclass
+class RunResult:
+    """Outcome of :func:`run_streaming`.
+
+    Mirrors the attributes callers read from ``subprocess.CompletedProcess``
+    (``returncode``, ``stdout``, ``stderr``) so either can be handled the
+    same way.  ``stdout`` / ``stderr`` hold only the last
+    :data:`TAIL_LINES` lines unless ``keep_stdout`` was requested.
+    """
+
+    args: list[str]
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    cancelled: bool = False
+    elapsed: float = 0.0
+    line_count: int = 0
+
+
+def run_streaming(
+    cmd: list[str],
+    *,
+    cwd: str | Path | None = None,
+    env: dict[str, str] | None = None,
+    on_line: Callable[[str], None] | None = None,
+    on_stderr: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    keep_stdout: bool = False,
+    tail_lines: int = TAIL_LINES,
+) -> RunResult:
+    """Run *cmd*, streaming its output line by line.
+
+    Parameters
+    ----------
+    on_line:
+        Called on the calling thread with each stdout line (without
+        the trailing newline).
+    on_stderr:
+        Called with each stderr line.  Defaults to *on_line*.
+    cancel_event:
+        When set, the process is terminated and the result is marked
+        ``cancelled`` with return code ``-1``.
+    keep_stdout:
+        Keep the full stdout instead of a bounded tail.
+    tail_lines:
+        Lines kept per stream for error reporting.
+
+    Raises ``FileNotFoundError`` when the executable does not exist,
+    like ``subprocess.run``.  ``KeyboardInterrupt`` terminates the
+    child before propagating.
+    """
+    on_stderr = on_stderr or on_line
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        cmd,
+        cwd=str(cwd) if cwd is not None else None,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+    )
+
+    lines: queue.SimpleQueue[tuple[str, str | None]] = queue.SimpleQueue()
+    readers = [
+        threading.Thread(target=_pump, args=(proc.stdout, _STDOUT, lines), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, _STDERR, lines), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    stdout: list[str] | deque[str] = [] if keep_stdout else deque(maxlen=tail_lines)
+    stderr: deque[str] = deque(maxlen=tail_lines)
+    line_count = 0
+    open_streams = len(readers)
+    cancelled = False
+
+    try:
+        while open_streams:
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                _terminate(proc)
+                break
+            try:
+                stream, line = lines.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if line is None:
+                open_streams -= 1
+                continue
+            line_count += 1
+            if stream == _STDOUT:
+                stdout.append(line)
+                callback = on_line
+            else:
+                stderr.append(line)
+                callback = on_stderr
+            if callback is not None:
+                try:
+                    callback(line)
+                except Exception:  # pragma: no cover - display must never break a deploy
+                    logger.debug("Output callback failed", exc_info=True)
+    except KeyboardInterrupt:
+        _terminate(proc)
+        raise
+
+    returncode = proc.wait() if not cancelled else -1
+    for reader in readers:
+        reader.join(timeout=1.0)
+
+    return RunResult(
+        args=list(cmd),
+        returncode=returncode,
+        stdout="\n".join(stdout),
+        stderr="\n".join(stderr),
+        cancelled=cancelled,
+        elapsed=time.monotonic() - start,
+        line_count=line_count,
+    )
+
+
+def _pump(pipe: IO[str] | None, stream: str, lines: queue.SimpleQueue) -> None:
+    """Forward lines from *pipe* to *lines*; ``None`` marks end of stream."""
+    try:
+        if pipe is not None:
+            for line in pipe:
+                lines.put((stream, line.rstrip("\r\n")))
+    except (OSError, ValueError):
+        pass  # pipe closed by terminate
+    finally:
+        lines.put((stream, None))
+
+
+def _terminate(proc: subprocess.Popen) -> None:
+    """Terminate *proc*, escalating to kill after a grace period."""
+    if proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=_KILL_GRACE)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+# ======================================================================
+# Terraform machine-readable progress
+# ======================================================================
+
+_ACTION_DONE = {
+    "create": "Created",
+    "update": "Modified",
+    "delete": "Destroyed",
+    "replace": "Replaced",
+    "read": "Read",
+    "noop": "Unchanged",
+}
+
+_ACTION_ING = {
+    "create": "Creating",
+    "update": "Modifying",
+    "delete": "Destroying",
+    "replace": "Replacing",
+    "read": "Reading",
+}
+
+
+@dataclass
+class TerraformProgress:
+    """Parse ``terraform apply -json`` events into progress lines and counts.
+
+    Feed every stdout line to :meth:`feed`; it returns a line to show the
+    user, or ``None`` for events not worth displaying (version banner,
+    outputs, refresh chatter).  Error diagnostics are collected (bounded)
+    so :meth:`error_text` can report them in Terraform's usual format.
+    The final ``outputs`` event is kept in :attr:`outputs` (sensitive
+    outputs carry no value there).
+    Lines that are not JSON (e.g. provider crash output) pass through.
+    """
+
+    planned: int = 0
+    created: int = 0
+    modified: int = 0
+    destroyed: int = 0
+    failed: int = 0
+    summary: str = ""
+    outputs: dict = field(default_factory=dict)
+    errors: deque[str] = field(default_factory=lambda: deque(maxlen=20))
+    _started: float = field(default_factory=time.monotonic)
+
+    @property
+    def completed(self) -> int:
+        return self.created + self.modified + self.destroyed
+
+    def feed(self, line: str) -> str | None:
+        """Consume one output line; return a display line or ``None``."""
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return line if line.strip() else None
+        if not isinstance(event, dict):
+            return None
+
+        kind = event.get("type", "")
+        hook = event.get("hook") or {}
+        addr = (hook.get("resource") or {}).get("addr", "")
+        action = hook.get("action") or ""
+
+        if kind == "planned_change":
+            if (event.get("change") or {}).get("action") not in (None, "noop", "read"):
+                self.planned += 1
+            return None
+        if kind == "apply_start":
+            return f"{_ACTION_ING.get(action, action.title())} {addr}..."
+        if kind == "apply_progress":
+            elapsed = hook.get("elapsed_seconds", 0)
+            return f"{addr}: still {_ACTION_ING.get(action, action).lower()} ({elapsed}s elapsed)"
+        if kind == "apply_complete":
+            if action == "create":
+                self.created += 1
+            elif action in ("update", "replace"):
+                self.modified += 1
+            elif action == "delete":
+                self.destroyed += 1
+            done = _ACTION_DONE.get(action, action.title())
+            return f"{self._counter()}{done} {addr} ({hook.get('elapsed_seconds', 0)}s)"
+        if kind == "apply_errored":
+            self.failed += 1
+            return f"Failed {addr} after {hook.get('elapsed_seconds', 0)}s"
+        if kind == "change_summary":
+            self.summary = event.get("@message", "")
+            return f"{self.summary} ({self.elapsed_text()})"
+        if kind == "outputs":
+            self.outputs = event.get("outputs") or {}
+            return None
+        if kind == "diagnostic":
+            diag = event.get("diagnostic") or {}
+            if diag.get("severity") == "error":
+                self.errors.append(_format_diagnostic(diag))
+                return f"Error: {diag.get('summary', '')}"
+            return None
+        return None
+
+    def error_text(self) -> str:
+        """Collected error diagnostics, formatted like Terraform's text output."""
+        return "\n\n".join(self.errors)
+
+    def elapsed_text(self) -> str:
+        seconds = int(time.monotonic() - self._started)
+        return f"{seconds // 60}m{seconds % 60:02d}s" if seconds >= 60 else f"{seconds}s"
+
+    def _counter(self) -> str:
+        if not self.planned:
+            return ""
+        return f"[{self.completed}/{self.planned}] "
+
+
+def _format_diagnostic(diag: dict) -> str:
+    text = f"Error: {diag.get('summary', '')}"
+    address = diag.get("address")
+    if address:
+        text += f"\n\n  with {address}"
+    detail = diag.get("detail")
+    if detail:
+        text += f"\n\n{detail}"
+    return text
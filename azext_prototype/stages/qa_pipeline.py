@@ -0,0 +1,150 @@
+"""Helpers for reviewing generated build stages with the QA agent.
+
+Reviewing every stage with its own QA request re-sends the QA agent's
+system prompt, governance and knowledge context each time.  The build
+session instead plans a review *round* over all stages awaiting QA:
+
+- **batch** mode packs small stages into one request, up to a token
+  budget; a stage too large to share a request is reviewed alone.
+- **parallel** mode sends one request per stage.
+
+Either way the requests of a round run concurrently.  Each request
+starts with the same :data:`QA_REVIEW_PREAMBLE`, so the QA agent's
+system messages plus the preamble form a byte-identical prefix that
+providers with prompt caching can reuse.  A batched request asks for
+one ``## Stage N`` section per stage; :func:`split_batch_findings` maps
+those back to their stages so remediation stays per stage.
+
+:class:`FileContentCache` keeps the (truncated) text of generated files
+keyed by path, size and modification time, so files are read from disk
+once per change rather than once per review.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from pathlib import Path
+
+QA_MODE_BATCH = "batch"
+QA_MODE_PARALLEL = "parallel"
+QA_MODES = (QA_MODE_BATCH, QA_MODE_PARALLEL)
+
+# Prompt tokens of stage files packed into one batched request
+QA_BATCH_TOKENS = 6_000
+# Concurrent QA requests per review round
+QA_PARALLELISM = 4
+# Rough characters per token for budgeting
+_CHARS_PER_TOKEN = 4
+# Largest slice of a single file sent for review
+PER_FILE_CAP = 8_000
+
+QA_REVIEW_PREAMBLE = (
+    "Review generated prototype code using your Mandatory Review Checklist. "
+    "Flag any issues — missing managed identity config, hardcoded secrets, "
+    "undefined references, missing outputs, incomplete scripts, etc.\n\n"
+    "Provide specific fixes (corrected file contents) for each issue.\n\n"
+)
+
+_ISSUE_KEYWORDS = ("critical", "error", "missing", "fix", "issue", "broken")
+_STAGE_HEADING_RE = re.compile(r"^#{1,4}\s*Stage\s+(\d+[a-z]?)\b.*$", re.IGNORECASE | re.MULTILINE)
+
+
+class FileContentCache:
+    """Thread-safe cache of generated file text for QA prompts."""
+
+    def __init__(self, root: str | Path):
+        self._root = Path(root)
+        self._entries: dict[str, tuple[int, int, str | None]] = {}
+        self._lock = threading.Lock()
+
+    def read(self, filepath: str) -> str | None:
+        """Text of *filepath* (relative to the root), capped at :data:`PER_FILE_CAP`.
+
+        Returns ``None`` when the file cannot be read as text.
+        """
+        path = self._root / filepath
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._entries.get(filepath)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        try:
+            content: str | None = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            content = None
+        if content is not None and len(content) > PER_FILE_CAP:
+            content = content[:PER_FILE_CAP] + "\n... (truncated)"
+        with self._lock:
+            self._entries[filepath] = (stat.st_mtime_ns, stat.st_size, content)
+        return content
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def pack_stages(sizes: list[tuple[str, int]], budget_tokens: int, mode: str = QA_MODE_BATCH) -> list[list[str]]:
+    """Group stage IDs into review requests.
+
+    *sizes* lists ``(stage_id, prompt_tokens)`` in build order.  In
+    :data:`QA_MODE_BATCH` consecutive stages share a request while their
+    total stays within *budget_tokens*; any other mode gives one request
+    per stage.
+    """
+    if mode != QA_MODE_BATCH:
+        return [[stage_id] for stage_id, _ in sizes]
+    groups: list[list[str]] = []
+    current: list[str] = []
+    used = 0
+    for stage_id, tokens in sizes:
+        if current and used + tokens > budget_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(stage_id)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def batch_review_instructions(stage_ids: list[str]) -> str:
+    """Response format for a request reviewing several stages."""
+    listed = ", ".join(f"Stage {sid}" for sid in stage_ids)
+    return (
+        f"This request covers {listed}. Review each stage on its own and answer "
+        "with one section per stage, headed exactly `## Stage N` (N being the "
+        "stage number, with its substage letter if any). A stage with no issues "
+        "gets a section containing only `PASS`.\n\n"
+    )
+
+
+def split_batch_findings(content: str, stage_ids: list[str]) -> dict[str, str]:
+    """Map each stage ID to its section of a batched QA response.
+
+    Stages without a section are left out, so the caller can review
+    them again on their own.
+    """
+    wanted = {sid.lower(): sid for sid in stage_ids}
+    matches = list(_STAGE_HEADING_RE.finditer(content))
+    findings: dict[str, str] = {}
+    for i, match in enumerate(matches):
+        sid = wanted.get(match.group(1).lower())
+        if sid is None:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        section = content[match.end() : end].strip()
+        findings[sid] = f"{findings[sid]}\n\n{section}" if sid in findings else section
+    return findings
+
+
+def qa_has_issues(findings: str) -> bool:
+    """Whether QA *findings* report problems that need remediation."""
+    text = findings.strip()
+    if not text or text.upper().startswith("PASS"):
+        return False
+    lowered = text.lower()
+    return any(kw in lowered for kw in _ISSUE_KEYWORDS)
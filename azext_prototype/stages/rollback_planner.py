@@ -0,0 +1,200 @@
+"""Dependency-ordered rollback planning.
+
+Rolling back one stage at a time in reverse stage order is always safe
+but takes as long as every ``terraform destroy`` added together.  Most
+stages do not depend on each other: a monitoring stage and a Key Vault
+stage both sit on the foundation stage, but neither reads the other.
+
+:func:`stage_dependencies` infers which earlier stages each stage
+depends on:
+
+- **Categories** — data stages sit on infra, integration on data and
+  infra, and application (and any other) stages on all of them.
+- **Remote state** — a stage reading another stage's state through a
+  ``terraform_remote_state`` key or path naming it (``stage1.tfstate``,
+  ``../stage-1-foundation/terraform.tfstate``) depends on it.
+- **Captured outputs** — a stage whose code references an earlier
+  stage's output by name (``.outputs.<name>``) or contains one of its
+  captured output values (resource IDs, names) depends on it.
+- **Substages** — a later substage depends on the earlier substages of
+  the same build stage.
+
+:func:`plan_rollback` reverses the graph into waves: each wave holds
+the stages that no remaining stage depends on, so a wave can be
+destroyed concurrently.  The number of waves is the length of the
+longest dependency chain.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping
+
+from azext_prototype.stages.build_state import stage_layer
+from azext_prototype.stages.deploy_state import stage_output_key
+
+# Concurrent destroys per wave
+ROLLBACK_PARALLELISM = 4
+
+# Files scanned for references, and the most read from each
+_SCANNED_SUFFIXES = (".tf", ".tfvars", ".bicep", ".bicepparam", ".json", ".sh", ".env", ".yaml", ".yml")
+_IGNORED_DIRS = frozenset({".terraform", "node_modules", ".git", "__pycache__"})
+_MAX_FILE_BYTES = 256 * 1024
+# Output values shorter than this are too generic to count as references
+_MIN_VALUE_LENGTH = 6
+
+_TFSTATE_RE = re.compile(r"""["']([^"'\s]+?)\.tfstate["']""")
+_OUTPUT_NAME_RE = re.compile(r"\.outputs\.([A-Za-z_][A-Za-z0-9_-]*)")
+
+
+@dataclass
+class RollbackPlan:
+    """Waves of stages to destroy, dependents first.
+
+    ``dependents`` maps a stage key (see
+    :func:`~.deploy_state.stage_output_key`) to the keys of planned
+    stages that depend on it, directly or through stages that are not
+    being rolled back.  A stage must not be destroyed while any of them
+    is still deployed.
+    """
+
+    waves: list[list[dict]] = field(default_factory=list)
+    dependents: dict[str, set[str]] = field(default_factory=dict)
+
+    @property
+    def stage_count(self) -> int:
+        return sum(len(wave) for wave in self.waves)
+
+    def keys(self) -> list[list[str]]:
+        """The waves as stage keys, for persisting progress."""
+        return [[stage_output_key(stage) for stage in wave] for wave in self.waves]
+
+
+def stage_dependencies(
+    stages: list[dict],
+    project_dir: str | Path,
+    captured_outputs: Mapping[str, Mapping[str, Any]] | None = None,
+) -> dict[str, set[str]]:
+    """Map each stage key to the keys of the earlier stages it depends on.
+
+    *stages* are in deployment order.  *captured_outputs* is the deploy
+    state's ``{stage_key: {output: value}}``.
+    """
+    project = Path(project_dir)
+    outputs = captured_outputs or {}
+    keys = [stage_output_key(stage) for stage in stages]
+    deps: dict[str, set[str]] = {key: set() for key in keys}
+
+    for i, stage in enumerate(stages):
+        layer = stage_layer(stage)
+        text: str | None = None
+        for j in range(i):
+            earlier = stages[j]
+            if stage_layer(earlier) < layer or _same_build_stage(earlier, stage):
+                deps[keys[i]].add(keys[j])
+                continue
+            if text is None:
+                text = _stage_text(project / stage.get("dir", "")) if stage.get("dir") else ""
+            if text and _references(text, earlier, outputs.get(keys[j]) or {}):
+                deps[keys[i]].add(keys[j])
+    return deps
+
+
+def plan_rollback(stages: list[dict], dependencies: Mapping[str, set[str]]) -> RollbackPlan:
+    """Order *stages* (the deployed ones) into destroy waves.
+
+    *dependencies* comes from :func:`stage_dependencies` over all
+    stages, so a dependency through a stage that is not deployed still
+    orders the two stages around it.
+    """
+    keys = {stage_output_key(stage): stage for stage in stages}
+    dependents: dict[str, set[str]] = {key: set() for key in keys}
+    for key in keys:
+        for dep in _planned_dependencies(key, keys, dependencies):
+            dependents[dep].add(key)
+
+    waves: list[list[dict]] = []
+    remaining = dict(keys)
+    while remaining:
+        wave = [key for key in remaining if not dependents[key] & remaining.keys()]
+        if not wave:  # pragma: no cover - edges only point to earlier stages
+            wave = list(remaining)
+        waves.append(
+            sorted(
+                (remaining.pop(key) for key in wave),
+                key=lambda s: (s.get("stage", 0), s.get("substage_label") or ""),
+                reverse=True,
+            )
+        )
+    return RollbackPlan(waves=waves, dependents=dependents)
+
+
+def _planned_dependencies(key: str, planned: Mapping[str, Any], dependencies: Mapping[str, set[str]]) -> set[str]:
+    """Planned stages *key* depends on, looking through unplanned ones."""
+    found: set[str] = set()
+    seen: set[str] = set()
+    stack = list(dependencies.get(key, ()))
+    while stack:
+        dep = stack.pop()
+        if dep in seen:
+            continue
+        seen.add(dep)
+        if dep in planned:
+            found.add(dep)
+        else:
+            stack.extend(dependencies.get(dep, ()))
+    return found
+
+
+def _same_build_stage(earlier: dict, stage: dict) -> bool:
+    bid = stage.get("build_stage_id")
+    return bool(bid) and earlier.get("build_stage_id") == bid
+
+
+def _references(text: str, earlier: dict, outputs: Mapping[str, Any]) -> bool:
+    """Whether stage code *text* references the *earlier* stage."""
+    names = _state_names(earlier)
+    for match in _TFSTATE_RE.finditer(text):
+        parts = re.split(r"[/\\]", match.group(1))
+        if parts[-1] in names or (earlier.get("dir") and Path(earlier["dir"]).name in parts):
+            return True
+    if outputs:
+        if any(name in outputs for name in _OUTPUT_NAME_RE.findall(text)):
+            return True
+        for value in outputs.values():
+            if isinstance(value, str) and len(value) >= _MIN_VALUE_LENGTH and value in text:
+                return True
+    return False
+
+
+def _state_names(stage: dict) -> set[str]:
+    """State file stems that may name *stage* (``stage1``, its ID, its directory)."""
+    num = stage.get("stage")
+    names = {f"stage{num}", f"stage-{num}", f"stage_{num}"}
+    if stage.get("build_stage_id"):
+        names.add(stage["build_stage_id"])
+    if stage.get("dir"):
+        names.add(Path(stage["dir"]).name)
+    return names
+
+
+def _stage_text(stage_dir: Path) -> str:
+    """Concatenated text of the files in *stage_dir* worth scanning."""
+    if not stage_dir.is_dir():
+        return ""
+    chunks: list[str] = []
+    for path in sorted(stage_dir.rglob("*")):
+        rel = path.relative_to(stage_dir)
+        if any(part in _IGNORED_DIRS for part in rel.parts[:-1]) or not path.is_file():
+            continue
+        if path.suffix not in _SCANNED_SUFFIXES or path.name.endswith(".tfstate"):
+            continue
+        try:
+            if path.stat().st_size > _MAX_FILE_BYTES:
+                continue
+            chunks.append(path.read_text(encoding="utf-8", errors="replace"))
+        except OSError:
+            continue
+    return "\n".join(chunks)
@@ -21,17 +21,26 @@ Design principles:
   from ``opencensus-ext-azure`` but its ``BaseLogHandler.createLock()``
   override sets ``self.lock = None`` which is incompatible with Python
   3.13+ where ``logging.Handler.handle()`` uses ``with self.lock:``.  We
-  now POST directly to the ``/v2/track`` ingestion endpoint which is
-  synchronous and guaranteed to complete before the CLI process exits.
+  now POST directly to the ``/v2/track`` ingestion endpoint.
+* **Never block the command** — events are appended to a small on-disk
+  spool and delivered in batches by a daemon thread, so command exit
+  never waits on the network.  Whatever a process does not get to is
+  delivered by the flusher that starts with the next tracked command.
+  Undeliverable events are dropped after ``_MAX_ATTEMPTS`` tries.
 """
 
 import json
 import logging
 import os
+import threading
+import time
+import uuid
 from datetime import datetime, timezone
 from functools import wraps
 from pathlib import Path
 
+from azext_prototype.knowledge.search_cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------
@@ -47,6 +56,11 @@ _BUILTIN_CONNECTION_STRING = ""
 _ingestion_endpoint: str | None = None
 _instrumentation_key: str | None = None
 _enabled: bool | None = None
+_tenant_id: str | None = None
+_dimension_cache: dict | None = None
+
+# (prototype.yaml path, mtime_ns) -> parsed data
+_project_config_cache = LRUCache(max_entries=8, name="project-config")
 
 
 # ---------------------------------------------------------------
@@ -130,10 +144,13 @@ def is_enabled() -> bool:
 
 def reset() -> None:
     """Reset cached state — useful for tests."""
-    global _enabled, _ingestion_endpoint, _instrumentation_key
+    global _enabled, _ingestion_endpoint, _instrumentation_key, _tenant_id, _dimension_cache
     _enabled = None
     _ingestion_endpoint = None
     _instrumentation_key = None
+    _tenant_id = None
+    _dimension_cache = None
+    _project_config_cache.clear()
 
 
 # ---------------------------------------------------------------
@@ -201,16 +218,47 @@ def _get_extension_version() -> str:
         return "unknown"
 
 
+def _profile_stamp() -> list | None:
+    """Path, mtime and size of the CLI's ``azureProfile.json``, or ``None``."""
+    try:
+        from azure.cli.core._environment import get_config_dir
+
+        path = os.path.join(get_config_dir(), "azureProfile.json")
+        stat = os.stat(path)
+        return [path, stat.st_mtime_ns, stat.st_size]
+    except Exception:
+        return None
+
+
 def _get_tenant_id(cmd) -> str:
-    """Try to extract the tenant ID from the CLI authentication context."""
+    """Try to extract the tenant ID from the CLI authentication context.
+
+    Building a ``Profile`` reads the CLI's token cache, so the result is
+    cached for the lifetime of the process and on disk until
+    ``azureProfile.json`` changes (login, logout, ``az account set``).
+    """
+    global _tenant_id
+    if _tenant_id is not None:
+        return _tenant_id
+
+    stamp = _profile_stamp()
+    cached = _load_dimension_cache().get("tenant")
+    if stamp and isinstance(cached, dict) and cached.get("stamp") == stamp:
+        _tenant_id = str(cached.get("id", ""))
+        return _tenant_id
+
     try:
         from azure.cli.core._profile import Profile
 
         profile = Profile(cli_ctx=cmd.cli_ctx)
         sub = profile.get_subscription()
-        return sub.get("tenantId", "")
+        _tenant_id = sub.get("tenantId", "") or ""
     except Exception:
-        return ""
+        _tenant_id = ""
+    if stamp and _tenant_id:
+        _load_dimension_cache()["tenant"] = {"stamp": stamp, "id": _tenant_id}
+        _save_dimension_cache()
+    return _tenant_id
 
 
 # ---------------------------------------------------------------
@@ -230,22 +278,88 @@ _DEFAULT_PROVIDER_MODELS: dict[str, str] = {
 # ---------------------------------------------------------------
 
 
-def _get_ai_config() -> tuple[str, str]:
-    """Try to read AI provider and model from the current project config.
+def _load_project_config() -> dict:
+    """Return the parsed ``prototype.yaml`` from the current directory.
 
-    Returns ``(provider, model)`` — both empty strings on any failure.
+    Memoized by path and mtime so the several dimension lookups made for
+    one event parse the file only once.  Returns ``{}`` when the file is
+    missing or unreadable.
     """
+    # The canonical config file is 'prototype.yaml' at the project root.
+    config_path = Path.cwd() / "prototype.yaml"
+    try:
+        mtime = config_path.stat().st_mtime_ns
+    except OSError:
+        return {}
+
+    key = (str(config_path), mtime)
+    cached = _project_config_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
-        # The canonical config file is 'prototype.yaml' at the project root.
-        config_path = Path.cwd() / "prototype.yaml"
-        if not config_path.exists():
-            return "", ""
         import yaml  # lazy — avoids import cost when telemetry is off
 
         with open(config_path, encoding="utf-8") as fh:
             data = yaml.safe_load(fh) or {}
-        ai = data.get("ai", {})
-        return ai.get("provider", ""), ai.get("model", "")
+        if not isinstance(data, dict):
+            data = {}
+    except Exception:
+        data = {}
+    _project_config_cache.put(key, data)
+    return data
+
+
+def _project_dimensions() -> dict:
+    """Return the ``provider``, ``model`` and ``project_id`` of ``prototype.yaml``.
+
+    Cached on disk by the file's path, mtime and size, so a command
+    exiting in an unchanged project does not parse YAML at all.
+    Returns ``{}`` when the file is missing.
+    """
+    config_path = Path.cwd() / "prototype.yaml"
+    try:
+        stat = config_path.stat()
+    except OSError:
+        return {}
+
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    cache = _load_dimension_cache()
+    projects = cache.get("projects")
+    if not isinstance(projects, dict):
+        projects = cache["projects"] = {}
+    key = str(config_path)
+    entry = projects.get(key)
+    if isinstance(entry, dict) and entry.get("stamp") == stamp:
+        return entry
+
+    data = _load_project_config()
+    try:
+        ai = data.get("ai") or {}
+        entry = {
+            "stamp": stamp,
+            "provider": ai.get("provider", ""),
+            "model": ai.get("model", ""),
+            "project_id": (data.get("project") or {}).get("id", ""),
+        }
+    except Exception:
+        entry = {"stamp": stamp}
+    projects.pop(key, None)
+    projects[key] = entry
+    while len(projects) > _MAX_CACHED_PROJECTS:
+        projects.pop(next(iter(projects)))
+    _save_dimension_cache()
+    return entry
+
+
+def _get_ai_config() -> tuple[str, str]:
+    """Try to read AI provider and model from the current project config.
+
+    Returns ``(provider, model)`` — both empty strings on any failure.
+    """
+    try:
+        dims = _project_dimensions()
+        return dims.get("provider", ""), dims.get("model", "")
     except Exception:
         return "", ""
 
@@ -256,20 +370,75 @@ def _get_project_id() -> str:
     Returns an empty string on any failure.
     """
     try:
-        config_path = Path.cwd() / "prototype.yaml"
-        if not config_path.exists():
-            return ""
-        import yaml
-
-        with open(config_path, encoding="utf-8") as fh:
-            data = yaml.safe_load(fh) or {}
-        return data.get("project", {}).get("id", "")
+        return _project_dimensions().get("project_id", "")
     except Exception:
         return ""
 
 
-def _send_envelope(envelope: dict, endpoint: str) -> bool:
-    """POST a single envelope to the App Insights ingestion endpoint.
+# ---------------------------------------------------------------
+# On-disk dimension cache
+# ---------------------------------------------------------------
+# Resolving the tenant builds a ``Profile`` and the project dimensions
+# parse ``prototype.yaml``; both run in every tracked command's
+# ``finally`` block, so their results are kept next to the spool.
+
+_DIMENSIONS_FILE = "dimensions.cache"  # not ``*.json`` — never claimed as an event
+_MAX_CACHED_PROJECTS = 8
+
+
+def _dimensions_path() -> str:
+    return os.path.join(_spool_dir(), _DIMENSIONS_FILE)
+
+
+def _load_dimension_cache() -> dict:
+    """Return the cached tenant and project dimensions, read once per process."""
+    global _dimension_cache
+    if _dimension_cache is None:
+        try:
+            with open(_dimensions_path(), encoding="utf-8") as fh:
+                data = json.load(fh)
+            _dimension_cache = data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            _dimension_cache = {}
+    return _dimension_cache
+
+
+def _save_dimension_cache() -> None:
+    """Write the dimension cache atomically.  Never raises."""
+    path = _dimensions_path()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(_load_dimension_cache(), fh, default=str)
+        os.replace(tmp, path)
+    except (OSError, ValueError):
+        logger.debug("Could not write telemetry dimension cache", exc_info=True)
+
+
+# ---------------------------------------------------------------
+# Delivery — disk spool + background flusher
+# ---------------------------------------------------------------
+
+_SPOOL_DIRNAME = "prototype_telemetry"
+_BATCH_SIZE = 50  # envelopes per POST
+_MAX_ATTEMPTS = 3  # delivery attempts before an event is dropped
+_MAX_SPOOL_FILES = 500  # oldest events are dropped beyond this
+_CLAIM_TIMEOUT = 300  # seconds before an abandoned in-flight event is retried
+_POST_TIMEOUT = 5
+
+_flush_lock = threading.Lock()
+_flush_thread: threading.Thread | None = None
+
+
+def _spool_dir() -> str:
+    """Return the directory holding undelivered telemetry events."""
+    base = os.environ.get("AZURE_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".azure")
+    return os.path.join(base, _SPOOL_DIRNAME)
+
+
+def _post_batch(envelopes: list[dict], endpoint: str) -> bool:
+    """POST *envelopes* to the App Insights ingestion endpoint.
 
     Returns *True* on success (HTTP 200 with items accepted),
     *False* on any error.  Never raises.
@@ -279,15 +448,167 @@ def _send_envelope(envelope: dict, endpoint: str) -> bool:
 
         resp = requests.post(
             endpoint,
-            data=json.dumps([envelope]),
+            data=json.dumps(envelopes),
             headers={"Content-Type": "application/json"},
-            timeout=5,
+            timeout=_POST_TIMEOUT,
         )
         return resp.status_code == 200
     except Exception:
         return False
 
 
+def _spool_envelope(envelope: dict, endpoint: str) -> bool:
+    """Write one event to the spool atomically.  Returns *False* on error."""
+    spool = _spool_dir()
+    name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+    path = os.path.join(spool, name)
+    tmp = path + ".tmp"
+    try:
+        os.makedirs(spool, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"endpoint": endpoint, "attempts": 0, "envelope": envelope}, fh)
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        return False
+
+
+def _claim_pending(spool: str, skip: set[str]) -> list[str]:
+    """Claim spooled events for delivery by renaming them to ``.sending``.
+
+    The rename is atomic, so two processes flushing the same spool never
+    deliver the same event twice.  Returns the claimed paths, oldest first.
+    """
+    try:
+        names = sorted(os.listdir(spool))
+    except OSError:
+        return []
+
+    now = time.time()
+    pending: list[str] = []
+    for name in names:
+        path = os.path.join(spool, name)
+        if name.endswith(".json.sending"):
+            # A process that exited mid-delivery leaves its claim behind.
+            try:
+                if now - os.path.getmtime(path) > _CLAIM_TIMEOUT:
+                    os.replace(path, path[: -len(".sending")])
+                    pending.append(name[: -len(".sending")])
+            except OSError:
+                pass
+        elif name.endswith(".json"):
+            pending.append(name)
+
+    pending = sorted(n for n in pending if n not in skip)
+    overflow = len(pending) - _MAX_SPOOL_FILES
+    for name in pending[: max(0, overflow)]:
+        try:
+            os.remove(os.path.join(spool, name))
+        except OSError:
+            pass
+    pending = pending[max(0, overflow) :]
+
+    claimed: list[str] = []
+    for name in pending:
+        path = os.path.join(spool, name)
+        try:
+            os.replace(path, path + ".sending")
+            os.utime(path + ".sending")
+        except OSError:
+            continue  # Claimed by another process
+        skip.add(name)
+        claimed.append(path + ".sending")
+    return claimed
+
+
+def _release(path: str, record: dict | None, delivered: bool) -> None:
+    """Finish a claimed event — delete it, or re-queue it for another try."""
+    try:
+        if delivered or record is None or record.get("attempts", 0) + 1 >= _MAX_ATTEMPTS:
+            os.remove(path)
+            return
+        record["attempts"] = record.get("attempts", 0) + 1
+        target = path[: -len(".sending")]
+        with open(target + ".tmp", "w", encoding="utf-8") as fh:
+            json.dump(record, fh)
+        os.replace(target + ".tmp", target)
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def flush_spool() -> int:
+    """Deliver spooled events in batches.  Returns the number delivered.
+
+    Each event gets one attempt per flush; failed events stay in the
+    spool until they have been tried ``_MAX_ATTEMPTS`` times.  Never raises.
+    """
+    spool = _spool_dir()
+    attempted: set[str] = set()
+    delivered = 0
+    try:
+        while True:
+            claimed = _claim_pending(spool, attempted)
+            if not claimed:
+                return delivered
+
+            by_endpoint: dict[str, list[tuple[str, dict]]] = {}
+            for path in claimed:
+                try:
+                    with open(path, encoding="utf-8") as fh:
+                        record = json.load(fh)
+                    by_endpoint.setdefault(record["endpoint"], []).append((path, record))
+                except (OSError, ValueError, KeyError, TypeError):
+                    _release(path, None, False)  # Corrupt — discard
+
+            for endpoint, items in by_endpoint.items():
+                for i in range(0, len(items), _BATCH_SIZE):
+                    batch = items[i : i + _BATCH_SIZE]
+                    ok = _post_batch([record["envelope"] for _, record in batch], endpoint)
+                    for path, record in batch:
+                        _release(path, record, ok)
+                    if ok:
+                        delivered += len(batch)
+    except Exception:
+        logger.debug("Telemetry flush failed", exc_info=True)
+        return delivered
+
+
+def _start_flusher() -> None:
+    """Start the background flusher unless one is already running."""
+    global _flush_thread
+    with _flush_lock:
+        if _flush_thread is not None and _flush_thread.is_alive():
+            return
+        _flush_thread = threading.Thread(target=flush_spool, name="telemetry-flush", daemon=True)
+        _flush_thread.start()
+
+
+def _wait_for_flush(timeout: float | None = None) -> None:
+    """Block until the running flusher finishes — for tests only."""
+    thread = _flush_thread
+    if thread is not None:
+        thread.join(timeout)
+
+
+def _send_envelope(envelope: dict, endpoint: str) -> bool:
+    """Queue *envelope* for background delivery.
+
+    The event is spooled to disk and the background flusher is started;
+    this never touches the network on the calling thread.  Returns
+    *True* when the event was queued, *False* on any error.  Never raises.
+    """
+    try:
+        if not _spool_envelope(envelope, endpoint):
+            # Unwritable spool — best-effort direct send, still off-thread.
+            threading.Thread(target=_post_batch, args=([envelope], endpoint), daemon=True).start()
+            return False
+        _start_flusher()
+        return True
+    except Exception:
+        return False
+
+
 def track_command(
     command_name: str,
     *,
@@ -512,6 +833,13 @@ def track(command_name: str):
         def wrapper(cmd, *args, **kwargs):
             success = True
             error_msg = ""
+            try:
+                # Give events left over from earlier commands the whole
+                # duration of this one to be delivered.
+                if is_enabled():
+                    _start_flusher()
+            except Exception:
+                pass
             try:
                 return func(cmd, *args, **kwargs)
             except Exception as exc:
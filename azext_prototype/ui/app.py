@@ -37,6 +37,7 @@ class PrototypeApp(App):
 
     BINDINGS = [
         ("ctrl+c", "quit", "Quit"),
+        ("escape", "cancel_command", "Cancel command"),
     ]
 
     def __init__(
@@ -92,7 +93,7 @@ class PrototypeApp(App):
     def on_mount(self) -> None:
         """Set up the initial state after widgets are mounted."""
         self.title = "az prototype"
-        self.info_bar.update_assist("Enter = submit | Ctrl+J = newline | Ctrl+C = quit")
+        self.info_bar.update_assist("Enter = submit | Ctrl+J = newline | Esc = cancel command | Ctrl+C = quit")
         self.prompt_input.disable()
 
         # Write a welcome banner
@@ -126,6 +127,10 @@ class PrototypeApp(App):
         """Signal the adapter so worker threads unblock and exit."""
         self.adapter.shutdown()
 
+    def action_cancel_command(self) -> None:
+        """Stop the deploy command running on the worker thread, if any."""
+        self.adapter.cancel_command()
+
     # ------------------------------------------------------------------ #
     # Event handlers
     # ------------------------------------------------------------------ #
@@ -449,6 +449,7 @@ class StageOrchestrator:
                 registry,
                 input_fn=self._adapter.input_fn,
                 print_fn=self._adapter.print_fn,
+                cancel_event=self._adapter.cancel_event,
             )
             self._adapter.update_task("deploy", TaskStatus.COMPLETED)
             self._populate_deploy_subtasks()
@@ -5,6 +5,9 @@ threads and call ``input_fn`` / ``print_fn`` synchronously.  This
 adapter translates those calls into Textual widget operations using
 ``call_from_thread`` (thread-safe scheduling on the main event loop)
 and ``threading.Event`` (blocking the worker until the user submits).
+Console output is the exception: it is queued on the ConsoleView with
+:meth:`ConsoleView.enqueue` and flushed once per frame, so chatty
+sessions never wait on the event loop.
 
 On shutdown the adapter's :meth:`shutdown` method is called by the app.
 This sets the ``_shutdown`` event so that any worker thread blocked in
@@ -73,6 +76,9 @@ class TUIAdapter:
         self._input_value: str = ""
         # Shutdown signal — unblocks any waiting worker thread
         self._shutdown = threading.Event()
+        # Cancellation signal for the command a session is running
+        # (Ctrl+C never reaches worker threads)
+        self.cancel_event = threading.Event()
         # Elapsed timer state (managed on the main thread)
         self._timer_start: float | None = None
         self._timer_handle = None  # Textual Timer reference
@@ -95,6 +101,10 @@ class TUIAdapter:
         """True if the adapter has been told to shut down."""
         return self._shutdown.is_set()
 
+    def cancel_command(self) -> None:
+        """Ask the session to stop the command it is running."""
+        self.cancel_event.set()
+
     # ------------------------------------------------------------------ #
     # Screen refresh helper
     # ------------------------------------------------------------------ #
@@ -120,25 +130,23 @@ class TUIAdapter:
     def print_fn(self, message: str = "", **kwargs) -> None:
         """Write *message* to the ConsoleView widget.
 
-        Called from a worker thread; delegates to the main thread via
-        ``call_from_thread``.  If the message contains Rich markup tags
-        (e.g. ``[success]✓[/success]``), they are preserved so the
-        console renders colored output.
+        Called from a worker thread.  The write is queued on the console
+        without blocking; queued lines are applied on the main thread in
+        one batch per frame, so bursts of output cost one repaint rather
+        than one ``call_from_thread`` round trip per line.  If the
+        message contains Rich markup tags (e.g. ``[success]✓[/success]``),
+        they are preserved so the console renders colored output.
         """
         if self._shutdown.is_set():
             return
 
         msg = str(message)
-
-        def _write() -> None:
+        try:
+            console = self._app.console_view
             if _RICH_TAG_RE.search(msg):
-                self._app.console_view.write_markup(msg)
+                console.enqueue(console.write_markup, msg)
             else:
-                self._app.console_view.write_text(msg)
-            self._request_screen_update()
-
-        try:
-            self._app.call_from_thread(_write)
+                console.enqueue(console.write_text, msg)
         except Exception:
             pass  # App already torn down
 
@@ -151,12 +159,8 @@ class TUIAdapter:
         if self._shutdown.is_set():
             return
         try:
-
-            def _render():
-                self._app.console_view.write_agent_response(content)
-                self._request_screen_update()
-
-            self._app.call_from_thread(_render)
+            console = self._app.console_view
+            console.enqueue(console.write_agent_response, content)
         except Exception:
             pass
 
@@ -179,6 +183,8 @@ class TUIAdapter:
         self._input_event.clear()
 
         def _enable_prompt() -> None:
+            # Show any queued output (usually the question) before the prompt
+            self._app.console_view.flush()
             self._app.prompt_input.enable(placeholder=prompt_text)
             self._request_screen_update()
 
@@ -209,7 +215,9 @@ class TUIAdapter:
         self._app.prompt_input.disable()
         # Echo user input to console (skip for empty pagination presses)
         if value:
-            self._app.console_view.write_text(f"> {value}", style=COLORS["content"])
+            console = self._app.console_view
+            console.flush()
+            console.write_text(f"> {value}", style=COLORS["content"])
         # Unblock the waiting worker thread
         self._input_event.set()
 
@@ -3,26 +3,69 @@
 Renders Rich renderables (Markdown, Panel, Table, Text) directly
 and provides semantic convenience methods mirroring ``Console`` from
 ``console.py``.
+
+Long build/deploy sessions write thousands of lines, so the view is
+tuned for volume:
+
+- **Bounded scrollback** — only the last ``max_lines`` rendered lines
+  are kept.  Older lines are dropped in batches, so trimming is
+  amortised O(1) per write rather than a list copy on every write.
+- **Virtualised painting** — ``RichLog.render_line`` only crops and
+  caches the lines inside the viewport; off-screen lines cost memory
+  (bounded above) but no render time.
+- **Coalesced writes** — worker threads call :meth:`ConsoleView.enqueue`,
+  which appends to a pending queue and posts at most one flush message.
+  The flush drains everything queued, is throttled to one per frame,
+  and scrolls/repaints once per batch instead of once per line.
+- **Cached markdown** — parsed ``Markdown`` renderables are memoized by
+  content so repeated agent responses are not re-parsed.
 """
 
 from __future__ import annotations
 
 import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
 
+from rich.console import RenderableType
 from rich.markdown import Markdown
 from rich.text import Text
+from textual.geometry import Size
+from textual.message import Message
 from textual.widgets import RichLog
 
+from azext_prototype.knowledge.search_cache import LRUCache
 from azext_prototype.ui.theme import RICH_THEME
 
 # Ordered list fix ported from console.py
 _ORDERED_LIST_RE = re.compile(r"^(\s*)(\d+)\.\s", re.MULTILINE)
 
+# Rendered lines kept in the scrollback
+_MAX_SCROLLBACK_LINES = 10_000
+# Extra lines tolerated before trimming, as a fraction of the limit
+_TRIM_SLACK = 0.1
+# Minimum seconds between two flushes of queued writes (~60 fps)
+_FRAME_INTERVAL = 1 / 60
+
+# Parsed agent responses, keyed by raw markdown content
+_MARKDOWN_CACHE = LRUCache(max_entries=64)
+
 
 def _preprocess_markdown(content: str) -> str:
     return _ORDERED_LIST_RE.sub(r"**\2.** ", content)
 
 
+def _render_markdown(content: str) -> Markdown:
+    """Return a (cached) ``Markdown`` renderable for *content*."""
+    markdown = _MARKDOWN_CACHE.get(content)
+    if markdown is None:
+        markdown = Markdown(_preprocess_markdown(content))
+        _MARKDOWN_CACHE.put(content, markdown)
+    return markdown
+
+
 class ConsoleView(RichLog):
     """Scrollable console panel for agent output, status messages, etc."""
 
@@ -33,7 +76,10 @@ class ConsoleView(RichLog):
     }
     """
 
-    def __init__(self, **kwargs) -> None:
+    class Flush(Message, bubble=False):
+        """Posted (from any thread) when queued writes are waiting."""
+
+    def __init__(self, max_lines: int | None = _MAX_SCROLLBACK_LINES, **kwargs) -> None:
         super().__init__(
             highlight=False,
             markup=True,
@@ -41,6 +87,106 @@ class ConsoleView(RichLog):
             wrap=True,
             **kwargs,
         )
+        # Trimming is done here in batches; RichLog's own max_lines
+        # handling copies the whole line list on every write.
+        self.scrollback_limit = max_lines
+        self._pending: deque[tuple[Callable[..., Any], tuple]] = deque()
+        self._pending_lock = threading.Lock()
+        self._flush_posted = False
+        self._last_flush = 0.0
+        self.flush_count = 0
+
+    # ------------------------------------------------------------------ #
+    # Bounded scrollback
+    # ------------------------------------------------------------------ #
+
+    def write(
+        self,
+        content: RenderableType | object,
+        width: int | None = None,
+        expand: bool = False,
+        shrink: bool = True,
+        scroll_end: bool | None = None,
+        animate: bool = False,
+    ) -> ConsoleView:
+        super().write(content, width=width, expand=expand, shrink=shrink, scroll_end=scroll_end, animate=animate)
+        self._trim_scrollback()
+        return self
+
+    @property
+    def line_count_written(self) -> int:
+        """Total lines written since the view was created, including trimmed ones."""
+        return self._start_line + len(self.lines)
+
+    def _trim_scrollback(self) -> None:
+        """Drop the oldest lines once the scrollback exceeds its limit plus slack."""
+        limit = self.scrollback_limit
+        if limit is None or len(self.lines) <= limit + int(limit * _TRIM_SLACK):
+            return
+        drop = len(self.lines) - limit
+        del self.lines[:drop]
+        # render_line keys its cache on absolute line numbers
+        self._start_line += drop
+        self._widest_line_width = max((line.cell_length for line in self.lines), default=0)
+        self.virtual_size = Size(self._widest_line_width, len(self.lines))
+        self.refresh()
+
+    # ------------------------------------------------------------------ #
+    # Coalesced writes from worker threads
+    # ------------------------------------------------------------------ #
+
+    def enqueue(self, write: Callable[..., Any], *args: Any) -> None:
+        """Queue ``write(*args)`` to run on the main thread with the next batch.
+
+        Safe to call from any thread and never blocks.  *write* is
+        normally one of the semantic ``write_*`` methods below.
+        """
+        with self._pending_lock:
+            self._pending.append((write, args))
+            if self._flush_posted:
+                return
+            self._flush_posted = True
+        if not self.post_message(self.Flush()):
+            with self._pending_lock:
+                self._flush_posted = False
+
+    @property
+    def pending_count(self) -> int:
+        """Number of queued writes not yet flushed."""
+        return len(self._pending)
+
+    def on_console_view_flush(self, event: Flush) -> None:
+        event.stop()
+        wait = self._last_flush + _FRAME_INTERVAL - time.monotonic()
+        if wait > 0:
+            self.set_timer(wait, self.flush)
+        else:
+            self.flush()
+
+    def flush(self) -> None:
+        """Apply every queued write, then scroll and repaint once.
+
+        Must run on the main thread.
+        """
+        with self._pending_lock:
+            batch = list(self._pending)
+            self._pending.clear()
+            self._flush_posted = False
+        if not batch:
+            return
+        self._last_flush = time.monotonic()
+        self.flush_count += 1
+
+        auto_scroll = self.auto_scroll
+        self.auto_scroll = False
+        try:
+            for write, args in batch:
+                write(*args)
+        finally:
+            self.auto_scroll = auto_scroll
+        if auto_scroll:
+            self.scroll_end(animate=False, immediate=False, x_axis=False)
+        self.refresh()
 
     # ------------------------------------------------------------------ #
     # Semantic write methods (mirror console.py Console)
@@ -97,7 +243,7 @@ class ConsoleView(RichLog):
     def write_agent_response(self, content: str) -> None:
         """Render a markdown agent response."""
         self.write(Text())
-        self.write(Markdown(_preprocess_markdown(content)))
+        self.write(_render_markdown(content))
         self.write(Text())
 
     def write_token_status(self, status_text: str) -> None:
@@ -105,8 +105,8 @@ class PromptInput(TextArea):
     # ------------------------------------------------------------------ #
 
     async def _on_key(self, event) -> None:
-        # Always let Ctrl+C bubble up to the app's quit binding
-        if event.key == "ctrl+c":
+        # Always let Ctrl+C and Escape bubble up to the app's bindings
+        if event.key in ("ctrl+c", "escape"):
             return
 
         if not self._enabled:
@@ -27,6 +27,56 @@ def _no_telemetry_network():
         yield
 
 
+@pytest.fixture(autouse=True)
+def _isolated_telemetry_spool(tmp_path):
+    """Keep the telemetry spool out of the real ~/.azure."""
+    spool = str(tmp_path / "telemetry_spool")
+    with patch("azext_prototype.telemetry._spool_dir", return_value=spool):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _isolated_document_cache(tmp_path):
+    """Keep the persistent Learn document cache out of the real ~/.azure."""
+    cache_dir = str(tmp_path / "learn_cache")
+    with patch("azext_prototype.knowledge.doc_cache._cache_dir", return_value=cache_dir):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _isolated_knowledge_index(tmp_path):
+    """Keep the persisted knowledge index out of the real ~/.azure."""
+    index_dir = tmp_path / "knowledge_index"
+    with patch(
+        "azext_prototype.knowledge.local_index._index_path",
+        side_effect=lambda key: str(index_dir / f"{key}.json"),
+    ):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _isolated_tool_cache(tmp_path):
+    """Keep the persisted tool-version cache out of the real ~/.azure."""
+    cache_file = str(tmp_path / "tool_versions.json")
+    with patch("azext_prototype.requirements._cache_path", return_value=cache_file):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _no_backlog_api_auth():
+    """Keep backlog pushes on the (mocked) CLI path — never call real APIs."""
+    with patch("azext_prototype.stages.backlog_session.resolve_push_auth", return_value=None):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _isolated_intent_cache(tmp_path):
+    """Keep the persisted intent classification cache out of the real ~/.azure."""
+    cache_file = str(tmp_path / "intent_cache.json")
+    with patch("azext_prototype.stages.intent._cache_path", return_value=cache_file):
+        yield
+
+
 def make_ai_response(content="Mock AI response content", model="gpt-4o", usage=None):
     """Convenience factory for AIResponse — reduces boilerplate in tests."""
     return AIResponse(
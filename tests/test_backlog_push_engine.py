@@ -0,0 +1,373 @@
+"""Tests for the backlog API push engine — concurrent, resumable pushes.
+
+A local HTTP server stands in for the GitHub REST API and the Azure
+DevOps work item API.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from azext_prototype.stages.backlog_push import (
+    BacklogPushEngine,
+    item_keys,
+    push_target,
+    resolve_push_auth,
+)
+from azext_prototype.stages.backlog_state import BacklogState
+
+
+# ------------------------------------------------------------------
+# Local API stand-in
+# ------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self, status, payload=None, headers=None):
+        body = json.dumps(payload if payload is not None else {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _enter(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.path))
+            server.inflight += 1
+            server.max_inflight = max(server.max_inflight, server.inflight)
+            fault = server.faults.pop(0) if server.faults and self.command == "POST" else None
+        time.sleep(server.delay)
+        return fault
+
+    def _leave(self):
+        with self.server.lock:
+            self.server.inflight -= 1
+
+    def do_GET(self):  # noqa: N802
+        self._enter()
+        try:
+            if re.match(r"^/repos/[^/]+/[^/]+/issues\?", self.path):
+                with self.server.lock:
+                    issues = list(reversed(self.server.issues))
+                return self._reply(200, issues)
+            self._reply(404, {"message": "not found"})
+        finally:
+            self._leave()
+
+    def do_POST(self):  # noqa: N802
+        fault = self._enter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            url = urlsplit(self.path)
+            if "/_apis/" in url.path and "api-version" not in parse_qs(url.query):
+                return self._reply(400, {"message": "No api-version was supplied for the POST request."})
+            if fault == "429":
+                return self._reply(429, {"message": "slow down"}, {"Retry-After": "0"})
+            if fault == "400":
+                return self._reply(400, {"message": "Validation Failed"})
+
+            if re.match(r"^/repos/[^/]+/[^/]+/issues$", url.path):
+                with self.server.lock:
+                    number = len(self.server.issues) + 1
+                    issue = {
+                        "number": number,
+                        "html_url": f"https://github.example/issues/{number}",
+                        **payload,
+                    }
+                    self.server.issues.append(issue)
+                result = (200, issue)
+            elif url.path.endswith("/_apis/wit/$batch"):
+                values = []
+                with self.server.lock:
+                    for sub in payload:
+                        wi_id = len(self.server.work_items) + 1
+                        fields = {op["path"]: op["value"] for op in sub["body"] if op["path"].startswith("/fields/")}
+                        relations = [op["value"] for op in sub["body"] if op["path"] == "/relations/-"]
+                        wi_type = sub["uri"].split("$", 1)[1].split("?", 1)[0]
+                        self.server.work_items.append(
+                            {"id": wi_id, "type": wi_type, "fields": fields, "relations": relations}
+                        )
+                        body = {"id": wi_id, "_links": {"html": {"href": f"https://devops.example/{wi_id}"}}}
+                        values.append({"code": 200, "body": json.dumps(body)})
+                result = (200, {"count": len(values), "value": values})
+            elif url.path.endswith("/_apis/wit/wiql"):
+                tag = re.search(r"CONTAINS '([^']+)'", payload["query"]).group(1)
+                with self.server.lock:
+                    found = [
+                        {"id": wi["id"]} for wi in self.server.work_items if wi["fields"].get("/fields/System.Tags") == tag
+                    ]
+                result = (200, {"workItems": found})
+            else:
+                result = (404, {"message": "not found"})
+
+            if fault == "500":
+                # Applied, but the client never learns the outcome
+                return self._reply(500, {"message": "internal error"})
+            self._reply(*result)
+        finally:
+            self._leave()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_server():
+    """A local stand-in for the GitHub and Azure DevOps REST APIs.
+
+    ``server.faults`` is a queue of faults applied to the next POSTs:
+    ``"429"`` (rate limited), ``"400"`` (rejected) or ``"500"`` (applied,
+    then an error is returned).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.issues = []
+    server.work_items = []
+    server.faults = []
+    server.delay = 0.0
+    server.inflight = 0
+    server.max_inflight = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _engine(server, provider, state=None, concurrency=4, project="proj"):
+    return BacklogPushEngine(
+        provider,
+        "org",
+        project,
+        {"Authorization": "Bearer t"},
+        state=state,
+        api_base=server.url,
+        concurrency=concurrency,
+        backoff=0,
+    )
+
+
+def _items(n):
+    return [{"epic": "Infra", "title": f"Item {i}", "description": "d", "effort": "S"} for i in range(n)]
+
+
+def _posts(server):
+    return [r for r in server.requests if r[0] == "POST"]
+
+
+# ------------------------------------------------------------------
+# Keys
+# ------------------------------------------------------------------
+
+class TestItemKeys:
+    def test_stable_and_distinct(self):
+        items = [{"title": "A"}, {"title": "B"}, {"title": "A"}]
+        keys = item_keys(items)
+        assert keys == item_keys(items)
+        assert len(set(keys)) == 3
+
+    def test_parent_scoped(self):
+        assert item_keys([{"title": "A"}], "p1") != item_keys([{"title": "A"}], "p2")
+
+    def test_target_scoped(self):
+        a = push_target("github", "Org", "repo-a")
+        assert a == "github:org/repo-a"
+        b = push_target("github", "org", "repo-b")
+        assert item_keys([{"title": "A"}], target=a) != item_keys([{"title": "A"}], target=b)
+
+
+# ------------------------------------------------------------------
+# GitHub
+# ------------------------------------------------------------------
+
+class TestGitHubPush:
+    def test_pushes_all_items_concurrently(self, api_server):
+        api_server.delay = 0.05
+        results = _engine(api_server, "github", concurrency=3).push(list(enumerate(_items(9))))
+
+        assert len(api_server.issues) == 9
+        assert sorted(results) == list(range(9))
+        assert all(r["url"].startswith("https://github.example/issues/") for r in results.values())
+        assert 1 < api_server.max_inflight <= 3
+
+    def test_issue_payload(self, api_server):
+        _engine(api_server, "github").push([(0, _items(1)[0])])
+        issue = api_server.issues[0]
+        assert issue["title"] == "[Infra] Item 0"
+        assert issue["labels"] == ["effort/S", "infra"]
+        assert "<!-- prototype-backlog-id: " in issue["body"]
+
+    def test_rate_limit_retried(self, api_server):
+        api_server.faults = ["429"]
+        results = _engine(api_server, "github").push([(0, _items(1)[0])])
+        assert "url" in results[0]
+        assert len(api_server.issues) == 1
+
+    def test_ambiguous_failure_not_duplicated(self, api_server):
+        api_server.faults = ["500"]
+        results = _engine(api_server, "github").push([(0, _items(1)[0])])
+        assert results[0] == {"url": "https://github.example/issues/1", "number": "1"}
+        assert len(api_server.issues) == 1
+
+    def test_rejected_item_reports_error(self, api_server, tmp_path):
+        state = BacklogState(str(tmp_path))
+        api_server.faults = ["400"]
+        results = _engine(api_server, "github", state=state).push([(0, _items(1)[0])])
+        assert "Validation Failed" in results[0]["error"]
+        assert state.state["push_records"] == {}
+
+
+# ------------------------------------------------------------------
+# Azure DevOps
+# ------------------------------------------------------------------
+
+def _hierarchy():
+    return [
+        {
+            "epic": "Infra",
+            "title": f"Feature {f}",
+            "children": [
+                {
+                    "title": f"Story {f}.{s}",
+                    "tasks": [{"title": "T1", "done": False}, {"title": "T2", "done": True}],
+                }
+                for s in range(2)
+            ],
+        }
+        for f in range(3)
+    ]
+
+
+class TestDevOpsPush:
+    def test_one_batch_per_level(self, api_server):
+        results = _engine(api_server, "devops").push(list(enumerate(_hierarchy())))
+
+        assert len(_posts(api_server)) == 3
+        types = [wi["type"] for wi in api_server.work_items]
+        assert types.count("Feature") == 3
+        assert types.count("User%20Story") == 6
+        assert types.count("Task") == 6  # done tasks are skipped
+        assert all(len(r["children"]) == 2 for r in results.values())
+
+    def test_children_linked_to_parents(self, api_server):
+        _engine(api_server, "devops").push([(0, _hierarchy()[0])])
+        feature, story = api_server.work_items[0], api_server.work_items[1]
+        assert story["relations"][0]["rel"] == "System.LinkTypes.Hierarchy-Reverse"
+        assert story["relations"][0]["url"].endswith(f"/workItems/{feature['id']}")
+        assert feature["fields"]["/fields/System.AreaPath"] == "proj\\Infra"
+
+    def test_ambiguous_batch_not_duplicated(self, api_server):
+        api_server.faults = ["500"]
+        results = _engine(api_server, "devops").push(list(enumerate(_items(3))))
+        assert len(api_server.work_items) == 3
+        assert all("id" in r for r in results.values())
+
+
+# ------------------------------------------------------------------
+# Resumable progress
+# ------------------------------------------------------------------
+
+class TestResume:
+    def test_second_push_skips_pushed_items(self, api_server, tmp_path):
+        state = BacklogState(str(tmp_path))
+        pending = list(enumerate(_hierarchy()))
+        first = _engine(api_server, "devops", state=state).push(pending)
+        created = len(api_server.work_items)
+
+        reloaded = BacklogState(str(tmp_path))
+        reloaded.load()
+        second = _engine(api_server, "devops", state=reloaded).push(pending)
+
+        assert len(api_server.work_items) == created
+        assert {i: r["url"] for i, r in first.items()} == {i: r["url"] for i, r in second.items()}
+
+    def test_records_survive_set_items(self, api_server, tmp_path):
+        state = BacklogState(str(tmp_path))
+        state.set_items(_items(2))
+        _engine(api_server, "github", state=state).push(state.get_pending_items())
+
+        state.set_items(_items(3))  # e.g. after /add
+        _engine(api_server, "github", state=state).push(state.get_pending_items())
+        assert len(api_server.issues) == 3
+
+    def test_in_flight_item_looked_up_before_create(self, api_server, tmp_path):
+        state = BacklogState(str(tmp_path))
+        item = _items(1)[0]
+        _engine(api_server, "github").push([(0, item)])  # created, but never recorded
+        state.record_push(item_keys([item], target=push_target("github", "org", "proj"))[0], "in_flight")
+
+        results = _engine(api_server, "github", state=state).push([(0, item)])
+        assert results[0]["number"] == "1"
+        assert len(api_server.issues) == 1
+
+    def test_push_to_another_repo_creates_items(self, api_server, tmp_path):
+        state = BacklogState(str(tmp_path))
+        state.set_items(_items(2))
+        _engine(api_server, "github", state=state).push(state.get_pending_items())
+        results = _engine(api_server, "github", state=state, project="other").push(state.get_pending_items())
+        assert len(api_server.issues) == 4
+        assert {r["number"] for r in results.values()} == {"3", "4"}
+
+    def test_single_push_keyed_by_backlog_occurrence(self, api_server, tmp_path):
+        state = BacklogState(str(tmp_path))
+        items = [{"epic": "Infra", "title": "Same"}, {"epic": "Infra", "title": "Same"}]
+        state.set_items(items)
+        _engine(api_server, "github", state=state).push([(0, items[0])])
+        results = _engine(api_server, "github", state=state).push([(1, items[1])])
+        assert len(api_server.issues) == 2
+        assert results[1]["number"] == "2"
+
+
+# ------------------------------------------------------------------
+# Auth and session integration
+# ------------------------------------------------------------------
+
+class TestResolvePushAuth:
+    def test_github_token_from_env(self, monkeypatch):
+        monkeypatch.setenv("GH_TOKEN", "abc")
+        assert resolve_push_auth("github") == {"Authorization": "Bearer abc"}
+
+    def test_devops_pat_uses_basic_auth(self, monkeypatch):
+        monkeypatch.setenv("AZURE_DEVOPS_EXT_PAT", "pat")
+        assert resolve_push_auth("devops")["Authorization"].startswith("Basic ")
+
+    def test_none_without_credentials(self, monkeypatch):
+        for var in ("GH_TOKEN", "GITHUB_TOKEN"):
+            monkeypatch.delenv(var, raising=False)
+        with patch("azext_prototype.stages.backlog_push.subprocess.run", side_effect=FileNotFoundError):
+            assert resolve_push_auth("github") is None
+
+
+class TestSessionUsesEngine:
+    def test_push_all_uses_api_when_authenticated(self, tmp_path):
+        from azext_prototype.stages.backlog_session import BacklogSession
+
+        state = BacklogState(str(tmp_path))
+        state.set_items(_items(2))
+        session = BacklogSession(MagicMock(project_dir=str(tmp_path)), MagicMock(), backlog_state=state)
+
+        engine = MagicMock()
+        engine.push.return_value = {0: {"url": "u0", "number": "1"}, 1: {"url": "u1", "number": "2"}}
+        with patch("azext_prototype.stages.backlog_session.resolve_push_auth", return_value={"Authorization": "x"}), \
+             patch("azext_prototype.stages.backlog_session.BacklogPushEngine", return_value=engine), \
+             patch("azext_prototype.stages.backlog_session.push_github_issue") as mock_cli:
+            result = session._push_all("github", "org", "repo", lambda *a: None, False)
+
+        mock_cli.assert_not_called()
+        assert result.items_pushed == 2
+        assert result.push_urls == ["u0", "u1"]
+        assert state.state["push_status"] == ["pushed", "pushed"]
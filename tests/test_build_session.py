@@ -6,6 +6,7 @@ Covers all new build-stage modules introduced in the interactive build overhaul.
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -39,6 +40,25 @@ def _make_file_response(filename: str = "main.tf", code: str = "# placeholder")
 
 class TestBuildState:
 
+    def test_diff_file_hashes(self):
+        from azext_prototype.stages.build_state import diff_file_hashes
+
+        old = {"a": {"sha256": "1"}, "b": {"sha256": "2"}, "c": {"sha256": "3"}}
+        new = {"a": {"sha256": "1"}, "b": {"sha256": "X"}, "d": {"sha256": "4"}}
+        assert diff_file_hashes(old, new) == ["b", "c", "d"]
+        assert diff_file_hashes(old, old) == []
+
+    def test_record_and_get_file_hashes(self, tmp_project):
+        from azext_prototype.stages.build_state import BuildState
+
+        bs = BuildState(str(tmp_project))
+        bs.set_deployment_plan([{"stage": 1, "name": "A", "category": "infra", "services": [], "status": "pending"}])
+        bs.record_file_hashes(1, {"x/main.tf": {"sha256": "abc", "size": 3}}, ["x/main.tf"])
+
+        assert bs.get_file_hashes(1) == {"x/main.tf": "abc"}
+        assert bs.get_stage(1)["changed_files"] == ["x/main.tf"]
+        assert bs.get_file_hashes(99) == {}
+
     def test_default_state_structure(self, tmp_project):
         from azext_prototype.stages.build_state import BuildState
 
@@ -242,6 +262,32 @@ class TestBuildState:
         assert bs.state["templates_used"] == []
         assert bs.exists  # File still exists after reset
 
+    def test_stage_index_records_change_events(self, tmp_project):
+        from azext_prototype.stages.build_state import BuildState, load_stage_index, stage_changes_since
+
+        bs = BuildState(str(tmp_project))
+        bs.set_deployment_plan([
+            {"stage": 1, "name": "Foundation", "category": "infra", "services": [], "status": "pending", "files": []},
+            {"stage": 2, "name": "Data", "category": "data", "services": [], "status": "pending", "files": []},
+        ])
+        index = load_stage_index(bs._path)
+        assert index["order"] == ["foundation", "data"]
+        first = index["revision"]
+
+        # Status is build progress, not a deploy input — no event
+        bs._state["deployment_stages"][0]["status"] = "in_progress"
+        bs.save()
+        assert load_stage_index(bs._path)["revision"] == first
+
+        bs.mark_stage_generated(2, ["main.tf"], "terraform-agent")
+        index = load_stage_index(bs._path)
+        assert stage_changes_since(index, first) == {"data"}
+        assert stage_changes_since(index, index["revision"]) == set()
+
+        # Hand-editing build.yaml invalidates the index
+        bs._path.write_text(bs._path.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+        assert load_stage_index(bs._path) is None
+
 
 # ======================================================================
 # PolicyResolver tests
@@ -997,6 +1043,93 @@ class TestArchitectureDiff:
         assert result is None
 
 
+class TestRuleBasedPlanning:
+    """The architect is only consulted when the rules cannot decide."""
+
+    def test_recognised_design_skips_architect(self, build_context, build_registry, mock_architect_agent_for_build):
+        from azext_prototype.stages.build_session import BuildSession
+
+        session = BuildSession(build_context, build_registry)
+        stages = session._derive_deployment_plan("Secrets in Key Vault, data in SQL Database", [])
+
+        mock_architect_agent_for_build.execute.assert_not_called()
+        assert [s["name"] for s in stages] == ["Foundation", "Key Vault", "SQL Database", "Documentation"]
+
+    def test_larger_design_draft_is_confirmed_by_architect(
+        self, build_context, build_registry, mock_architect_agent_for_build
+    ):
+        from azext_prototype.stages.build_session import BuildSession
+
+        session = BuildSession(build_context, build_registry)
+        session._derive_deployment_plan("Key Vault + SQL Database behind App Service", [])
+
+        task = mock_architect_agent_for_build.execute.call_args[0][1]
+        assert "## Rule-based Draft" in task
+        assert "merge or split stages" in task
+
+    def test_rejected_services_are_not_planned_unreviewed(
+        self, build_context, build_registry, mock_architect_agent_for_build
+    ):
+        from azext_prototype.stages.build_session import BuildSession
+
+        session = BuildSession(build_context, build_registry)
+        session._derive_deployment_plan(
+            "Data in SQL Database. We considered Cosmos DB but rejected it; Redis caching is out of scope.", []
+        )
+
+        task = mock_architect_agent_for_build.execute.call_args[0][1]
+        draft = task.split("```json", 1)[1]
+        assert "Cosmos" not in draft.split("```", 1)[0]
+        assert "only as rejected or out of scope" in task
+
+    def test_ambiguous_design_sends_draft_to_architect(
+        self, build_context, build_registry, mock_architect_agent_for_build
+    ):
+        from azext_prototype.stages.build_session import BuildSession
+
+        session = BuildSession(build_context, build_registry)
+        stages = session._derive_deployment_plan("Key Vault fronted by Azure Firewall", [])
+
+        task = mock_architect_agent_for_build.execute.call_args[0][1]
+        assert "## Rule-based Draft" in task
+        assert "Azure Firewall" in task
+        assert stages[0]["services"][0]["computed_name"] == "zd-kv-test-dev-eus"
+
+    def test_ambiguous_design_without_architect_uses_draft(self, build_context, build_registry):
+        from azext_prototype.stages.build_session import BuildSession
+
+        session = BuildSession(build_context, build_registry)
+        session._architect_agent = None
+        stages = session._derive_deployment_plan("Key Vault fronted by Azure Firewall", [])
+        assert [s["name"] for s in stages] == ["Foundation", "Key Vault", "Documentation"]
+
+    def test_structural_diff_skips_architect(self, build_context, build_registry, mock_architect_agent_for_build):
+        from azext_prototype.stages.build_session import BuildSession
+
+        session = BuildSession(build_context, build_registry)
+        existing = session._derive_deployment_plan("Secrets in Key Vault. Data in Cosmos DB.", [])
+        result = session._diff_architectures(
+            "Secrets in Key Vault. Data in Cosmos DB.", "Secrets in Key Vault. Data in Azure SQL.", existing
+        )
+
+        mock_architect_agent_for_build.execute.assert_not_called()
+        assert result["removed"] == [3]
+        assert result["unchanged"] == [1, 2]
+        assert result["added"][0]["services"][0]["resource_type"] == "Microsoft.Sql/servers/databases"
+
+    def test_simple_adjustment_skips_architect(self, build_context, build_registry, mock_architect_agent_for_build):
+        from azext_prototype.stages.build_session import BuildSession
+
+        session = BuildSession(build_context, build_registry)
+        arch = "Key Vault + Cosmos DB"
+        session._build_state.set_deployment_plan(session._derive_deployment_plan(arch, []))
+
+        adjusted = session._adjust_plan("remove stage 3", arch, [])
+
+        mock_architect_agent_for_build.execute.assert_not_called()
+        assert [s["name"] for s in adjusted] == ["Foundation", "Key Vault", "Documentation"]
+
+
 class TestIncrementalBuildSession:
     """End-to-end tests for the incremental build flow."""
 
@@ -1596,6 +1729,73 @@ class TestBlockedFileFiltering:
         assert "versions.tf" in BuildSession._BLOCKED_FILES["terraform"]
 
 
+class TestSkipUnchangedWrites:
+    """_write_stage_files() skips byte-identical files and records hashes."""
+
+    _make_session = TestBlockedFileFiltering._make_session
+
+    def _setup(self, tmp_project):
+        session = self._make_session(tmp_project)
+        session._build_state.set_deployment_plan([
+            {"stage": 1, "name": "Foundation", "category": "infra", "services": [],
+             "status": "pending", "dir": "concept/infra/terraform/stage-1", "files": []},
+        ])
+        return session, session._build_state.get_stage(1)
+
+    def test_records_file_hashes(self, tmp_project):
+        from azext_prototype.parsers.file_extractor import content_hash
+
+        session, stage = self._setup(tmp_project)
+        written = session._write_stage_files(stage, "```main.tf\nabc\n```\n")
+
+        assert written == ["concept/infra/terraform/stage-1/main.tf"]
+        assert stage["file_hashes"] == {written[0]: {"sha256": content_hash("abc"), "size": 3}}
+        assert stage["changed_files"] == written
+
+    def test_identical_rewrite_is_skipped(self, tmp_project):
+        import os
+
+        session, stage = self._setup(tmp_project)
+        content = "```main.tf\nabc\n```\n```outputs.tf\nout\n```\n"
+        session._write_stage_files(stage, content)
+        main_tf = tmp_project / "concept" / "infra" / "terraform" / "stage-1" / "main.tf"
+        os.utime(main_tf, (1_000_000, 1_000_000))
+
+        written = session._write_stage_files(stage, "```main.tf\nabc\n```\n```outputs.tf\nchanged\n```\n")
+
+        assert len(written) == 2
+        assert main_tf.stat().st_mtime == 1_000_000
+        assert stage["changed_files"] == ["concept/infra/terraform/stage-1/outputs.tf"]
+
+    def test_regenerated_files_keep_mode(self, tmp_project):
+        import os
+
+        if os.name == "nt":
+            pytest.skip("POSIX permissions")
+        session, stage = self._setup(tmp_project)
+        session._write_stage_files(stage, "```deploy.sh\n#!/bin/sh\n```\n```main.tf\nabc\n```\n")
+        stage_dir = tmp_project / "concept" / "infra" / "terraform" / "stage-1"
+        (stage_dir / "deploy.sh").chmod(0o755)
+
+        session._write_stage_files(stage, "```deploy.sh\n#!/bin/sh\nset -e\n```\n```main.tf\nabc\n```\n")
+
+        umask = os.umask(0o022)
+        os.umask(umask)
+        assert (stage_dir / "deploy.sh").stat().st_mode & 0o777 == 0o755
+        assert (stage_dir / "main.tf").stat().st_mode & 0o777 == 0o666 & ~umask
+
+    def test_hashes_persist_via_mark_stage_generated(self, tmp_project):
+        from azext_prototype.stages.build_state import BuildState
+
+        session, stage = self._setup(tmp_project)
+        written = session._write_stage_files(stage, "```main.tf\nabc\n```\n")
+        session._build_state.mark_stage_generated(1, written, "terraform-agent")
+
+        reloaded = BuildState(str(tmp_project))
+        reloaded.load()
+        assert list(reloaded.get_file_hashes(1)) == written
+
+
 # ======================================================================
 # Terraform prompt reinforcement tests
 # ======================================================================
@@ -1835,6 +2035,123 @@ class TestPerStageQA:
         content = session._collect_stage_file_content(stage)
         assert content == ""
 
+    def _three_stages(self, project_dir):
+        stages = []
+        for num, name in ((1, "Foundation"), (2, "Data"), (3, "Messaging")):
+            rel = f"concept/infra/terraform/stage-{num}"
+            (project_dir / rel).mkdir(parents=True, exist_ok=True)
+            (project_dir / rel / "main.tf").write_text(f'resource "null" "s{num}" {{}}\n')
+            stages.append({
+                "stage": num, "name": name, "category": "infra", "dir": rel,
+                "files": [f"{rel}/main.tf"], "status": "generated", "services": [],
+            })
+        return stages
+
+    def test_batched_qa_maps_findings_to_stages(self, tmp_project):
+        from azext_prototype.stages.qa_pipeline import QA_REVIEW_PREAMBLE
+
+        session, _, tf_agent = self._make_session(tmp_project)
+        stages = self._three_stages(tmp_project)
+        session._build_state.set_deployment_plan(stages)
+        stages = session._build_state._state["deployment_stages"]
+        tasks = []
+
+        def mock_delegate(**kwargs):
+            tasks.append(kwargs["sub_task"])
+            if len(tasks) == 1:
+                return _make_response("## Stage 1\nPASS\n\n## Stage 2\nCRITICAL: missing output.\n\n## Stage 3\nPASS")
+            return _make_response("PASS")
+
+        printed = []
+        with patch("azext_prototype.stages.build_session.AgentOrchestrator") as mock_orch:
+            mock_orch.return_value.delegate.side_effect = mock_delegate
+            session._run_qa_reviews(stages, "arch", [], False, printed.append)
+
+        # One request for all three stages, one re-review of the remediated stage
+        assert len(tasks) == 2
+        assert all(f"## Stage {n}:" in tasks[0] for n in (1, 2, 3))
+        assert "## Stage 2:" in tasks[1] and "## Stage 1:" not in tasks[1]
+        assert all(task.startswith(QA_REVIEW_PREAMBLE) for task in tasks)  # cacheable prefix
+        assert tf_agent.execute.call_count == 1
+        assert "CRITICAL: missing output." in tf_agent.execute.call_args[0][1]
+        output = "\n".join(printed)
+        assert "Stage 1 passed QA." in output and "Stage 3 passed QA." in output
+        assert "Stage 2: QA found issues" in output
+
+    def test_parallel_qa_sends_one_request_per_stage(self, tmp_project):
+        session, _, tf_agent = self._make_session(tmp_project)
+        session._config.get.side_effect = lambda k, d=None: {"build.qa_mode": "parallel"}.get(k, d)
+        stages = self._three_stages(tmp_project)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def mock_delegate(**kwargs):
+            barrier.wait()  # all three reviews are in flight at once
+            return _make_response("PASS")
+
+        printed = []
+        with patch("azext_prototype.stages.build_session.AgentOrchestrator") as mock_orch:
+            mock_orch.return_value.delegate.side_effect = mock_delegate
+            session._run_qa_reviews(stages, "arch", [], False, printed.append)
+
+        assert mock_orch.return_value.delegate.call_count == 3
+        assert tf_agent.execute.call_count == 0
+        assert sum("passed QA" in line for line in printed) == 3
+
+    def test_remediation_rechecks_downstream_stages(self, tmp_project):
+        session, _, tf_agent = self._make_session(tmp_project)
+        stages = self._three_stages(tmp_project)
+        stages[2]["category"] = "data"
+        session._build_state.set_deployment_plan(stages)
+        stages = session._build_state._state["deployment_stages"]
+        tasks = []
+
+        def mock_delegate(**kwargs):
+            tasks.append(kwargs["sub_task"])
+            if len(tasks) == 1:
+                return _make_response("## Stage 1\nCRITICAL: missing output.\n\n## Stage 2\nPASS\n\n## Stage 3\nPASS")
+            return _make_response("## Stage 1\nPASS\n\n## Stage 3\nPASS")
+
+        printed = []
+        with patch("azext_prototype.stages.build_session.AgentOrchestrator") as mock_orch:
+            mock_orch.return_value.delegate.side_effect = mock_delegate
+            session._run_qa_reviews(stages, "arch", [], False, printed.append)
+
+        # Stage 3 (data) builds on the remediated infra stage; stage 2 shares its layer
+        assert len(tasks) == 2
+        assert "## Stage 1:" in tasks[1] and "## Stage 3:" in tasks[1] and "## Stage 2:" not in tasks[1]
+        assert any("Stage 3: re-checking against remediated upstream" in line for line in printed)
+
+    def test_generation_reviews_each_layer_before_the_next(self, tmp_project):
+        session, _, tf_agent = self._make_session(tmp_project)
+        stages = self._three_stages(tmp_project)
+        stages[2]["category"] = "data"
+        for stage in stages:
+            stage["status"] = "pending"
+        session._build_state.set_deployment_plan(stages)
+        events = []
+
+        def mock_execute(_ctx, task):
+            events.append("generate")
+            return _make_file_response("main.tf", 'resource "null" "x" {}')
+
+        def mock_delegate(**kwargs):
+            reviewed = [n for n in (1, 2, 3) if f"## Stage {n}:" in kwargs["sub_task"]]
+            events.append(f"qa {reviewed}")
+            return _make_response("\n\n".join(f"## Stage {n}\nPASS" for n in reviewed))
+
+        tf_agent.execute.side_effect = mock_execute
+        inputs = iter(["", "done"])
+        with patch("azext_prototype.stages.build_session.GovernanceContext") as mock_gov_cls, patch(
+            "azext_prototype.stages.build_session.AgentOrchestrator"
+        ) as mock_orch:
+            mock_gov_cls.return_value.check_response_for_violations.return_value = []
+            session._governance = mock_gov_cls.return_value
+            session._policy_resolver._governance = mock_gov_cls.return_value
+            mock_orch.return_value.delegate.side_effect = mock_delegate
+            session.run(design={"architecture": "Simple"}, input_fn=lambda p: next(inputs), print_fn=lambda m: None)
+
+        assert events[:5] == ["generate", "generate", "qa [1, 2]", "generate", "qa [3]"]
+
 
 # ======================================================================
 # Advisory QA tests
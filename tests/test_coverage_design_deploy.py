@@ -673,7 +673,7 @@ class TestDeployAppStage:
 
     @patch("azext_prototype.stages.deploy_helpers.subprocess.run")
     def test_deploy_app_stage_sub_app_failure(self, mock_run, tmp_path):
-        """Failed sub-app is logged but doesn't stop others."""
+        """Failed sub-app doesn't stop others, but fails the stage."""
         from azext_prototype.stages.deploy_helpers import deploy_app_stage
 
         api = tmp_path / "api"
@@ -684,11 +684,15 @@ class TestDeployAppStage:
         web.mkdir()
         (web / "deploy.sh").write_text("#!/bin/bash\necho ok", encoding="utf-8")
 
-        mock_run.side_effect = [
-            MagicMock(returncode=1, stdout="", stderr="api failed"),
-            MagicMock(returncode=0, stdout="ok", stderr=""),
-        ]
+        def _run(cmd, cwd=None, **kwargs):
+            if cwd.endswith("api"):
+                return MagicMock(returncode=1, stdout="", stderr="api failed")
+            return MagicMock(returncode=0, stdout="ok", stderr="")
+
+        mock_run.side_effect = _run
 
         result = deploy_app_stage(tmp_path, "sub", "rg")
-        assert result["status"] == "deployed"
-        assert "web" in result["apps"]
+        assert result["status"] == "failed"
+        assert result["apps"] == ["web"]
+        assert result["failed_apps"] == ["api"]
+        assert result["error"] == "api: api failed"
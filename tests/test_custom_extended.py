@@ -1119,6 +1119,28 @@ class TestPrototypeStatusExtended:
         assert len(result["deployment_history"]) == 1
         assert result["deployment_history"][0]["scope"] == "all"
 
+    @patch(f"{_MOD}._get_project_dir")
+    def test_status_reports_cache_metrics(self, mock_dir, project_with_config, tmp_path):
+        """Only persistent caches are reported; in-process counters restart per command."""
+        from azext_prototype.custom import prototype_status
+        from azext_prototype.knowledge.search_cache import SearchCache
+        from azext_prototype.stages.intent import ClassificationCache
+
+        cache = SearchCache()
+        cache.put("q", "r")
+        cache.get("q")
+        intent_cache = ClassificationCache(path=str(tmp_path / "intent.json"))
+        intent_cache.put("prompt", "build it", {"kind": "command"})
+
+        mock_dir.return_value = str(project_with_config)
+        with patch("azext_prototype.stages.intent.get_classification_cache", return_value=intent_cache):
+            result = prototype_status(MagicMock(), json_output=True)
+
+        assert set(result["caches"]) == {"learn-docs", "intent"}
+        assert set(result["caches"]["learn-docs"]) == {"entries", "bytes"}
+        assert result["caches"]["intent"]["entries"] == 1
+        assert result["caches"]["intent"]["bytes"] > 0
+
     @patch(f"{_MOD}._get_project_dir")
     def test_status_detailed_json_returns_dict(self, mock_dir, project_with_config):
         """When both detailed and json_output are True, json wins — returns dict."""
@@ -73,6 +73,105 @@ class TestDeploymentOutputCapture:
         result = capture.capture_bicep("not-json")
         assert result == {}
 
+    def _write_state(self, path, outputs):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"version": 4, "outputs": outputs}), encoding="utf-8")
+
+    def test_terraform_outputs_read_from_state_file(self, tmp_project):
+        stage_dir = tmp_project / "concept" / "infra" / "terraform" / "stage-1"
+        self._write_state(stage_dir / "terraform.tfstate", {
+            "rg_name": {"value": "zd-rg", "type": "string"},
+            "db_password": {"value": "s3cret", "type": "string", "sensitive": True},
+        })
+        capture = DeploymentOutputCapture(str(tmp_project))
+
+        with patch("azext_prototype.stages.deploy_helpers.subprocess.run") as mock_run:
+            result = capture.capture_terraform(stage_dir, stage="foundation")
+
+        mock_run.assert_not_called()
+        assert result == {"rg_name": "zd-rg", "db_password": "s3cret"}
+        assert capture.provenance("rg_name")["source"] == "state"
+        assert capture.get_all()["stages"]["foundation"]["sensitive"] == ["db_password"]
+
+    def test_local_backend_path_is_honoured(self, tmp_project):
+        stage_dir = tmp_project / "concept" / "infra" / "terraform" / "stage-2"
+        (stage_dir / ".terraform").mkdir(parents=True)
+        (stage_dir / ".terraform" / "terraform.tfstate").write_text(
+            json.dumps({"backend": {"type": "local", "config": {"path": "../.terraform-state/stage2.tfstate"}}}),
+            encoding="utf-8",
+        )
+        self._write_state(stage_dir.parent / ".terraform-state" / "stage2.tfstate", {"sql_fqdn": {"value": "sql.example"}})
+
+        capture = DeploymentOutputCapture(str(tmp_project))
+        assert capture.capture_terraform(stage_dir, stage="data") == {"sql_fqdn": "sql.example"}
+
+    def test_remote_backend_uses_apply_outputs(self, tmp_project):
+        stage_dir = tmp_project / "stage"
+        (stage_dir / ".terraform").mkdir(parents=True)
+        (stage_dir / ".terraform" / "terraform.tfstate").write_text(
+            json.dumps({"backend": {"type": "azurerm", "config": {}}}), encoding="utf-8"
+        )
+        streamed = {"rg_name": {"value": "zd-rg", "type": "string"}}
+        capture = DeploymentOutputCapture(str(tmp_project))
+
+        with patch("azext_prototype.stages.deploy_helpers.subprocess.run") as mock_run:
+            result = capture.capture_terraform(stage_dir, stage="foundation", outputs=streamed)
+
+        mock_run.assert_not_called()
+        assert result == {"rg_name": "zd-rg"}
+        assert capture.provenance("rg_name")["source"] == "apply"
+
+    def test_redacted_sensitive_output_falls_back_to_cli(self, tmp_project):
+        stage_dir = tmp_project / "stage"
+        stage_dir.mkdir()
+        streamed = {"rg_name": {"value": "zd-rg", "type": "string"}, "key": {"sensitive": True, "type": "string"}}
+        cli = {"rg_name": {"value": "zd-rg"}, "key": {"value": "s3cret", "sensitive": True}}
+        capture = DeploymentOutputCapture(str(tmp_project))
+
+        with patch("azext_prototype.stages.deploy_helpers.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout=json.dumps(cli))
+            result = capture.capture_terraform(stage_dir, stage="foundation", outputs=streamed)
+
+        assert mock_run.call_args.args[0] == ["terraform", "output", "-json"]
+        assert result == {"rg_name": "zd-rg", "key": "s3cret"}
+        assert capture.provenance("key")["source"] == "cli"
+
+    def test_stages_are_namespaced_and_indexed(self, tmp_project):
+        one, two = tmp_project / "one", tmp_project / "two"
+        self._write_state(one / "terraform.tfstate", {"rg_name": {"value": "rg-1"}, "vnet_id": {"value": "vnet"}})
+        self._write_state(two / "terraform.tfstate", {"rg_name": {"value": "rg-2"}, "tags": {"value": {"env": "dev"}}})
+        capture = DeploymentOutputCapture(str(tmp_project))
+        capture.capture_terraform(one, stage="foundation")
+        capture.capture_terraform(two, stage="data")
+
+        assert capture.by_stage() == {
+            "foundation": {"rg_name": "rg-1", "vnet_id": "vnet"},
+            "data": {"rg_name": "rg-2", "tags": {"env": "dev"}},
+        }
+        # Later stages win for unqualified lookups; each stage keeps its own
+        assert capture.get("rg_name") == "rg-2"
+        assert capture.get("rg_name", stage="foundation") == "rg-1"
+        assert capture.get("vnet_id") == "vnet"
+        assert capture.provenance("rg_name")["stage"] == "data"
+        # Flat view kept for older deploy scripts
+        assert capture.get_all()["terraform"]["rg_name"] == "rg-2"
+
+        env = capture.to_env_vars()
+        assert env["PROTOTYPE_RG_NAME"] == "rg-2"
+        assert env["PROTOTYPE_TAGS"] == '{"env": "dev"}'
+        env_file = (tmp_project / DeploymentOutputCapture.ENV_FILE).read_text(encoding="utf-8")
+        assert "PROTOTYPE_VNET_ID=vnet\n" in env_file
+        assert "PROTOTYPE_TAGS='{\"env\": \"dev\"}'\n" in env_file
+
+    def test_legacy_file_is_indexed(self, tmp_project):
+        path = tmp_project / DeploymentOutputCapture.OUTPUT_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"terraform": {"rg_name": "old-rg"}, "last_capture": "x"}), encoding="utf-8")
+
+        capture = DeploymentOutputCapture(str(tmp_project))
+        assert capture.get("rg_name") == "old-rg"
+        assert capture.by_stage() == {"terraform": {"rg_name": "old-rg"}}
+
 
 class TestDeployScriptGenerator:
     """Test deploy script generation."""
@@ -476,3 +575,361 @@ class TestResolveStageSecrets:
 
         result = resolve_stage_secrets(tmp_path, config)
         assert result == {}
+
+
+class TestStreamingDeploy:
+    """deploy/preview helpers stream through run_streaming when given on_output."""
+
+    @staticmethod
+    def _fake_runner(calls, apply_events=(), returncode=0):
+        from azext_prototype.stages.process_runner import RunResult
+
+        def _run(cmd, *, cwd=None, env=None, on_line=None, cancel_event=None, keep_stdout=False):
+            calls.append(cmd)
+            label = cmd[1] if cmd[0] == "terraform" else cmd[0]
+            lines = list(apply_events) if "apply" in cmd else [f"{label} output"]
+            for line in lines:
+                on_line(line)
+            if "apply" in cmd:
+                code = returncode
+            else:
+                code = 2 if "-detailed-exitcode" in cmd else 0  # plan has changes
+            return RunResult(args=cmd, returncode=code, stdout="\n".join(lines))
+
+        return _run
+
+    def test_deploy_terraform_streams_apply_progress(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+
+        events = [
+            json.dumps({"type": "planned_change", "change": {"action": "create"}}),
+            json.dumps({"type": "apply_start", "hook": {"resource": {"addr": "azurerm_resource_group.rg"}, "action": "create"}}),
+            json.dumps({
+                "type": "apply_complete",
+                "hook": {"resource": {"addr": "azurerm_resource_group.rg"}, "action": "create", "elapsed_seconds": 2},
+            }),
+            json.dumps({"type": "change_summary", "@message": "Apply complete! Resources: 1 added, 0 changed, 0 destroyed."}),
+        ]
+        calls, shown = [], []
+        with patch("azext_prototype.stages.deploy_helpers.run_streaming", side_effect=self._fake_runner(calls, events)):
+            result = deploy_terraform(tmp_path, "sub-123", on_output=shown.append)
+
+        assert result["status"] == "deployed"
+        assert result["summary"].startswith("Apply complete!")
+        assert calls[-1] == ["terraform", "apply", "-input=false", "-json", "tfplan"]
+        assert shown[:3] == ["init output", "validate output", "plan output"]
+        assert "[1/1] Created azurerm_resource_group.rg (2s)" in shown
+        assert not any(line.startswith("{") for line in shown)
+
+    def test_deploy_terraform_reports_diagnostics(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+
+        events = [json.dumps({
+            "type": "diagnostic",
+            "diagnostic": {"severity": "error", "summary": "Insufficient quota", "detail": "Quota exceeded"},
+        })]
+        with patch(
+            "azext_prototype.stages.deploy_helpers.run_streaming",
+            side_effect=self._fake_runner([], events, returncode=1),
+        ):
+            result = deploy_terraform(tmp_path, "sub-123", on_output=lambda line: None)
+
+        assert result["status"] == "failed"
+        assert result["command"].startswith("terraform apply")
+        assert result["error"] == "Error: Insufficient quota\n\nQuota exceeded"
+
+    def test_cancelled_command_is_reported(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+        from azext_prototype.stages.process_runner import RunResult
+
+        cancelled = RunResult(args=[], returncode=-1, cancelled=True)
+        with patch("azext_prototype.stages.deploy_helpers.run_streaming", return_value=cancelled):
+            result = deploy_terraform(tmp_path, "sub-123", on_output=lambda line: None)
+
+        assert result["status"] == "failed"
+        assert result["cancelled"] is True
+
+    def test_plan_terraform_marks_output_streamed(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import plan_terraform
+
+        shown = []
+        with patch("azext_prototype.stages.deploy_helpers.run_streaming", side_effect=self._fake_runner([])):
+            result = plan_terraform(tmp_path, "sub-123", on_output=shown.append)
+
+        assert result["streamed"] is True
+        assert shown == ["init output", "plan output"]
+
+    def test_deploy_app_stage_prefixes_sub_app_output(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_app_stage
+
+        for name in ("api", "web"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "deploy.sh").write_text("echo ok")
+
+        shown = []
+        with patch("azext_prototype.stages.deploy_helpers.run_streaming", side_effect=self._fake_runner([])):
+            result = deploy_app_stage(tmp_path, "sub", "rg", on_output=shown.append)
+
+        assert result["status"] == "deployed"
+        assert result["apps"] == ["api", "web"]
+        assert sorted(shown) == ["api | bash output", "web | bash output"]
+
+    def test_real_deploy_script_streams(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_app_stage
+
+        (tmp_path / "deploy.sh").write_text("for i in 1 2 3; do echo \"step $i\"; done\n")
+        shown = []
+        result = deploy_app_stage(tmp_path, "sub", "rg", env=dict(os.environ), on_output=shown.append)
+        assert result["status"] == "deployed"
+        assert shown == ["step 1", "step 2", "step 3"]
+
+
+class TestParallelAppDeploy:
+    """Sub-app deploy scripts run concurrently with a failure policy."""
+
+    @staticmethod
+    def _apps(stage_dir, scripts):
+        for name, script in scripts.items():
+            (stage_dir / name).mkdir()
+            (stage_dir / name / "deploy.sh").write_text(script)
+
+    def test_sub_apps_run_concurrently(self, tmp_path):
+        import time
+
+        from azext_prototype.stages.deploy_helpers import deploy_app_stage
+
+        self._apps(tmp_path, {f"svc{i}": "sleep 0.5; echo done\n" for i in range(4)})
+        shown = []
+        start = time.monotonic()
+        result = deploy_app_stage(tmp_path, "sub", "rg", env=dict(os.environ), on_output=shown.append, max_parallel=4)
+
+        assert time.monotonic() - start < 1.8  # ~0.5s, not 4 x 0.5s
+        assert result["status"] == "deployed"
+        assert result["apps"] == ["svc0", "svc1", "svc2", "svc3"]
+        assert sorted(shown) == [f"svc{i} | done" for i in range(4)]
+        assert all(r["status"] == "deployed" for r in result["app_results"].values())
+
+    def test_continue_on_error_runs_every_app(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_app_stage
+
+        self._apps(tmp_path, {"api": "echo broken >&2; exit 3\n", "web": "sleep 0.3; echo ok\n"})
+        result = deploy_app_stage(tmp_path, "sub", "rg", env=dict(os.environ), on_output=lambda line: None)
+
+        assert result["status"] == "failed"
+        assert result["apps"] == ["web"]
+        assert result["failed_apps"] == ["api"]
+        assert result["app_results"]["api"] == {"status": "failed", "error": "broken", "elapsed": result["app_results"]["api"]["elapsed"]}
+
+    def test_fail_fast_stops_remaining_apps(self, tmp_path):
+        import time
+
+        from azext_prototype.stages.deploy_helpers import deploy_app_stage
+
+        self._apps(tmp_path, {"api": "exit 1\n", "web": "sleep 30\n", "worker": "sleep 30\n"})
+        start = time.monotonic()
+        result = deploy_app_stage(tmp_path, "sub", "rg", env=dict(os.environ), max_parallel=2, fail_fast=True)
+
+        assert time.monotonic() - start < 10
+        assert result["status"] == "failed"
+        statuses = {name: r["status"] for name, r in result["app_results"].items()}
+        assert statuses == {"api": "failed", "web": "cancelled", "worker": "skipped"}
+
+    def test_user_cancel_stops_all_apps(self, tmp_path):
+        import threading
+
+        from azext_prototype.stages.deploy_helpers import deploy_app_stage
+
+        self._apps(tmp_path, {"api": "sleep 30\n", "web": "sleep 30\n"})
+        cancel = threading.Event()
+        threading.Timer(0.3, cancel.set).start()
+        result = deploy_app_stage(tmp_path, "sub", "rg", env=dict(os.environ), cancel_event=cancel)
+
+        assert result["cancelled"] is True
+        assert {r["status"] for r in result["app_results"].values()} == {"cancelled"}
+
+
+class TestSavedPlans:
+    """plan_terraform(save=True) followed by deploy_terraform reuses the plan."""
+
+    @staticmethod
+    def _ok(returncode=0, stderr=""):
+        return MagicMock(returncode=returncode, stdout="", stderr=stderr)
+
+    @staticmethod
+    def _commands(mock_run):
+        return [c.args[0][1] for c in mock_run.call_args_list]
+
+    def _dry_run(self, infra_dir, plan_code, inputs=None):
+        from azext_prototype.stages.deploy_helpers import plan_terraform
+
+        with patch("subprocess.run", side_effect=[self._ok(), self._ok(plan_code)]):
+            result = plan_terraform(infra_dir, "sub-123", save=True, inputs=inputs)
+        if plan_code == 2:
+            (infra_dir / "tfplan").write_bytes(b"plan")  # written by terraform
+        return result
+
+    def test_saved_plan_is_applied_directly(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+
+        (tmp_path / "main.tf").write_text('resource "x" "y" {}')
+        assert self._dry_run(tmp_path, 2)["changes"] is True
+
+        with patch("subprocess.run", return_value=self._ok()) as mock_run:
+            result = deploy_terraform(tmp_path, "sub-123")
+
+        assert result["status"] == "deployed"
+        assert result["saved_plan"] is True
+        assert self._commands(mock_run) == ["apply"]
+        assert mock_run.call_args.args[0][-1] == "tfplan"
+        assert not (tmp_path / ".prototype-plan.json").exists()
+        assert not (tmp_path / "tfplan").exists()
+
+    def test_no_change_plan_skips_apply(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+
+        (tmp_path / "main.tf").write_text('resource "x" "y" {}')
+        assert self._dry_run(tmp_path, 0)["changes"] is False
+
+        with patch("subprocess.run") as mock_run:
+            result = deploy_terraform(tmp_path, "sub-123")
+
+        assert result == {"status": "deployed", "tool": "terraform", "no_changes": True, "saved_plan": True}
+        mock_run.assert_not_called()
+
+    def test_edited_files_invalidate_saved_plan(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+
+        (tmp_path / "main.tf").write_text('resource "x" "y" {}')
+        self._dry_run(tmp_path, 2)
+        (tmp_path / "main.tf").write_text('resource "x" "z" {}')
+
+        with patch("subprocess.run", side_effect=[self._ok(), self._ok(), self._ok(2), self._ok()]) as mock_run:
+            result = deploy_terraform(tmp_path, "sub-123")
+
+        assert result["status"] == "deployed"
+        assert "saved_plan" not in result
+        assert self._commands(mock_run) == ["init", "validate", "plan", "apply"]
+
+    def test_changed_upstream_inputs_invalidate_saved_plan(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+
+        (tmp_path / "main.tf").write_text('resource "x" "y" {}')
+        self._dry_run(tmp_path, 0, inputs={"terraform": {"vnet_id": "a"}})
+
+        with patch("subprocess.run", return_value=self._ok()) as mock_run:
+            result = deploy_terraform(tmp_path, "sub-123", inputs={"terraform": {"vnet_id": "b"}})
+
+        assert result["no_changes"] is True
+        assert "saved_plan" not in result
+        assert self._commands(mock_run) == ["init", "validate", "plan"]
+
+    def test_stale_saved_plan_is_replanned(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+
+        (tmp_path / "main.tf").write_text('resource "x" "y" {}')
+        self._dry_run(tmp_path, 2)
+
+        stale = self._ok(1, stderr="Error: Saved plan is stale")
+        with patch(
+            "subprocess.run", side_effect=[stale, self._ok(), self._ok(), self._ok(2), self._ok()]
+        ) as mock_run:
+            result = deploy_terraform(tmp_path, "sub-123")
+
+        assert result["status"] == "deployed"
+        assert self._commands(mock_run) == ["apply", "init", "validate", "plan", "apply"]
+
+    def test_plan_uses_detailed_exitcode(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import deploy_terraform
+
+        with patch("subprocess.run", side_effect=[self._ok(), self._ok(), self._ok(1, stderr="Error: bad")]) as mock_run:
+            result = deploy_terraform(tmp_path, "sub-123")
+
+        plan_cmd = mock_run.call_args.args[0]
+        assert "-detailed-exitcode" in plan_cmd and "-out=tfplan" in plan_cmd
+        assert result["status"] == "failed"
+        assert result["error"] == "Error: bad"
+
+
+class TestConcurrentPreflight:
+    """validate_terraform_stages checks stages in parallel, isolated copies."""
+
+    @staticmethod
+    def _stages(root, count=2):
+        (root / "concept" / "infra" / "modules").mkdir(parents=True)
+        dirs = []
+        for n in range(1, count + 1):
+            stage_dir = root / "concept" / "infra" / f"stage-{n}"
+            (stage_dir / ".terraform").mkdir(parents=True)
+            (stage_dir / "main.tf").write_text('module "m" { source = "../modules" }')
+            (stage_dir / "terraform.tfstate").write_text("{}")
+            dirs.append(stage_dir)
+        return dirs
+
+    def test_working_copy_links_siblings(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import _working_copy
+
+        project = tmp_path / "project"
+        stage_dir = self._stages(project, 1)[0]
+        work = _working_copy(project, stage_dir, tmp_path / "work")
+
+        assert work == tmp_path / "work" / "concept" / "infra" / "stage-1"
+        assert (work / "main.tf").is_file()
+        assert not (work / ".terraform").exists()
+        assert not (work / "terraform.tfstate").exists()
+        assert (work.parent / "modules").resolve() == (project / "concept" / "infra" / "modules").resolve()
+
+    def test_plugin_cache_env(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import PLUGIN_CACHE_DIR, plugin_cache_env
+
+        env = plugin_cache_env(tmp_path, {"PATH": "/bin"})
+        assert env["TF_PLUGIN_CACHE_DIR"] == str((tmp_path / PLUGIN_CACHE_DIR).resolve())
+        assert (tmp_path / PLUGIN_CACHE_DIR).is_dir()
+        assert plugin_cache_env(tmp_path, {"TF_PLUGIN_CACHE_DIR": "/shared"})["TF_PLUGIN_CACHE_DIR"] == "/shared"
+
+    def test_stages_validate_concurrently_with_serial_inits(self, tmp_path):
+        import threading
+        import time
+
+        from azext_prototype.stages.deploy_helpers import validate_terraform_stages
+
+        stage_dirs = self._stages(tmp_path, 3)
+        barrier = threading.Barrier(3, timeout=10)
+        lock = threading.Lock()
+        state = {"inits": 0, "max_inits": 0}
+        cwds, cache_dirs = [], set()
+
+        def _run(cmd, cwd=None, env=None, **kwargs):
+            with lock:
+                cwds.append(cwd)
+                cache_dirs.add(env["TF_PLUGIN_CACHE_DIR"])
+            if cmd[1] == "init":
+                with lock:
+                    state["inits"] += 1
+                    state["max_inits"] = max(state["max_inits"], state["inits"])
+                time.sleep(0.05)
+                with lock:
+                    state["inits"] -= 1
+                return MagicMock(returncode=0, stdout="", stderr="")
+            barrier.wait()  # every stage validates at the same time
+            failed = "stage-2" in cwd
+            return MagicMock(returncode=1 if failed else 0, stdout="", stderr="Error: bad" if failed else "")
+
+        with patch("subprocess.run", side_effect=_run):
+            results = validate_terraform_stages(stage_dirs, tmp_path)
+
+        assert [r["ok"] for r in results] == [True, False, True]
+        assert results[1] == {"ok": False, "phase": "validate", "error": "Error: bad", "elapsed": results[1]["elapsed"]}
+        assert all(isinstance(r["elapsed"], float) for r in results)
+        assert state["max_inits"] == 1
+        assert len(cache_dirs) == 1
+        assert not any(str(tmp_path) in cwd for cwd in cwds)
+        assert all((d / "terraform.tfstate").read_text() == "{}" for d in stage_dirs)
+
+    def test_missing_terraform_reported_as_init_failure(self, tmp_path):
+        from azext_prototype.stages.deploy_helpers import validate_terraform_stages
+
+        stage_dirs = self._stages(tmp_path, 1)
+        with patch("subprocess.run", side_effect=FileNotFoundError("terraform")):
+            results = validate_terraform_stages(stage_dirs, tmp_path)
+        assert results[0]["ok"] is False
+        assert results[0]["phase"] == "init"
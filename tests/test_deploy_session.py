@@ -10,6 +10,8 @@ Covers the deploy-stage overhaul modules:
 
 from __future__ import annotations
 
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch, call
 
@@ -819,6 +821,66 @@ class TestDeploySession:
         # Should only show stage 1
         assert mock_plan.call_count == 1
 
+    @patch(
+        "azext_prototype.stages.deploy_session.plan_terraform",
+        return_value={"output": "No changes.", "error": None, "changes": False},
+    )
+    def test_dry_run_saves_plans(self, mock_plan, tmp_project):
+        stages = [
+            {"stage": 1, "name": "Infra", "category": "infra", "services": [], "dir": "concept/infra/terraform", "status": "generated", "files": []},
+        ]
+        (tmp_project / "concept" / "infra" / "terraform").mkdir(parents=True, exist_ok=True)
+        session = self._make_session(tmp_project, build_stages=stages)
+
+        output = []
+        session.run_dry_run(subscription="sub-123", print_fn=output.append)
+
+        kwargs = mock_plan.call_args.kwargs
+        assert kwargs["save"] is True
+        assert kwargs["inputs"] == {}
+        assert any("without applying" in line for line in output)
+
+    def test_dry_run_plans_stages_concurrently(self, tmp_project):
+        import threading
+
+        stages = [
+            {"stage": n, "name": f"Infra {n}", "category": "infra", "services": [], "dir": f"concept/infra/stage-{n}", "status": "generated", "files": []}
+            for n in (1, 2, 3)
+        ]
+        for n in (1, 2, 3):
+            (tmp_project / "concept" / "infra" / f"stage-{n}").mkdir(parents=True, exist_ok=True)
+        session = self._make_session(tmp_project, build_stages=stages)
+        barrier = threading.Barrier(3, timeout=10)
+
+        def _plan(stage_dir, subscription, **kwargs):
+            barrier.wait()  # all three stages plan at the same time
+            kwargs["on_output"](f"planning {stage_dir.name}")
+            return {"output": f"Plan for {stage_dir.name}", "error": None, "streamed": True, "changes": True}
+
+        output = []
+        with patch("azext_prototype.stages.deploy_session.plan_terraform", side_effect=_plan) as mock_plan:
+            session.run_dry_run(subscription="sub-123", print_fn=output.append)
+
+        locks = {id(c.kwargs["init_lock"]) for c in mock_plan.call_args_list}
+        assert len(locks) == 1
+        assert all(c.kwargs["env"]["TF_PLUGIN_CACHE_DIR"] for c in mock_plan.call_args_list)
+        assert "    Stage 2 | planning stage-2" in output
+        headers = [line for line in output if line.startswith("  Stage ")]
+        assert headers == ["  Stage 1: Infra 1 (infra)", "  Stage 2: Infra 2 (infra)", "  Stage 3: Infra 3 (infra)"]
+
+    @patch("azext_prototype.stages.deploy_session.deploy_terraform", return_value={"status": "deployed", "no_changes": True})
+    def test_single_stage_reports_no_changes(self, mock_tf, tmp_project):
+        stages = [
+            {"stage": 1, "name": "Infra", "category": "infra", "services": [], "dir": "concept/infra/terraform", "status": "generated", "files": []},
+        ]
+        (tmp_project / "concept" / "infra" / "terraform").mkdir(parents=True, exist_ok=True)
+        session = self._make_session(tmp_project, build_stages=stages)
+
+        output = []
+        result = session.run_single_stage(1, subscription="sub-123", print_fn=output.append)
+        assert len(result.deployed_stages) == 1
+        assert "  Stage 1 is up to date (no changes)." in output
+
     def test_dry_run_stage_not_found(self, tmp_project):
         session = self._make_session(tmp_project)
         output = []
@@ -846,6 +908,29 @@ class TestDeploySession:
         assert len(result.deployed_stages) == 1
         mock_tf.assert_called_once()
 
+    def test_single_stage_streams_command_output(self, tmp_project):
+        stages = [
+            {"stage": 1, "name": "Infra", "category": "infra", "services": [], "dir": "concept/infra/terraform", "status": "generated", "files": []},
+        ]
+        (tmp_project / "concept" / "infra" / "terraform").mkdir(parents=True, exist_ok=True)
+        session = self._make_session(tmp_project, build_stages=stages)
+
+        def _deploy(stage_dir, subscription, env=None, on_output=None, cancel_event=None, inputs=None):
+            on_output("[1/1] Created azurerm_resource_group.rg (2s)")
+            session.cancel()
+            assert cancel_event.is_set()
+            return {"status": "deployed"}
+
+        output = []
+        with patch("azext_prototype.stages.deploy_session.deploy_terraform", side_effect=_deploy):
+            result = session.run_single_stage(1, subscription="sub-123", print_fn=output.append)
+
+        assert len(result.deployed_stages) == 1
+        assert "    [1/1] Created azurerm_resource_group.rg (2s)" in output
+        # A new run starts with a fresh cancellation flag
+        session.run_single_stage(99, subscription="sub-123", print_fn=output.append)
+        assert not session._cancel_event.is_set()
+
     def test_single_stage_not_found(self, tmp_project):
         session = self._make_session(tmp_project)
         output = []
@@ -998,6 +1083,19 @@ class TestDeployStageIntegration:
         finally:
             os.chdir("/")
 
+    def test_cancel_event_shared_with_session(self, tmp_project):
+        """A caller's cancel event (the TUI's) is the one the session sets and checks."""
+        from azext_prototype.agents.base import AgentContext
+        from azext_prototype.stages.deploy_session import DeployResult
+        from azext_prototype.stages.deploy_stage import DeployStage
+
+        context = AgentContext(project_config={}, project_dir=str(tmp_project), ai_provider=MagicMock())
+        event = threading.Event()
+        with patch("azext_prototype.stages.deploy_stage.DeploySession") as mock_session_cls:
+            mock_session_cls.return_value.run.return_value = DeployResult(cancelled=True)
+            DeployStage().execute(context, MagicMock(), cancel_event=event)
+        assert mock_session_cls.call_args.kwargs["cancel_event"] is event
+
     @patch("azext_prototype.stages.deploy_session.DeploySession")
     def test_status_flag(self, mock_session_cls, tmp_project):
         """Test --status flag shows deploy state without starting session."""
@@ -1827,7 +1925,12 @@ class TestTerraformValidate:
         """Verify deploy_terraform() continues past validate when it passes."""
         from azext_prototype.stages.deploy_helpers import deploy_terraform
 
-        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        mock_run.side_effect = [
+            MagicMock(returncode=0, stdout="", stderr=""),  # init
+            MagicMock(returncode=0, stdout="", stderr=""),  # validate
+            MagicMock(returncode=2, stdout="", stderr=""),  # plan (-detailed-exitcode: changes)
+            MagicMock(returncode=0, stdout="", stderr=""),  # apply
+        ]
         result = deploy_terraform(tmp_project, "sub-123")
         assert result["status"] == "deployed"
         # Should have called: init, validate, plan, apply = 4 calls
@@ -1984,6 +2087,28 @@ class TestTerraformPreflightValidation:
         names = [r["name"] for r in results]
         assert any("Terraform Validate" in n for n in names)
 
+    @patch("azext_prototype.stages.deploy_session.subprocess.run")
+    def test_results_keep_stage_order_with_timing(self, mock_run, tmp_project):
+        stages = [
+            {"stage": n, "name": f"Infra {n}", "category": "infra", "services": [],
+             "dir": f"concept/infra/stage-{n}", "status": "generated", "files": []}
+            for n in (1, 2)
+        ]
+        for n in (1, 2):
+            stage_dir = tmp_project / "concept" / "infra" / f"stage-{n}"
+            stage_dir.mkdir(parents=True, exist_ok=True)
+            (stage_dir / "main.tf").write_text('resource "null" "x" {}')
+        session = self._make_session(tmp_project, build_stages=stages)
+
+        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        results = session._check_terraform_validate()
+
+        assert [r["name"] for r in results] == ["Terraform Validate (Stage 1)", "Terraform Validate (Stage 2)"]
+        assert all(isinstance(r["elapsed"], float) for r in results)
+        assert not (tmp_project / "concept" / "infra" / "stage-1" / ".terraform").exists()
+        session._deploy_state.set_preflight_results(results)
+        assert f"Syntax valid. ({results[0]['elapsed']}s)" in session._deploy_state.format_preflight_report()
+
 
 # ======================================================================
 # Deploy env threading tests
@@ -2670,6 +2795,94 @@ class TestDeployRemediation:
 
         assert remediated is None  # No remediation attempted
 
+    def test_known_provider_failure_fixed_without_agents(self, tmp_project):
+        stages = [
+            {"stage": 1, "name": "Infra", "category": "infra", "services": [],
+             "dir": "concept/infra/terraform", "status": "generated", "files": []},
+        ]
+        (tmp_project / "concept" / "infra" / "terraform").mkdir(parents=True, exist_ok=True)
+        session = self._make_session(tmp_project, build_stages=stages, ai_provider=None)
+        session._qa_agent = MagicMock()
+
+        result = {"status": "failed", "error": "The subscription is not registered to use namespace 'Microsoft.App'."}
+        stage = session._deploy_state.get_stage(1)
+        output = []
+
+        with patch("azext_prototype.stages.deploy_session.subprocess.run", return_value=MagicMock(returncode=0, stdout="{}", stderr="")) as mock_run, \
+             patch.object(session, "_deploy_single_stage", return_value={"status": "deployed"}):
+            remediated = session._remediate_deploy_failure(stage, result, False, output.append, lambda p: "")
+
+        assert remediated["status"] == "deployed"
+        assert mock_run.call_args_list[0].args[0][1:] == ["provider", "register", "--namespace", "Microsoft.App", "--wait"]
+        session._qa_agent.execute.assert_not_called()
+        assert any("Known failure: Resource provider not registered" in line for line in output)
+
+    def test_known_guidance_skips_qa_and_architect(self, tmp_project):
+        stages = [
+            {"stage": 1, "name": "Infra", "category": "infra", "services": [],
+             "dir": "concept/infra/terraform", "status": "generated", "files": []},
+        ]
+        (tmp_project / "concept" / "infra" / "terraform").mkdir(parents=True, exist_ok=True)
+        session = self._make_session(tmp_project, build_stages=stages)
+        session._qa_agent = MagicMock()
+        session._architect_agent = MagicMock()
+        mock_iac = MagicMock()
+        mock_iac.execute.return_value = _make_response("```main.tf\n# unique name\n```")
+        session._iac_agents["terraform"] = mock_iac
+
+        result = {"status": "failed", "error": 'Error: creating Storage Account "zdst1": StorageAccountAlreadyTaken'}
+        stage = session._deploy_state.get_stage(1)
+
+        with patch.object(session, "_deploy_single_stage", return_value={"status": "deployed"}):
+            remediated = session._remediate_deploy_failure(stage, result, False, lambda msg: None, lambda p: "")
+
+        assert remediated["status"] == "deployed"
+        session._qa_agent.execute.assert_not_called()
+        session._architect_agent.execute.assert_not_called()
+        assert "random suffix" in mock_iac.execute.call_args.args[1]
+
+    def test_successful_remediation_is_learned(self, tmp_project):
+        from azext_prototype.stages.escalation import EscalationTracker
+
+        stages = [
+            {"stage": 1, "name": "Infra", "category": "infra", "services": [],
+             "dir": "concept/infra/terraform", "status": "generated", "files": []},
+        ]
+        (tmp_project / "concept" / "infra" / "terraform").mkdir(parents=True, exist_ok=True)
+        tracker = EscalationTracker(str(tmp_project))
+        tracker.record_blocker("Deploy Stage 1: Infra", 'Error: waiting for "kv-1": code 409', "deploy-session", "deploy")
+
+        def _agents(session):
+            session._qa_agent = MagicMock()
+            session._qa_agent.execute.return_value = _make_response("Soft-deleted vault blocks the name.")
+            session._architect_agent = MagicMock()
+            session._architect_agent.execute.return_value = _make_response("Enable purge protection recovery.\n[]")
+            mock_iac = MagicMock()
+            mock_iac.execute.return_value = _make_response("```main.tf\n# fixed\n```")
+            session._iac_agents["terraform"] = mock_iac
+
+        session = self._make_session(tmp_project, build_stages=stages)
+        _agents(session)
+        with patch.object(session, "_deploy_single_stage", return_value={"status": "deployed"}):
+            session._remediate_deploy_failure(
+                session._deploy_state.get_stage(1), {"status": "failed", "error": 'Error: waiting for "kv-1": code 409'},
+                False, lambda msg: None, lambda p: "",
+            )
+        assert session._escalation_tracker.get_active_blockers() == []
+
+        # A fresh session recognises the same failure in another run
+        session = self._make_session(tmp_project, build_stages=stages)
+        _agents(session)
+        with patch.object(session, "_deploy_single_stage", return_value={"status": "deployed"}):
+            remediated = session._remediate_deploy_failure(
+                session._deploy_state.get_stage(1), {"status": "failed", "error": 'Error: waiting for "kv-2": code 409'},
+                False, lambda msg: None, lambda p: "",
+            )
+        assert remediated["status"] == "deployed"
+        session._qa_agent.execute.assert_not_called()
+        session._architect_agent.execute.assert_not_called()
+        assert "Enable purge protection recovery." in session._iac_agents["terraform"].execute.call_args.args[1]
+
     def test_remediation_qa_cannot_diagnose(self, tmp_project):
         """Stops early when QA can't diagnose."""
         stages = [
@@ -2722,6 +2935,59 @@ class TestDeployRemediation:
         build_stage = bs.state["deployment_stages"][0]
         assert build_stage["files"] == written
 
+    def test_remediation_skips_unchanged_and_records_hashes(self, tmp_project):
+        """Byte-identical remediation output is not rewritten; hashes land in build.yaml."""
+        import os
+
+        from azext_prototype.parsers.file_extractor import content_hash
+        from azext_prototype.stages.build_state import BuildState
+
+        stage_dir = tmp_project / "concept" / "infra" / "terraform"
+        stage_dir.mkdir(parents=True, exist_ok=True)
+        (stage_dir / "main.tf").write_text("# same", encoding="utf-8")
+        os.utime(stage_dir / "main.tf", (1_000_000, 1_000_000))
+        stages = [
+            {"stage": 1, "name": "Infra", "category": "infra", "services": [],
+             "dir": "concept/infra/terraform", "status": "generated",
+             "files": ["concept/infra/terraform/main.tf"]},
+        ]
+        session = self._make_session(tmp_project, build_stages=stages)
+        stage = session._deploy_state.get_stage(1)
+
+        written = session._write_stage_files(stage, "```main.tf\n# same\n```\n```variables.tf\n# new\n```")
+
+        assert (stage_dir / "main.tf").stat().st_mtime == 1_000_000
+        bs = BuildState(str(tmp_project))
+        bs.load()
+        build_stage = bs.state["deployment_stages"][0]
+        assert build_stage["files"] == written
+        assert build_stage["file_hashes"]["concept/infra/terraform/main.tf"]["sha256"] == content_hash("# same")
+        assert build_stage["changed_files"] == ["concept/infra/terraform/variables.tf"]
+        assert stage["file_hashes"] == build_stage["file_hashes"]
+
+    def test_remediation_keeps_file_mode(self, tmp_project):
+        """Rewritten scripts keep their permissions, including the execute bit."""
+        import os
+
+        if os.name == "nt":
+            pytest.skip("POSIX permissions")
+        stage_dir = tmp_project / "concept" / "infra" / "terraform"
+        stage_dir.mkdir(parents=True, exist_ok=True)
+        script = stage_dir / "deploy.sh"
+        script.write_text("#!/bin/sh\n", encoding="utf-8")
+        script.chmod(0o755)
+        stages = [
+            {"stage": 1, "name": "Infra", "category": "infra", "services": [],
+             "dir": "concept/infra/terraform", "status": "generated",
+             "files": ["concept/infra/terraform/deploy.sh"]},
+        ]
+        session = self._make_session(tmp_project, build_stages=stages)
+
+        session._write_stage_files(session._deploy_state.get_stage(1), "```deploy.sh\n#!/bin/sh\nset -e\n```")
+
+        assert "set -e" in script.read_text(encoding="utf-8")
+        assert script.stat().st_mode & 0o777 == 0o755
+
     @patch("azext_prototype.stages.deploy_session.subprocess.run", return_value=MagicMock(returncode=0, stdout="Terraform v1.7.0\n", stderr=""))
     @patch("azext_prototype.stages.deploy_session.check_az_login", return_value=True)
     @patch("azext_prototype.stages.deploy_session.get_current_subscription", return_value="sub-123")
@@ -2973,6 +3239,28 @@ class TestSyncFromBuildState:
         assert result.updated_code == 1
         assert ds.state["deployment_stages"][0].get("_code_updated") is True
 
+    def test_sync_uses_file_hashes_for_exact_change_set(self, tmp_project):
+        """With per-file hashes, only content changes count — not rewrites."""
+        from azext_prototype.stages.deploy_state import DeployState
+
+        stages = _build_yaml_with_ids()["deployment_stages"]
+        stages[0]["file_hashes"] = {"main.tf": {"sha256": "aaa", "size": 1}}
+        build_path = _write_build_yaml_with_ids(tmp_project, stages=stages)
+        ds = DeployState(str(tmp_project))
+        ds.load_from_build_state(build_path)
+        ds.mark_stage_deployed(1)
+
+        # Same hashes → no code change
+        result = ds.sync_from_build_state(build_path)
+        assert result.updated_code == 0
+
+        stages[0]["file_hashes"] = {"main.tf": {"sha256": "bbb", "size": 1}}
+        _write_build_yaml_with_ids(tmp_project, stages=stages)
+        result = ds.sync_from_build_state(build_path)
+        assert result.updated_code == 1
+        assert result.changed_files == ["main.tf"]
+        assert ds.state["deployment_stages"][0]["file_hashes"]["main.tf"]["sha256"] == "bbb"
+
     def test_sync_from_build_state_creates_new(self, tmp_project):
         """New build stage creates new deploy stage."""
         from azext_prototype.stages.deploy_state import DeployState
@@ -3036,6 +3324,81 @@ class TestSyncFromBuildState:
         assert len(removed) == 1
         assert removed[0]["build_stage_id"] == "data-layer"
 
+    def test_sync_uses_stage_index_for_changed_stages_only(self, tmp_project):
+        """With a current build index, only stages with change events are touched."""
+        from azext_prototype.stages.build_state import BuildState
+        from azext_prototype.stages.deploy_state import DeployState
+
+        bs = BuildState(str(tmp_project))
+        bs.set_deployment_plan(_build_yaml_with_ids()["deployment_stages"])
+        build_path = tmp_project / ".prototype" / "state" / "build.yaml"
+
+        ds = DeployState(str(tmp_project))
+        assert ds.sync_from_build_state(build_path).created == 3
+        for stage in ds.state["deployment_stages"]:
+            stage["deploy_status"] = "deployed"
+        revision = ds.state["_metadata"]["build_revision"]
+        assert revision is not None
+
+        # Unchanged index: nothing to reconcile
+        result = ds.sync_from_build_state(build_path)
+        assert (result.matched, result.created, result.updated_code) == (3, 0, 0)
+
+        bs.mark_stage_generated(3, ["app.py", "requirements.txt"], "app-developer")
+        # A deploy stage the index says is untouched is not re-read
+        ds.state["deployment_stages"][0]["name"] = "Renamed locally"
+
+        result = ds.sync_from_build_state(build_path)
+        assert result.matched == 3
+        assert result.updated_code == 1
+        assert ds.state["deployment_stages"][2]["_code_updated"] is True
+        assert ds.state["deployment_stages"][0]["name"] == "Renamed locally"
+        assert ds.state["_metadata"]["build_revision"] > revision
+
+    def test_rebuilt_index_is_not_mistaken_for_synced_revision(self, tmp_project):
+        """An index started afresh reuses revision numbers under a new generation."""
+        from azext_prototype.stages.build_state import BuildState, load_stage_index
+        from azext_prototype.stages.deploy_state import DeployState
+
+        bs = BuildState(str(tmp_project))
+        bs.set_deployment_plan(_build_yaml_with_ids()["deployment_stages"])
+        build_path = tmp_project / ".prototype" / "state" / "build.yaml"
+        ds = DeployState(str(tmp_project))
+        ds.sync_from_build_state(build_path)
+        for stage in ds.state["deployment_stages"]:
+            stage["deploy_status"] = "deployed"
+        synced = load_stage_index(build_path)
+
+        bs._index_path.unlink()
+        bs.mark_stage_generated(3, ["app.py", "requirements.txt"], "app-developer")
+        rebuilt = load_stage_index(build_path)
+        assert rebuilt["revision"] == synced["revision"]
+        assert rebuilt["generation"] != synced["generation"]
+
+        result = ds.sync_from_build_state(build_path)
+        assert result.updated_code == 1
+        assert ds.state["_metadata"]["build_generation"] == rebuilt["generation"]
+
+    def test_sync_falls_back_when_build_yaml_edited(self, tmp_project):
+        """A hand-edited build.yaml invalidates the index; the full parse is used."""
+        from azext_prototype.stages.build_state import BuildState, load_stage_index
+        from azext_prototype.stages.deploy_state import DeployState
+
+        bs = BuildState(str(tmp_project))
+        bs.set_deployment_plan(_build_yaml_with_ids()["deployment_stages"])
+        build_path = tmp_project / ".prototype" / "state" / "build.yaml"
+        ds = DeployState(str(tmp_project))
+        ds.load_from_build_state(build_path)
+
+        stages = _build_yaml_with_ids()["deployment_stages"]
+        stages = [s for s in stages if s["id"] != "data-layer"]
+        _write_build_yaml_with_ids(tmp_project, stages=stages)
+        assert load_stage_index(build_path) is None
+
+        result = ds.sync_from_build_state(build_path)
+        assert result.orphaned == 1
+        assert ds.state["_metadata"]["build_revision"] is None
+
 
 class TestStageSpitting:
 
@@ -3446,3 +3809,304 @@ class TestDeployReportFormatting:
         status = ds.format_stage_status()
         assert "2a" in status
         assert "2b" in status
+
+
+# ======================================================================
+# Stage fingerprints — incremental deploys
+# ======================================================================
+
+def _make_session_with_ids(project_dir):
+    """DeploySession over the stable-ID build stages, with stage files on disk."""
+    from azext_prototype.agents.base import AgentContext
+    from azext_prototype.agents.registry import AgentRegistry
+    from azext_prototype.agents.builtin import register_all_builtin
+    from azext_prototype.stages.deploy_session import DeploySession
+
+    config_path = Path(project_dir) / "prototype.yaml"
+    if not config_path.exists():
+        with open(config_path, "w") as f:
+            yaml.dump({"project": {"name": "test", "location": "eastus", "iac_tool": "terraform"}, "ai": {"provider": "github-models"}}, f)
+
+    build_path = _write_build_yaml_with_ids(project_dir)
+    for stage in _build_yaml_with_ids()["deployment_stages"]:
+        stage_dir = Path(project_dir) / stage["dir"]
+        stage_dir.mkdir(parents=True, exist_ok=True)
+        (stage_dir / stage["files"][0]).write_text(f"# {stage['name']}\n", encoding="utf-8")
+
+    context = AgentContext(
+        project_config={"project": {"iac_tool": "terraform"}},
+        project_dir=str(project_dir),
+        ai_provider=MagicMock(),
+    )
+    registry = AgentRegistry()
+    register_all_builtin(registry)
+    session = DeploySession(context, registry)
+    session._deploy_state.load_from_build_state(build_path)
+    session._subscription = "sub-123"
+    session._output_capture.capture_terraform = MagicMock(return_value={"rg_name": "zd-rg"})
+    return session
+
+
+class TestStageFingerprints:
+
+    def _deploy(self, session, force=False):
+        output = []
+        session._deploy_pending_stages(force, False, output.append, lambda p: "")
+        return output
+
+    @patch("azext_prototype.stages.deploy_session.deploy_app_stage", return_value={"status": "deployed"})
+    @patch("azext_prototype.stages.deploy_session.deploy_terraform", return_value={"status": "deployed"})
+    def test_unchanged_stages_are_skipped(self, mock_tf, mock_app, tmp_project):
+        session = _make_session_with_ids(tmp_project)
+        self._deploy(session)
+        assert mock_tf.call_count == 2 and mock_app.call_count == 1
+        assert all(s["deploy_fingerprint"] for s in session._deploy_state.get_deployed_stages())
+
+        output = self._deploy(session)
+        assert "  All stages already deployed." in output
+        assert mock_tf.call_count == 2 and mock_app.call_count == 1
+
+    @patch("azext_prototype.stages.deploy_session.deploy_app_stage", return_value={"status": "deployed"})
+    @patch("azext_prototype.stages.deploy_session.deploy_terraform", return_value={"status": "deployed"})
+    def test_changed_files_redeploy_only_that_stage(self, mock_tf, mock_app, tmp_project):
+        session = _make_session_with_ids(tmp_project)
+        self._deploy(session)
+
+        (tmp_project / "concept/apps/stage-3-application/app.py").write_text("print('v2')\n", encoding="utf-8")
+        output = self._deploy(session)
+
+        assert mock_tf.call_count == 2
+        assert mock_app.call_count == 2
+        assert "  Changed since last deploy: Stage 3" in output
+        assert "  Skipping 2 unchanged stage(s)." in output
+
+    @patch("azext_prototype.stages.deploy_session.deploy_app_stage", return_value={"status": "deployed"})
+    @patch("azext_prototype.stages.deploy_session.deploy_terraform", return_value={"status": "deployed"})
+    def test_upstream_output_change_redeploys_downstream(self, mock_tf, mock_app, tmp_project):
+        session = _make_session_with_ids(tmp_project)
+        self._deploy(session)
+
+        # Stage 1 changes and now produces a different output
+        (tmp_project / "concept/infra/terraform/stage-1-foundation/main.tf").write_text("# v2\n", encoding="utf-8")
+        session._output_capture.capture_terraform.return_value = {"rg_name": "zd-rg-2"}
+        output = self._deploy(session)
+
+        assert "  Changed since last deploy: Stage 1" in output
+        assert any("Outputs changed — redeploying Stage 2, Stage 3." in line for line in output)
+        assert mock_tf.call_count == 4
+        assert mock_app.call_count == 2
+        assert all(s["deploy_status"] == "deployed" for s in session._deploy_state._state["deployment_stages"])
+
+        # Converged — nothing left to do
+        assert "  All stages already deployed." in self._deploy(session)
+
+    @patch("azext_prototype.stages.deploy_session.deploy_app_stage", return_value={"status": "deployed"})
+    @patch("azext_prototype.stages.deploy_session.deploy_terraform", return_value={"status": "deployed"})
+    def test_changed_secret_redeploys_stage(self, mock_tf, mock_app, tmp_project):
+        session = _make_session_with_ids(tmp_project)
+        session._deploy_env = {"TF_VAR_admin_password": "one"}
+        self._deploy(session)
+
+        session._deploy_env = {"TF_VAR_admin_password": "two"}
+        self._deploy(session)
+        assert mock_tf.call_count == 4
+        # The secret is hashed, never stored
+        assert "two" not in (tmp_project / ".prototype/state/deploy.yaml").read_text(encoding="utf-8")
+
+    @patch("azext_prototype.stages.deploy_session.deploy_app_stage", return_value={"status": "deployed"})
+    @patch("azext_prototype.stages.deploy_session.deploy_terraform", return_value={"status": "deployed"})
+    def test_force_redeploys_everything(self, mock_tf, mock_app, tmp_project):
+        session = _make_session_with_ids(tmp_project)
+        self._deploy(session)
+        self._deploy(session, force=True)
+        assert mock_tf.call_count == 4 and mock_app.call_count == 2
+
+    @patch("azext_prototype.stages.deploy_session.deploy_app_stage", return_value={"status": "deployed"})
+    @patch("azext_prototype.stages.deploy_session.deploy_terraform", return_value={"status": "deployed"})
+    def test_legacy_stage_uses_code_updated_flag(self, mock_tf, mock_app, tmp_project):
+        session = _make_session_with_ids(tmp_project)
+        ds = session._deploy_state
+        for num in (1, 2, 3):
+            ds.mark_stage_deployed(num)
+        ds.get_stage(2)["_code_updated"] = True
+
+        self._deploy(session)
+        assert mock_tf.call_count == 1
+        assert mock_app.call_count == 0
+        assert "_code_updated" not in ds.get_stage(2)
+        assert ds.get_stage(2)["deploy_fingerprint"]
+
+    @patch("azext_prototype.stages.deploy_session.deploy_app_stage", return_value={"status": "deployed"})
+    @patch(
+        "azext_prototype.stages.deploy_session.deploy_terraform",
+        return_value={"status": "deployed", "outputs": {"rg_name": {"value": "zd-rg", "type": "string"}}},
+    )
+    def test_outputs_captured_per_stage_and_exported_to_apps(self, mock_tf, mock_app, tmp_project):
+        from azext_prototype.stages.deploy_helpers import DeploymentOutputCapture
+
+        session = _make_session_with_ids(tmp_project)
+        session._output_capture = DeploymentOutputCapture(str(tmp_project))
+        session._deploy_env = {"PATH": "/usr/bin"}
+        with patch("azext_prototype.stages.deploy_helpers.subprocess.run") as mock_run:
+            self._deploy(session)
+
+        # No state file and no backend: the apply stream's outputs are used
+        mock_run.assert_not_called()
+        assert session._deploy_state._state["captured_outputs"] == {
+            "foundation": {"rg_name": "zd-rg"},
+            "data-layer": {"rg_name": "zd-rg"},
+        }
+        app_env = mock_app.call_args.kwargs["env"]
+        assert app_env["PROTOTYPE_RG_NAME"] == "zd-rg"
+        assert app_env["PATH"] == "/usr/bin"
+
+    def test_output_digests(self, tmp_project):
+        from azext_prototype.stages.deploy_state import DeployState
+
+        ds = DeployState(str(tmp_project))
+        ds.load_from_build_state(_write_build_yaml_with_ids(tmp_project))
+
+        assert ds.record_stage_outputs(1, {"rg_name": "a"}) is True
+        assert ds.record_stage_outputs(1, {"rg_name": "a"}) is False
+        assert ds.record_stage_outputs(2, {"sql": "b"}) is True
+
+        assert ds.upstream_outputs(1) == {}
+        assert list(ds.upstream_outputs(2)) == ["foundation"]
+        assert list(ds.upstream_outputs(3)) == ["foundation", "data-layer"]
+        assert "a" not in ds.upstream_outputs(2).values()
+
+        ds.mark_stage_deployed(1, fingerprint="abc")
+        ds.mark_stage_rolled_back(1)
+        assert ds.get_stage(1)["deploy_fingerprint"] is None
+        assert list(ds.upstream_outputs(3)) == ["data-layer"]
+
+
+class TestParallelAppStage:
+
+    @patch("azext_prototype.stages.deploy_session.deploy_app_stage")
+    def test_app_results_recorded_and_policy_from_config(self, mock_app, tmp_project):
+        session = _make_session_with_ids(tmp_project)
+        session._config.set("deploy.app_parallelism", 8)
+        session._config.set("deploy.app_failure_policy", "fail-fast")
+        mock_app.return_value = {
+            "status": "failed",
+            "error": "web: push denied",
+            "apps": ["api"],
+            "failed_apps": ["web"],
+            "app_results": {"api": {"status": "deployed", "elapsed": 4.0}, "web": {"status": "failed", "error": "push denied", "elapsed": 2.0}},
+        }
+
+        result = session._deploy_single_stage(session._deploy_state.get_stage(3))
+
+        assert result["status"] == "failed"
+        kwargs = mock_app.call_args.kwargs
+        assert kwargs["max_parallel"] == 8
+        assert kwargs["fail_fast"] is True
+        stage = session._deploy_state.get_stage(3)
+        assert stage["app_results"]["web"]["status"] == "failed"
+        assert "Apps: api (deployed), web (failed)" in session._deploy_state.format_deploy_report()
+
+    def test_invalid_settings_fall_back_to_defaults(self, tmp_project):
+        from azext_prototype.stages.deploy_helpers import APP_PARALLELISM
+
+        session = _make_session_with_ids(tmp_project)
+        session._config.set("deploy.app_parallelism", "lots")
+        session._config.set("deploy.app_failure_policy", "stop-everything")
+        assert session._app_parallelism() == APP_PARALLELISM
+        assert session._app_failure_policy() == "continue"
+
+        session._config.set("deploy.app_parallelism", "2")
+        session._config.set("deploy.app_failure_policy", "Fail-Fast")
+        assert session._app_parallelism() == 2
+        assert session._app_failure_policy() == "fail-fast"
+
+
+class TestDependencyOrderedRollback:
+
+    def _session(self, tmp_project):
+        from azext_prototype.stages.deploy_state import _enrich_deploy_fields
+
+        session = _make_session_with_ids(tmp_project)
+        stages = session._deploy_state._state["deployment_stages"]
+        stages.insert(1, _enrich_deploy_fields({
+            "stage": 2, "name": "Monitoring", "category": "infra", "build_stage_id": "monitoring",
+            "services": [], "dir": "concept/infra/terraform/stage-2-monitoring", "files": [],
+        }))
+        session._deploy_state.renumber_stages()
+        for stage in stages:
+            stage["deploy_status"] = "deployed"
+        return session
+
+    @patch("azext_prototype.stages.deploy_session.rollback_terraform")
+    def test_rollback_all_destroys_independent_stages_together(self, mock_rb, tmp_project):
+        session = self._session(tmp_project)
+        barrier = threading.Barrier(2, timeout=5)
+        destroyed = []
+
+        def _destroy(stage_dir, env=None):
+            name = Path(stage_dir).name
+            if name != "stage-2-data":
+                barrier.wait()  # foundation and monitoring run at the same time
+            destroyed.append(name)
+            return {"status": "rolled_back"}
+
+        mock_rb.side_effect = _destroy
+        output = []
+        session._rollback_all(output.append, lambda _: "y")
+
+        assert destroyed[0] == "stage-2-data"
+        assert sorted(destroyed[1:]) == ["stage-1-foundation", "stage-2-monitoring"]
+        joined = "\n".join(output)
+        assert "4 stage(s) in 3 wave(s)" in joined
+        assert "All stages rolled back." in joined
+        assert not session._deploy_state.get_deployed_stages()
+        assert session._deploy_state.rollback_plan is None
+
+    @patch("azext_prototype.stages.deploy_session.rollback_terraform")
+    def test_interrupted_rollback_resumes(self, mock_rb, tmp_project):
+        session = self._session(tmp_project)
+        mock_rb.return_value = {"status": "failed", "error": "lock held"}
+        output = []
+        session._rollback_all(output.append, lambda _: "y")
+
+        # The data stage failed, so the stages under it stay deployed
+        assert {s["build_stage_id"] for s in session._deploy_state.get_deployed_stages()} == {
+            "foundation", "monitoring", "data-layer",
+        }
+        plan = session._deploy_state.rollback_plan
+        assert plan["completed"] == ["application"]
+        assert list(plan["failed"]) == ["data-layer"]
+        assert mock_rb.call_count == 1
+
+        mock_rb.return_value = {"status": "rolled_back"}
+        output.clear()
+        session._rollback_all(output.append, lambda _: "y")
+        joined = "\n".join(output)
+        assert "Resuming interrupted rollback (1 stage(s) already rolled back)" in joined
+        assert "3 stage(s) in 2 wave(s)" in joined
+        assert session._deploy_state.rollback_plan is None
+        assert not session._deploy_state.get_deployed_stages()
+
+    @patch("azext_prototype.stages.deploy_session.rollback_bicep")
+    def test_bicep_waves_run_serially(self, mock_rb, tmp_project):
+        session = self._session(tmp_project)
+        session._iac_tool = "bicep"
+        lock = threading.Lock()
+        overlapped = []
+
+        def _destroy(stage_dir, subscription, resource_group, env=None):
+            if not lock.acquire(blocking=False):
+                overlapped.append(Path(stage_dir).name)
+                return {"status": "rolled_back"}
+            try:
+                time.sleep(0.05)
+            finally:
+                lock.release()
+            return {"status": "rolled_back"}
+
+        mock_rb.side_effect = _destroy
+        session._rollback_all(lambda _: None, lambda _: "y")
+
+        assert mock_rb.call_count == 3  # the app stage needs no destroy
+        assert overlapped == []
+        assert session._rollback_parallelism() == 1
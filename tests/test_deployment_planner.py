@@ -0,0 +1,211 @@
+"""Tests for azext_prototype.stages.deployment_planner — rule-based planning."""
+
+import pytest
+
+from azext_prototype.naming import create_naming_strategy
+from azext_prototype.stages.deployment_planner import (
+    DeploymentPlanner,
+    detect_services,
+    renumber,
+    service_category,
+)
+from azext_prototype.templates.registry import TemplateService
+
+ARCH = (
+    "## Architecture\n"
+    "A React frontend on Azure Static Web Apps calls a Python API hosted in Azure Container Apps. "
+    "Orders are stored in Azure Cosmos DB and secrets live in Key Vault. "
+    "Application Insights collects telemetry.\n"
+)
+
+
+@pytest.fixture
+def planner():
+    naming = create_naming_strategy({"naming": {"strategy": "simple"}, "project": {"name": "demo"}})
+    return DeploymentPlanner("terraform", naming, "demo")
+
+
+class _Template:
+    def __init__(self, *services):
+        self.services = list(services)
+
+
+def _names(stages):
+    return [s["name"] for s in stages]
+
+
+# ------------------------------------------------------------------
+# Detection
+# ------------------------------------------------------------------
+
+class TestDetectServices:
+    def test_aliases_and_implied_services(self):
+        detection = detect_services(ARCH)
+        assert not detection.ambiguous
+        assert detection.types == {
+            "static-web-app", "container-apps", "cosmos-db", "key-vault",
+            "application-insights", "container-app-environment", "log-analytics",
+        }
+        implied = {s.type for s in detection.services if s.source == "implied"}
+        assert implied == {"container-app-environment", "log-analytics"}
+
+    def test_unknown_azure_services_are_ambiguous(self):
+        detection = detect_services("Key Vault behind Azure Firewall, plus Azure Quantum workspaces.")
+        assert detection.ambiguous
+        assert detection.unknown == ["Azure Firewall", "Azure Quantum"]
+
+    def test_platform_phrases_are_not_services(self):
+        detection = detect_services("Key Vault with SQL firewall rules, Azure Monitor alerts and Azure AD auth.")
+        assert detection.unknown == []
+        assert detection.types == {"key-vault"}
+
+    def test_rejected_and_out_of_scope_services_are_excluded(self):
+        detection = detect_services(
+            "We use SQL Database instead of Cosmos DB. Redis caching is out of scope; secrets live in Key Vault."
+        )
+        assert detection.types == {"sql-database", "key-vault"}
+        assert detection.excluded == ["Cosmos DB", "Redis"]
+        assert detection.ambiguous and detection.needs_review
+
+    def test_small_designs_need_no_review(self):
+        assert not detect_services("Secrets in Key Vault, data in SQL Database").needs_review
+        assert detect_services(ARCH).needs_review
+
+    def test_nothing_recognised_is_ambiguous(self):
+        assert detect_services("Sample architecture").ambiguous
+
+    def test_template_services_keep_names_and_cover_shared_resources(self):
+        template = _Template(
+            TemplateService(name="ai-engine", type="cognitive-services", tier="standard"),
+            TemplateService(name="orders", type="container-apps", tier="consumption"),
+            TemplateService(name="billing", type="container-apps", tier="consumption"),
+        )
+        detection = detect_services("Azure OpenAI behind Container Apps", [template])
+        names = [(s.type, s.name) for s in detection.services if s.source == "template"]
+        assert names == [("cognitive-services", "ai-engine"), ("container-apps", "orders"), ("container-apps", "billing")]
+        assert "openai" not in detection.types
+
+    def test_service_category(self):
+        assert service_category("storage") == "data"
+        assert service_category("container-registry") == "infra"
+        assert service_category("functions") == "app"
+        assert service_category("unknown-service") == "app"
+
+
+# ------------------------------------------------------------------
+# Plan derivation
+# ------------------------------------------------------------------
+
+class TestPlan:
+    def test_stage_order_is_topological(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        assert _names(stages) == [
+            "Foundation", "Log Analytics", "Application Insights", "Key Vault", "Cosmos DB",
+            "Container Apps Environment", "Static Web App", "Container App", "Documentation",
+        ]
+        assert [s["stage"] for s in stages] == list(range(1, 10))
+
+    def test_stage_shape(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        kv = stages[3]
+        assert kv["category"] == "infra"
+        assert kv["dir"] == "concept/infra/terraform/stage-4-key-vault"
+        assert kv["services"][0]["resource_type"] == "Microsoft.KeyVault/vaults"
+        assert kv["services"][0]["computed_name"]
+        assert stages[7]["dir"] == "concept/apps/stage-8-container-apps"
+        assert stages[-1]["dir"] == "concept/docs"
+
+    def test_reproducible(self, planner):
+        assert planner.plan(detect_services(ARCH)) == planner.plan(detect_services(ARCH))
+
+    def test_template_instances_get_own_stages(self, planner):
+        template = _Template(
+            TemplateService(name="orders", type="container-apps", tier="consumption"),
+            TemplateService(name="billing", type="container-apps", tier="consumption"),
+            TemplateService(name="queue", type="service-bus", tier="standard"),
+        )
+        stages = planner.plan(detect_services("Services on Container Apps talk over Service Bus", [template]))
+        assert _names(stages) == [
+            "Foundation", "Log Analytics", "Queue", "Container Apps Environment", "Orders", "Billing",
+            "Documentation",
+        ]
+        assert stages[2]["services"][0]["sku"] == "standard"
+
+
+# ------------------------------------------------------------------
+# Diff
+# ------------------------------------------------------------------
+
+class TestDiff:
+    def test_added_removed_and_modified(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        new_arch = ARCH.replace("Azure Cosmos DB", "Azure SQL Database") + "Sessions are cached in Redis.\n"
+        result = planner.diff(ARCH, new_arch, stages)
+
+        assert result["removed"] == [5]
+        assert result["modified"] == [4, 9]  # Key Vault shares the Cosmos DB sentence
+        assert result["unchanged"] == [1, 2, 3, 6, 7, 8]
+        assert [s["name"] for s in result["added"]] == ["SQL Database", "Redis Cache"]
+        assert result["plan_restructured"] is False
+        assert result["summary"] == "Added SQL Database, Redis Cache; removed Cosmos DB; 2 stage(s) affected."
+
+    def test_changed_sentence_marks_stage_modified(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        new_arch = ARCH.replace("secrets live in Key Vault", "secrets live in Key Vault with purge protection")
+        result = planner.diff(ARCH, new_arch, stages)
+        assert 4 in result["modified"]
+        assert 5 in result["modified"]  # same sentence mentions Cosmos DB
+        assert result["added"] == [] and result["removed"] == []
+
+    def test_new_dependency_restructures_plan(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        result = planner.diff(ARCH, ARCH + "Everything is injected into a virtual network.\n", stages)
+        assert result["plan_restructured"] is True
+
+    def test_ambiguous_design_returns_none(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        assert planner.diff(ARCH, ARCH + "Traffic enters through Azure Firewall.\n", stages) is None
+        assert planner.diff("old arch", "new arch", stages) is None
+
+    def test_unmapped_stage_returns_none(self, planner):
+        stages = [
+            {"stage": 1, "name": "Schema", "category": "schema", "services": [{"name": "orders-schema"}]},
+            {"stage": 2, "name": "Documentation", "category": "docs", "services": []},
+        ]
+        assert planner.diff(ARCH, ARCH + "More Key Vault detail.", stages) is None
+
+
+# ------------------------------------------------------------------
+# Feedback
+# ------------------------------------------------------------------
+
+class TestApplyFeedback:
+    def test_remove_stages(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        adjusted = planner.apply_feedback(stages, "Remove stages 2 and 3.")
+        assert "Log Analytics" not in _names(adjusted)
+        assert adjusted[1]["name"] == "Key Vault"
+        assert adjusted[1]["dir"] == "concept/infra/terraform/stage-2-key-vault"
+        assert stages[1]["name"] == "Log Analytics"  # input untouched
+
+    def test_remove_service(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        adjusted = planner.apply_feedback(stages, "drop the cosmos db stage")
+        assert "Cosmos DB" not in _names(adjusted)
+        assert len(adjusted) == len(stages) - 1
+
+    def test_add_service_before_apps(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        adjusted = planner.apply_feedback(stages, "add redis")
+        assert _names(adjusted).index("Redis Cache") == _names(adjusted).index("Cosmos DB") + 1
+        assert planner.apply_feedback(adjusted, "add redis") is None  # already planned
+
+    def test_unrecognised_feedback_returns_none(self, planner):
+        stages = planner.plan(detect_services(ARCH))
+        assert planner.apply_feedback(stages, "Please add logging to stage 2") is None
+        assert planner.apply_feedback(stages, "remove stage 42") is None
+
+    def test_renumber_rewrites_dirs(self):
+        stages = renumber([{"dir": "concept/apps/stage-7-api"}, {"dir": "concept/docs"}])
+        assert stages[0] == {"stage": 1, "dir": "concept/apps/stage-1-api"}
+        assert stages[1]["dir"] == "concept/docs"
@@ -0,0 +1,131 @@
+"""Tests for azext_prototype.stages.error_signatures — known deploy failures."""
+
+from __future__ import annotations
+
+import yaml
+
+from azext_prototype.stages.error_signatures import (
+    ACTION_GUIDANCE,
+    ACTION_REGISTER_PROVIDER,
+    ErrorSignatureDB,
+    error_signature,
+    match_builtin,
+    normalize_error,
+)
+from azext_prototype.stages.escalation import EscalationTracker
+
+_CONFLICT = (
+    "Plan: 2 to add, 0 to change, 0 to destroy.\n"
+    "azurerm_cosmosdb_account.main: Creating...\n"
+    'Error: creating Database Account "{name}" (Resource Group "rg-{n}"): unexpected status 409 '
+    "at {time}, request {guid}\n"
+    "  with azurerm_cosmosdb_account.main, on main.tf line {line}"
+)
+
+
+def _conflict(name="zd-cosmos-1", n=1, time="2026-01-02T03:04:05Z", guid="0b5c1f2e-1111-2222-3333-444455556666", line=12):
+    return _CONFLICT.format(name=name, n=n, time=time, guid=guid, line=line)
+
+
+class TestNormalization:
+    def test_run_specific_details_are_masked(self):
+        normalized = normalize_error(_conflict())
+        assert normalized.startswith("error: creating database account <value>")
+        assert "plan:" not in normalized
+        assert "<time>" in normalized and "<guid>" in normalized and "<n>" in normalized
+
+    def test_same_failure_same_signature(self):
+        other = _conflict(name="zd-cosmos-7", n=3, time="2026-05-06T07:08:09Z", guid="aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee", line=40)
+        assert error_signature(_conflict()) == error_signature(other)
+        assert error_signature(_conflict()) != error_signature("Error: something else entirely")
+
+    def test_argument_names_are_kept(self):
+        sku = normalize_error('Error: Missing required argument\n\nThe argument "sku_name" is required.')
+        tier = normalize_error('Error: Missing required argument\n\nThe argument "tier" is required.')
+        assert '"sku_name"' in sku and sku != tier
+        assert normalize_error('Error: Unsupported attribute "principal_id" on "zd-identity"').endswith(
+            '"principal_id" on <value>'
+        )
+
+    def test_resource_ids_and_urls(self):
+        text = "Error: /subscriptions/abc/resourceGroups/rg/providers/X/y failed, see https://aka.ms/help"
+        assert normalize_error(text) == "error: <resource-id> failed, see <url>"
+
+
+class TestBuiltinSignatures:
+    def test_provider_not_registered(self):
+        fix = match_builtin(
+            "Code=\"MissingSubscriptionRegistration\" Message=\"The subscription is not registered "
+            "to use namespace 'Microsoft.App'.\""
+        )
+        assert fix.action == ACTION_REGISTER_PROVIDER
+        assert fix.params == {"namespace": "Microsoft.App"}
+
+    def test_duplicate_required_providers(self):
+        # terraform init already tries merging the blocks, so what is left is for the fix agent
+        fix = match_builtin("Error: Duplicate required providers configuration\n\n  on versions.tf line 3")
+        assert fix.action == ACTION_GUIDANCE
+        assert fix.diagnosis and fix.guidance
+
+    def test_guidance_signatures(self):
+        taken = match_builtin('Error: creating Storage Account "zdst1": StorageAccountAlreadyTaken')
+        sku = match_builtin("Code: SkuNotAvailable Message: The requested size is not available in location 'eastus'")
+        assert (taken.key, taken.action) == ("name-not-available", ACTION_GUIDANCE)
+        assert (sku.key, sku.action) == ("sku-not-available", ACTION_GUIDANCE)
+        assert taken.guidance and sku.diagnosis
+
+    def test_unknown_error(self):
+        assert match_builtin(_conflict()) is None
+
+
+class TestErrorSignatureDB:
+    def test_learn_and_match_across_sessions(self, tmp_path):
+        db = ErrorSignatureDB(str(tmp_path))
+        assert db.match(_conflict()) is None
+        db.learn(_conflict(), "Cosmos account name collides.", "Add a random suffix.")
+
+        reloaded = ErrorSignatureDB(str(tmp_path))
+        reloaded.load()
+        fix = reloaded.match(_conflict(name="zd-cosmos-9", n=4))
+        assert fix is not None and fix.learned
+        assert (fix.action, fix.diagnosis, fix.guidance) == (ACTION_GUIDANCE, "Cosmos account name collides.", "Add a random suffix.")
+
+    def test_builtin_failures_are_not_learned(self, tmp_path):
+        db = ErrorSignatureDB(str(tmp_path))
+        assert db.learn("Error: StorageAccountAlreadyTaken", "diag", "fix") is None
+        assert db.learned == []
+
+    def test_older_version_is_discarded(self, tmp_path):
+        db = ErrorSignatureDB(str(tmp_path))
+        db.learn(_conflict(), "diag", "fix")
+        path = tmp_path / ".prototype" / "state" / "error_signatures.yaml"
+        data = yaml.safe_load(path.read_text())
+        data["version"] = 0
+        path.write_text(yaml.dump(data))
+
+        reloaded = ErrorSignatureDB(str(tmp_path))
+        reloaded.load()
+        assert reloaded.learned == []
+
+    def test_failing_learned_signature_is_forgotten(self, tmp_path):
+        db = ErrorSignatureDB(str(tmp_path))
+        db.learn(_conflict(), "diag", "fix")
+        fix = db.match(_conflict())
+
+        db.record_outcome(fix, succeeded=False)
+        assert db.match(_conflict()) is not None
+        db.record_outcome(fix, succeeded=False)
+        assert db.match(_conflict()) is None
+
+    def test_learn_from_resolved_escalations(self, tmp_path):
+        tracker = EscalationTracker(str(tmp_path))
+        resolved = tracker.record_blocker("Deploy Stage 2: Data", _conflict(), "deploy-session", "deploy")
+        tracker.resolve(resolved, "Renamed the account with a suffix.")
+        tracker.record_blocker("Deploy Stage 3: Apps", "Error: open blocker", "deploy-session", "deploy")
+
+        db = ErrorSignatureDB(str(tmp_path))
+        assert db.learn_from_escalations(tracker) == 1
+        assert db.learn_from_escalations(tracker) == 0
+        fix = db.match(_conflict(n=2))
+        assert fix.guidance == "Renamed the account with a suffix."
+        assert fix.source == "escalation"
@@ -0,0 +1,47 @@
+"""Tests for azext_prototype.stages.fingerprint."""
+
+from azext_prototype.stages.fingerprint import deploy_variables, file_digests, stage_fingerprint
+
+
+def _stage(tmp_path):
+    (tmp_path / "main.tf").write_text('resource "azurerm_resource_group" "rg" {}')
+    (tmp_path / "modules").mkdir()
+    (tmp_path / "modules" / "net.tf").write_text("# network")
+    return tmp_path
+
+
+class TestStageFingerprint:
+    def test_stable_and_content_sensitive(self, tmp_path):
+        stage = _stage(tmp_path)
+        first = stage_fingerprint(stage)
+        assert stage_fingerprint(stage) == first
+
+        (stage / "modules" / "net.tf").write_text("# network v2")
+        assert stage_fingerprint(stage) != first
+
+    def test_tool_artifacts_are_ignored(self, tmp_path):
+        stage = _stage(tmp_path)
+        before = stage_fingerprint(stage)
+        (stage / ".terraform").mkdir()
+        (stage / ".terraform" / "providers.json").write_text("{}")
+        for name in ("terraform.tfstate", "terraform.tfstate.backup", ".terraform.lock.hcl", "tfplan"):
+            (stage / name).write_text("generated")
+        assert stage_fingerprint(stage) == before
+        assert sorted(file_digests(stage)) == ["main.tf", "modules/net.tf"]
+
+    def test_variables_and_inputs(self, tmp_path):
+        stage = _stage(tmp_path)
+        base = stage_fingerprint(stage, {"TF_VAR_admin_password": "one"}, {"stage-1": {"vnet_id": "a"}})
+        assert stage_fingerprint(stage, {"TF_VAR_admin_password": "two"}, {"stage-1": {"vnet_id": "a"}}) != base
+        assert stage_fingerprint(stage, {"TF_VAR_admin_password": "one"}, {"stage-1": {"vnet_id": "b"}}) != base
+        assert "one" not in base
+
+    def test_missing_directory(self, tmp_path):
+        assert file_digests(tmp_path / "nope") == {}
+        assert stage_fingerprint(tmp_path / "nope") == stage_fingerprint(tmp_path / "also-nope")
+
+
+def test_deploy_variables_selects_relevant_env():
+    env = {"TF_VAR_location": "eastus", "ARM_SUBSCRIPTION_ID": "sub", "ARM_CLIENT_SECRET": "s", "PATH": "/bin"}
+    assert deploy_variables(env) == {"TF_VAR_location": "eastus", "ARM_SUBSCRIPTION_ID": "sub"}
+    assert deploy_variables(None) == {}
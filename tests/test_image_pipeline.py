@@ -0,0 +1,226 @@
+"""Tests for azext_prototype.parsers.image_pipeline."""
+
+from __future__ import annotations
+
+import base64
+import io
+
+import pytest
+
+from azext_prototype.parsers.image_pipeline import (
+    CACHE_DIR,
+    ImagePipeline,
+    PipelineStats,
+    _fit_size,
+    process_images,
+)
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+
+def _png(width=64, height=64, color=(200, 30, 30), mode="RGB") -> str:
+    """Return a base64-encoded PNG with a simple gradient so dHash is stable."""
+    img = Image.new(mode, (width, height), color if mode == "RGB" else color + (255,))
+    for x in range(width):
+        shade = int(255 * x / max(1, width - 1))
+        for y in range(0, height, max(1, height // 8)):
+            img.putpixel((x, y), (shade, shade, shade) if mode == "RGB" else (shade, shade, shade, 255))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _noise_png(width, height, seed=0) -> str:
+    import random
+
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height))
+    img.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(width * height)])
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _decode(image: dict):
+    return Image.open(io.BytesIO(base64.b64decode(image["data"])))
+
+
+# ------------------------------------------------------------------ #
+# _fit_size
+# ------------------------------------------------------------------ #
+
+
+class TestFitSize:
+    def test_small_image_unchanged(self):
+        assert _fit_size(640, 480, 2048, 768) == (640, 480)
+
+    def test_short_edge_capped(self):
+        assert _fit_size(1600, 1200, 2048, 768) == (1024, 768)
+
+    def test_long_edge_capped(self):
+        w, h = _fit_size(8000, 500, 2048, 768)
+        assert w == 2048
+        assert h == 128
+
+    def test_degenerate_size(self):
+        assert _fit_size(0, 10, 2048, 768) == (0, 10)
+
+
+# ------------------------------------------------------------------ #
+# Deduplication
+# ------------------------------------------------------------------ #
+
+
+class TestDeduplication:
+    def test_exact_duplicates_removed(self):
+        data = _png()
+        images = [
+            {"filename": "logo.png", "data": data, "mime": "image/png"},
+            {"filename": "doc.docx/image1.png", "data": data, "mime": "image/png"},
+        ]
+        out, stats = process_images(images)
+        assert len(out) == 1
+        assert out[0]["filename"] == "logo.png"
+        assert stats.duplicates_exact == 1
+
+    def test_perceptual_duplicates_removed(self):
+        original = _png(200, 200)
+        rescaled = _png(100, 100)
+        assert original != rescaled
+        out, stats = process_images([
+            {"filename": "a.png", "data": original, "mime": "image/png"},
+            {"filename": "b.png", "data": rescaled, "mime": "image/png"},
+        ])
+        assert len(out) == 1
+        assert stats.duplicates_perceptual == 1
+
+    def test_distinct_images_kept(self):
+        out, stats = process_images([
+            {"filename": "a.png", "data": _noise_png(32, 32, seed=1), "mime": "image/png"},
+            {"filename": "b.png", "data": _noise_png(32, 32, seed=2), "mime": "image/png"},
+        ])
+        assert len(out) == 2
+        assert stats.duplicates == 0
+
+    def test_order_preserved(self):
+        images = [
+            {"filename": f"{i}.png", "data": _noise_png(16, 16, seed=i), "mime": "image/png"}
+            for i in range(4)
+        ]
+        out, _ = process_images(images)
+        assert [i["filename"] for i in out] == ["0.png", "1.png", "2.png", "3.png"]
+
+
+# ------------------------------------------------------------------ #
+# Downscale / re-encode
+# ------------------------------------------------------------------ #
+
+
+class TestTransform:
+    def test_large_image_downscaled_to_jpeg(self):
+        big = _noise_png(1600, 1200)
+        out, stats = process_images([{"filename": "shot.png", "data": big, "mime": "image/png"}])
+        assert out[0]["mime"] == "image/jpeg"
+        assert _decode(out[0]).size == (1024, 768)
+        assert stats.resized == 1
+        assert stats.bytes_saved > 0
+        assert stats.bytes_out < stats.bytes_in / 5
+
+    def test_alpha_image_not_jpeg(self):
+        img = Image.new("RGBA", (1200, 1200), (0, 0, 0, 0))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        data = base64.b64encode(buf.getvalue()).decode("utf-8")
+        out, _ = process_images([{"filename": "t.png", "data": data, "mime": "image/png"}])
+        assert out[0]["mime"] in ("image/webp", "image/png")
+        assert max(_decode(out[0]).size) <= 768
+
+    def test_small_image_keeps_original_when_not_smaller(self):
+        data = _png(8, 8)
+        out, stats = process_images([{"filename": "tiny.png", "data": data, "mime": "image/png"}])
+        assert out[0]["data"] == data
+        assert stats.resized == 0
+
+    def test_undecodable_image_passed_through(self):
+        data = base64.b64encode(b"\xff\xd8\xff\xe0" + b"\x00" * 50).decode("utf-8")
+        out, stats = process_images([{"filename": "bad.jpg", "data": data, "mime": "image/jpeg"}])
+        assert out == [{"filename": "bad.jpg", "data": data, "mime": "image/jpeg"}]
+        assert stats.bytes_in == stats.bytes_out
+
+    def test_invalid_base64_images_not_deduplicated(self):
+        images = [
+            {"filename": "a.png", "data": "not base64!", "mime": "image/png"},
+            {"filename": "b.png", "data": "also bad?", "mime": "image/png"},
+        ]
+        out, stats = process_images(images)
+        assert out == images
+        assert stats.duplicates_exact == 0
+
+    def test_pillow_missing_passes_through(self, monkeypatch):
+        import builtins
+
+        real_import = builtins.__import__
+
+        def _no_pil(name, *args, **kwargs):
+            if name == "PIL" or name.startswith("PIL."):
+                raise ImportError("no PIL")
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", _no_pil)
+        big = _noise_png(1600, 1200)
+        out, stats = process_images([
+            {"filename": "a.png", "data": big, "mime": "image/png"},
+            {"filename": "b.png", "data": big, "mime": "image/png"},
+        ])
+        assert len(out) == 1
+        assert out[0]["data"] == big
+        assert stats.duplicates_exact == 1
+
+
+# ------------------------------------------------------------------ #
+# Disk cache
+# ------------------------------------------------------------------ #
+
+
+class TestCache:
+    def test_variants_cached_on_disk(self, tmp_path):
+        big = _noise_png(1000, 1000)
+        images = [{"filename": "a.png", "data": big, "mime": "image/png"}]
+
+        pipeline = ImagePipeline(str(tmp_path))
+        first = pipeline.process(images)
+        assert pipeline.stats.cache_hits == 0
+        assert list((tmp_path / CACHE_DIR).glob("*.json"))
+
+        second = pipeline.process(images)
+        assert pipeline.stats.cache_hits == 1
+        assert second == first
+
+    def test_no_cache_without_project_dir(self, tmp_path):
+        pipeline = ImagePipeline()
+        pipeline.process([{"filename": "a.png", "data": _png(), "mime": "image/png"}])
+        assert not (tmp_path / CACHE_DIR).exists()
+
+    def test_corrupt_cache_entry_ignored(self, tmp_path):
+        big = _noise_png(1000, 1000)
+        images = [{"filename": "a.png", "data": big, "mime": "image/png"}]
+        ImagePipeline(str(tmp_path)).process(images)
+        for f in (tmp_path / CACHE_DIR).glob("*.json"):
+            f.write_text("{not json", encoding="utf-8")
+
+        pipeline = ImagePipeline(str(tmp_path))
+        out = pipeline.process(images)
+        assert pipeline.stats.cache_hits == 0
+        assert out[0]["mime"] == "image/jpeg"
+
+
+class TestPipelineStats:
+    def test_summary(self):
+        stats = PipelineStats(images_in=5, images_out=3, duplicates_exact=2, resized=1, bytes_in=4 * 1024 * 1024, bytes_out=300 * 1024)
+        text = stats.summary()
+        assert "3 of 5" in text
+        assert "2 duplicate" in text
+        assert "4.0 MB" in text
+        assert "300 KB" in text
+        assert stats.bytes_saved == 4 * 1024 * 1024 - 300 * 1024
@@ -544,3 +544,131 @@ class TestAIClassificationPrompt:
         prompt = c._build_classification_prompt()
         assert "__prompt_context" in prompt
         assert "__read_files" in prompt
+
+
+# ======================================================================
+# TestCompiledMatching — precompiled patterns and signal pre-filter
+# ======================================================================
+
+
+class TestCompiledMatching:
+    """Patterns are compiled once at registration."""
+
+    def test_regexes_compiled_at_register(self):
+        c = IntentClassifier()
+        c.register(IntentPattern(command="/x", regex_patterns=[r"do\s+x"]))
+        assert c._patterns[0].regexes[0].pattern == r"do\s+x"
+        assert c._signal_re is not None
+
+    def test_invalid_regex_fails_at_register(self):
+        c = IntentClassifier()
+        with pytest.raises(Exception):
+            c.register(IntentPattern(command="/x", regex_patterns=["("]))
+
+    def test_no_signal_skips_scoring(self):
+        class _NoIteration(list):
+            def __iter__(self):
+                raise AssertionError("patterns were scored")
+
+        c = build_deploy_classifier()
+        c._patterns = _NoIteration(c._patterns)
+        result = c.classify("the weather is lovely today")
+        assert result.kind == IntentKind.CONVERSATIONAL
+        assert result.confidence == 0.0
+
+    def test_backreference_disables_prefilter(self):
+        c = IntentClassifier()
+        c.register(IntentPattern(command="/x", keywords=["alpha"]))
+        c.register(IntentPattern(command="/y", regex_patterns=[r"(\w+) again \1"]))
+        assert c._signal_re is None
+        assert c.classify("stop again stop").command == "/y"
+
+
+# ======================================================================
+# TestClassificationCache — memoized AI results
+# ======================================================================
+
+
+def _partial_signal_classifier(provider, cache):
+    c = IntentClassifier(ai_provider=provider, cache=cache)
+    c.add_command_def(CommandDef("/status", "Show status"))
+    c.register(IntentPattern(command="/status", keywords=["status"], min_confidence=0.5))
+    return c
+
+
+class TestClassificationCache:
+    """AI classifications are memoized per normalised input."""
+
+    def test_repeated_input_skips_ai(self, tmp_path):
+        from azext_prototype.stages.intent import ClassificationCache
+
+        provider = MagicMock()
+        provider.chat.return_value = _make_response('{"command": "/status", "args": "", "is_command": true}')
+        c = _partial_signal_classifier(provider, ClassificationCache(str(tmp_path / "c.json")))
+
+        first = c.classify("status please")
+        second = c.classify("  Status   PLEASE? ")
+
+        assert first.command == second.command == "/status"
+        assert second.original_input == "Status   PLEASE?"
+        assert provider.chat.call_count == 1
+
+    def test_cache_persists_across_instances(self, tmp_path):
+        from azext_prototype.stages.intent import ClassificationCache
+
+        path = str(tmp_path / "c.json")
+        provider = MagicMock()
+        provider.chat.return_value = _make_response('{"command": "", "args": "", "is_command": false}')
+        _partial_signal_classifier(provider, ClassificationCache(path)).classify("status of my feelings")
+
+        other = MagicMock()
+        result = _partial_signal_classifier(other, ClassificationCache(path)).classify("status of my feelings")
+
+        assert result.kind == IntentKind.CONVERSATIONAL
+        other.chat.assert_not_called()
+
+    def test_keyed_by_command_set(self, tmp_path):
+        from azext_prototype.stages.intent import ClassificationCache
+
+        cache = ClassificationCache(str(tmp_path / "c.json"))
+        provider = MagicMock()
+        provider.chat.return_value = _make_response('{"command": "/status", "args": "", "is_command": true}')
+        _partial_signal_classifier(provider, cache).classify("status please")
+
+        c = _partial_signal_classifier(provider, cache)
+        c.add_command_def(CommandDef("/open", "Show open items"))
+        c.classify("status please")
+        assert provider.chat.call_count == 2
+
+    def test_failures_not_cached(self, tmp_path):
+        from azext_prototype.stages.intent import ClassificationCache
+
+        provider = MagicMock()
+        provider.chat.side_effect = [
+            ConnectionError("timeout"),
+            _make_response('{"command": "/status", "args": "", "is_command": true}'),
+        ]
+        c = _partial_signal_classifier(provider, ClassificationCache(str(tmp_path / "c.json")))
+
+        assert c.classify("status please").kind == IntentKind.CONVERSATIONAL
+        assert c.classify("status please").command == "/status"
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        from azext_prototype.stages.intent import ClassificationCache
+
+        path = tmp_path / "c.json"
+        path.write_text("{not json", encoding="utf-8")
+        cache = ClassificationCache(str(path))
+        assert cache.get("k", "status") is None
+        cache.put("k", "status", {"kind": "command", "command": "/status"})
+        assert ClassificationCache(str(path)).get("k", "STATUS")["command"] == "/status"
+
+    def test_factories_share_cache(self):
+        classifiers = [
+            build_discovery_classifier(),
+            build_build_classifier(),
+            build_deploy_classifier(),
+            build_backlog_classifier(),
+        ]
+        assert len({id(c._cache) for c in classifiers}) == 1
+        assert classifiers[0]._cache is not None
@@ -0,0 +1,254 @@
+"""Tests for azext_prototype.knowledge.local_index — offline BM25 index."""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+
+from azext_prototype.ai.provider import AIResponse
+from azext_prototype.knowledge import KnowledgeLoader
+from azext_prototype.knowledge.local_index import LocalIndex, _chunk_markdown, search_local, tokenize
+
+
+# ------------------------------------------------------------------
+# Fixtures
+# ------------------------------------------------------------------
+
+@pytest.fixture
+def sources(tmp_path):
+    """A small knowledge tree, policy tree and Learn page cache."""
+    kd = tmp_path / "knowledge"
+    for sub in ("services", "tools", "languages", "roles"):
+        (kd / sub).mkdir(parents=True)
+    (kd / "constraints.md").write_text("# Constraints\n\nAlways use managed identity.\n", encoding="utf-8")
+    (kd / "services" / "cosmos-db.md").write_text(
+        "# Cosmos DB\n\nIntro.\n\n"
+        "## Terraform Patterns\n\n"
+        "```hcl\n# Cosmos uses its own sql role assignment resource\n```\n\n"
+        "## Pitfalls\n\nServerless accounts cannot enable analytical store.\n",
+        encoding="utf-8",
+    )
+    (kd / "services" / "key-vault.md").write_text(
+        "# Key Vault\n\n## Private Endpoint\n\nKey vault private endpoint needs the privatelink DNS zone.\n",
+        encoding="utf-8",
+    )
+    (kd / "tools" / "terraform.md").write_text("# Terraform\n\nPin the azurerm provider version.\n", encoding="utf-8")
+    (kd / "service-registry.yaml").write_text(
+        yaml.safe_dump({"services": {"redis": {"display_name": "Azure Cache for Redis", "port": 6380}}}),
+        encoding="utf-8",
+    )
+
+    pd = tmp_path / "policies" / "azure"
+    pd.mkdir(parents=True)
+    (pd / "storage.policy.yaml").write_text(
+        yaml.safe_dump({
+            "metadata": {"name": "storage"},
+            "rules": [{"id": "ST-001", "description": "Disable shared key access on storage accounts"}],
+        }),
+        encoding="utf-8",
+    )
+
+    pages = tmp_path / "pages"
+    pages.mkdir()
+    (pages / "page-abc.json").write_text(
+        json.dumps({"url": "https://learn.microsoft.com/event-hubs", "text": "Event Hubs partitions and consumer groups"}),
+        encoding="utf-8",
+    )
+    return kd, tmp_path / "policies", pages
+
+
+def _index(sources, tmp_path):
+    kd, pd, pages = sources
+    return LocalIndex(knowledge_dir=kd, policies_dir=pd, pages_dir=str(pages), index_path=str(tmp_path / "idx.json"))
+
+
+# ------------------------------------------------------------------
+# Extraction
+# ------------------------------------------------------------------
+
+class TestExtraction:
+    def test_tokenize_drops_stopwords(self):
+        assert tokenize("How to use the Key-Vault with RBAC") == ["key", "vault", "rbac"]
+
+    def test_chunk_per_heading_ignores_code_comments(self):
+        text = "# Title\n\nintro\n\n## A\n\n```\n# not a heading\n```\n\n## B\n\nbody\n"
+        titles = [d["title"] for d in _chunk_markdown(text, "services/x")]
+        assert titles == ["services/x — Title", "services/x — A", "services/x — B"]
+
+
+# ------------------------------------------------------------------
+# Search
+# ------------------------------------------------------------------
+
+class TestLocalIndexSearch:
+    def test_finds_markdown_section(self, sources, tmp_path):
+        index = _index(sources, tmp_path)
+        index.refresh()
+        hits = index.search("key vault private endpoint dns")
+        assert hits[0].title == "services/key-vault — Private Endpoint"
+        assert hits[0].coverage == 1.0
+
+    def test_finds_policy_rule(self, sources, tmp_path):
+        index = _index(sources, tmp_path)
+        index.refresh()
+        assert index.search("shared key storage")[0].title == "storage policy — ST-001"
+
+    def test_finds_registry_entry(self, sources, tmp_path):
+        index = _index(sources, tmp_path)
+        index.refresh()
+        assert index.search("redis port")[0].title == "service-registry — Azure Cache for Redis"
+
+    def test_finds_cached_learn_page(self, sources, tmp_path):
+        index = _index(sources, tmp_path)
+        index.refresh()
+        hit = index.search("event hubs consumer groups")[0]
+        assert hit.url == "https://learn.microsoft.com/event-hubs"
+
+    def test_min_coverage_filters(self, sources, tmp_path):
+        index = _index(sources, tmp_path)
+        index.refresh()
+        assert index.search("key vault quantum teleportation", min_coverage=0.6) == []
+        assert index.search("key vault quantum teleportation", min_coverage=0.4)
+
+    def test_source_filter(self, sources, tmp_path):
+        index = _index(sources, tmp_path)
+        index.refresh()
+        hits = index.search("managed identity key vault", source_filter="services/cosmos-db.md")
+        assert all(h.source.endswith("cosmos-db.md") for h in hits)
+
+    def test_empty_query(self, sources, tmp_path):
+        index = _index(sources, tmp_path)
+        index.refresh()
+        assert index.search("the and of") == []
+
+
+# ------------------------------------------------------------------
+# Persistence / incremental refresh
+# ------------------------------------------------------------------
+
+class TestIncrementalRefresh:
+    def test_persisted_index_reused(self, sources, tmp_path):
+        first = _index(sources, tmp_path)
+        assert first.refresh() > 0
+        assert os.path.exists(tmp_path / "idx.json")
+
+        second = _index(sources, tmp_path)
+        assert second.refresh() == 0
+        assert second.document_count == first.document_count
+        assert second.search("terraform azurerm provider")
+
+    def test_changed_file_reindexed(self, sources, tmp_path):
+        kd, _, _ = sources
+        index = _index(sources, tmp_path)
+        index.refresh()
+
+        (kd / "tools" / "terraform.md").write_text("# Terraform\n\nUse remote state backends.\n", encoding="utf-8")
+        assert index.refresh() == 1
+        assert index.search("remote state backends", min_coverage=1.0)
+        assert not index.search("azurerm provider", min_coverage=1.0)
+
+    def test_deleted_file_dropped(self, sources, tmp_path):
+        _, _, pages = sources
+        index = _index(sources, tmp_path)
+        index.refresh()
+
+        os.remove(pages / "page-abc.json")
+        index.refresh()
+        assert not index.search("event hubs consumer groups", min_coverage=1.0)
+
+    def test_touched_file_not_retokenized(self, sources, tmp_path):
+        kd, _, _ = sources
+        index = _index(sources, tmp_path)
+        index.refresh()
+
+        path = kd / "tools" / "terraform.md"
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        with patch.object(LocalIndex, "_extract") as mock_extract:
+            assert index.refresh() == 0
+        mock_extract.assert_not_called()
+
+    def test_corrupt_index_file_rebuilt(self, sources, tmp_path):
+        (tmp_path / "idx.json").write_text("{not json", encoding="utf-8")
+        index = _index(sources, tmp_path)
+        assert index.refresh() > 0
+        assert index.search("terraform")
+
+
+# ------------------------------------------------------------------
+# Consumers
+# ------------------------------------------------------------------
+
+class TestSearchLocal:
+    def test_answers_from_builtin_knowledge(self):
+        result = search_local("key vault private endpoint")
+        assert result.startswith("### ")
+        assert "Source:" in result
+
+    def test_empty_when_not_covered(self):
+        assert search_local("zyxxy quorple flarn") == ""
+
+    def test_never_raises(self):
+        with patch("azext_prototype.knowledge.local_index.get_local_index", side_effect=RuntimeError("boom")):
+            assert search_local("key vault") == ""
+
+
+class TestKnowledgeLoaderSearch:
+    def test_service_scoped_search(self, sources):
+        kd, _, _ = sources
+        hits = KnowledgeLoader(knowledge_dir=kd).search("serverless analytical store", service="cosmos-db")
+        assert hits
+        assert hits[0].title == "services/cosmos-db — Pitfalls"
+
+    def test_gap_covered_by_index(self, sources):
+        from azext_prototype.stages.knowledge_contributor import check_knowledge_gap
+
+        kd, _, _ = sources
+        loader = KnowledgeLoader(knowledge_dir=kd)
+        covered = {"service": "cosmos-db", "context": "The analytical store cannot enable on serverless accounts"}
+        novel = {"service": "cosmos-db", "context": "Continuous backup requires a policy migration first"}
+        assert check_knowledge_gap(covered, loader) is False
+        assert check_knowledge_gap(novel, loader) is True
+
+
+class TestLocalFirstResolution:
+    def test_search_marker_answered_locally(self):
+        from azext_prototype.agents.base import AgentContext, BaseAgent
+
+        agent = BaseAgent(name="test-agent", description="Test", system_prompt="sys")
+        agent._enable_web_search = True
+        agent._governance_aware = False
+        provider = MagicMock()
+        provider.chat.side_effect = [
+            AIResponse(content="[SEARCH: key vault private endpoint]", model="m", usage={}),
+            AIResponse(content="final", model="m", usage={}),
+        ]
+        context = AgentContext(project_config={}, project_dir="/tmp", ai_provider=provider)
+
+        with patch("azext_prototype.knowledge.web_search.search_and_fetch") as mock_web:
+            result = agent.execute(context, "task")
+
+        assert result.content == "final"
+        mock_web.assert_not_called()
+        injected = provider.chat.call_args_list[1][0][0]
+        assert any("DOCUMENTATION SEARCH RESULTS" in m.content and "Key Vault" in m.content for m in injected)
+
+    def test_escalation_uses_local_index_first(self, tmp_path):
+        from azext_prototype.stages.escalation import EscalationEntry, EscalationTracker
+
+        tracker = EscalationTracker(str(tmp_path))
+        entry = EscalationEntry(
+            task_description="deploy",
+            blocker="key vault private endpoint dns",
+            source_agent="terraform-agent",
+            source_stage="build",
+        )
+        printed = []
+        with patch("azext_prototype.knowledge.web_search.search_and_fetch") as mock_web:
+            result = tracker._escalate_to_web_search(entry, printed.append)
+
+        mock_web.assert_not_called()
+        assert "Key Vault" in result
+        assert any("local knowledge index" in p for p in printed)
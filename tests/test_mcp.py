@@ -631,6 +631,195 @@ class TestMCPManager:
         assert all(not r.is_error for r in results)
 
 
+class _CountingHandler(EchoHandler):
+    """Echo handler that counts list_tools() round trips."""
+
+    def __init__(self, config, **kwargs):
+        super().__init__(config, **kwargs)
+        self.list_calls = 0
+
+    def list_tools(self):
+        self.list_calls += 1
+        return super().list_tools()
+
+
+class TestMCPToolCatalogCache:
+    def test_list_tools_called_once_per_connect(self, echo_config):
+        registry = MCPRegistry()
+        handler = _CountingHandler(echo_config)
+        registry.register_builtin(handler)
+        manager = MCPManager(registry)
+
+        for _ in range(5):
+            manager.get_tools_as_openai_schema(stage="build", agent="terraform-agent")
+        manager.get_tools_for_scope(stage="deploy")
+
+        assert handler.list_calls == 1
+
+    def test_schema_precomputed_per_scope(self, registry_with_handlers):
+        manager = MCPManager(registry_with_handlers)
+        first = manager.get_tools_as_openai_schema(stage="build", agent="qa-engineer")
+        second = manager.get_tools_as_openai_schema(stage="build", agent="qa-engineer")
+
+        assert first == second
+        assert first is not second  # callers get their own list
+        assert ("build", "qa-engineer") in manager._scope_schemas
+
+    def test_tools_list_changed_refreshes_catalog(self, echo_config):
+        registry = MCPRegistry()
+        handler = _CountingHandler(echo_config)
+        registry.register_builtin(handler)
+        manager = MCPManager(registry)
+        assert len(manager.get_tools_as_openai_schema()) == 2
+
+        handler._tools.append(MCPToolDefinition(
+            name="shout", description="Upper-cases input", input_schema={}, handler_name="echo",
+        ))
+        # Without a change notification the cached catalog is served
+        assert len(manager.get_tools_as_openai_schema()) == 2
+
+        handler.notify_tools_changed()
+        schema = manager.get_tools_as_openai_schema()
+        assert [s["function"]["name"] for s in schema] == ["echo", "reverse", "shout"]
+        assert handler.list_calls == 2
+
+    def test_circuit_breaker_removes_handler_from_cached_scope(self):
+        registry = MCPRegistry()
+        registry.register_builtin(FailingHandler(MCPHandlerConfig(name="failing")))
+        manager = MCPManager(registry)
+        assert len(manager.get_tools_as_openai_schema()) == 1
+
+        for _ in range(3):
+            manager.call_tool("fail_tool", {})
+
+        assert manager.get_tools_as_openai_schema() == []
+
+    def test_shutdown_clears_catalog(self, echo_config):
+        registry = MCPRegistry()
+        handler = _CountingHandler(echo_config)
+        registry.register_builtin(handler)
+        manager = MCPManager(registry)
+        manager.get_tools_for_scope()
+
+        manager.shutdown_all()
+        manager.get_tools_for_scope()
+
+        assert handler.list_calls == 2
+        assert handler._connected
+
+    def test_notify_without_manager_is_noop(self, echo_handler):
+        echo_handler.notify_tools_changed()  # no callback registered
+
+
+class _SlowHandler(EchoHandler):
+    """Echo handler whose calls sleep, tracking peak concurrency."""
+
+    def __init__(self, config, delay=0.2, **kwargs):
+        super().__init__(config, **kwargs)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._counter_lock = threading.Lock()
+
+    def call_tool(self, name, arguments):
+        import time
+
+        with self._counter_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(arguments.get("delay", self.delay))
+            return super().call_tool(name, arguments)
+        finally:
+            with self._counter_lock:
+                self.active -= 1
+
+
+class TestMCPParallelCalls:
+    def _manager(self, handler):
+        registry = MCPRegistry()
+        registry.register_builtin(handler)
+        manager = MCPManager(registry)
+        manager.get_tools_for_scope()
+        return manager
+
+    def test_calls_run_concurrently_in_order(self):
+        import time
+
+        handler = _SlowHandler(MCPHandlerConfig(name="echo", max_concurrency=5))
+        manager = self._manager(handler)
+
+        start = time.monotonic()
+        results = manager.call_tools([("echo", {"text": f"t{i}"}) for i in range(5)])
+        elapsed = time.monotonic() - start
+
+        assert [r.content for r in results] == ["t0", "t1", "t2", "t3", "t4"]
+        assert elapsed < 0.2 * 5 * 0.6
+        assert handler.peak > 1
+
+    def test_per_handler_concurrency_limit(self):
+        handler = _SlowHandler(MCPHandlerConfig(name="echo", max_concurrency=2), delay=0.05)
+        manager = self._manager(handler)
+
+        manager.call_tools([("echo", {"text": str(i)}) for i in range(6)])
+
+        assert handler.peak == 2
+
+    def test_timeout_returns_error_and_counts_toward_breaker(self):
+        handler = _SlowHandler(MCPHandlerConfig(name="echo"))
+        manager = self._manager(handler)
+
+        results = manager.call_tools(
+            [("echo", {"text": "fast", "delay": 0}), ("reverse", {"text": "slow", "delay": 1.0})],
+            timeout=0.1,
+        )
+
+        assert results[0].content == "fast"
+        assert results[1].is_error
+        assert "timed out" in results[1].error_message
+        assert manager._error_counts["echo"] == 1
+
+    def test_timeout_starts_when_call_gets_a_slot(self):
+        handler = _SlowHandler(MCPHandlerConfig(name="echo", max_concurrency=1), delay=0.1)
+        manager = self._manager(handler)
+
+        # Run one at a time; the later calls queue longer than the timeout.
+        results = manager.call_tools([("echo", {"text": str(i)}) for i in range(5)], timeout=0.3)
+
+        assert [r.content for r in results] == ["0", "1", "2", "3", "4"]
+        assert not any(r.is_error for r in results)
+
+    def test_unknown_tool_in_batch(self, registry_with_handlers):
+        manager = MCPManager(registry_with_handlers)
+        manager.get_tools_for_scope()
+
+        results = manager.call_tools([("nope", {}), ("echo", {"text": "hi"})])
+
+        assert results[0].is_error
+        assert "Unknown tool" in results[0].error_message
+        assert results[1].content == "hi"
+
+    def test_errors_in_batch_trip_circuit_breaker(self):
+        registry = MCPRegistry()
+        registry.register_builtin(FailingHandler(MCPHandlerConfig(name="failing")))
+        manager = MCPManager(registry)
+        manager.get_tools_for_scope()
+
+        manager.call_tools([("fail_tool", {})] * 3)
+
+        assert "failing" in manager._failed_handlers
+
+    def test_handler_exception_becomes_error_result(self, echo_config):
+        handler = EchoHandler(echo_config)
+        handler.call_tool = MagicMock(side_effect=RuntimeError("boom"))
+        manager = self._manager(handler)
+
+        results = manager.call_tools([("echo", {}), ("reverse", {})])
+
+        assert all(r.is_error for r in results)
+        assert "boom" in results[0].error_message
+
+
 # ================================================================== #
 # Loader tests
 # ================================================================== #
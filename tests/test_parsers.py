@@ -1,8 +1,18 @@
 """Tests for azext_prototype.parsers.file_extractor."""
 
+import os
 from pathlib import Path
 
-from azext_prototype.parsers.file_extractor import parse_file_blocks, write_parsed_files
+import pytest
+
+from azext_prototype.parsers.file_extractor import (
+    FileBlockParser,
+    FileWriter,
+    content_hash,
+    iter_file_blocks,
+    parse_file_blocks,
+    write_parsed_files,
+)
 
 
 # ======================================================================
@@ -259,3 +269,114 @@ class TestParseAndWrite:
         assert files == {}
         written = write_parsed_files(files, tmp_path, verbose=False)
         assert written == []
+
+
+class TestFileBlockParser:
+    """Incremental parsing must match parse_file_blocks for any chunking."""
+
+    SAMPLE = (
+        "Intro text\n"
+        "```main.tf\n"
+        'resource "x" "y" {}\n'
+        "```\n"
+        "````README.md\n"
+        "# Title\n"
+        "```bash\n"
+        "echo hi\n"
+        "```\n"
+        "````\n"
+        "```hcl:infra/variables.tf\n"
+        'variable "a" {}\n'
+        "```\n"
+        "```scripts/deploy.sh\n"
+        "echo unclosed\n"
+    )
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 1000])
+    def test_chunked_matches_batch(self, size):
+        parser = FileBlockParser()
+        events = []
+        for i in range(0, len(self.SAMPLE), size):
+            events.extend(parser.feed(self.SAMPLE[i : i + size]))
+        events.extend(parser.close())
+        assert dict(events) == parse_file_blocks(self.SAMPLE)
+
+    def test_emits_when_fence_closes(self):
+        parser = FileBlockParser()
+        assert parser.feed("```main.tf\nline1\n") == []
+        assert parser.current_file == "main.tf"
+        assert parser.feed("line2\n``") == []
+        assert parser.feed("`\nmore") == [("main.tf", "line1\nline2")]
+        assert parser.current_file is None
+        assert parser.close() == []
+
+    def test_longer_fence_keeps_nested_block(self):
+        parser = FileBlockParser()
+        events = parser.feed("````doc.md\n```py\nx\n```\n````\n")
+        assert events == [("doc.md", "```py\nx\n```")]
+
+    def test_unclosed_block_flushed_on_close(self):
+        parser = FileBlockParser()
+        assert parser.feed("```a.py\nprint(1)") == []
+        assert parser.close() == [("a.py", "print(1)")]
+
+    def test_feed_after_close_raises(self):
+        parser = FileBlockParser()
+        parser.close()
+        with pytest.raises(ValueError):
+            parser.feed("x")
+
+    def test_iter_file_blocks(self):
+        chunks = ["```a.tf\n", "a\n```\n", "```b.tf\nb\n", "```\n"]
+        assert list(iter_file_blocks(chunks)) == [("a.tf", "a"), ("b.tf", "b")]
+
+
+class TestFileWriter:
+    def test_writes_and_records_manifest(self, tmp_path: Path):
+        writer = FileWriter(tmp_path)
+        assert writer.write("sub/main.tf", "hello") is True
+        assert (tmp_path / "sub" / "main.tf").read_text() == "hello"
+        assert writer.manifest["sub/main.tf"] == {"sha256": content_hash("hello"), "size": 5}
+
+    def test_skips_identical_content(self, tmp_path: Path):
+        import os
+
+        target = tmp_path / "main.tf"
+        target.write_text("same", encoding="utf-8")
+        os.utime(target, (1_000_000, 1_000_000))
+
+        writer = FileWriter(tmp_path)
+        assert writer.write("main.tf", "same") is False
+        assert target.stat().st_mtime == 1_000_000
+        assert writer.skipped == [target]
+        assert writer.written == []
+
+    def test_known_hash_with_external_edit_rewrites(self, tmp_path: Path):
+        target = tmp_path / "main.tf"
+        target.write_text("user edited", encoding="utf-8")
+        writer = FileWriter(tmp_path, known_hashes={"main.tf": content_hash("new")})
+        assert writer.write("main.tf", "new") is True
+        assert target.read_text() == "new"
+
+    def test_write_all_returns_changed_only(self, tmp_path: Path):
+        (tmp_path / "a.tf").write_text("a", encoding="utf-8")
+        writer = FileWriter(tmp_path)
+        changed = writer.write_all([("a.tf", "a"), ("b.tf", "b")])
+        assert changed == [tmp_path / "b.tf"]
+
+    def test_no_temp_files_left(self, tmp_path: Path):
+        FileWriter(tmp_path).write("x.txt", "data")
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["x.txt"]
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+    def test_file_modes(self, tmp_path: Path):
+        umask = os.umask(0o022)
+        os.umask(umask)
+        FileWriter(tmp_path).write("new.tf", "data")
+        assert (tmp_path / "new.tf").stat().st_mode & 0o777 == 0o666 & ~umask
+
+        script = tmp_path / "deploy.sh"
+        script.write_text("#!/bin/sh\n", encoding="utf-8")
+        script.chmod(0o755)
+        FileWriter(tmp_path).write("deploy.sh", "#!/bin/sh\necho hi\n")
+        assert script.stat().st_mode & 0o777 == 0o755
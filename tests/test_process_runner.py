@@ -0,0 +1,164 @@
+"""Tests for azext_prototype.stages.process_runner — streaming subprocess runner."""
+
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+from azext_prototype.stages.process_runner import TerraformProgress, run_streaming
+
+
+def _py(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+# ------------------------------------------------------------------
+# run_streaming
+# ------------------------------------------------------------------
+
+class TestRunStreaming:
+    def test_streams_lines_in_order(self):
+        seen = []
+        result = run_streaming(_py("for i in range(5): print(f'line {i}', flush=True)"), on_line=seen.append)
+        assert result.returncode == 0
+        assert seen == [f"line {i}" for i in range(5)]
+        assert result.stdout == "\n".join(seen)
+        assert result.line_count == 5
+
+    def test_output_is_bounded_to_tail(self):
+        seen = []
+        result = run_streaming(_py("for i in range(5000): print(i)"), on_line=seen.append, tail_lines=50)
+        assert len(seen) == 5000
+        assert result.stdout.splitlines() == [str(i) for i in range(4950, 5000)]
+
+    def test_keep_stdout_keeps_everything(self):
+        result = run_streaming(_py("for i in range(500): print(i)"), keep_stdout=True, tail_lines=10)
+        assert len(result.stdout.splitlines()) == 500
+
+    def test_stderr_and_exit_code(self):
+        out, err = [], []
+        result = run_streaming(
+            _py("import sys; print('ok'); print('boom', file=sys.stderr); sys.exit(3)"),
+            on_line=out.append,
+            on_stderr=err.append,
+        )
+        assert result.returncode == 3
+        assert out == ["ok"] and err == ["boom"]
+        assert result.stderr == "boom"
+
+    def test_stderr_defaults_to_on_line(self):
+        seen = []
+        run_streaming(_py("import sys; print('warn', file=sys.stderr)"), on_line=seen.append)
+        assert seen == ["warn"]
+
+    def test_cwd_and_env(self, tmp_path):
+        result = run_streaming(
+            _py("import os; print(os.getcwd()); print(os.environ['DEPLOY_MARKER'])"),
+            cwd=tmp_path,
+            env={"DEPLOY_MARKER": "stage-3", "PATH": ""},
+        )
+        lines = result.stdout.splitlines()
+        assert lines[0] == str(tmp_path.resolve())
+        assert lines[1] == "stage-3"
+
+    def test_cancel_terminates_process(self):
+        cancel = threading.Event()
+        threading.Timer(0.3, cancel.set).start()
+        start = time.monotonic()
+        result = run_streaming(_py("import time; print('started', flush=True); time.sleep(30)"), cancel_event=cancel)
+        assert result.cancelled is True
+        assert result.returncode == -1
+        assert time.monotonic() - start < 10
+
+    def test_missing_executable_raises(self):
+        with pytest.raises(FileNotFoundError):
+            run_streaming(["definitely-not-a-real-binary-xyz"])
+
+    def test_callback_errors_do_not_abort(self):
+        def _bad(line):
+            raise RuntimeError("display broke")
+
+        result = run_streaming(_py("print('a'); print('b')"), on_line=_bad)
+        assert result.returncode == 0
+        assert result.stdout == "a\nb"
+
+
+# ------------------------------------------------------------------
+# TerraformProgress
+# ------------------------------------------------------------------
+
+def _event(kind: str, **fields) -> str:
+    return json.dumps({"@level": "info", "type": kind, **fields})
+
+
+def _hook(addr: str, action: str, elapsed: int | None = None) -> dict:
+    hook = {"resource": {"addr": addr}, "action": action}
+    if elapsed is not None:
+        hook["elapsed_seconds"] = elapsed
+    return hook
+
+
+class TestTerraformProgress:
+    def test_apply_events(self):
+        progress = TerraformProgress()
+        lines = [
+            _event("version", terraform="1.7.0"),
+            _event("planned_change", change={"resource": {"addr": "azurerm_resource_group.main"}, "action": "create"}),
+            _event("planned_change", change={"resource": {"addr": "azurerm_key_vault.main"}, "action": "update"}),
+            _event("apply_start", hook=_hook("azurerm_resource_group.main", "create")),
+            _event("apply_complete", hook=_hook("azurerm_resource_group.main", "create", 3)),
+            _event("apply_start", hook=_hook("azurerm_key_vault.main", "update")),
+            _event("apply_progress", hook=_hook("azurerm_key_vault.main", "update", 10)),
+            _event("apply_complete", hook=_hook("azurerm_key_vault.main", "update", 14)),
+            _event("change_summary", **{"@message": "Apply complete! Resources: 1 added, 1 changed, 0 destroyed."}),
+            _event("outputs", outputs={}),
+        ]
+        shown = [msg for msg in map(progress.feed, lines) if msg is not None]
+
+        assert shown[:5] == [
+            "Creating azurerm_resource_group.main...",
+            "[1/2] Created azurerm_resource_group.main (3s)",
+            "Modifying azurerm_key_vault.main...",
+            "azurerm_key_vault.main: still modifying (10s elapsed)",
+            "[2/2] Modified azurerm_key_vault.main (14s)",
+        ]
+        assert shown[5].startswith("Apply complete! Resources: 1 added, 1 changed, 0 destroyed.")
+        assert (progress.created, progress.modified, progress.destroyed) == (1, 1, 0)
+
+    def test_error_diagnostics(self):
+        progress = TerraformProgress()
+        progress.feed(_event("apply_errored", hook=_hook("azurerm_storage_account.data", "create", 2)))
+        shown = progress.feed(_event(
+            "diagnostic",
+            diagnostic={
+                "severity": "error",
+                "summary": "creating Storage Account",
+                "detail": "StorageAccountAlreadyTaken",
+                "address": "azurerm_storage_account.data",
+            },
+        ))
+        assert shown == "Error: creating Storage Account"
+        assert progress.failed == 1
+        assert progress.error_text() == (
+            "Error: creating Storage Account\n\n  with azurerm_storage_account.data\n\nStorageAccountAlreadyTaken"
+        )
+
+    def test_outputs_event_is_kept(self):
+        progress = TerraformProgress()
+        outputs = {"rg_name": {"sensitive": False, "type": "string", "value": "zd-rg"}}
+        assert progress.feed(_event("outputs", outputs=outputs)) is None
+        assert progress.outputs == outputs
+
+    def test_warnings_hidden_and_plain_text_passes_through(self):
+        progress = TerraformProgress()
+        assert progress.feed(_event("diagnostic", diagnostic={"severity": "warning", "summary": "deprecated"})) is None
+        assert progress.feed("panic: provider crashed") == "panic: provider crashed"
+        assert progress.feed("") is None
+        assert progress.error_text() == ""
+
+    def test_null_action(self):
+        progress = TerraformProgress()
+        hook = {"resource": {"addr": "azurerm_key_vault.main"}, "action": None, "elapsed_seconds": 10}
+        assert progress.feed(_event("apply_progress", hook=hook)).startswith("azurerm_key_vault.main: still")
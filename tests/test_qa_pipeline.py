@@ -0,0 +1,65 @@
+"""Tests for azext_prototype.stages.qa_pipeline — batched QA review helpers."""
+
+import os
+
+from azext_prototype.stages.qa_pipeline import (
+    PER_FILE_CAP,
+    QA_MODE_PARALLEL,
+    FileContentCache,
+    pack_stages,
+    qa_has_issues,
+    split_batch_findings,
+)
+
+
+class TestPackStages:
+    def test_packs_consecutive_stages_within_budget(self):
+        sizes = [("1", 1000), ("2", 2000), ("3", 2500), ("4", 500), ("5", 9000)]
+        assert pack_stages(sizes, 6000) == [["1", "2", "3", "4"], ["5"]]
+
+    def test_oversized_stage_gets_own_request(self):
+        assert pack_stages([("1", 100), ("2", 8000), ("3", 100)], 6000) == [["1"], ["2"], ["3"]]
+
+    def test_parallel_mode_is_one_request_per_stage(self):
+        assert pack_stages([("1", 10), ("2", 10)], 6000, QA_MODE_PARALLEL) == [["1"], ["2"]]
+
+
+class TestSplitBatchFindings:
+    def test_sections_map_to_stages(self):
+        content = (
+            "Overall the build is sound.\n\n"
+            "## Stage 1\nPASS\n\n"
+            "## Stage 2: Data\nCRITICAL: missing output `sql_id`.\n\n"
+            "### Stage 3 — App\nPASS\n"
+        )
+        findings = split_batch_findings(content, ["1", "2", "3"])
+        assert findings == {"1": "PASS", "2": "CRITICAL: missing output `sql_id`.", "3": "PASS"}
+
+    def test_missing_and_unknown_stages(self):
+        findings = split_batch_findings("## Stage 1\nPASS\n## Stage 9\nfix this", ["1", "2"])
+        assert findings == {"1": "PASS"}
+
+
+class TestQAHasIssues:
+    def test_verdicts(self):
+        assert qa_has_issues("PASS") is False
+        assert qa_has_issues("") is False
+        assert qa_has_issues("All looks good.") is False
+        assert qa_has_issues("CRITICAL: hardcoded secret") is True
+
+
+class TestFileContentCache:
+    def test_reads_once_until_file_changes(self, tmp_path):
+        path = tmp_path / "main.tf"
+        path.write_text("a" * (PER_FILE_CAP + 10), encoding="utf-8")
+        cache = FileContentCache(tmp_path)
+
+        first = cache.read("main.tf")
+        assert first.endswith("... (truncated)")
+        assert cache.read("main.tf") is first
+
+        path.write_text("b", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert cache.read("main.tf") == "b"
+        assert cache.read("missing.tf") is None
@@ -280,6 +280,125 @@ class TestCheckAll:
             check_all_or_fail(iac_tool="terraform")
 
 
+class TestInProcessVersions:
+    """Python and Azure CLI versions come from the running process."""
+
+    @patch("azext_prototype.requirements.subprocess.run")
+    def test_python_no_subprocess(self, mock_run):
+        import platform
+
+        result = check_tool(get_requirement("Python"))
+        assert result.installed_version == platform.python_version()
+        mock_run.assert_not_called()
+
+    @patch("azext_prototype.requirements._azure_cli_version", return_value="2.70.0")
+    @patch("azext_prototype.requirements.subprocess.run")
+    def test_azure_cli_uses_core_version(self, mock_run, mock_ver):
+        req = get_requirement("Azure CLI")
+        with patch.object(req, "in_process", mock_ver):
+            result = check_tool(req)
+        assert result.status == "pass"
+        assert result.installed_version == "2.70.0"
+        mock_run.assert_not_called()
+
+    def test_azure_cli_version_without_core(self):
+        from azext_prototype.requirements import _azure_cli_version
+
+        with patch.dict(sys.modules, {"azure.cli.core": None}):
+            assert _azure_cli_version() is None
+
+
+class TestToolVersionCache:
+    """check_all() caches spawned-tool versions keyed by binary fingerprint."""
+
+    def _tool(self, tmp_path, content=b"#!/bin/sh\n"):
+        binary = tmp_path / "terraform"
+        binary.write_bytes(content)
+        return str(binary)
+
+    def test_unchanged_binary_not_reprobed(self, tmp_path):
+        binary = self._tool(tmp_path)
+        with patch("azext_prototype.requirements._find_tool", return_value=binary), \
+                patch("azext_prototype.requirements.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout="Terraform v1.14.2\ngh version 2.40.0\n", stderr="")
+            first = check_all(iac_tool="terraform")
+            calls_after_first = mock_run.call_count
+            second = check_all(iac_tool="terraform")
+
+        assert calls_after_first >= 1
+        assert mock_run.call_count == calls_after_first
+        tf = [r for r in second if r.name == "Terraform"][0]
+        assert tf.status == "pass"
+        assert tf.installed_version == "1.14.2"
+        assert [r.status for r in first] == [r.status for r in second]
+
+    def test_changed_binary_reprobed(self, tmp_path):
+        binary = self._tool(tmp_path)
+        with patch("azext_prototype.requirements._find_tool", return_value=binary), \
+                patch("azext_prototype.requirements.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout="Terraform v1.14.2\n", stderr="")
+            check_all(iac_tool="terraform")
+            calls = mock_run.call_count
+
+            self._tool(tmp_path, content=b"#!/bin/sh\n# upgraded\n")
+            mock_run.return_value = MagicMock(stdout="Terraform v1.15.0\n", stderr="")
+            results = check_all(iac_tool="terraform")
+
+        assert mock_run.call_count > calls
+        tf = [r for r in results if r.name == "Terraform"][0]
+        assert tf.installed_version == "1.15.0"
+
+    def test_use_cache_false_always_probes(self, tmp_path):
+        binary = self._tool(tmp_path)
+        with patch("azext_prototype.requirements._find_tool", return_value=binary), \
+                patch("azext_prototype.requirements.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout="Terraform v1.14.2\n", stderr="")
+            check_all(iac_tool="terraform")
+            calls = mock_run.call_count
+            check_all(iac_tool="terraform", use_cache=False)
+
+        assert mock_run.call_count == calls * 2
+
+    def test_missing_tool_not_cached(self):
+        from azext_prototype.requirements import _load_cache
+
+        with patch("azext_prototype.requirements._find_tool", return_value=None):
+            results = check_all(iac_tool="terraform")
+        assert [r for r in results if r.name == "Terraform"][0].status == "missing"
+        assert "Terraform" not in _load_cache()
+
+    def test_corrupt_cache_ignored(self):
+        from azext_prototype.requirements import _cache_path, _load_cache
+
+        with open(_cache_path(), "w", encoding="utf-8") as f:
+            f.write("{not json")
+        assert _load_cache() == {}
+
+    def test_checks_run_concurrently(self, tmp_path):
+        import threading
+        import time
+
+        binary = self._tool(tmp_path)
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def _slow_run(*args, **kwargs):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return MagicMock(stdout="gh version 2.40.0\nTerraform v1.14.2\n", stderr="")
+
+        with patch("azext_prototype.requirements._find_tool", return_value=binary), \
+                patch("azext_prototype.requirements._azure_cli_version", return_value=None), \
+                patch("azext_prototype.requirements.subprocess.run", side_effect=_slow_run):
+            check_all(iac_tool="terraform", use_cache=False)
+
+        assert active["peak"] > 1
+
+
 # ======================================================================
 # TestGetRequirement
 # ======================================================================
@@ -0,0 +1,96 @@
+"""Tests for azext_prototype.stages.rollback_planner — dependency-ordered rollback."""
+
+from pathlib import Path
+
+from azext_prototype.stages.rollback_planner import plan_rollback, stage_dependencies
+
+
+def _stage(num, bid, category="infra", label=None, status="deployed"):
+    return {
+        "stage": num,
+        "name": bid.title(),
+        "category": category,
+        "build_stage_id": bid,
+        "substage_label": label,
+        "dir": f"concept/infra/terraform/stage-{num}-{bid}",
+        "deploy_status": status,
+    }
+
+
+def _write(project: Path, stage: dict, text: str) -> None:
+    stage_dir = project / stage["dir"]
+    stage_dir.mkdir(parents=True, exist_ok=True)
+    (stage_dir / "main.tf").write_text(text, encoding="utf-8")
+
+
+def _keys(plan):
+    return [[s["build_stage_id"] for s in wave] for wave in plan.waves]
+
+
+class TestStageDependencies:
+    def test_categories_layer_stages(self, tmp_path):
+        stages = [_stage(1, "foundation"), _stage(2, "monitoring"), _stage(3, "data", "data"), _stage(4, "web", "app")]
+        deps = stage_dependencies(stages, tmp_path)
+        assert deps["foundation"] == set()
+        assert deps["monitoring"] == set()  # same layer, no reference
+        assert deps["data"] == {"foundation", "monitoring"}
+        assert deps["web"] == {"foundation", "monitoring", "data"}
+
+    def test_remote_state_references(self, tmp_path):
+        stages = [_stage(1, "foundation"), _stage(2, "network"), _stage(3, "keyvault")]
+        _write(tmp_path, stages[1], 'data "terraform_remote_state" "s1" {\n  config = { key = "stage1.tfstate" }\n}\n')
+        _write(
+            tmp_path,
+            stages[2],
+            'data "terraform_remote_state" "net" {\n  config = { path = "../stage-2-network/terraform.tfstate" }\n}\n',
+        )
+        deps = stage_dependencies(stages, tmp_path)
+        assert deps["network"] == {"foundation"}
+        assert deps["keyvault"] == {"network"}
+
+    def test_captured_output_references(self, tmp_path):
+        stages = [_stage(1, "foundation"), _stage(2, "identity"), _stage(3, "keyvault")]
+        _write(tmp_path, stages[1], 'resource_group_name = "zd-rg-api-dev"\n')
+        _write(tmp_path, stages[2], "principal = data.terraform_remote_state.id.outputs.principal_id\n")
+        outputs = {
+            "foundation": {"resource_group_name": "zd-rg-api-dev", "location": "eus"},
+            "identity": {"principal_id": "0000-1111"},
+        }
+        deps = stage_dependencies(stages, tmp_path, outputs)
+        assert deps["identity"] == {"foundation"}
+        assert deps["keyvault"] == {"identity"}
+
+    def test_substages_depend_on_earlier_substages(self, tmp_path):
+        stages = [_stage(1, "data", label="a"), _stage(1, "data", label="b")]
+        deps = stage_dependencies(stages, tmp_path)
+        assert deps["data:b"] == {"data:a"}
+
+
+class TestPlanRollback:
+    def test_independent_stages_share_a_wave(self, tmp_path):
+        stages = [
+            _stage(1, "foundation"),
+            _stage(2, "network"),
+            _stage(3, "monitoring"),
+            _stage(4, "data", "data"),
+            _stage(5, "web", "app"),
+            _stage(6, "worker", "app"),
+        ]
+        for stage in stages[1:3]:
+            _write(tmp_path, stage, 'config = { key = "foundation.tfstate" }\n')
+        plan = plan_rollback(stages, stage_dependencies(stages, tmp_path))
+        assert _keys(plan) == [["worker", "web"], ["data"], ["monitoring", "network"], ["foundation"]]
+        assert plan.dependents["foundation"] == {"network", "monitoring", "data", "web", "worker"}
+        assert plan.stage_count == 6
+
+    def test_dependency_through_undeployed_stage(self, tmp_path):
+        stages = [_stage(1, "foundation"), _stage(2, "network", status="rolled_back"), _stage(3, "keyvault")]
+        _write(tmp_path, stages[1], 'key = "stage1.tfstate"\n')
+        _write(tmp_path, stages[2], 'key = "stage2.tfstate"\n')
+        deployed = [s for s in stages if s["deploy_status"] == "deployed"]
+        plan = plan_rollback(deployed, stage_dependencies(stages, tmp_path))
+        assert _keys(plan) == [["keyvault"], ["foundation"]]
+
+    def test_empty(self):
+        plan = plan_rollback([], {})
+        assert plan.waves == [] and plan.keys() == []
@@ -981,6 +981,190 @@ class TestDesignStage:
             )
 
 
+class TestDesignParallelSections:
+    """Section-parallel architecture generation (``--parallel-sections``)."""
+
+    @staticmethod
+    def _setup(project_with_config, populated_registry):
+        from azext_prototype.agents.base import AgentCapability
+        from azext_prototype.config import ProjectConfig
+
+        config = ProjectConfig(str(project_with_config))
+        config.load()
+        architect = populated_registry.find_by_capability(AgentCapability.ARCHITECT)[0]
+        return config, architect
+
+    @staticmethod
+    def _chat(delay=0.0, extra=None, review=None):
+        """Provider stub: sections echo their name, the review returns *review*."""
+        import re
+        import time as _time
+
+        from azext_prototype.ai.provider import AIResponse
+
+        prompts = []
+
+        def _respond(messages, **kwargs):
+            prompt = messages[-1].content
+            prompts.append(prompt)
+            usage = {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20}
+            if prompt.startswith("## Task\nThe sections below"):
+                content = review if review is not None else "{}"
+                return AIResponse(content=content, model="gpt-4o", usage=usage)
+            _time.sleep(delay)
+            section = re.search(r'Generate the "(.+?)" section', prompt).group(1)
+            content = f"## {section}\nBody of {section}."
+            if extra and section in extra:
+                content += f"\n{extra[section]}"
+            return AIResponse(content=content, model="gpt-4o", usage=usage)
+
+        return _respond, prompts
+
+    def test_sections_run_concurrently(self, project_with_config, mock_agent_context, populated_registry):
+        import time as _time
+
+        from azext_prototype.stages.design_stage import DesignStage
+
+        config, architect = self._setup(project_with_config, populated_registry)
+        respond, prompts = self._chat(delay=0.3)
+        mock_agent_context.ai_provider.chat.side_effect = respond
+        sections = [{"name": n, "context": ""} for n in ("Overview", "Services", "Security", "Data Flow")]
+
+        start = _time.monotonic()
+        output, usage = DesignStage()._generate_architecture_sections(
+            None, mock_agent_context, architect, config, sections, "Build an app", lambda m: None, parallel=True
+        )
+
+        assert _time.monotonic() - start < 0.9  # four 0.3s sections, not 1.2s
+        assert [ln for ln in output.splitlines() if ln.startswith("## ")] == [
+            "## Overview", "## Services", "## Security", "## Data Flow",
+        ]
+        assert usage["total_tokens"] == 5 * 20  # four sections + consistency pass
+        assert not any("Architecture So Far" in p for p in prompts)
+        assert "## Draft Document" in prompts[-1]
+
+    def test_new_sections_generated_in_follow_up_wave(
+        self, project_with_config, mock_agent_context, populated_registry
+    ):
+        from azext_prototype.stages.design_stage import DesignStage
+
+        config, architect = self._setup(project_with_config, populated_registry)
+        marker = '[NEW_SECTION: {"name": "Disaster Recovery", "context": "Backups"}]'
+        respond, prompts = self._chat(extra={"Services": marker})
+        mock_agent_context.ai_provider.chat.side_effect = respond
+        sections = [{"name": "Overview", "context": ""}, {"name": "Services", "context": ""}]
+        added = []
+
+        output, _ = DesignStage()._generate_architecture_sections(
+            None, mock_agent_context, architect, config, sections, "Build an app", lambda m: None,
+            section_fn=added.extend, parallel=True,
+        )
+
+        assert output.rstrip().endswith("## Disaster Recovery\nBody of Disaster Recovery.")
+        assert "NEW_SECTION" not in output
+        assert ("Disaster Recovery", 3) in added
+        assert "- Disaster Recovery: Backups" in prompts[-1]
+
+    def test_progress_reported_per_section(self, project_with_config, mock_agent_context, populated_registry):
+        from azext_prototype.stages.design_stage import DesignStage
+
+        config, architect = self._setup(project_with_config, populated_registry)
+        respond, _ = self._chat(delay=0.05)
+        mock_agent_context.ai_provider.chat.side_effect = respond
+        sections = [{"name": "Overview", "context": ""}, {"name": "Azure Services", "context": ""}]
+        updates, printed = [], []
+
+        DesignStage()._generate_architecture_sections(
+            None, mock_agent_context, architect, config, sections, "Build an app", printed.append,
+            update_task_fn=lambda tid, status: updates.append((tid, status)), parallel=True,
+        )
+
+        for tid in ("design-section-overview", "design-section-azure-services", "design-section-consistency-review"):
+            assert updates.index((tid, "in_progress")) < updates.index((tid, "completed"))
+        assert any(m.startswith("  Azure Services...Done.") for m in printed)
+
+    def test_review_that_rewrites_document_keeps_draft(
+        self, project_with_config, mock_agent_context, populated_registry
+    ):
+        from azext_prototype.stages.design_stage import DesignStage
+
+        config, architect = self._setup(project_with_config, populated_registry)
+        respond, _ = self._chat(review="## Overview\nOnly one section survived.")
+        mock_agent_context.ai_provider.chat.side_effect = respond
+        sections = [{"name": "Overview", "context": ""}, {"name": "Services", "context": ""}]
+
+        output, _ = DesignStage()._generate_architecture_sections(
+            None, mock_agent_context, architect, config, sections, "Build an app", lambda m: None, parallel=True
+        )
+
+        assert output == "## Overview\nBody of Overview.\n\n## Services\nBody of Services."
+
+    def test_review_edits_applied_locally(self, project_with_config, mock_agent_context, populated_registry):
+        import json
+
+        from azext_prototype.stages.design_stage import DesignStage
+
+        config, architect = self._setup(project_with_config, populated_registry)
+        review = json.dumps({
+            "renames": {"Body": "Text"},
+            "edits": [
+                {"section": "Services", "find": "of Services.", "replace": "of Services, see Overview."},
+                {"section": "Overview", "find": "Overview\nBody", "replace": "Intro\nBody"},
+                {"section": "Overview", "find": "not in the draft", "replace": "x"},
+            ],
+        })
+        respond, _ = self._chat(review=f"```json\n{review}\n```")
+        mock_agent_context.ai_provider.chat.side_effect = respond
+        sections = [{"name": "Overview", "context": ""}, {"name": "Services", "context": ""}]
+
+        output, _ = DesignStage()._generate_architecture_sections(
+            None, mock_agent_context, architect, config, sections, "Build an app", lambda m: None, parallel=True
+        )
+
+        # The heading-changing edit is skipped; headings are never renamed
+        assert output == "## Overview\nText of Overview.\n\n## Services\nText of Services, see Overview."
+
+    def test_truncated_section_continuation_carries_context(self, mock_agent_context):
+        from azext_prototype.ai.provider import AIResponse
+        from azext_prototype.stages.design_stage import DesignStage
+
+        architect = MagicMock()
+        architect.execute.side_effect = [
+            AIResponse(content="## Overview\nHalf a sen", model="m", usage={"total_tokens": 5}, finish_reason="length"),
+            AIResponse(content="tence.", model="m", usage={"total_tokens": 2}, finish_reason="stop"),
+        ]
+
+        response = DesignStage._execute_section(architect, mock_agent_context, "Write the Overview.", "Overview")
+
+        assert response.content == "## Overview\nHalf a sentence."
+        assert response.usage == {"total_tokens": 7}
+        continuation = architect.execute.call_args_list[1].args[1]
+        assert continuation.startswith("Write the Overview.")
+        assert "## Partial Response" in continuation and "Half a sen" in continuation
+
+    def test_enabled_from_project_config(self, project_with_config, mock_agent_context, populated_registry):
+        from azext_prototype.config import ProjectConfig
+        from azext_prototype.stages.design_stage import DesignStage
+        from azext_prototype.stages.discovery import DiscoveryResult
+
+        config = ProjectConfig(str(project_with_config))
+        config.load()
+        config.set("design.parallel_sections", True)
+
+        stage = DesignStage()
+        stage.get_guards = lambda: []  # type: ignore[assignment]
+        discovery = DiscoveryResult(requirements="Build a web app", conversation=[], policy_overrides=[], exchange_count=1)
+
+        with patch("azext_prototype.stages.design_stage.DiscoverySession") as MockDS, patch.object(
+            DesignStage, "_plan_architecture", return_value=[{"name": "Overview", "context": ""}]
+        ), patch.object(DesignStage, "_generate_sections_parallel", return_value=("## Overview\nx", {})) as par, \
+                patch.object(DesignStage, "_run_iac_review"):
+            MockDS.return_value.run.return_value = discovery
+            stage.execute(mock_agent_context, populated_registry, context="Build a web app")
+
+        par.assert_called_once()
+
+
 class TestBuildStage:
     """Test the build stage."""
 
@@ -414,6 +414,46 @@ class TestGetTenantId:
         ):
             assert _get_tenant_id(cmd) == ""
 
+    def test_profile_built_once_per_process(self):
+        from azext_prototype.telemetry import _get_tenant_id
+
+        mock_profile = MagicMock()
+        mock_profile.get_subscription.return_value = {"tenantId": "tenant-1"}
+
+        with _fake_azure_cli_modules(), patch(
+            "azure.cli.core._profile.Profile",
+            return_value=mock_profile,
+        ) as mock_cls:
+            assert _get_tenant_id(MagicMock()) == "tenant-1"
+            assert _get_tenant_id(MagicMock()) == "tenant-1"
+        assert mock_cls.call_count == 1
+
+    def test_tenant_cached_on_disk_until_profile_changes(self, tmp_path):
+        import os
+
+        from azext_prototype import telemetry
+
+        profile_file = tmp_path / "azureProfile.json"
+        profile_file.write_text("{}")
+        mock_profile = MagicMock()
+        mock_profile.get_subscription.return_value = {"tenantId": "tenant-1"}
+
+        with _fake_azure_cli_modules(), patch(
+            "azure.cli.core._environment.get_config_dir",
+            return_value=str(tmp_path),
+        ), patch("azure.cli.core._profile.Profile", return_value=mock_profile) as mock_cls:
+            assert telemetry._get_tenant_id(MagicMock()) == "tenant-1"
+            telemetry.reset()  # a later command, in a new process
+            assert telemetry._get_tenant_id(MagicMock()) == "tenant-1"
+            assert mock_cls.call_count == 1
+
+            mock_profile.get_subscription.return_value = {"tenantId": "tenant-2"}
+            stat = profile_file.stat()
+            os.utime(profile_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            telemetry.reset()
+            assert telemetry._get_tenant_id(MagicMock()) == "tenant-2"
+            assert mock_cls.call_count == 2
+
 
 # ======================================================================
 # _parse_connection_string
@@ -726,59 +766,266 @@ class TestTrackCommand:
 
 
 # ======================================================================
-# _send_envelope
+# _post_batch
 # ======================================================================
 
 
-class TestSendEnvelope:
+class TestPostBatch:
     """Test the direct HTTP ingestion function."""
 
-    @pytest.fixture(autouse=True)
-    def _no_telemetry_network(self):
-        """Override the conftest autouse fixture — this class needs the
-        real ``_send_envelope`` function so it can test it with mocked
-        ``requests.post`` underneath."""
-        yield
-
     def test_returns_true_on_200(self):
-        from azext_prototype.telemetry import _send_envelope
+        from azext_prototype.telemetry import _post_batch
 
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         with patch("requests.post", return_value=mock_resp):
-            assert _send_envelope({"test": 1}, "https://host/v2/track") is True
+            assert _post_batch([{"test": 1}], "https://host/v2/track") is True
 
     def test_returns_false_on_non_200(self):
-        from azext_prototype.telemetry import _send_envelope
+        from azext_prototype.telemetry import _post_batch
 
         mock_resp = MagicMock()
         mock_resp.status_code = 500
         with patch("requests.post", return_value=mock_resp):
-            assert _send_envelope({"test": 1}, "https://host/v2/track") is False
+            assert _post_batch([{"test": 1}], "https://host/v2/track") is False
 
     def test_returns_false_on_exception(self):
-        from azext_prototype.telemetry import _send_envelope
+        from azext_prototype.telemetry import _post_batch
 
         with patch(
             "requests.post",
             side_effect=Exception("timeout"),
         ):
-            assert _send_envelope({"test": 1}, "https://host/v2/track") is False
+            assert _post_batch([{"test": 1}], "https://host/v2/track") is False
 
-    def test_posts_json_envelope(self):
-        from azext_prototype.telemetry import _send_envelope
+    def test_posts_json_envelopes(self):
+        from azext_prototype.telemetry import _post_batch
 
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         with patch("requests.post", return_value=mock_resp) as mock_post:
-            _send_envelope({"key": "val"}, "https://host/v2/track")
+            _post_batch([{"key": "val"}, {"key": "val2"}], "https://host/v2/track")
             mock_post.assert_called_once()
             _, kwargs = mock_post.call_args
             assert kwargs["headers"]["Content-Type"] == "application/json"
             assert kwargs["timeout"] == 5
             import json
             payload = json.loads(kwargs["data"])
-            assert payload == [{"key": "val"}]
+            assert payload == [{"key": "val"}, {"key": "val2"}]
+
+
+# ======================================================================
+# Spool + background delivery
+# ======================================================================
+
+
+@pytest.fixture
+def ingestion_server():
+    """A local stand-in for the App Insights ``/v2/track`` endpoint.
+
+    Records every POSTed batch in ``server.batches``; respond with
+    ``server.status`` (200 by default).
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            length = int(self.headers.get("Content-Length", 0))
+            self.server.batches.append(json.loads(self.rfile.read(length)))
+            self.send_response(self.server.status)
+            self.end_headers()
+            self.wfile.write(b'{"itemsReceived": 0}')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.batches = []
+    server.status = 200
+    server.endpoint = f"http://127.0.0.1:{server.server_address[1]}/v2/track"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestSpoolDelivery:
+    """Events are spooled to disk and delivered in batches off-thread."""
+
+    @pytest.fixture(autouse=True)
+    def _no_telemetry_network(self):
+        """Override the conftest autouse fixture — these tests need the
+        real ``_send_envelope``; delivery goes to ``ingestion_server``."""
+        yield
+
+    def _spooled(self):
+        import os
+
+        from azext_prototype.telemetry import _spool_dir
+
+        try:
+            return sorted(os.listdir(_spool_dir()))
+        except FileNotFoundError:
+            return []
+
+    def test_flush_sends_one_batch(self, ingestion_server):
+        from azext_prototype.telemetry import _spool_envelope, flush_spool
+
+        for i in range(3):
+            assert _spool_envelope({"n": i}, ingestion_server.endpoint)
+
+        assert flush_spool() == 3
+        assert ingestion_server.batches == [[{"n": 0}, {"n": 1}, {"n": 2}]]
+        assert self._spooled() == []
+
+    def test_flush_splits_large_spool(self, ingestion_server, monkeypatch):
+        from azext_prototype import telemetry
+
+        monkeypatch.setattr(telemetry, "_BATCH_SIZE", 2)
+        for i in range(5):
+            telemetry._spool_envelope({"n": i}, ingestion_server.endpoint)
+
+        assert telemetry.flush_spool() == 5
+        assert [len(b) for b in ingestion_server.batches] == [2, 2, 1]
+
+    def test_failed_batch_retried_then_dropped(self, ingestion_server):
+        from azext_prototype.telemetry import _MAX_ATTEMPTS, _spool_envelope, flush_spool
+
+        ingestion_server.status = 500
+        _spool_envelope({"n": 1}, ingestion_server.endpoint)
+
+        assert flush_spool() == 0
+        assert len(self._spooled()) == 1
+
+        for _ in range(_MAX_ATTEMPTS - 1):
+            flush_spool()
+        assert len(ingestion_server.batches) == _MAX_ATTEMPTS
+        assert self._spooled() == []
+
+    def test_unreachable_endpoint_keeps_event(self):
+        from azext_prototype.telemetry import _spool_envelope, flush_spool
+
+        _spool_envelope({"n": 1}, "http://127.0.0.1:9/v2/track")
+        assert flush_spool() == 0
+        assert len(self._spooled()) == 1
+
+    def test_send_envelope_never_blocks(self):
+        import threading
+        import time
+
+        from azext_prototype import telemetry
+
+        release = threading.Event()
+
+        def _slow_post(envelopes, endpoint):
+            release.wait(5)
+            return True
+
+        with patch(f"{TELEMETRY_MODULE}._post_batch", side_effect=_slow_post):
+            start = time.monotonic()
+            assert telemetry._send_envelope({"n": 1}, "http://host/v2/track") is True
+            assert time.monotonic() - start < 1
+            release.set()
+            telemetry._wait_for_flush(5)
+
+        assert self._spooled() == []
+
+    def test_track_command_delivered_in_background(self, ingestion_server, monkeypatch):
+        from azext_prototype import telemetry
+
+        monkeypatch.setenv(
+            "APPINSIGHTS_CONNECTION_STRING",
+            "InstrumentationKey=k;IngestionEndpoint=" + ingestion_server.endpoint[: -len("/v2/track")],
+        )
+        telemetry.track_command("prototype build", tenant_id="t", project_id="p")
+        telemetry._wait_for_flush(5)
+
+        sent = [e for batch in ingestion_server.batches for e in batch]
+        assert len(sent) == 1
+        assert sent[0]["data"]["baseData"]["properties"]["commandName"] == "prototype build"
+
+    def test_stale_claim_is_reclaimed(self, ingestion_server):
+        import os
+
+        from azext_prototype.telemetry import _CLAIM_TIMEOUT, _spool_dir, _spool_envelope, flush_spool
+
+        _spool_envelope({"n": 1}, ingestion_server.endpoint)
+        (name,) = self._spooled()
+        path = os.path.join(_spool_dir(), name)
+        os.replace(path, path + ".sending")
+        old = os.path.getmtime(path + ".sending") - _CLAIM_TIMEOUT - 10
+        os.utime(path + ".sending", (old, old))
+
+        assert flush_spool() == 1
+        assert ingestion_server.batches == [[{"n": 1}]]
+
+    def test_fresh_claim_left_alone(self, ingestion_server):
+        import os
+
+        from azext_prototype.telemetry import _spool_dir, _spool_envelope, flush_spool
+
+        _spool_envelope({"n": 1}, ingestion_server.endpoint)
+        (name,) = self._spooled()
+        path = os.path.join(_spool_dir(), name)
+        os.replace(path, path + ".sending")
+
+        assert flush_spool() == 0
+        assert ingestion_server.batches == []
+
+    def test_spool_capped(self, ingestion_server, monkeypatch):
+        from azext_prototype import telemetry
+
+        monkeypatch.setattr(telemetry, "_MAX_SPOOL_FILES", 2)
+        for i in range(4):
+            telemetry._spool_envelope({"n": i}, ingestion_server.endpoint)
+
+        assert telemetry.flush_spool() == 2
+        assert ingestion_server.batches == [[{"n": 2}, {"n": 3}]]
+
+    def test_corrupt_spool_entry_discarded(self, ingestion_server):
+        import os
+
+        from azext_prototype.telemetry import _spool_dir, _spool_envelope, flush_spool
+
+        _spool_envelope({"n": 1}, ingestion_server.endpoint)
+        with open(os.path.join(_spool_dir(), "00000000000000000000-1-bad.json"), "w") as fh:
+            fh.write("{not json")
+
+        assert flush_spool() == 1
+        assert self._spooled() == []
+
+    def test_unwritable_spool_falls_back_to_direct_send(self):
+        from azext_prototype import telemetry
+
+        with patch(f"{TELEMETRY_MODULE}._spool_envelope", return_value=False), \
+                patch(f"{TELEMETRY_MODULE}._post_batch", return_value=True) as mock_post:
+            assert telemetry._send_envelope({"n": 1}, "http://host/v2/track") is False
+            for _ in range(50):
+                if mock_post.called:
+                    break
+                import time
+                time.sleep(0.01)
+        mock_post.assert_called_once_with([{"n": 1}], "http://host/v2/track")
+
+    def test_decorator_starts_flusher_before_command(self, mock_env_conn_string):
+        from azext_prototype.telemetry import track as track_decorator
+
+        order = []
+
+        @track_decorator("test command")
+        def my_command(cmd):
+            order.append("command")
+
+        with patch(f"{TELEMETRY_MODULE}._start_flusher", side_effect=lambda: order.append("flush")), \
+                patch(f"{TELEMETRY_MODULE}.track_command"):
+            my_command(MagicMock())
+
+        assert order == ["flush", "command"]
 
 
 # ======================================================================
@@ -1112,6 +1359,51 @@ class TestGetAiConfig:
         monkeypatch.chdir(tmp_path)
         assert _get_ai_config() == ("copilot", "")
 
+    def test_config_parsed_once_for_all_dimensions(self, tmp_path, monkeypatch):
+        import yaml
+
+        from azext_prototype.telemetry import _get_ai_config, _get_project_id
+
+        (tmp_path / "prototype.yaml").write_text(
+            "project:\n  id: p-1\nai:\n  provider: copilot\n  model: m\n"
+        )
+        monkeypatch.chdir(tmp_path)
+        with patch("yaml.safe_load", wraps=yaml.safe_load) as mock_load:
+            assert _get_ai_config() == ("copilot", "m")
+            assert _get_project_id() == "p-1"
+            assert _get_ai_config() == ("copilot", "m")
+        assert mock_load.call_count == 1
+
+    def test_config_reparsed_after_change(self, tmp_path, monkeypatch):
+        import os
+
+        from azext_prototype.telemetry import _get_ai_config
+
+        config = tmp_path / "prototype.yaml"
+        config.write_text("ai:\n  provider: copilot\n")
+        monkeypatch.chdir(tmp_path)
+        assert _get_ai_config() == ("copilot", "")
+
+        config.write_text("ai:\n  provider: azure-openai\n")
+        stat = config.stat()
+        os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert _get_ai_config() == ("azure-openai", "")
+
+    def test_dimensions_cached_on_disk_across_processes(self, tmp_path, monkeypatch):
+        from azext_prototype import telemetry
+
+        (tmp_path / "prototype.yaml").write_text(
+            "project:\n  id: p-1\nai:\n  provider: copilot\n  model: m\n"
+        )
+        monkeypatch.chdir(tmp_path)
+        assert telemetry._get_ai_config() == ("copilot", "m")
+
+        telemetry.reset()  # a later command, in a new process
+        with patch("yaml.safe_load") as mock_load:
+            assert telemetry._get_ai_config() == ("copilot", "m")
+            assert telemetry._get_project_id() == "p-1"
+        mock_load.assert_not_called()
+
 
 # ======================================================================
 # _sanitize_parameters
@@ -338,6 +338,29 @@ async def test_adapter_print_fn_preserves_markup():
         # No exception = success (markup preserved for styled, plain for unstyled)
 
 
+@pytest.mark.asyncio
+async def test_adapter_print_fn_batches_and_echo_keeps_order():
+    """print_fn queues without blocking; the prompt echo lands after queued output."""
+    app = PrototypeApp()
+    async with app.run_test() as pilot:
+        adapter = app.adapter
+        cv = app.console_view
+        await pilot.pause()
+
+        def _worker():
+            for i in range(200):
+                adapter.print_fn(f"[info]→[/info] step {i}")
+
+        t = threading.Thread(target=_worker)
+        t.start()
+        t.join(timeout=5)
+
+        adapter.on_prompt_submitted("yes")
+        assert cv.pending_count == 0
+        assert "step 199" in cv.lines[-2].text
+        assert cv.lines[-1].text.strip() == "> yes"
+
+
 # -------------------------------------------------------------------- #
 # response_fn
 # -------------------------------------------------------------------- #
@@ -6,11 +6,16 @@ the full PrototypeApp in a headless terminal.
 
 from __future__ import annotations
 
+import threading
+import time
+
 import pytest
+from rich.segment import Segment
+from textual.strip import Strip
 
 from azext_prototype.ui.app import PrototypeApp
 from azext_prototype.ui.task_model import TaskItem, TaskStatus, TaskStore
-from azext_prototype.ui.widgets.console_view import ConsoleView
+from azext_prototype.ui.widgets.console_view import ConsoleView, _render_markdown
 from azext_prototype.ui.widgets.info_bar import InfoBar
 from azext_prototype.ui.widgets.prompt_input import PromptInput
 from azext_prototype.ui.widgets.task_tree import TaskTree
@@ -249,6 +254,111 @@ async def test_console_view_write_markup_invalid_falls_back():
         app.console_view.write_markup("[invalid_tag_that_wont_parse")
 
 
+# -------------------------------------------------------------------- #
+# ConsoleView scrollback, batching and markdown cache
+# -------------------------------------------------------------------- #
+
+
+async def _drain(pilot, cv) -> None:
+    for _ in range(20):
+        if not cv.pending_count:
+            return
+        await pilot.pause(0.02)
+
+
+@pytest.mark.asyncio
+async def test_console_view_scrollback_is_bounded():
+    """Old lines are dropped in batches once the scrollback limit is exceeded."""
+    app = PrototypeApp()
+    async with app.run_test() as pilot:
+        cv = app.console_view
+        await pilot.pause()
+        cv.scrollback_limit = 100
+        written = cv.line_count_written
+        for i in range(500):
+            cv.write_text(f"line {i}")
+        assert 100 <= len(cv.lines) <= 110
+        assert cv.line_count_written == written + 500
+        assert cv._start_line > 0
+        assert cv.virtual_size.height == len(cv.lines)
+        assert "line 499" in cv.lines[-1].text
+
+
+@pytest.mark.asyncio
+async def test_console_view_enqueue_coalesces_writes():
+    """Writes queued from a worker thread are applied in a few batches."""
+    app = PrototypeApp()
+    async with app.run_test() as pilot:
+        cv = app.console_view
+        await pilot.pause()
+        before = len(cv.lines)
+        flushes = cv.flush_count
+
+        def _worker():
+            for i in range(300):
+                cv.enqueue(cv.write_text, f"worker line {i}")
+
+        t = threading.Thread(target=_worker)
+        t.start()
+        t.join(timeout=5)
+        await _drain(pilot, cv)
+
+        assert cv.pending_count == 0
+        assert len(cv.lines) == before + 300
+        assert "worker line 299" in cv.lines[-1].text
+        assert cv.flush_count - flushes < 10
+
+
+@pytest.mark.asyncio
+async def test_console_view_flush_preserves_order():
+    """flush() applies queued writes in order before a direct write."""
+    app = PrototypeApp()
+    async with app.run_test() as pilot:
+        cv = app.console_view
+        await pilot.pause()
+        cv.enqueue(cv.write_text, "queued")
+        cv.flush()
+        cv.write_text("direct")
+        assert [line.text.strip() for line in cv.lines[-2:]] == ["queued", "direct"]
+        assert cv.pending_count == 0
+
+
+def test_render_markdown_is_cached():
+    content = "# Heading\n\n1. first\n2. second"
+    assert _render_markdown(content) is _render_markdown(content)
+    assert _render_markdown(content + " ") is not _render_markdown(content)
+
+
+@pytest.mark.asyncio
+async def test_console_view_frame_time_steady_at_50k_lines():
+    """Headless benchmark: a frame of output costs the same at 50k lines as at 0."""
+    app = PrototypeApp()
+    async with app.run_test() as pilot:
+        cv = app.console_view
+        await pilot.pause()
+        filler = Strip([Segment("x" * 60)])
+
+        async def _frame() -> float:
+            start = time.perf_counter()
+            for i in range(50):
+                cv.enqueue(cv.write_text, f"status line {i}")
+            cv.flush()
+            await pilot.pause()
+            return time.perf_counter() - start
+
+        baseline = min([await _frame() for _ in range(5)])
+        frames = []
+        for _ in range(50):
+            # Simulate 1,000 more lines of session history per frame
+            cv.lines.extend([filler] * 1000)
+            frames.append(await _frame())
+
+        assert cv.line_count_written > 50_000
+        assert len(cv.lines) <= cv.scrollback_limit * 1.1
+        late = sorted(frames[-10:])[5]
+        assert late < baseline * 5 + 0.05
+
+
 # -------------------------------------------------------------------- #
 # PromptInput allow_empty tests
 # -------------------------------------------------------------------- #
@@ -286,3 +396,14 @@ async def test_prompt_input_input_mode():
         assert prompt._enabled is True
         assert prompt.text == "> "
         assert prompt.placeholder == ""
+
+
+@pytest.mark.asyncio
+async def test_escape_cancels_running_command():
+    """Escape reaches the app's binding even while the prompt is disabled."""
+    app = PrototypeApp()
+    async with app.run_test() as pilot:
+        app.prompt_input.focus()
+        assert app.prompt_input._enabled is False
+        await pilot.press("escape")
+        assert app.adapter.cancel_event.is_set()
@@ -324,6 +324,285 @@ class TestSearchCache:
         assert cache.get("q1") == "new"
         assert cache.stats()["entries"] == 1
 
+    def test_eviction_is_least_recently_used(self):
+        cache = SearchCache(ttl_seconds=60, max_entries=3)
+        for q in ("q1", "q2", "q3"):
+            cache.put(q, q)
+        cache.get("q1")  # q2 is now least recently used
+        cache.put("q4", "q4")
+        assert "q1" in cache
+        assert "q2" not in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_budget_eviction(self):
+        cache = SearchCache(ttl_seconds=60, max_entries=10, max_bytes=10)
+        cache.put("q1", "12345")
+        cache.put("q2", "12345")
+        cache.put("q3", "12345")
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] == 10
+        assert "q1" not in cache
+
+    def test_expired_entries_purged_on_put(self):
+        cache = SearchCache(ttl_seconds=60)
+        cache.put("old", "r")
+        cache._store["old"] = (time.monotonic() - 120, "r", 1)
+        cache._born["old"] = time.monotonic() - 120
+        cache.put("new", "r")
+        assert len(cache) == 1
+        assert cache.stats()["expirations"] == 1
+
+    def test_invalidate_all_keeps_stats(self, cache):
+        cache.put("q1", "r1")
+        cache.get("q1")
+        cache.invalidate_all()
+        stats = cache.stats()
+        assert stats["entries"] == 0
+        assert stats["bytes"] == 0
+        assert stats["hits"] == 1
+
+    def test_concurrent_access(self):
+        import threading
+
+        cache = SearchCache(ttl_seconds=60, max_entries=20)
+
+        def worker(n):
+            for i in range(200):
+                cache.put(f"q{(n * 7 + i) % 40}", "x" * (i % 5))
+                cache.get(f"q{i % 40}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = cache.stats()
+        assert stats["entries"] <= 20
+        assert stats["hits"] + stats["misses"] == 8 * 200
+        assert stats["bytes"] == sum(entry[2] for entry in cache._store.values())
+
+    def test_cache_stats_aggregates_by_name(self):
+        from azext_prototype.knowledge.search_cache import LRUCache, cache_stats, format_cache_stats
+
+        a = LRUCache(name="test-agg")
+        b = LRUCache(name="test-agg")
+        LRUCache().put("unnamed", "ignored")
+        a.put("k", "v")
+        a.get("k")
+        b.get("k")
+
+        stats = cache_stats()["test-agg"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert any("test-agg" in line and "50%" in line for line in format_cache_stats({"test-agg": stats}))
+
+
+# ================================================================== #
+# Persistent Document Cache
+# ================================================================== #
+
+def _page_response(html, status=200, etag=None, last_modified=None):
+    resp = _mock_page_response(html)
+    resp.status_code = status
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    resp.headers = headers
+    return resp
+
+
+class TestDocumentCache:
+    """Tests for DocumentCache."""
+
+    def test_page_round_trip(self, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+
+        cache = DocumentCache(str(tmp_path))
+        cache.put_page("https://learn.microsoft.com/a", "text", etag='"v1"', last_modified="Mon")
+        entry = cache.get_page("https://learn.microsoft.com/a")
+        assert entry["text"] == "text"
+        assert entry["fresh"] is True
+        assert DocumentCache.validators(entry) == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon"}
+
+    def test_persists_across_instances(self, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+
+        DocumentCache(str(tmp_path)).put_search("Cosmos  DB", 2, [{"url": "u"}])
+        assert DocumentCache(str(tmp_path)).get_search("cosmos db", 2) == [{"url": "u"}]
+
+    def test_stale_page_still_returned(self, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+
+        cache = DocumentCache(str(tmp_path), fresh_seconds=0)
+        cache.put_page("u", "old text")
+        entry = cache.get_page("u")
+        assert entry["fresh"] is False
+        assert entry["text"] == "old text"
+
+    def test_stale_search_expires(self, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+
+        cache = DocumentCache(str(tmp_path), fresh_seconds=0)
+        cache.put_search("q", 2, [{"url": "u"}])
+        assert cache.get_search("q", 2) is None
+
+    def test_size_bound_evicts_least_recently_used(self, tmp_path):
+        import os
+
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+
+        cache = DocumentCache(str(tmp_path), max_bytes=1500)
+        cache.put_page("a", "A" * 500)
+        cache.put_page("b", "B" * 500)
+        # Make "a" clearly older than "b", then use "a" so "b" is the LRU
+        for i, name in enumerate(sorted(os.listdir(tmp_path))):
+            os.utime(tmp_path / name, (1000 + i, 1000 + i))
+        assert cache.get_page("a") is not None
+        cache.put_page("c", "C" * 500)
+
+        assert cache.get_page("a") is not None
+        assert cache.get_page("b") is None
+        assert cache.get_page("c") is not None
+        assert cache.stats()["bytes"] <= 1500
+
+    def test_reads_keep_mtime(self, tmp_path):
+        import os
+
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+
+        cache = DocumentCache(str(tmp_path))
+        cache.put_page("a", "A")
+        (entry,) = tmp_path.iterdir()
+        os.utime(entry, (1000, 1000))
+
+        assert cache.get_page("a")["text"] == "A"
+        assert entry.stat().st_mtime == 1000  # the local index signs pages by mtime
+        assert entry.stat().st_atime > 1000
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+
+        cache = DocumentCache(str(tmp_path))
+        cache.put_page("u", "text")
+        for f in tmp_path.glob("*.json"):
+            f.write_text("{not json")
+        assert cache.get_page("u") is None
+
+    def test_clear(self, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+
+        cache = DocumentCache(str(tmp_path))
+        cache.put_page("u", "text")
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+        assert cache.get_page("u") is None
+
+
+class TestPersistentFetch:
+    """fetch_page_content / search_learn backed by the document cache."""
+
+    @patch("azext_prototype.knowledge.web_search.requests.get")
+    def test_fresh_page_served_from_disk(self, mock_get):
+        from azext_prototype.knowledge.web_search import fetch_page_content
+
+        mock_get.return_value = _page_response("<p>Hello</p>", etag='"v1"')
+        assert fetch_page_content("https://learn.microsoft.com/x") == "Hello"
+        assert fetch_page_content("https://learn.microsoft.com/x") == "Hello"
+        assert mock_get.call_count == 1
+
+    @patch("azext_prototype.knowledge.web_search._html_to_text", return_value="Hello")
+    @patch("azext_prototype.knowledge.web_search.requests.get")
+    def test_stale_page_revalidated_with_etag(self, mock_get, mock_extract, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+        from azext_prototype.knowledge.web_search import fetch_page_content
+
+        cache = DocumentCache(str(tmp_path), fresh_seconds=0)
+        mock_get.return_value = _page_response("<p>Hello</p>", etag='"v1"', last_modified="Mon")
+        fetch_page_content("https://learn.microsoft.com/x", cache=cache)
+
+        mock_get.return_value = _page_response("", status=304)
+        assert fetch_page_content("https://learn.microsoft.com/x", cache=cache) == "Hello"
+        _, kwargs = mock_get.call_args
+        assert kwargs["headers"] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon"}
+        # HTML extraction only ran for the first (200) response
+        assert mock_extract.call_count == 1
+
+    @patch("azext_prototype.knowledge.web_search.requests.get")
+    def test_changed_page_replaced(self, mock_get, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+        from azext_prototype.knowledge.web_search import fetch_page_content
+
+        cache = DocumentCache(str(tmp_path), fresh_seconds=0)
+        mock_get.return_value = _page_response("<p>Old</p>", etag='"v1"')
+        fetch_page_content("u", cache=cache)
+        mock_get.return_value = _page_response("<p>New</p>", etag='"v2"')
+        assert fetch_page_content("u", cache=cache) == "New"
+        assert cache.get_page("u")["etag"] == '"v2"'
+
+    @patch("azext_prototype.knowledge.web_search.requests.get")
+    def test_offline_falls_back_to_stale_copy(self, mock_get, tmp_path):
+        from azext_prototype.knowledge.doc_cache import DocumentCache
+        from azext_prototype.knowledge.web_search import fetch_page_content
+
+        cache = DocumentCache(str(tmp_path), fresh_seconds=0)
+        mock_get.return_value = _page_response("<p>Cached</p>")
+        fetch_page_content("u", cache=cache)
+        mock_get.side_effect = Exception("offline")
+        assert fetch_page_content("u", cache=cache) == "Cached"
+
+    @patch("azext_prototype.knowledge.web_search.requests.get")
+    def test_search_results_cached(self, mock_get):
+        from azext_prototype.knowledge.web_search import search_learn
+
+        mock_get.return_value = _mock_search_response([{"title": "T", "url": "https://u", "description": ""}])
+        first = search_learn("cosmos db", max_results=2)
+        second = search_learn("Cosmos DB", max_results=2)
+        assert first == second == [{"title": "T", "url": "https://u", "description": ""}]
+        assert mock_get.call_count == 1
+
+    @patch("azext_prototype.knowledge.web_search.requests.get")
+    def test_empty_search_not_cached(self, mock_get):
+        from azext_prototype.knowledge.web_search import search_learn
+
+        mock_get.return_value = _mock_search_response([])
+        search_learn("nothing")
+        search_learn("nothing")
+        assert mock_get.call_count == 2
+
+    @patch("azext_prototype.knowledge.web_search.requests.get")
+    def test_pages_fetched_concurrently(self, mock_get):
+        import threading
+
+        from azext_prototype.knowledge.web_search import search_and_fetch
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        def side_effect(url, **kwargs):
+            if "api/search" in url:
+                return _mock_search_response([
+                    {"title": f"Doc {i}", "url": f"https://learn.microsoft.com/d{i}", "description": ""}
+                    for i in range(3)
+                ])
+            barrier.wait()  # Deadlocks unless all three fetches run at once
+            return _page_response(f"<p>Body of {url[-2:]}</p>")
+
+        mock_get.side_effect = side_effect
+        result = search_and_fetch("q", max_results=3)
+        assert result.index("Doc 0") < result.index("Doc 1") < result.index("Doc 2")
+        assert "Body of d2" in result
+
+    @patch("azext_prototype.knowledge.web_search.search_and_fetch")
+    def test_search_and_fetch_many_preserves_order(self, mock_search):
+        from azext_prototype.knowledge.web_search import search_and_fetch_many
+
+        mock_search.side_effect = lambda q, **kw: f"result for {q}" if q != "none" else ""
+        assert search_and_fetch_many(["a", "none", "b"], max_results=2) == ["result for a", "", "result for b"]
+
 
 # ================================================================== #
 # Marker Interception — BaseAgent._resolve_searches
@@ -332,6 +611,12 @@ class TestSearchCache:
 class TestMarkerInterception:
     """Tests for [SEARCH: ...] marker detection and resolution."""
 
+    @pytest.fixture(autouse=True)
+    def _no_local_index(self):
+        """These tests cover the network path — the offline index finds nothing."""
+        with patch("azext_prototype.knowledge.local_index.search_local", return_value=""):
+            yield
+
     def _make_agent(self, enable_search=True):
         from azext_prototype.agents.base import BaseAgent
         agent = BaseAgent(
@@ -419,7 +704,7 @@ class TestMarkerInterception:
         # Pre-populate cache
         cache = SearchCache()
         cache.put("cosmos db", "Cached content")
-        context._search_cache = cache
+        context.search_cache = cache
 
         agent.execute(context, "task")
         # search_and_fetch should NOT be called since cache has it
@@ -780,6 +1065,12 @@ class TestBacklogIntegration:
 class TestSessionIntegration:
     """Tests for session-level integration of web search."""
 
+    @pytest.fixture(autouse=True)
+    def _no_local_index(self):
+        """These tests cover the network path — the offline index finds nothing."""
+        with patch("azext_prototype.knowledge.local_index.search_local", return_value=""):
+            yield
+
     @patch("azext_prototype.knowledge.web_search.search_and_fetch")
     def test_cache_attached_to_context_on_first_search(self, mock_search):
         mock_search.return_value = "Doc content"
@@ -804,10 +1095,9 @@ class TestSessionIntegration:
             project_config={}, project_dir="/tmp", ai_provider=provider,
         )
 
-        assert not hasattr(context, "_search_cache")
+        assert context.search_cache is None
         agent.execute(context, "task")
-        assert hasattr(context, "_search_cache")
-        assert isinstance(context._search_cache, SearchCache)
+        assert isinstance(context.search_cache, SearchCache)
 
     @patch("azext_prototype.knowledge.web_search.search_and_fetch")
     def test_cache_shared_across_agents(self, mock_search):
@@ -844,7 +1134,25 @@ class TestSessionIntegration:
 
         # Agent 2 should have gotten cache hit, so search_and_fetch only called once
         assert mock_search.call_count == 1
-        assert context._search_cache.stats()["hits"] == 1
+        assert context.search_cache.stats()["hits"] == 1
+
+    def test_delegate_shares_search_cache(self):
+        """Sub-agents launched by the orchestrator reuse the parent's cache."""
+        from azext_prototype.agents.base import AgentContext
+        from azext_prototype.agents.orchestrator import AgentOrchestrator
+
+        sub_agent = MagicMock()
+        sub_agent.execute.return_value = AIResponse(content="ok", model="m", usage={})
+        registry = MagicMock()
+        registry.get.return_value = sub_agent
+
+        context = AgentContext(project_config={}, project_dir="/tmp", ai_provider=MagicMock())
+        AgentOrchestrator(registry, context).delegate("lead", "sub", "task")
+
+        sub_context = sub_agent.execute.call_args[0][0]
+        assert sub_context is not context
+        assert sub_context.search_cache is context.search_cache
+        assert isinstance(context.search_cache, SearchCache)
 
     @patch("azext_prototype.knowledge.web_search.search_and_fetch")
     def test_token_tracker_records_both_calls(self, mock_search):